@@ -70,6 +70,16 @@ DEVICE_TYPE = os.getenv("DEVICE_TYPE", "cuda")  # cuda 또는 cpu
 # 기본값: true (양자화 사용)
 USE_QUANTIZATION = os.getenv("USE_QUANTIZATION", "true").lower() in ("true", "1", "yes", "on")
 
+# CPU 추론 프로파일 (DEVICE_TYPE=cpu 또는 GPU가 없는 노드, USE_QUANTIZATION은 CUDA 전용)
+# - fp32: 기존 방식 (float32, 7B 기준 약 28GB)
+# - bf16: bfloat16 가중치 (CPU가 bf16을 지원하지 않으면 fp32로 폴백, 약 14GB)
+# - int8: 언어 모델 Linear 레이어 동적 int8 양자화 (torch.ao, 약 7-9GB)
+LLAVA_CPU_PROFILE = os.getenv("LLAVA_CPU_PROFILE", "fp32").lower()
+# CPU 추론 스레드 수 (0이면 사용 가능한 CPU 수)
+LLAVA_CPU_THREADS = int(os.getenv("LLAVA_CPU_THREADS", "0"))
+# CPU 추론 시 torch.compile 사용 여부 (첫 요청 컴파일 시간 증가, 이후 디코딩 가속)
+LLAVA_CPU_COMPILE = os.getenv("LLAVA_CPU_COMPILE", "false").lower() in ("true", "1", "yes", "on")
+
 # 모델 저장 디렉토리 (프로젝트 루트의 model 폴더)
 # config.py가 프로젝트 루트에 있으므로 현재 파일의 디렉토리를 기준으로 설정
 MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model")
@@ -104,8 +114,126 @@ else:
 GPT_API_KEY = os.getenv("OPENAPI_KEY") or os.getenv("GPT_API_KEY", "")  # OpenAI API 키
 GPT_MODEL_NAME = os.getenv("GPT_MODEL_NAME", "gpt-4o-mini")  # 사용할 GPT 모델
 GPT_MAX_TOKENS = int(os.getenv("GPT_MAX_TOKENS", "1000"))  # 최대 토큰 수
+GPT_BASE_URL = os.getenv("GPT_BASE_URL", "")  # OpenAI 호환 서버 주소 (예: 로컬 가짜 서버 http://127.0.0.1:8099/v1, 비어있으면 OpenAI)
+GPT_MAX_CONCURRENCY = int(os.getenv("GPT_MAX_CONCURRENCY", "8"))  # 동시 GPT 호출 수 상한 (초과 요청은 대기)
+GPT_MAX_CONNECTIONS = int(os.getenv("GPT_MAX_CONNECTIONS", "16"))  # 공유 HTTP 커넥션 풀 크기
+GPT_MAX_RETRIES = int(os.getenv("GPT_MAX_RETRIES", "4"))  # 429 / 5xx / 연결 오류 재시도 횟수
+GPT_BACKOFF_BASE_SECONDS = float(os.getenv("GPT_BACKOFF_BASE_SECONDS", "0.5"))  # 지수 백오프 기본 대기 시간
+GPT_BACKOFF_MAX_SECONDS = float(os.getenv("GPT_BACKOFF_MAX_SECONDS", "20"))  # 재시도 대기 시간 상한
+GPT_TIMEOUT_SECONDS = float(os.getenv("GPT_TIMEOUT_SECONDS", "60"))  # 호출별 타임아웃
+
+# GPT 응답 캐시 설정 (같은 모델/프롬프트 버전/입력/temperature면 GPT 호출 생략)
+GPT_CACHE_ENABLED = os.getenv("GPT_CACHE_ENABLED", "true").lower() in ("true", "1", "yes", "on")
+GPT_CACHE_SIZE = int(os.getenv("GPT_CACHE_SIZE", "2048"))  # 메모리 LRU 최대 항목 수 (DB 테이블은 공유 2차 캐시)
+GPT_CACHE_TTL_HOURS = float(os.getenv("GPT_CACHE_TTL_HOURS", "168"))  # 캐시 유효 시간
+# 이 값보다 높은 temperature 호출은 캐시하지 않음 (기본 0.3: 번역(0.3)만 캐시, 피드 글(0.7)은 샘플링 결과의 다양성 유지)
+# 0.7이면 피드 글까지, 0이면 캐시 사용 안 함 (현재 temperature 0 호출 없음)
+GPT_CACHE_MAX_TEMPERATURE = float(os.getenv("GPT_CACHE_MAX_TEMPERATURE", "0.3"))
 
 # Job State Listener 설정
 ENABLE_JOB_STATE_LISTENER = os.getenv("ENABLE_JOB_STATE_LISTENER", "true").lower() in ("true", "1", "yes", "on")
 JOB_STATE_LISTENER_RECONNECT_DELAY = int(os.getenv("JOB_STATE_LISTENER_RECONNECT_DELAY", "5"))
-
+# job_variants_id별 NOTIFY 병합 윈도우 (ms): 윈도우 내 연속 이벤트는 최신 상태 1개로 처리, 0이면 즉시 처리
+LISTENER_COALESCE_WINDOW_MS = int(os.getenv("LISTENER_COALESCE_WINDOW_MS", "50"))
+# Job / Variant 상태 메모리 미러: DB 대조 주기 (초), 미러에 유지할 진행 중 job 범위 (최근 N시간 내 갱신)
+JOB_STATE_MIRROR_RECONCILE_SECONDS = float(os.getenv("JOB_STATE_MIRROR_RECONCILE_SECONDS", "30"))
+JOB_STATE_MIRROR_WINDOW_HOURS = float(os.getenv("JOB_STATE_MIRROR_WINDOW_HOURS", "24"))
+# LISTEN 연결 생존 확인: probe 간격 / 응답 제한 (초), 재연결 시 누락 이벤트 재생 범위 여유 (watermark 이전 N초부터)
+LISTENER_PROBE_INTERVAL_SECONDS = float(os.getenv("LISTENER_PROBE_INTERVAL_SECONDS", "5"))
+LISTENER_PROBE_TIMEOUT_SECONDS = float(os.getenv("LISTENER_PROBE_TIMEOUT_SECONDS", "3"))
+LISTENER_CATCHUP_SKEW_SECONDS = float(os.getenv("LISTENER_CATCHUP_SKEW_SECONDS", "5"))
+# 재시도 스케줄러 timer wheel tick 간격 (초): 실패 재시도는 실패 유형별 백오프 후 tick 단위로 실행
+RETRY_SCHEDULER_TICK_SECONDS = float(os.getenv("RETRY_SCHEDULER_TICK_SECONDS", "0.5"))
+# 주기 복구 스캔: 간격 (초), running이 이 시간(초)보다 오래 갱신 없으면 failed(timeout) 처리 (단계 API 타임아웃 30분보다 길게),
+# done인데 다른 variant보다 뒤처진 채 이 시간(초) 이상 갱신 없으면 다음 단계 재트리거
+RECOVERY_SCAN_INTERVAL_SECONDS = float(os.getenv("RECOVERY_SCAN_INTERVAL_SECONDS", "60"))
+RECOVERY_STALE_RUNNING_SECONDS = float(os.getenv("RECOVERY_STALE_RUNNING_SECONDS", "2400"))
+RECOVERY_LAGGING_DONE_SECONDS = float(os.getenv("RECOVERY_LAGGING_DONE_SECONDS", "300"))
+# 리스너 리더 선출 (멀티 워커/레플리카 배포 시 Postgres advisory lock을 잡은 프로세스 1개만 리스너 실행)
+LISTENER_LEADER_ELECTION = os.getenv("LISTENER_LEADER_ELECTION", "true").lower() in ("true", "1", "yes", "on")
+LISTENER_LEADER_LOCK_KEY = int(os.getenv("LISTENER_LEADER_LOCK_KEY", "72017"))  # 같은 DB를 쓰는 모든 워커가 같은 값
+LISTENER_LEADER_RETRY_SECONDS = float(os.getenv("LISTENER_LEADER_RETRY_SECONDS", "5"))  # 팔로워의 lock 획득 재시도 간격
+
+# Job 레벨 텍스트 단계 선행 실행 설정
+# ad_copy_gen_kor / instagram_feed_gen GPT 호출을 variant 처리와 동시에 미리 실행하고, 모든 variants 완료 후 결과만 커밋
+# (리스너 프로세스에서 시작, 결과는 gpt_response_cache로 공유되어 gpt / instagram_feed 라우터가 다른 워커에 있어도 재사용
+#  테이블이 없으면 같은 프로세스의 라우터에서만 재사용)
+ENABLE_SPECULATIVE_TEXT = os.getenv("ENABLE_SPECULATIVE_TEXT", "true").lower() in ("true", "1", "yes", "on")
+SPECULATIVE_TEXT_WAIT_SECONDS = float(os.getenv("SPECULATIVE_TEXT_WAIT_SECONDS", "30"))  # 합류 시점에 진행 중인 선행 호출 대기 시간
+SPECULATIVE_TEXT_TTL_SECONDS = int(os.getenv("SPECULATIVE_TEXT_TTL_SECONDS", "3600"))  # 사용되지 않은 선행 결과 보관 시간
+
+# Overlay 다중 후보 렌더링 설정
+# OVERLAY_CANDIDATE_COUNT > 1이면 상위 K개 proposal을 병렬 렌더링 후 사전 평가하여 최적 후보만 저장
+# 1이면 기존 방식 (softmax 샘플링으로 proposal 1개 선택)
+OVERLAY_CANDIDATE_COUNT = int(os.getenv("OVERLAY_CANDIDATE_COUNT", "1"))
+
+# 폰트 색상/스타일/크기 추천 방식
+# - palette (기본값): 텍스트 영역 팔레트 기반 결정적 추천 (NumPy, 수 ms), Stage 1에서 LLaVA 폰트 추천 생성 생략
+# - llava: Stage 1에서 LLaVA로 폰트 추천 생성 (팔레트 추천은 누락 필드 보완용)
+FONT_RECOMMENDER = os.getenv("FONT_RECOMMENDER", "palette").lower()
+
+# CPU 작업 프로세스 풀 설정 (planner 마스크 연산, overlay 텍스트 레이아웃/합성)
+# 앱 시작 시 워커를 미리 생성/워밍업, 0이면 비활성화 (요청 스레드에서 실행)
+CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# 앱 역할 설정 (마운트할 라우터 선택, 콤마 구분)
+# 예: APP_ROLES=planner,overlay,evals → 해당 라우터만 import/마운트 (torch 등 무거운 모듈 로드 없음)
+# "all"이면 전체 라우터, "listener"는 Job State Listener 실행 여부 (ENABLE_JOB_STATE_LISTENER와 함께 적용)
+APP_ROLES = [role.strip().lower() for role in os.getenv("APP_ROLES", "all").split(",") if role.strip()]
+
+# 모델 레지스트리 설정 (LLaVA / YOLO / EasyOCR 상주 관리)
+# MODEL_PRELOAD: 앱 시작 시 백그라운드로 미리 로드할 모델 (콤마 구분: llava,yolo,ocr), 비어 있으면 첫 요청 시 로드
+# MODEL_*_BUDGET_MB: 디바이스별 모델 메모리 예산 (0이면 제한 없음), 초과 시 유휴 모델을 LRU 순으로 언로드
+MODEL_PRELOAD = [name.strip().lower() for name in os.getenv("MODEL_PRELOAD", "").split(",") if name.strip()]
+MODEL_GPU_MEMORY_BUDGET_MB = int(os.getenv("MODEL_GPU_MEMORY_BUDGET_MB", "0"))
+MODEL_RAM_BUDGET_MB = int(os.getenv("MODEL_RAM_BUDGET_MB", "0"))
+
+# 분산 트레이싱 설정 (리스너 → 트리거 → 단계 API → 모델 추론 → DB 커밋 span 연결)
+# TRACING_SAMPLE_RATIO: 루트 span 샘플링 비율 (trace_id 기준, 하위 span은 루트 결정을 따름)
+# TRACING_EXPORTER: file (TRACING_FILE_PATH에 JSONL) 또는 otlp (OTLP/HTTP JSON, Jaeger / Tempo / OTel Collector)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() in ("true", "1", "yes", "on")
+TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", "0.1"))
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "file").lower()
+TRACING_FILE_PATH = os.getenv("TRACING_FILE_PATH", "logs/traces.jsonl")
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "feedlyai-pipeline")
+
+# 관리자 API 토큰 (/admin/*, X-Admin-Token 헤더), 비어 있으면 관리자 API 비활성화
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# 단계 샘플링 프로파일러 설정 (관리자 API로 실행 중 변경 가능)
+# PROFILER_STAGES: 대상 단계 (콤마 구분, 예: planner,overlay), 비어 있으면 모든 단계
+# PROFILER_SAMPLE_RATIO: 대상 단계 요청 중 프로파일링할 비율 (0.01 = 1%)
+# 결과: PROFILER_DIR/{stage}/{시각}.collapsed (collapsed-stack, flamegraph.pl / speedscope 입력)
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() in ("true", "1", "yes", "on")
+PROFILER_SAMPLE_RATIO = float(os.getenv("PROFILER_SAMPLE_RATIO", "0.01"))
+PROFILER_STAGES = [stage.strip() for stage in os.getenv("PROFILER_STAGES", "").split(",") if stage.strip()]
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "10"))  # 스택 샘플링 간격
+PROFILER_DUMP_INTERVAL_SECONDS = float(os.getenv("PROFILER_DUMP_INTERVAL_SECONDS", "300"))  # collapsed-stack 파일 저장 주기
+PROFILER_DIR = os.getenv("PROFILER_DIR", os.path.join(PART_ASSETS_DIR, "profiles"))
+
+# 부하 테스트용 stub 모델 (scripts/load_test_pipeline.py)
+# STUB_MODELS: stub 백엔드를 기본값으로 사용할 모델 (콤마 구분: llava,yolo,ocr,gpt, all은 llava,yolo,ocr)
+# STUB_LATENCY: 모델별 지연 분포 (예: llava=lognormal:1500:0.3,yolo=normal:60:15,ocr=const:150,gpt=normal:800:200, 단위 ms)
+# all에 GPT가 포함되지 않는 이유: 부하 테스트는 GPT_BASE_URL을 가짜 서버(scripts/fake_openai_server.py)로 지정해 GPT 클라이언트까지 측정
+STUB_MODELS = [name.strip().lower() for name in os.getenv("STUB_MODELS", "").split(",") if name.strip()]
+STUB_LATENCY = os.getenv("STUB_LATENCY", "")
+
+# 추론 백엔드 설정 (모델 계열별 실행 방식, services/inference_backends.py)
+# LLAVA_BACKEND / OCR_BACKEND: local (이 프로세스에서 torch 추론) | remote (추론 워커) | stub (고정 응답)
+# YOLO_BACKEND: local | onnx (ONNX로 내보낸 모델, 없으면 첫 로드 시 .pt에서 내보내기) | remote | stub
+# GPT_BACKEND: openai (OpenAI 또는 GPT_BASE_URL의 호환 서버) | stub (고정 응답, 네트워크 없음)
+# INFERENCE_WORKER_URL: remote 백엔드가 호출할 추론 워커 주소 (워커는 APP_ROLES=inference_worker, 해당 모델은 local/onnx)
+# INFERENCE_MAX_CONCURRENCY: 모델별 동시 추론 수 (예: llava=1,yolo=4, 0이면 제한 없음), 지정하지 않으면 백엔드 기본값
+_STUB_ALL = "all" in STUB_MODELS
+LLAVA_BACKEND = os.getenv("LLAVA_BACKEND", "stub" if _STUB_ALL or "llava" in STUB_MODELS else "local").lower()
+YOLO_BACKEND = os.getenv("YOLO_BACKEND", "stub" if _STUB_ALL or "yolo" in STUB_MODELS else "local").lower()
+OCR_BACKEND = os.getenv("OCR_BACKEND", "stub" if _STUB_ALL or "ocr" in STUB_MODELS else "local").lower()
+GPT_BACKEND = os.getenv("GPT_BACKEND", "stub" if "gpt" in STUB_MODELS else "openai").lower()
+INFERENCE_WORKER_URL = os.getenv("INFERENCE_WORKER_URL", "").rstrip("/")
+INFERENCE_WORKER_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_WORKER_TIMEOUT_SECONDS", "300"))
+INFERENCE_MAX_CONCURRENCY = {
+    name.strip().lower(): int(value)
+    for name, _, value in (item.partition("=") for item in os.getenv("INFERENCE_MAX_CONCURRENCY", "").split(","))
+    if name.strip() and value.strip()
+}
@@ -2,10 +2,10 @@
 """데이터베이스 모델 및 세션 관리"""
 ########################################################
 # created_at: 2025-11-20
-# updated_at: 2025-12-03
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: Database model and session management logic
-# version: 1.1.2
+# version: 1.5.0
 # status: development
 # tags: database
 # dependencies: fastapi, pydantic, PIL, requests
@@ -15,17 +15,43 @@
 
 import datetime
 import uuid
-from sqlalchemy import create_engine, Column, String, Integer, Float, DateTime, ForeignKey, Text
-from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy import create_engine, event, text, Column, String, Integer, Float, DateTime, ForeignKey, Text
+from sqlalchemy.orm import sessionmaker, declarative_base, deferred, Session
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
+from prometheus_client import Counter
 from config import DATABASE_URL
+from services.tracing import current_traceparent
+from services.stage_metrics import current_stage_name
 
 Base = declarative_base()
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+@event.listens_for(SessionLocal, "after_begin")
+def _set_trace_context(session, transaction, connection):
+    """트랜잭션에 현재 traceparent 설정 (NOTIFY 트리거가 payload에 포함 → 리스너가 trace 이어감)"""
+    traceparent = current_traceparent()
+    if traceparent:
+        # is_local=true: 트랜잭션 종료 시 자동 해제 (커넥션 풀 재사용 시 누수 없음)
+        connection.execute(text("SELECT set_config('app.traceparent', :tp, true)"), {"tp": traceparent})
+
+
+db_queries_total = Counter(
+    'db_queries_total',
+    'SQL statements executed through SQLAlchemy (listener asyncpg queries not included)',
+    ['stage', 'operation']
+)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    """단계별 SQL 실행 수 (단계 밖은 stage="none", operation은 첫 키워드: select / insert / update / ...)"""
+    operation = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "other"
+    db_queries_total.labels(stage=current_stage_name() or "none", operation=operation).inc()
+
+
 class OverlayLayout(Base):
     """OverlayLayout 데이터베이스 모델"""
     __tablename__ = "overlay_layouts"
@@ -164,6 +190,9 @@ class YOLORun(Base):
     model_name = Column(String(255), nullable=True)  # 사용된 모델 이름
     detection_count = Column(Integer, default=0)  # 감지된 객체 개수
     latency_ms = Column(Float, nullable=True)  # YOLO 실행 시간 (밀리초)
+    # 추론 텔레메트리 (구간별 시간, 최대 메모리, 배치 크기 등)
+    # 지연 로드: 컬럼 추가 전 DB에서도 db.query(YOLORun) 조회가 동작하도록 접근할 때만 SELECT
+    telemetry = deferred(Column(JSONB, nullable=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -252,6 +281,21 @@ class LLMTrace(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
+class GPTResponseCache(Base):
+    """GPT 응답 캐시 데이터베이스 모델"""
+    __tablename__ = "gpt_response_cache"
+    
+    cache_key = Column(Text, primary_key=True)  # sha256(모델, 프롬프트 템플릿 버전, 정규화된 입력, temperature)
+    operation = Column(Text, nullable=False)  # 'eng_to_kor', 'feed_gen', 'speculative_*' (선행 실행 결과 공유)
+    model_name = Column(Text, nullable=False)
+    template_version = Column(Text, nullable=False)
+    temperature = Column(Float, nullable=True)
+    result = Column(JSONB, nullable=False)  # gpt_service 반환값 (latency_ms, call_stats 제외)
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_hit_at = Column(DateTime(timezone=True), nullable=True)
+
+
 class TxtAdCopyGeneration(Base):
     """Text Ad Copy Generations 데이터베이스 모델"""
     __tablename__ = "txt_ad_copy_generations"
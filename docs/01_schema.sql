@@ -168,6 +168,7 @@ CREATE TABLE IF NOT EXISTS jobs (
     current_step TEXT,  -- Current pipeline step: 'vlm_analyze', 'vlm_planner', 'vlm_judge', 'llm_translate', 'llm_prompt', etc.
     version TEXT,
     retry_count INTEGER DEFAULT 0,  -- Job 재시도 횟수 (자동 복구 로직에 의해 증가)
+    next_attempt_at TIMESTAMP WITH TIME ZONE,  -- 예약된 다음 재시도 시각 (실패 유형별 백오프, 없으면 NULL)
     pk SERIAL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
@@ -196,6 +197,7 @@ CREATE TABLE IF NOT EXISTS jobs_variants (
     status TEXT DEFAULT 'queued',  -- queued, running, done, failed
     current_step TEXT DEFAULT 'vlm_analyze',  -- 'vlm_analyze', 'yolo_detect', 'planner', 'overlay', 'vlm_judge', 'ocr_eval', 'readability_eval', 'iou_eval'
     retry_count INTEGER DEFAULT 0,  -- Variant 재시도 횟수 (자동 복구 로직에 의해 증가)
+    next_attempt_at TIMESTAMP WITH TIME ZONE,  -- 예약된 다음 재시도 시각 (실패 유형별 백오프, 없으면 NULL)
     overlaid_img_asset_id UUID REFERENCES image_assets(image_asset_id),  -- 최종 오버레이 이미지 asset 참조 (image_type='overlaid')
     pk SERIAL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
@@ -256,10 +258,13 @@ CREATE TABLE IF NOT EXISTS yolo_runs (
     model_name VARCHAR(255),
     detection_count INTEGER DEFAULT 0,
     latency_ms FLOAT,
+    telemetry JSONB,
     pk SERIAL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
+-- 기존 DB: 추론 텔레메트리 컬럼 추가
+ALTER TABLE yolo_runs ADD COLUMN IF NOT EXISTS telemetry JSONB;
 
 -- PLANNER_PROPOSALS 테이블
 CREATE TABLE IF NOT EXISTS planner_proposals (
@@ -364,6 +369,20 @@ CREATE TABLE IF NOT EXISTS llm_traces (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- GPT_RESPONSE_CACHE 테이블
+-- GPT 응답 캐시 (모델, 프롬프트 템플릿 버전, 정규화된 입력, temperature의 sha256 → 결과)
+CREATE TABLE IF NOT EXISTS gpt_response_cache (
+    cache_key TEXT PRIMARY KEY,  -- sha256 hex
+    operation TEXT NOT NULL,  -- 'eng_to_kor', 'feed_gen', 'speculative_*' (선행 실행 결과 공유, cache_key = 'speculative:{stage}:{job_id}')
+    model_name TEXT NOT NULL,
+    template_version TEXT NOT NULL,
+    temperature FLOAT,
+    result JSONB NOT NULL,  -- gpt_service 반환값 (latency_ms, call_stats 제외)
+    hit_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    last_hit_at TIMESTAMP WITH TIME ZONE
+);
+
 -- ============================================
 -- 6. 텍스트 생성 및 광고문구 관리 (Text Generation & Ad Copy Management)
 -- ============================================
@@ -541,10 +560,15 @@ CREATE INDEX IF NOT EXISTS idx_gen_runs_created_at ON gen_runs(created_at);
 CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at);
 CREATE INDEX IF NOT EXISTS idx_job_inputs_created_at ON job_inputs(created_at);
 CREATE INDEX IF NOT EXISTS idx_jobs_variants_created_at ON jobs_variants(created_at);
+-- 리스너 복구 스캔 / 상태 미러 (마지막 스캔 이후 변경분만 range scan)
+CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs(updated_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_variants_updated_at ON jobs_variants(updated_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_variants_status_updated_at ON jobs_variants(status, updated_at);
 CREATE INDEX IF NOT EXISTS idx_vlm_traces_created_at ON vlm_traces(created_at);
 CREATE INDEX IF NOT EXISTS idx_llm_traces_created_at ON llm_traces(created_at);
 CREATE INDEX IF NOT EXISTS idx_txt_ad_copy_generations_created_at ON txt_ad_copy_generations(created_at);
 CREATE INDEX IF NOT EXISTS idx_evaluations_created_at ON evaluations(created_at);
+CREATE INDEX IF NOT EXISTS idx_gpt_response_cache_created_at ON gpt_response_cache(created_at);  -- 만료 행 삭제
 CREATE INDEX IF NOT EXISTS idx_instagram_feeds_created_at ON instagram_feeds(created_at);
 CREATE INDEX IF NOT EXISTS idx_llm_traces_created_at_tokens ON llm_traces(created_at, total_tokens);
 
@@ -821,6 +845,7 @@ COMMENT ON COLUMN jobs.status IS '작업 상태 (queued, running, done, failed)'
 COMMENT ON COLUMN jobs.current_step IS '현재 파이프라인 단계 (vlm_analyze, vlm_planner, vlm_judge, llm_translate, llm_prompt 등)';
 COMMENT ON COLUMN jobs.version IS '작업 버전';
 COMMENT ON COLUMN jobs.retry_count IS '작업 재시도 횟수 (자동 복구 로직에 의해 증가)';
+COMMENT ON COLUMN jobs.next_attempt_at IS '예약된 다음 재시도 시각 (실패 유형별 백오프, 예약 없으면 NULL)';
 COMMENT ON COLUMN jobs.pk IS '자동 증가 기본 키 (SERIAL)';
 COMMENT ON COLUMN jobs.created_at IS '레코드 생성 시간';
 COMMENT ON COLUMN jobs.updated_at IS '레코드 수정 시간';
@@ -844,6 +869,7 @@ COMMENT ON COLUMN jobs_variants.selected IS '선택 여부 (기본값: FALSE)';
 COMMENT ON COLUMN jobs_variants.status IS '변형 상태 (queued, running, done, failed)';
 COMMENT ON COLUMN jobs_variants.current_step IS '현재 단계 (vlm_analyze, yolo_detect, planner, overlay, vlm_judge, ocr_eval, readability_eval, iou_eval)';
 COMMENT ON COLUMN jobs_variants.retry_count IS '변형 재시도 횟수 (자동 복구 로직에 의해 증가)';
+COMMENT ON COLUMN jobs_variants.next_attempt_at IS '예약된 다음 재시도 시각 (실패 유형별 백오프, 예약 없으면 NULL)';
 COMMENT ON COLUMN jobs_variants.overlaid_img_asset_id IS 'FK: 최종 오버레이 이미지 ID (image_assets 테이블 참조, image_type=overlaid)';
 COMMENT ON COLUMN jobs_variants.pk IS '자동 증가 기본 키 (SERIAL)';
 COMMENT ON COLUMN jobs_variants.created_at IS '레코드 생성 시간';
@@ -866,7 +892,7 @@ COMMENT ON COLUMN vlm_traces.provider IS 'VLM 제공자 (예: llava)';
 COMMENT ON COLUMN vlm_traces.prompt_id IS 'FK: VLM 프롬프트 ID (vlm_prompt_assets 테이블 참조)';
 COMMENT ON COLUMN vlm_traces.operation_type IS '작업 타입 (analyze, planner, judge)';
 COMMENT ON COLUMN vlm_traces.request IS 'VLM API 요청 내용 (JSONB)';
-COMMENT ON COLUMN vlm_traces.response IS 'VLM API 응답 내용 (JSONB)';
+COMMENT ON COLUMN vlm_traces.response IS 'VLM API 응답 내용 (JSONB). telemetry 키: generate별 preprocess / vision_encode / prefill / decode ms, 생성 토큰 수, 토큰/초, 최대 메모리, 배치 크기, 캐시 hit 및 합계';
 COMMENT ON COLUMN vlm_traces.latency_ms IS 'VLM API 호출 소요 시간 (밀리초)';
 COMMENT ON COLUMN vlm_traces.pk IS '자동 증가 기본 키 (SERIAL)';
 COMMENT ON COLUMN vlm_traces.created_at IS '레코드 생성 시간';
@@ -893,6 +919,7 @@ COMMENT ON COLUMN yolo_runs.forbidden_mask_url IS '금지 영역 마스크 URL';
 COMMENT ON COLUMN yolo_runs.model_name IS '사용된 YOLO 모델 이름';
 COMMENT ON COLUMN yolo_runs.detection_count IS '탐지된 객체 개수 (기본값: 0)';
 COMMENT ON COLUMN yolo_runs.latency_ms IS 'YOLO 실행 소요 시간 (밀리초)';
+COMMENT ON COLUMN yolo_runs.telemetry IS '추론 텔레메트리 (JSONB). 예: {"preprocess_ms": 3.1, "vision_encode_ms": 41.2, "postprocess_ms": 1.5, "peak_memory_mb": 812.0, "batch_size": 1, "cache_hits": 1}';
 COMMENT ON COLUMN yolo_runs.pk IS '자동 증가 기본 키 (SERIAL)';
 COMMENT ON COLUMN yolo_runs.created_at IS '레코드 생성 시간';
 COMMENT ON COLUMN yolo_runs.updated_at IS '레코드 수정 시간';
@@ -0,0 +1,82 @@
+-- FeedlyAI 상태 변경 NOTIFY 트리거
+-- Version: 1.1
+-- Created: 2026-10-19
+-- Updated: 2026-10-19
+--
+-- 01_schema.sql만 적용한 새 DB에서 리스너가 동작하도록 트리거 함수 / 트리거 생성
+-- (운영 DB는 db/init에서 이미 생성, 같은 이름의 함수 / 트리거가 있으면 건드리지 않음)
+-- - notify_job_variant_state_change(): db/init/03_job_variants_state_notify_trigger.sql 정의 그대로
+--   (presentation/01_AUTOMATION_TRIGGER_SYSTEM.md)
+-- - notify_job_state_change(): db/init 정의 그대로 (docs/analysis/ANALYSIS_JOB_STATE_DETECTION.md)
+-- - job_variant_state_change_trigger: jobs_variants 상태 변경 → job_variant_state_changed 채널
+-- - job_state_change_trigger: jobs 상태 변경 → job_state_changed 채널
+-- payload의 traceparent는 이 파일 다음에 04_notify_trace_context.sql로 추가
+
+DO $bootstrap$
+BEGIN
+    IF to_regprocedure('notify_job_variant_state_change()') IS NULL THEN
+        EXECUTE $definition$
+CREATE FUNCTION notify_job_variant_state_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- current_step, status, 또는 updated_at이 변경된 경우 NOTIFY 발행
+    -- updated_at 변경도 감지하여 INSERT 후 UPDATE 시 트리거 발동
+    IF (OLD.current_step IS DISTINCT FROM NEW.current_step
+        OR OLD.status IS DISTINCT FROM NEW.status
+        OR OLD.updated_at IS DISTINCT FROM NEW.updated_at) THEN
+        
+        PERFORM pg_notify(
+            'job_variant_state_changed',
+            json_build_object(
+                'job_variants_id', NEW.job_variants_id::text,
+                'job_id', NEW.job_id::text,
+                'current_step', NEW.current_step,
+                'status', NEW.status,
+                'img_asset_id', NEW.img_asset_id::text,
+                'tenant_id', (SELECT tenant_id FROM jobs WHERE job_id = NEW.job_id),
+                'updated_at', NEW.updated_at
+            )::text
+        );
+    END IF;
+    
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+$definition$;
+    END IF;
+
+    IF to_regprocedure('notify_job_state_change()') IS NULL THEN
+        EXECUTE $definition$
+CREATE FUNCTION notify_job_state_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('job_state_changed', 
+        json_build_object(
+            'job_id', NEW.job_id,
+            'current_step', NEW.current_step,
+            'status', NEW.status
+        )::text
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+$definition$;
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'job_variant_state_change_trigger') THEN
+        CREATE TRIGGER job_variant_state_change_trigger
+            AFTER UPDATE ON jobs_variants
+            FOR EACH ROW
+            EXECUTE FUNCTION notify_job_variant_state_change();
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'job_state_change_trigger') THEN
+        CREATE TRIGGER job_state_change_trigger
+            AFTER UPDATE ON jobs
+            FOR EACH ROW
+            WHEN (OLD.current_step IS DISTINCT FROM NEW.current_step
+               OR OLD.status IS DISTINCT FROM NEW.status)
+            EXECUTE FUNCTION notify_job_state_change();
+    END IF;
+END;
+$bootstrap$;
@@ -0,0 +1,88 @@
+-- FeedlyAI NOTIFY trace context
+-- Version: 1.1
+-- Created: 2026-10-19
+-- Updated: 2026-10-19
+--
+-- 상태 변경 NOTIFY payload에 traceparent 추가 (분산 트레이싱, TRACING_ENABLED)
+-- - 단계 API의 DB 트랜잭션이 app.traceparent를 설정 (database.py after_begin, is_local=true)
+-- - 트리거 함수 payload에 'traceparent', NULLIF(current_setting('app.traceparent', true), '') 추가
+-- - 리스너가 payload의 traceparent로 이어서 span 시작 → 단계 간 구간이 하나의 trace로 연결
+-- - 설정이 없으면 NULL (트레이싱 비활성 / 수동 UPDATE), 리스너는 새 트레이스로 처리
+--
+-- 마이그레이션 방식: 트리거 함수를 새로 정의하지 않고 DB에 있는 정의(db/init)를 그대로 수정
+-- - pg_get_functiondef로 현재 정의를 읽어 pg_notify의 json_build_object(...) 마지막 인자로 traceparent만 추가
+-- - 다른 payload 필드, NOTIFY 조건, 트리거 정의는 변경하지 않음
+-- - 이미 traceparent가 있으면 건너뜀 (여러 번 적용해도 안전)
+-- - 함수가 없으면 건너뜀 (새 DB는 03_state_notify_triggers.sql 적용 후 이 파일 적용)
+-- 되돌리기: db/init의 원래 함수 정의를 다시 적용
+
+DO $migration$
+DECLARE
+    fn_name TEXT;
+    fn_oid REGPROCEDURE;
+    definition TEXT;
+    args_start INT;
+    pos INT;
+    depth INT;
+    in_string BOOLEAN;
+    ch TEXT;
+    head TEXT;
+    trimmed TEXT;
+BEGIN
+    FOREACH fn_name IN ARRAY ARRAY['notify_job_variant_state_change', 'notify_job_state_change'] LOOP
+        fn_oid := to_regprocedure(fn_name || '()');
+        IF fn_oid IS NULL THEN
+            RAISE NOTICE '%() 없음, 건너뜀 (db/init 또는 03_state_notify_triggers.sql을 먼저 적용)', fn_name;
+            CONTINUE;
+        END IF;
+
+        definition := pg_get_functiondef(fn_oid);
+        IF position('app.traceparent' IN definition) > 0 THEN
+            RAISE NOTICE '%(): traceparent 이미 포함, 건너뜀', fn_name;
+            CONTINUE;
+        END IF;
+
+        args_start := position('json_build_object(' IN definition);
+        IF args_start = 0 THEN
+            RAISE WARNING '%(): json_build_object payload를 찾을 수 없음, 건너뜀', fn_name;
+            CONTINUE;
+        END IF;
+
+        -- json_build_object(의 닫는 괄호 찾기 (문자열 리터럴 / -- 주석 안의 괄호는 무시)
+        pos := args_start + length('json_build_object(');
+        depth := 1;
+        in_string := FALSE;
+        WHILE depth > 0 AND pos <= length(definition) LOOP
+            ch := substr(definition, pos, 1);
+            IF in_string THEN
+                IF ch = '''' THEN
+                    in_string := FALSE;
+                END IF;
+            ELSIF ch = '''' THEN
+                in_string := TRUE;
+            ELSIF substr(definition, pos, 2) = '--' THEN
+                pos := pos + position(E'\n' IN substr(definition, pos)) - 1;
+            ELSIF ch = '(' THEN
+                depth := depth + 1;
+            ELSIF ch = ')' THEN
+                depth := depth - 1;
+            END IF;
+            pos := pos + 1;
+        END LOOP;
+        IF depth > 0 THEN
+            RAISE WARNING '%(): json_build_object 인자 끝을 찾을 수 없음, 건너뜀', fn_name;
+            CONTINUE;
+        END IF;
+
+        -- pos - 1: 닫는 괄호 위치, 마지막 인자 바로 뒤(공백/줄바꿈 앞)에 traceparent 추가
+        head := substr(definition, 1, pos - 2);
+        trimmed := rtrim(head, E' \t\r\n');
+        definition := trimmed
+            || ', ''traceparent'', NULLIF(current_setting(''app.traceparent'', true), '''')'
+            || substr(head, length(trimmed) + 1)
+            || substr(definition, pos - 1);
+        EXECUTE definition;
+        RAISE NOTICE '%(): payload에 traceparent 추가', fn_name;
+    END LOOP;
+END;
+$migration$;
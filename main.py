@@ -8,10 +8,10 @@
 #       - Metrics endpoint
 ########################################################
 # created_at: 2025-11-13
-# updated_at: 2025-11-28
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: Main application logic
-# version: 0.1.0
+# version: 0.4.1
 # status: development
 # tags: main
 # dependencies: fastapi, pydantic, PIL, requests
@@ -20,19 +20,89 @@
 ########################################################
 
 import os
+import asyncio
+import importlib
 import subprocess
 import logging
 from contextlib import asynccontextmanager
+from typing import List, Tuple
 from fastapi import FastAPI
-from config import PART_NAME, HOST, PORT, ENABLE_JOB_STATE_LISTENER
+from config import PART_NAME, HOST, PORT, ENABLE_JOB_STATE_LISTENER, APP_ROLES, MODEL_PRELOAD, ENABLE_SPECULATIVE_TEXT
 from middleware import metrics_middleware, metrics_endpoint
-from routers import (
-    yolo, planner, overlay, evals, llava_stage1, llava_stage2, health,
-    gpt, refined_ad_copy, ocr_eval, readability_eval, iou_eval, instagram_feed
-)
+from routers import health, admin
 
 logger = logging.getLogger(__name__)
 
+# 역할(role)별 라우터 모듈 (등록 순서 유지, health는 항상 마운트)
+# 선택되지 않은 라우터는 import하지 않으므로 torch/transformers/ultralytics/openai 로드 비용이 없음
+ROUTER_MODULES = {
+    "yolo": "routers.yolo",
+    "planner": "routers.planner",
+    "overlay": "routers.overlay",
+    "evals": "routers.evals",
+    "llava_stage1": "routers.llava_stage1",
+    "llava_stage2": "routers.llava_stage2",
+    "ocr_eval": "routers.ocr_eval",
+    "readability_eval": "routers.readability_eval",
+    "iou_eval": "routers.iou_eval",
+    "gpt": "routers.gpt",
+    "refined_ad_copy": "routers.refined_ad_copy",
+    "instagram_feed": "routers.instagram_feed",
+    "inference_worker": "routers.inference_worker",
+}
+# 여러 라우터를 묶은 역할
+ROLE_GROUPS = {
+    "llava": ["llava_stage1", "llava_stage2"],
+}
+
+
+def resolve_app_roles(roles: List[str]) -> Tuple[List[str], bool]:
+    """
+    APP_ROLES 해석
+    
+    Args:
+        roles: 역할 리스트 (예: ["planner", "overlay", "listener"])
+    
+    Returns:
+        (마운트할 라우터 이름 리스트, Job State Listener 실행 여부)
+    
+    Raises:
+        ValueError: 알 수 없는 역할
+    """
+    if not roles or "all" in roles:
+        return list(ROUTER_MODULES), True
+    selected = set()
+    for role in roles:
+        if role == "listener":
+            continue
+        if role in ROLE_GROUPS:
+            selected.update(ROLE_GROUPS[role])
+        elif role in ROUTER_MODULES:
+            selected.add(role)
+        else:
+            raise ValueError(
+                f"알 수 없는 APP_ROLES 값: {role} "
+                f"(사용 가능: all, listener, {', '.join(list(ROUTER_MODULES) + list(ROLE_GROUPS))})"
+            )
+    return [name for name in ROUTER_MODULES if name in selected], "listener" in roles
+
+
+ACTIVE_ROUTERS, LISTENER_ROLE = resolve_app_roles(APP_ROLES)
+RUN_JOB_STATE_LISTENER = ENABLE_JOB_STATE_LISTENER and LISTENER_ROLE
+# 폰트/CPU 풀이 필요한 라우터 (텍스트 렌더링, 마스크 연산)
+USES_FONTS = "overlay" in ACTIVE_ROUTERS or "planner" in ACTIVE_ROUTERS
+USES_CPU_POOL = "overlay" in ACTIVE_ROUTERS or "planner" in ACTIVE_ROUTERS
+# 텍스트 단계 선행 실행: 트리거(리스너)가 있는 프로세스에서 시작
+# (결과는 gpt_response_cache로 공유되어 gpt / instagram_feed 라우터가 있는 어느 워커에서도 재사용)
+RUN_SPECULATIVE_TEXT = ENABLE_SPECULATIVE_TEXT and RUN_JOB_STATE_LISTENER
+
+# 사전 로딩 가능한 모델 → 모델을 레지스트리에 등록하는 서비스 모듈
+MODEL_SERVICE_MODULES = {
+    "llava": "services.llava_service",
+    "yolo": "services.yolo_service",
+    "ocr": "services.ocr_service",
+}
+
 # 애플리케이션 시작 시 폰트 설치 확인
 def check_and_install_fonts():
     """폰트 설치 확인 및 설치"""
@@ -55,8 +125,9 @@ def check_and_install_fonts():
     except Exception as e:
         logger.error(f"❌ 폰트 설치 확인 중 오류: {e}")
 
-# 애플리케이션 시작 시 폰트 확인
-check_and_install_fonts()
+# 애플리케이션 시작 시 폰트 확인 (폰트를 사용하는 라우터가 있을 때만)
+if USES_FONTS:
+    check_and_install_fonts()
 
 # root_path는 리버스 프록시(nginx) 뒤에서만 필요
 # 직접 접근 시에는 None으로 설정하여 /docs가 정상 작동하도록 함
@@ -74,7 +145,53 @@ async def lifespan(app: FastAPI):
     print("애플리케이션 시작 중...")
     logger.info("애플리케이션 시작 중...")
     
-    if ENABLE_JOB_STATE_LISTENER:
+    print(f"APP_ROLES: {','.join(APP_ROLES)} → 라우터: {','.join(ACTIVE_ROUTERS)}")
+    logger.info(f"APP_ROLES: {APP_ROLES}, 라우터: {ACTIVE_ROUTERS}, 리스너: {RUN_JOB_STATE_LISTENER}")
+    
+    # 폰트 레지스트리 구축 (폰트 파일 검증, 이름/스타일/한글 커버리지 인덱스)
+    if USES_FONTS:
+        try:
+            from services.font_registry import get_font_registry
+            registry = await asyncio.to_thread(get_font_registry)
+            print(f"✓ 폰트 레지스트리 구축 완료: {len(registry.faces)}개 폰트")
+        except Exception as e:
+            print(f"❌ 폰트 레지스트리 구축 실패: {e}")
+            logger.error(f"폰트 레지스트리 구축 실패: {e}", exc_info=True)
+    
+    # CPU 작업 프로세스 풀 사전 생성 및 워밍업 (planner/overlay CPU 연산 오프로드)
+    if USES_CPU_POOL:
+        try:
+            from services.cpu_pool import start_cpu_pool
+            print("CPU 작업 프로세스 풀 시작...")
+            await asyncio.to_thread(start_cpu_pool)
+            print("✓ CPU 작업 프로세스 풀 시작 완료")
+        except Exception as e:
+            print(f"❌ CPU 작업 프로세스 풀 시작 실패: {e}")
+            logger.error(f"CPU 작업 프로세스 풀 시작 실패: {e}", exc_info=True)
+    
+    # 모델 백그라운드 사전 로딩 (첫 요청 지연 제거, 준비 상태는 /healthz에서 확인)
+    if MODEL_PRELOAD:
+        try:
+            from services.model_registry import model_registry
+            unknown = [name for name in MODEL_PRELOAD if name not in MODEL_SERVICE_MODULES]
+            if unknown:
+                logger.warning(f"알 수 없는 MODEL_PRELOAD 값 무시: {unknown} (사용 가능: {', '.join(MODEL_SERVICE_MODULES)})")
+            names = [name for name in MODEL_PRELOAD if name in MODEL_SERVICE_MODULES]
+            for name in names:
+                importlib.import_module(MODEL_SERVICE_MODULES[name])  # import 시 레지스트리에 등록
+            model_registry.preload(names)
+            print(f"✓ 모델 백그라운드 사전 로딩 시작: {', '.join(names)}")
+        except Exception as e:
+            print(f"❌ 모델 사전 로딩 시작 실패: {e}")
+            logger.error(f"모델 사전 로딩 시작 실패: {e}", exc_info=True)
+    
+    # Job 레벨 텍스트 단계(GPT) 선행 실행 활성화 (리스너 시작 전)
+    if RUN_SPECULATIVE_TEXT:
+        from services.speculative_text_service import enable_speculative_text
+        enable_speculative_text()
+        print("✓ 텍스트 단계 선행 실행 활성화")
+    
+    if RUN_JOB_STATE_LISTENER:
         print(f"ENABLE_JOB_STATE_LISTENER: {ENABLE_JOB_STATE_LISTENER}")
         try:
             from services.job_state_listener import start_listener
@@ -94,7 +211,7 @@ async def lifespan(app: FastAPI):
     print("애플리케이션 종료 중...")
     logger.info("애플리케이션 종료 중...")
     
-    if ENABLE_JOB_STATE_LISTENER:
+    if RUN_JOB_STATE_LISTENER:
         try:
             from services.job_state_listener import stop_listener
             print("Job State Listener 종료...")
@@ -103,6 +220,29 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             print(f"❌ Job State Listener 종료 실패: {e}")
             logger.error(f"Job State Listener 종료 실패: {e}", exc_info=True)
+    
+    if RUN_SPECULATIVE_TEXT:
+        from services.speculative_text_service import shutdown_speculative_text
+        shutdown_speculative_text()
+    
+    # 추론 백엔드 정리 (GPT 커넥션 풀, 추론 워커 커넥션 풀)
+    from services.inference_backends import close_backends
+    await asyncio.to_thread(close_backends)
+    
+    if USES_CPU_POOL:
+        try:
+            from services.cpu_pool import shutdown_cpu_pool
+            await asyncio.to_thread(shutdown_cpu_pool)
+        except Exception as e:
+            logger.error(f"CPU 작업 프로세스 풀 종료 실패: {e}", exc_info=True)
+    
+    # 프로파일러에 남은 스택 저장
+    from services.stage_profiler import stage_profiler
+    await asyncio.to_thread(stage_profiler.dump)
+    
+    # 대기 중인 trace span 내보내기
+    from services.tracing import flush as flush_traces
+    await asyncio.to_thread(flush_traces)
 
 app = FastAPI(
     title=f"app-{PART_NAME} (Planner/Overlay/Eval)",
@@ -113,20 +253,11 @@ app = FastAPI(
 # 미들웨어 등록
 app.middleware("http")(metrics_middleware)
 
-# 라우터 등록
-app.include_router(yolo.router)
-app.include_router(planner.router)
-app.include_router(overlay.router)
-app.include_router(evals.router)
-app.include_router(llava_stage1.router)
-app.include_router(llava_stage2.router)
-app.include_router(ocr_eval.router)
-app.include_router(readability_eval.router)
-app.include_router(iou_eval.router)
-app.include_router(gpt.router)
-app.include_router(refined_ad_copy.router)
-app.include_router(instagram_feed.router)
+# 라우터 등록 (APP_ROLES로 선택된 라우터만 import)
+for router_name in ACTIVE_ROUTERS:
+    app.include_router(importlib.import_module(ROUTER_MODULES[router_name]).router)
 app.include_router(health.router)
+app.include_router(admin.router)
 
 # 메트릭 엔드포인트
 app.get("/metrics")(metrics_endpoint)
@@ -10,10 +10,11 @@
 #       - Collect metrics for HTTP request status code
 ########################################################
 # created_at: 2025-11-20
-# updated_at: 2025-11-20
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: Metrics middleware logic
-# version: 0.1.0
+# version: 0.3.0
+# changes: traceparent 헤더로 요청 서버 span 시작 (트리거 → 단계 핸들러 trace 연결)
 # status: development
 # tags: metrics
 # dependencies: fastapi, pydantic, PIL, requests
@@ -24,6 +25,8 @@
 import time
 from fastapi import Request, Response
 from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from services.stage_metrics import READY_AT_HEADER, mark_request_received
+from services.tracing import TRACEPARENT_HEADER, start_span, parse_traceparent
 
 # 메트릭 정의
 http_requests_total = Counter(
@@ -45,19 +48,36 @@ async def metrics_middleware(request: Request, call_next):
     if request.url.path == "/metrics":
         return await call_next(request)
     
-    start_time = time.time()
-    response = await call_next(request)
-    duration = time.time() - start_time
+    # 단계 핸들러의 queue_wait 계산용 (이전 단계 done 시각 헤더가 없으면 요청 도착 시각 기준)
+    mark_request_received(request.headers.get(READY_AT_HEADER))
+    
+    # 트리거가 보낸 traceparent가 있으면 같은 trace로 이어서 서버 span 시작
+    with start_span(
+        f"{request.method} {request.url.path}",
+        {'http.method': request.method},
+        parent=parse_traceparent(request.headers.get(TRACEPARENT_HEADER)),
+        kind='server'
+    ) as span:
+        start_time = time.time()
+        response = await call_next(request)
+        duration = time.time() - start_time
+        
+        # 매칭된 라우트 템플릿 사용 (없으면 원본 경로)
+        route = request.scope.get("route")
+        endpoint = getattr(route, "path", None) or request.url.path
+        if span is not None:
+            span.name = f"{request.method} {endpoint}"
+            span.set_attribute('http.status_code', response.status_code)
     
     http_requests_total.labels(
         method=request.method,
-        endpoint=request.url.path,
+        endpoint=endpoint,
         status=response.status_code
     ).inc()
     
     http_request_duration_seconds.labels(
         method=request.method,
-        endpoint=request.url.path
+        endpoint=endpoint
     ).observe(duration)
     
     return response
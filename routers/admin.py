@@ -0,0 +1,84 @@
+"""관리자 라우터"""
+########################################################
+# 운영 중 진단용 관리자 API (ADMIN_TOKEN 헤더 인증)
+#
+# 기능:
+# - 샘플링 프로파일러 설정 조회 / 변경 (재배포 없이 켜고 끄기, 대상 단계, 요청 비율)
+# - 단계별 hot 함수 top-N 조회, collapsed-stack 파일 저장, 누적 통계 초기화
+# - ADMIN_TOKEN이 설정되지 않으면 모든 요청 거부
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Admin-protected diagnostics endpoints (sampling profiler)
+# version: 1.0.0
+# status: development
+# tags: admin, profiling
+# dependencies: fastapi, pydantic
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import secrets
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from pydantic import BaseModel, Field
+from config import ADMIN_TOKEN
+from services.stage_profiler import stage_profiler
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None, alias=ADMIN_TOKEN_HEADER)):
+    """관리자 토큰 확인 (ADMIN_TOKEN 미설정 시 관리자 API 비활성화)"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="관리자 API가 비활성화되어 있습니다 (ADMIN_TOKEN 미설정)")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="관리자 토큰이 올바르지 않습니다")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+class ProfilerConfigIn(BaseModel):
+    """프로파일러 설정 변경 (지정하지 않은 항목은 유지)"""
+    enabled: Optional[bool] = None
+    sample_ratio: Optional[float] = Field(default=None, ge=0.0, le=1.0)  # 대상 단계 요청 중 프로파일링 비율
+    stages: Optional[List[str]] = None  # 대상 단계 (빈 리스트면 모든 단계)
+    interval_ms: Optional[float] = Field(default=None, ge=1.0)  # 스택 샘플링 간격
+
+
+@router.get("/profiler")
+def get_profiler():
+    """프로파일러 상태 조회"""
+    return stage_profiler.status()
+
+
+@router.put("/profiler")
+def configure_profiler(body: ProfilerConfigIn):
+    """프로파일러 설정 변경 (비활성화 시 남은 샘플을 파일로 저장)"""
+    return stage_profiler.configure(
+        enabled=body.enabled,
+        sample_ratio=body.sample_ratio,
+        stages=body.stages,
+        interval_ms=body.interval_ms
+    )
+
+
+@router.get("/profiler/top")
+def profiler_top(stage: Optional[str] = None, limit: int = Query(default=20, ge=1, le=200)):
+    """단계별 hot 함수 top-N (self: 직접 실행 중, total: 호출 스택에 포함)"""
+    return stage_profiler.top(stage=stage, limit=limit)
+
+
+@router.post("/profiler/dump")
+def dump_profiler():
+    """마지막 저장 이후 수집된 스택을 collapsed-stack 파일로 저장"""
+    return {"files": stage_profiler.dump()}
+
+
+@router.post("/profiler/reset")
+def reset_profiler():
+    """누적 통계 초기화 (저장되지 않은 스택은 먼저 저장)"""
+    stage_profiler.reset()
+    return stage_profiler.status()
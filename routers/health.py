@@ -10,10 +10,10 @@
 #       - etc.
 ########################################################
 # created_at: 2025-11-20
-# updated_at: 2025-11-20
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: Health check logic
-# version: 0.1.0
+# version: 0.3.0
 # status: development
 # tags: health
 # dependencies: fastapi, pydantic, PIL, requests
@@ -26,14 +26,25 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from database import get_db
 from config import PART_NAME
+from services.model_registry import model_registry
+from services.inference_backends import backend_status
 
 router = APIRouter(tags=["health"])
 
 
 @router.get("/healthz")
 def health(db: Session = Depends(get_db)):
-    """헬스 체크 엔드포인트 (DB 연결 테스트 포함)"""
+    """헬스 체크 엔드포인트 (DB 연결 테스트, 모델 준비 상태 포함)"""
     # DB 연결 테스트
     db.execute(text("SELECT 1"))
-    return {"ok": True, "service": f"app-{PART_NAME}"}
+    # 모델 상태 (ready: MODEL_PRELOAD 대상 모델이 모두 로드되었는지)
+    models = model_registry.status()
+    return {
+        "ok": True,
+        "service": f"app-{PART_NAME}",
+        "ready": models["ready"],
+        "models": models["models"],
+        # 생성된 추론 백엔드의 종류와 처리 능력 (배치 크기, 동시 추론 수, 원격 여부)
+        "backends": backend_status()
+    }
 
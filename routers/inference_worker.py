@@ -0,0 +1,125 @@
+"""추론 워커 라우터"""
+########################################################
+# remote 추론 백엔드가 호출하는 추론 전용 API
+#
+# 기능:
+# - LLaVA 생성 / YOLO 감지 / EasyOCR 인식을 이 프로세스의 백엔드(local / onnx / stub)로 실행
+#   (API 노드는 *_BACKEND=remote, INFERENCE_WORKER_URL로 이 워커 지정)
+# - 이미지는 base64 PNG, LLaVA 생성 중단 조건은 파서 설정(stop)으로 전달
+# - 백엔드별 동시 추론 수 제한 / 텔레메트리 기록은 워커에서도 동일하게 적용
+# - 워커 자신의 백엔드가 remote면 409 (요청 순환 방지)
+#
+# 실행 예 (GPU 노드): APP_ROLES=inference_worker MODEL_PRELOAD=llava,yolo,ocr python main.py
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Inference worker endpoints for remote LLaVA / YOLO / OCR backends
+# version: 1.0.0
+# status: development
+# tags: inference, worker, llava, yolo, ocr
+# dependencies: fastapi, pydantic, numpy, pillow
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+from typing import Any, Dict, List, Optional
+import logging
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from services.inference_backends import get_backend, backend_status, decode_image
+from services.llava_stream_parser import detector_from_spec
+from services.llava_service import process_image_with_llava
+from services.yolo_service import predict_detections
+from services.ocr_service import read_text
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/inference", tags=["inference_worker"])
+
+
+class LlavaInferenceIn(BaseModel):
+    image: str  # base64 PNG
+    prompt: str
+    max_new_tokens: int = Field(default=512, ge=1)
+    temperature: float = 0.1
+    do_sample: bool = False
+    stop: Optional[Dict[str, Any]] = None  # 생성 중단 파서 설정 (JsonObjectDetector / FieldsDetector.to_spec())
+
+
+class YoloInferenceIn(BaseModel):
+    images: List[str]  # base64 PNG (max_batch_size 이하)
+    model_name: str
+    conf: float
+    iou: float
+    classes: Optional[List[int]] = None
+
+
+class OcrInferenceIn(BaseModel):
+    image: str  # base64 PNG
+
+
+def _require_local(family: str):
+    """이 프로세스에서 실행하는 백엔드인지 확인 (remote면 다른 워커로 다시 보내게 되므로 거부)"""
+    backend = get_backend(family)
+    if backend.capabilities.remote:
+        raise HTTPException(
+            status_code=409,
+            detail=f"이 워커의 {family} 백엔드가 {backend.kind}입니다 (워커는 local / onnx / stub 백엔드로 실행)"
+        )
+
+
+@router.get("/backends")
+def backends():
+    """워커의 백엔드별 종류와 처리 능력"""
+    for family in ("llava", "yolo", "ocr"):
+        get_backend(family)
+    return backend_status()
+
+
+@router.post("/llava")
+def infer_llava(body: LlavaInferenceIn):
+    """LLaVA 생성 (응답 텍스트 + 텔레메트리)"""
+    _require_local("llava")
+    try:
+        stop_detector = detector_from_spec(body.stop) if body.stop else None
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"잘못된 생성 중단 설정: {e}")
+    response, telemetry = process_image_with_llava(
+        decode_image(body.image),
+        body.prompt,
+        max_new_tokens=body.max_new_tokens,
+        temperature=body.temperature,
+        do_sample=body.do_sample,
+        stop_detector=stop_detector,
+        return_telemetry=True
+    )
+    return {"response": response, "telemetry": telemetry.to_dict()}
+
+
+@router.post("/yolo")
+def infer_yolo(body: YoloInferenceIn):
+    """YOLO 이미지 배치 감지 (이미지별 박스 / 신뢰도 / 클래스 / 클래스 이름 + 텔레메트리)"""
+    _require_local("yolo")
+    try:
+        results, telemetry = predict_detections(
+            [decode_image(image) for image in body.images], body.model_name, body.conf, body.iou, body.classes
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"results": results, "telemetry": telemetry.to_dict()}
+
+
+@router.post("/ocr")
+def infer_ocr(body: OcrInferenceIn):
+    """EasyOCR 인식 ([[bbox, 텍스트, 신뢰도], ...])"""
+    _require_local("ocr")
+    results = read_text(np.array(decode_image(body.image)))
+    # EasyOCR 좌표 / 신뢰도는 numpy 타입일 수 있으므로 JSON 직렬화 가능한 값으로 변환
+    return {
+        "results": [
+            [np.asarray(bbox).tolist(), str(text), float(confidence)]
+            for bbox, text, confidence in results
+        ]
+    }
@@ -7,12 +7,15 @@
 # - job_inputs에서 tone_style, product_description 조회
 # - stores 테이블에서 스토어 정보 조회
 # - 인스타그램 광고문구와 해시태그를 출력
+# - variant 처리 중 선행 실행된 피드 글 재사용 (ENABLE_SPECULATIVE_TEXT)
+# - GPT 호출은 비동기 공유 클라이언트 사용 (DB 작업만 스레드풀)
+# - 응답 캐시 사용 여부를 llm_traces.request.cache_hit에 기록
 ########################################################
 # created_at: 2025-11-25
-# updated_at: 2025-12-01
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: Instagram feed post generation using GPT
-# version: 1.0.0
+# version: 1.4.0
 # status: development
 # tags: instagram, gpt, feed
 # dependencies: fastapi, pydantic, openai
@@ -26,11 +29,16 @@ import json
 import time
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from models import InstagramFeedIn, InstagramFeedOut
-from services.gpt_service import generate_instagram_feed
+from services.gpt_service import generate_instagram_feed_async
+from services.speculative_text_service import (
+    fetch_eng_ad_copy, fetch_feed_context, take_speculative_result, FEED_GPT_PROMPT, STAGE_FEED_GEN
+)
 from database import get_db, InstagramFeed, LLMModel, Job, JobInput, TxtAdCopyGeneration, LLMTrace
+from services.stage_metrics import timed_stage, observe_job_completed
 from config import GPT_MODEL_NAME, GPT_MAX_TOKENS
 
 logger = logging.getLogger(__name__)
@@ -38,8 +46,272 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/yh/instagram", tags=["instagram"])
 
 
+def _mark_job_failed(db: Session, job_id: uuid.UUID):
+    """jobs 테이블 상태를 'failed'로 업데이트"""
+    try:
+        db.execute(
+            text("""
+                UPDATE jobs
+                SET status = 'failed',
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE job_id = :job_id
+            """),
+            {"job_id": job_id}
+        )
+        db.commit()
+    except Exception as update_error:
+        logger.error(f"Failed to update job status to failed: {update_error}")
+        db.rollback()
+
+
+def _load_feed_inputs(body: InstagramFeedIn, db: Session):
+    """
+    job 검증 및 피드 글 생성 입력 조회 (DB 작업, 스레드풀에서 실행)
+    
+    Returns:
+        (job_id, ad_copy_kor, gpt_inputs, llm_model_id)
+    """
+    # Step 0: job_id 검증
+    try:
+        job_id = uuid.UUID(body.job_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid UUID format: {str(e)}"
+        )
+    
+    logger.info(f"인스타그램 피드 글 생성 요청 - job_id: {body.job_id}, tenant_id: {body.tenant_id}")
+    
+    # job 조회 및 검증
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    if not job:
+        logger.error(f"Job not found: job_id={body.job_id}")
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job not found: {body.job_id}"
+        )
+    
+    # job의 tenant_id 확인
+    if job.tenant_id != body.tenant_id:
+        logger.error(f"Job tenant_id mismatch: job.tenant_id={job.tenant_id}, request.tenant_id={body.tenant_id}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Job tenant_id mismatch"
+        )
+    
+    # Step 1: txt_ad_copy_generations에서 한글 광고문구 조회
+    ad_copy_kor_row = db.execute(
+        text("""
+            SELECT ad_copy_kor
+            FROM txt_ad_copy_generations
+            WHERE job_id = :job_id
+              AND generation_stage = 'eng_to_kor'
+              AND status = 'done'
+            ORDER BY created_at DESC
+            LIMIT 1
+        """),
+        {"job_id": job_id}
+    ).first()
+    
+    ad_copy_kor = ad_copy_kor_row.ad_copy_kor if ad_copy_kor_row else None
+    if not ad_copy_kor:
+        logger.warning(f"ad_copy_kor not found in txt_ad_copy_generations: job_id={job_id}")
+    
+    # Step 2: txt_ad_copy_generations에서 refined_ad_copy_eng 조회 (없으면 ad_copy_eng)
+    refined_ad_copy_eng = fetch_eng_ad_copy(db, job_id)
+    if not refined_ad_copy_eng:
+        logger.error(f"refined_ad_copy_eng not found: job_id={job_id}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"English ad copy not found for job_id: {body.job_id}"
+        )
+    
+    # Step 3: job_inputs에서 tone_style, product_description 조회
+    job_input = db.query(JobInput).filter(JobInput.job_id == job_id).first()
+    if not job_input:
+        logger.error(f"JobInput not found: job_id={job_id}")
+        raise HTTPException(
+            status_code=404,
+            detail=f"JobInput not found: {body.job_id}"
+        )
+    
+    # Step 4: tone_styles / stores 테이블에서 톤 & 스타일, 스토어 정보 조회
+    feed_context = fetch_feed_context(db, job, job_input)
+    tone_style = feed_context["tone_style"]
+    product_description = feed_context["product_description"]
+    store_information = feed_context["store_information"]
+    
+    # Step 5: GPT 프롬프트 구성 (기본값)
+    gpt_prompt = FEED_GPT_PROMPT
+    
+    logger.info(f"Data retrieved - refined_ad_copy_eng: {len(refined_ad_copy_eng)} chars, tone_style: {tone_style}, product_description: {len(product_description)} chars, store_information: {len(store_information)} chars")
+    
+    gpt_inputs = {
+        "refined_ad_copy_eng": refined_ad_copy_eng,
+        "tone_style": tone_style,
+        "product_description": product_description,
+        "store_information": store_information,
+        "gpt_prompt": gpt_prompt
+    }
+    
+    # Step 7: LLM 모델 조회
+    llm_model = db.query(LLMModel).filter(
+        LLMModel.model_name == GPT_MODEL_NAME,
+        LLMModel.is_active == 'true'
+    ).first()
+    
+    if not llm_model:
+        logger.warning(f"⚠️ LLM 모델을 찾을 수 없습니다: {GPT_MODEL_NAME}. 기본 모델 정보로 저장합니다.")
+        llm_model_id = None
+    else:
+        llm_model_id = llm_model.llm_model_id
+    
+    return job_id, ad_copy_kor, gpt_inputs, llm_model_id
+
+
+def _save_feed_result(
+    body: InstagramFeedIn,
+    db: Session,
+    job_id: uuid.UUID,
+    ad_copy_kor,
+    gpt_inputs: dict,
+    llm_model_id,
+    result: dict,
+    speculative: bool
+) -> InstagramFeedOut:
+    """피드 글 생성 결과 저장 (DB 작업, 스레드풀에서 실행)"""
+    refined_ad_copy_eng = gpt_inputs["refined_ad_copy_eng"]
+    tone_style = gpt_inputs["tone_style"]
+    product_description = gpt_inputs["product_description"]
+    store_information = gpt_inputs["store_information"]
+    gpt_prompt = gpt_inputs["gpt_prompt"]
+    
+    # Step 8: llm_traces 레코드 생성
+    llm_trace_id = uuid.uuid4()
+    
+    # 요청 데이터 구성
+    request_data = {
+        "refined_ad_copy_eng": refined_ad_copy_eng,
+        "tone_style": tone_style,
+        "product_description": product_description,
+        "store_information": store_information,
+        "gpt_prompt": gpt_prompt,
+        "operation": "feed_gen",
+        "speculative": speculative,
+        "cache_hit": result.get("cache_hit", False)  # 응답 캐시 사용 시 GPT 미호출 (토큰 컬럼 NULL)
+    }
+    
+    # 응답 데이터 구성
+    response_data = {
+        "instagram_ad_copy": result["instagram_ad_copy"],
+        "hashtags": result["hashtags"],
+        "token_usage": result.get("token_usage"),
+        "call_stats": result.get("call_stats")  # 동시성 대기 시간, 시도 횟수, 재시도 사유
+    }
+    
+    # 토큰 사용량 추출 (llm_traces에 저장하기 위해)
+    token_usage = result.get("token_usage")
+    prompt_tokens = token_usage.get("prompt_tokens") if token_usage else None
+    completion_tokens = token_usage.get("completion_tokens") if token_usage else None
+    total_tokens = token_usage.get("total_tokens") if token_usage else None
+    
+    # Step 8: llm_traces에 저장 (토큰 정보 및 llm_model_id 포함)
+    db.execute(
+        text("""
+            INSERT INTO llm_traces (
+                llm_trace_id, job_id, provider, llm_model_id, operation_type,
+                request, response, latency_ms,
+                prompt_tokens, completion_tokens, total_tokens, token_usage,
+                created_at, updated_at
+            )
+            VALUES (
+                :llm_trace_id, :job_id, :provider, :llm_model_id, :operation_type,
+                CAST(:request AS jsonb), CAST(:response AS jsonb), :latency_ms,
+                :prompt_tokens, :completion_tokens, :total_tokens, CAST(:token_usage AS jsonb),
+                CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+            )
+        """),
+        {
+            "llm_trace_id": llm_trace_id,
+            "job_id": job_id,
+            "provider": "gpt",
+            "llm_model_id": llm_model_id,
+            "operation_type": "feed_gen",
+            "request": json.dumps(request_data),
+            "response": json.dumps(response_data),
+            "latency_ms": result.get("latency_ms"),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": total_tokens,
+            "token_usage": json.dumps(token_usage) if token_usage else None
+        }
+    )
+    
+    # Step 9: instagram_feeds 테이블에 저장 (최적화된 버전)
+    instagram_feed_id = uuid.uuid4()
+    
+    instagram_feed = InstagramFeed(
+        instagram_feed_id=instagram_feed_id,
+        job_id=job_id,
+        llm_trace_id=llm_trace_id,
+        tenant_id=body.tenant_id,
+        refined_ad_copy_eng=refined_ad_copy_eng,
+        ad_copy_kor=ad_copy_kor,
+        tone_style=tone_style,
+        product_description=product_description,
+        gpt_prompt=gpt_prompt,
+        instagram_ad_copy=result["instagram_ad_copy"],
+        hashtags=result["hashtags"],
+        used_temperature=0.7,  # 실제 사용된 temperature (llm_traces.request에서도 조회 가능)
+        used_max_tokens=GPT_MAX_TOKENS,  # 실제 사용된 최대 토큰 수 (llm_traces.request에서도 조회 가능)
+        latency_ms=result.get("latency_ms")  # llm_traces.latency_ms와 동일하지만 빠른 조회를 위해 유지
+    )
+    
+    db.add(instagram_feed)
+    
+    # Step 10: jobs 테이블 업데이트 (created_at은 end-to-end 메트릭용)
+    job_created_at = db.execute(
+        text("""
+            UPDATE jobs
+            SET current_step = 'instagram_feed_gen',
+                status = 'done',
+                updated_at = CURRENT_TIMESTAMP
+            WHERE job_id = :job_id
+            RETURNING created_at
+        """),
+        {"job_id": job_id}
+    ).scalar()
+    
+    # Step 11: 커밋
+    try:
+        db.commit()
+        db.refresh(instagram_feed)
+        observe_job_completed(job_created_at)
+        logger.info(f"✓ 인스타그램 피드 글 생성 및 DB 저장 완료 - instagram_feed_id: {instagram_feed_id}, job_id: {job_id}, llm_trace_id: {llm_trace_id}")
+    except Exception as e:
+        logger.error(f"Failed to commit to DB: {str(e)}", exc_info=True)
+        db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to save instagram feed to database: {str(e)}"
+        )
+    
+    # Step 12: 응답 생성
+    response = InstagramFeedOut(
+        instagram_feed_id=str(instagram_feed_id),
+        tenant_id=body.tenant_id,
+        instagram_ad_copy=result["instagram_ad_copy"],
+        hashtags=result["hashtags"],
+        prompt_used=result["prompt_used"],
+        generated_at=datetime.utcnow().isoformat() + "Z"
+    )
+    
+    return response
+
+
 @router.post("/feed", response_model=InstagramFeedOut)
-def create_instagram_feed(body: InstagramFeedIn, db: Session = Depends(get_db)):
+@timed_stage("instagram_feed_gen")
+async def create_instagram_feed(body: InstagramFeedIn, db: Session = Depends(get_db)):
     """
     GPT를 사용하여 인스타그램 피드 글 생성 및 DB 저장
     
@@ -56,304 +328,40 @@ def create_instagram_feed(body: InstagramFeedIn, db: Session = Depends(get_db)):
     1. txt_ad_copy_generations에서 한글 광고문구 조회
     2. job_inputs에서 tone_style, product_description 조회
     3. stores 테이블에서 스토어 정보 조회
-    4. GPT API 호출하여 인스타그램 피드글 생성
+    4. GPT API 호출하여 인스타그램 피드글 생성 (비동기 클라이언트, 스레드 점유 없음)
     5. llm_traces 저장
     6. instagram_feeds 저장
     7. jobs 테이블 업데이트
+    
+    DB 조회/저장(1~3, 5~7)은 스레드풀에서 실행한다.
     """
+    job_id = None
     try:
-        # Step 0: job_id 검증
-        try:
-            job_id = uuid.UUID(body.job_id)
-        except ValueError as e:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid UUID format: {str(e)}"
-            )
-        
-        logger.info(f"인스타그램 피드 글 생성 요청 - job_id: {body.job_id}, tenant_id: {body.tenant_id}")
-        
-        # job 조회 및 검증
-        job = db.query(Job).filter(Job.job_id == job_id).first()
-        if not job:
-            logger.error(f"Job not found: job_id={body.job_id}")
-            raise HTTPException(
-                status_code=404,
-                detail=f"Job not found: {body.job_id}"
-            )
-        
-        # job의 tenant_id 확인
-        if job.tenant_id != body.tenant_id:
-            logger.error(f"Job tenant_id mismatch: job.tenant_id={job.tenant_id}, request.tenant_id={body.tenant_id}")
-            raise HTTPException(
-                status_code=400,
-                detail=f"Job tenant_id mismatch"
-            )
-        
-        # Step 1: txt_ad_copy_generations에서 한글 광고문구 조회
-        ad_copy_kor_row = db.execute(
-            text("""
-                SELECT ad_copy_kor
-                FROM txt_ad_copy_generations
-                WHERE job_id = :job_id
-                  AND generation_stage = 'eng_to_kor'
-                  AND status = 'done'
-                ORDER BY created_at DESC
-                LIMIT 1
-            """),
-            {"job_id": job_id}
-        ).first()
-        
-        ad_copy_kor = ad_copy_kor_row.ad_copy_kor if ad_copy_kor_row else None
-        if not ad_copy_kor:
-            logger.warning(f"ad_copy_kor not found in txt_ad_copy_generations: job_id={job_id}")
-        
-        # Step 2: txt_ad_copy_generations에서 refined_ad_copy_eng 조회
-        refined_ad_copy_row = db.execute(
-            text("""
-                SELECT COALESCE(refined_ad_copy_eng, ad_copy_eng) AS refined_ad_copy_eng
-                FROM txt_ad_copy_generations
-                WHERE job_id = :job_id
-                  AND (
-                      (generation_stage = 'refined_ad_copy' AND refined_ad_copy_eng IS NOT NULL)
-                      OR (generation_stage = 'ad_copy_eng' AND ad_copy_eng IS NOT NULL)
-                  )
-                  AND status = 'done'
-                ORDER BY 
-                    CASE generation_stage
-                        WHEN 'refined_ad_copy' THEN 1
-                        WHEN 'ad_copy_eng' THEN 2
-                    END,
-                    created_at DESC
-                LIMIT 1
-            """),
-            {"job_id": job_id}
-        ).first()
-        
-        refined_ad_copy_eng = refined_ad_copy_row.refined_ad_copy_eng if refined_ad_copy_row else None
-        if not refined_ad_copy_eng:
-            logger.error(f"refined_ad_copy_eng not found: job_id={job_id}")
-            raise HTTPException(
-                status_code=400,
-                detail=f"English ad copy not found for job_id: {body.job_id}"
-            )
-        
-        # Step 3: job_inputs에서 tone_style, product_description 조회
-        job_input = db.query(JobInput).filter(JobInput.job_id == job_id).first()
-        if not job_input:
-            logger.error(f"JobInput not found: job_id={job_id}")
-            raise HTTPException(
-                status_code=404,
-                detail=f"JobInput not found: {body.job_id}"
-            )
-        
-        product_description = job_input.desc_kor if job_input.desc_kor else ""
-        
-        # tone_style_id로 tone_styles 테이블에서 톤 & 스타일 정보 조회
-        tone_style = ""
-        if job_input.tone_style_id:
-            tone_style_row = db.execute(
-                text("""
-                    SELECT kor_name, eng_name
-                    FROM tone_styles
-                    WHERE tone_style_id = :tone_style_id
-                """),
-                {"tone_style_id": job_input.tone_style_id}
-            ).first()
-            
-            if tone_style_row:
-                tone_style = tone_style_row.kor_name if tone_style_row.kor_name else (tone_style_row.eng_name if tone_style_row.eng_name else "")
-        
-        # Step 4: jobs.store_id를 통해 stores 테이블에서 스토어 정보 조회
-        store_information = ""
-        if job.store_id:
-            store_row = db.execute(
-                text("""
-                    SELECT title, body, store_category
-                    FROM stores
-                    WHERE store_id = :store_id
-                """),
-                {"store_id": job.store_id}
-            ).first()
-            
-            if store_row:
-                # 스토어 정보 조합 (title, body, store_category)
-                store_parts = []
-                if store_row.title:
-                    store_parts.append(store_row.title)
-                if store_row.body:
-                    store_parts.append(store_row.body)
-                if store_row.store_category:
-                    store_parts.append(f"카테고리: {store_row.store_category}")
-                store_information = ", ".join(store_parts) if store_parts else ""
-        
-        # Step 5: GPT 프롬프트 구성 (기본값)
-        gpt_prompt = "인스타그램에 어울리는 매력적이고 친근한 피드 글을 작성해주세요. 한국어로 작성하고, 자연스럽고 매력적인 톤으로 작성해주세요."
-        
-        logger.info(f"Data retrieved - refined_ad_copy_eng: {len(refined_ad_copy_eng)} chars, tone_style: {tone_style}, product_description: {len(product_description)} chars, store_information: {len(store_information)} chars")
+        # Step 0 ~ 5, 7: job 검증, 입력 및 LLM 모델 조회
+        job_id, ad_copy_kor, gpt_inputs, llm_model_id = await run_in_threadpool(_load_feed_inputs, body, db)
         
         # Step 6: GPT 서비스를 사용하여 인스타그램 피드 글 생성
-        result = generate_instagram_feed(
-            refined_ad_copy_eng=refined_ad_copy_eng,
-            tone_style=tone_style,
-            product_description=product_description,
-            store_information=store_information,
-            gpt_prompt=gpt_prompt
-        )
-        
-        # Step 7: LLM 모델 조회
-        llm_model = db.query(LLMModel).filter(
-            LLMModel.model_name == GPT_MODEL_NAME,
-            LLMModel.is_active == 'true'
-        ).first()
-        
-        if not llm_model:
-            logger.warning(f"⚠️ LLM 모델을 찾을 수 없습니다: {GPT_MODEL_NAME}. 기본 모델 정보로 저장합니다.")
-            llm_model_id = None
-        else:
-            llm_model_id = llm_model.llm_model_id
+        # variant 처리 중 선행 실행된 결과가 있고 입력이 같으면 재사용
+        result = await run_in_threadpool(take_speculative_result, body.job_id, STAGE_FEED_GEN, gpt_inputs)
+        speculative = result is not None
+        if not speculative:
+            result = await generate_instagram_feed_async(**gpt_inputs)
         
-        # Step 8: llm_traces 레코드 생성
-        llm_trace_id = uuid.uuid4()
-        
-        # 요청 데이터 구성
-        request_data = {
-            "refined_ad_copy_eng": refined_ad_copy_eng,
-            "tone_style": tone_style,
-            "product_description": product_description,
-            "store_information": store_information,
-            "gpt_prompt": gpt_prompt,
-            "operation": "feed_gen"
-        }
-        
-        # 응답 데이터 구성
-        response_data = {
-            "instagram_ad_copy": result["instagram_ad_copy"],
-            "hashtags": result["hashtags"],
-            "token_usage": result.get("token_usage")
-        }
-        
-        # 토큰 사용량 추출 (llm_traces에 저장하기 위해)
-        token_usage = result.get("token_usage")
-        prompt_tokens = token_usage.get("prompt_tokens") if token_usage else None
-        completion_tokens = token_usage.get("completion_tokens") if token_usage else None
-        total_tokens = token_usage.get("total_tokens") if token_usage else None
-        
-        # Step 8: llm_traces에 저장 (토큰 정보 및 llm_model_id 포함)
-        db.execute(
-            text("""
-                INSERT INTO llm_traces (
-                    llm_trace_id, job_id, provider, llm_model_id, operation_type,
-                    request, response, latency_ms,
-                    prompt_tokens, completion_tokens, total_tokens, token_usage,
-                    created_at, updated_at
-                )
-                VALUES (
-                    :llm_trace_id, :job_id, :provider, :llm_model_id, :operation_type,
-                    CAST(:request AS jsonb), CAST(:response AS jsonb), :latency_ms,
-                    :prompt_tokens, :completion_tokens, :total_tokens, CAST(:token_usage AS jsonb),
-                    CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
-                )
-            """),
-            {
-                "llm_trace_id": llm_trace_id,
-                "job_id": job_id,
-                "provider": "gpt",
-                "llm_model_id": llm_model_id,
-                "operation_type": "feed_gen",
-                "request": json.dumps(request_data),
-                "response": json.dumps(response_data),
-                "latency_ms": result.get("latency_ms"),
-                "prompt_tokens": prompt_tokens,
-                "completion_tokens": completion_tokens,
-                "total_tokens": total_tokens,
-                "token_usage": json.dumps(token_usage) if token_usage else None
-            }
-        )
-        
-        # Step 9: instagram_feeds 테이블에 저장 (최적화된 버전)
-        instagram_feed_id = uuid.uuid4()
-        
-        instagram_feed = InstagramFeed(
-            instagram_feed_id=instagram_feed_id,
-            job_id=job_id,
-            llm_trace_id=llm_trace_id,
-            tenant_id=body.tenant_id,
-            refined_ad_copy_eng=refined_ad_copy_eng,
-            ad_copy_kor=ad_copy_kor,
-            tone_style=tone_style,
-            product_description=product_description,
-            gpt_prompt=gpt_prompt,
-            instagram_ad_copy=result["instagram_ad_copy"],
-            hashtags=result["hashtags"],
-            used_temperature=0.7,  # 실제 사용된 temperature (llm_traces.request에서도 조회 가능)
-            used_max_tokens=GPT_MAX_TOKENS,  # 실제 사용된 최대 토큰 수 (llm_traces.request에서도 조회 가능)
-            latency_ms=result.get("latency_ms")  # llm_traces.latency_ms와 동일하지만 빠른 조회를 위해 유지
+        # Step 8 ~ 12: llm_traces / instagram_feeds / jobs 저장 및 응답
+        return await run_in_threadpool(
+            _save_feed_result, body, db, job_id, ad_copy_kor, gpt_inputs, llm_model_id, result, speculative
         )
         
-        db.add(instagram_feed)
-        
-        # Step 10: jobs 테이블 업데이트
-        db.execute(
-            text("""
-                UPDATE jobs
-                SET current_step = 'instagram_feed_gen',
-                    status = 'done',
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE job_id = :job_id
-            """),
-            {"job_id": job_id}
-        )
-        
-        # Step 11: 커밋
-        try:
-            db.commit()
-            db.refresh(instagram_feed)
-            logger.info(f"✓ 인스타그램 피드 글 생성 및 DB 저장 완료 - instagram_feed_id: {instagram_feed_id}, job_id: {job_id}, llm_trace_id: {llm_trace_id}")
-        except Exception as e:
-            logger.error(f"Failed to commit to DB: {str(e)}", exc_info=True)
-            db.rollback()
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to save instagram feed to database: {str(e)}"
-            )
-        
-        # Step 12: 응답 생성
-        response = InstagramFeedOut(
-            instagram_feed_id=str(instagram_feed_id),
-            tenant_id=body.tenant_id,
-            instagram_ad_copy=result["instagram_ad_copy"],
-            hashtags=result["hashtags"],
-            prompt_used=result["prompt_used"],
-            generated_at=datetime.utcnow().isoformat() + "Z"
-        )
-        
-        return response
-        
     except HTTPException:
         # HTTPException은 그대로 재발생
         raise
     except ValueError as e:
         logger.error(f"❌ 설정 오류: {e}")
         if db:
-            db.rollback()
+            await run_in_threadpool(db.rollback)
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         logger.error(f"❌ 인스타그램 피드 글 생성 중 오류: {e}", exc_info=True)
-        if db:
-            try:
-                db.execute(
-                    text("""
-                        UPDATE jobs
-                        SET status = 'failed',
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE job_id = :job_id
-                    """),
-                    {"job_id": job_id}
-                )
-                db.commit()
-            except Exception as update_error:
-                logger.error(f"Failed to update job status to failed: {update_error}")
-            db.rollback()
+        if db and job_id is not None:
+            await run_in_threadpool(_mark_job_failed, db, job_id)
         raise HTTPException(status_code=500, detail=f"인스타그램 피드 글 생성 중 오류가 발생했습니다: {str(e)}")
-
@@ -6,10 +6,10 @@
 # - evaluations 테이블에 결과 저장
 ########################################################
 # created_at: 2025-11-26
-# updated_at: 2025-12-03
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: IoU evaluation API
-# version: 1.3.0
+# version: 1.4.0
 # status: production
 # tags: iou, evaluation
 # dependencies: fastapi, pydantic, sqlalchemy
@@ -26,6 +26,7 @@ import time
 from models import IoUEvalIn, IoUEvalOut
 from services.iou_eval_service import calculate_iou_with_food
 from database import get_db, Job, OverlayLayout, Detection, ImageAsset, JobVariant
+from services.stage_metrics import timed_stage
 import logging
 
 logger = logging.getLogger(__name__)
@@ -34,6 +35,7 @@ router = APIRouter(prefix="/api/yh/iou", tags=["iou-eval"])
 
 
 @router.post("/evaluate", response_model=IoUEvalOut)
+@timed_stage("iou_eval")
 def evaluate_iou(body: IoUEvalIn, db: Session = Depends(get_db)):
     """
     IoU 평가: 음식 바운딩 박스와 텍스트 영역 겹침 확인
@@ -6,10 +6,10 @@
 # - 관련성 점수 계산
 ########################################################
 # created_at: 2025-11-20
-# updated_at: 2025-12-03
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: LLaVa Stage 1 validation API
-# version: 1.2.0
+# version: 1.4.0
 # status: production
 # tags: llava, stage1, validation
 # dependencies: fastapi, pydantic, PIL, transformers
@@ -25,7 +25,9 @@ import uuid
 from models import LLaVaStage1In, LLaVaStage1Out
 from utils import abs_from_url
 from services.llava_service import validate_image_and_text
+from services.inference_telemetry import collect_telemetry, summarize_telemetry
 from database import get_db, ImageAsset, Job, JobInput, VLMTrace, JobVariant
+from services.stage_metrics import timed_stage
 import logging
 
 logger = logging.getLogger(__name__)
@@ -34,6 +36,7 @@ router = APIRouter(prefix="/api/yh/llava/stage1", tags=["llava-stage1"])
 
 
 @router.post("/validate", response_model=LLaVaStage1Out)
+@timed_stage("vlm_analyze")
 def stage1_validate(body: LLaVaStage1In, db: Session = Depends(get_db)):
     """
     LLaVa Stage 1 Validation: 이미지와 광고문구의 적합성 검증
@@ -230,11 +233,13 @@ def stage1_validate(body: LLaVaStage1In, db: Session = Depends(get_db)):
         import time
         start_time = time.time()
         try:
-            result = validate_image_and_text(
-                image=image,
-                ad_copy_text=ad_copy_text,  # job_inputs에서 가져온 값 사용
-                validation_prompt=validation_prompt
-            )
+            # 이미지 분석 / 검증 / 폰트 추천 generate별 텔레메트리 수집
+            with collect_telemetry() as telemetry:
+                result = validate_image_and_text(
+                    image=image,
+                    ad_copy_text=ad_copy_text,  # job_inputs에서 가져온 값 사용
+                    validation_prompt=validation_prompt
+                )
             latency_ms = (time.time() - start_time) * 1000
             logger.info(f"Validation completed: is_valid={result.get('is_valid')}, score={result.get('relevance_score')}, latency={latency_ms:.2f}ms")
         except Exception as e:
@@ -270,8 +275,8 @@ def stage1_validate(body: LLaVaStage1In, db: Session = Depends(get_db)):
             "image_asset_id": str(image_asset_id)  # 병렬 실행 시 variant 구분을 위해 추가
         }
         
-        # 응답 데이터 구성 (검증 결과)
-        response_data = result
+        # 응답 데이터 구성 (검증 결과 + 추론 텔레메트리)
+        response_data = {**result, "telemetry": summarize_telemetry(telemetry)}
         
         # vlm_traces에 저장
         db.execute(
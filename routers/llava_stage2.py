@@ -9,10 +9,10 @@
 # - job 상태 업데이트
 ########################################################
 # created_at: 2025-11-20
-# updated_at: 2025-12-03
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: LLaVa Stage 2 validation API
-# version: 1.2.0
+# version: 1.4.0
 # status: production
 # tags: llava, stage2, validation, judge
 # dependencies: fastapi, pydantic, PIL, sqlalchemy
@@ -30,7 +30,9 @@ import time
 from models import JudgeIn, JudgeOut
 from utils import abs_from_url
 from services.llava_service import judge_final_ad
+from services.inference_telemetry import collect_telemetry, summarize_telemetry
 from database import get_db, Job, OverlayLayout, VLMTrace, JobVariant, ImageAsset
+from services.stage_metrics import timed_stage
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,6 +41,7 @@ router = APIRouter(prefix="/api/yh/llava/stage2", tags=["llava-stage2"])
 
 
 @router.post("/judge", response_model=JudgeOut)
+@timed_stage("vlm_judge")
 def judge(body: JudgeIn, db: Session = Depends(get_db)):
     """
     LLaVa Stage 2 Validation: 최종 광고 시각 결과물 판단
@@ -195,7 +198,8 @@ def judge(body: JudgeIn, db: Session = Depends(get_db)):
         # Step 3: LLaVA를 사용한 판단
         start_time = time.time()
         try:
-            result = judge_final_ad(image=image)
+            with collect_telemetry() as telemetry:
+                result = judge_final_ad(image=image)
         except Exception as e:
             logger.error(f"LLaVA 판단 실패: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"LLaVA 판단 중 오류가 발생했습니다: {str(e)}")
@@ -208,7 +212,7 @@ def judge(body: JudgeIn, db: Session = Depends(get_db)):
             "render_asset_url": render_asset_url,
             "overlay_id": body.overlay_id
         }
-        response_data = result
+        response_data = {**result, "telemetry": summarize_telemetry(telemetry)}
         
         try:
             db.execute(
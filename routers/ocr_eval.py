@@ -7,10 +7,10 @@
 # - evaluations 테이블에 결과 저장
 ########################################################
 # created_at: 2025-11-26
-# updated_at: 2025-11-30
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: OCR evaluation API
-# version: 1.1.0
+# version: 1.2.0
 # status: production
 # tags: ocr, evaluation
 # dependencies: fastapi, pydantic, PIL, sqlalchemy
@@ -29,6 +29,7 @@ from models import OCREvalIn, OCREvalOut
 from utils import abs_from_url
 from services.ocr_service import extract_text_from_image, calculate_ocr_accuracy
 from database import get_db, Job, OverlayLayout, JobVariant, ImageAsset
+from services.stage_metrics import timed_stage
 import logging
 
 logger = logging.getLogger(__name__)
@@ -37,6 +38,7 @@ router = APIRouter(prefix="/api/yh/ocr", tags=["ocr-eval"])
 
 
 @router.post("/evaluate", response_model=OCREvalOut)
+@timed_stage("ocr_eval")
 def evaluate_ocr(body: OCREvalIn, db: Session = Depends(get_db)):
     """
     OCR 평가: 텍스트 인식률 확인
@@ -7,10 +7,10 @@
 # - job 상태 업데이트
 ########################################################
 # created_at: 2025-11-20
-# updated_at: 2025-12-04
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: Overlay logic with DB integration
-# version: 2.3.1
+# version: 2.7.1
 # status: production
 # tags: overlay
 # dependencies: fastapi, pydantic, PIL, sqlalchemy
@@ -19,7 +19,7 @@
 ########################################################
 
 from fastapi import APIRouter, HTTPException, Depends
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 import uuid
@@ -27,11 +27,18 @@ import json
 import os
 import random
 import numpy as np
-from typing import Tuple
+from typing import Optional
 from models import OverlayIn, OverlayOut
 from utils import abs_from_url, save_asset, parse_hex_rgba
-from database import get_db, Job, JobInput, ImageAsset, PlannerProposal, OverlayLayout, VLMTrace, JobVariant
-from fonts import FONT_STYLE_MAP, FONT_NAME_MAP, FONT_SIZE_MAP
+from database import get_db, Job, JobInput, ImageAsset, PlannerProposal, OverlayLayout, VLMTrace, JobVariant, YOLORun
+from fonts import FONT_SIZE_MAP
+from services.font_registry import get_font_registry
+from config import OVERLAY_CANDIDATE_COUNT, FONT_RECOMMENDER
+from services.palette_service import recommend_text_style
+from services.overlay_service import (
+    padded_text_bbox, select_top_k_proposals, render_overlay_candidates, compose_overlay
+)
+from services.stage_metrics import timed_stage
 import logging
 
 logger = logging.getLogger(__name__)
@@ -40,6 +47,7 @@ router = APIRouter(prefix="/api/yh/overlay", tags=["overlay"])
 
 
 @router.post("", response_model=OverlayOut)
+@timed_stage("overlay")
 def overlay(body: OverlayIn, db: Session = Depends(get_db)):
     """
     이미지에 텍스트 오버레이 적용 (DB 연동)
@@ -166,6 +174,7 @@ def overlay(body: OverlayIn, db: Session = Depends(get_db)):
         # proposal_id가 있으면 planner_proposals에서 정보 가져오기
         proposal_id_uuid = None
         x_ratio, y_ratio, width_ratio, height_ratio = None, None, None, None
+        candidate_proposals = []  # 다중 후보 렌더링용 proposal 리스트
         
         if body.proposal_id:
             try:
@@ -185,6 +194,7 @@ def overlay(body: OverlayIn, db: Session = Depends(get_db)):
                             )
                             
                             if best_proposal and "xywh" in best_proposal:
+                                candidate_proposals = proposals_list
                                 xywh = best_proposal["xywh"]  # [x, y, width, height] 정규화된 좌표
                                 x_ratio, y_ratio, width_ratio, height_ratio = xywh
                                 x, y, pw, ph = (int(w * x_ratio), int(h * y_ratio), int(w * width_ratio), int(h * height_ratio))
@@ -235,6 +245,7 @@ def overlay(body: OverlayIn, db: Session = Depends(get_db)):
                                 )
                                 
                                 if best_proposal and "xywh" in best_proposal:
+                                    candidate_proposals = proposals_list
                                     xywh = best_proposal["xywh"]
                                     x_ratio, y_ratio, width_ratio, height_ratio = xywh
                                     x, y, pw, ph = (int(w * x_ratio), int(h * y_ratio), int(w * width_ratio), int(h * height_ratio))
@@ -278,26 +289,9 @@ def overlay(body: OverlayIn, db: Session = Depends(get_db)):
             logger.info(f"[Overlay 배경] 배경 색상 없음 (투명)")
         
         ol_color = parse_hex_rgba(overlay_color_hex, (0, 0, 0, 0))
-        if ol_color[3] > 0:
-            logger.info(f"[Overlay 배경] 배경 적용: RGBA={ol_color}")
-            over = Image.new("RGBA", (pw, ph), ol_color)
-            im.alpha_composite(over, dest=(x, y))
-        else:
-            logger.info(f"[Overlay 배경] 배경 없음 (투명)")
-        
-        # draw text
-        draw = ImageDraw.Draw(im)
         
         # 패딩 적용 (old/overlay.py의 _apply_padding 로직)
-        padding_ratio = 0.08
-        pad_x = int(pw * padding_ratio)
-        pad_y = int(ph * padding_ratio)
-        padded_bbox = (
-            max(0, x + pad_x),
-            max(0, y + pad_y),
-            min(w, x + pw - pad_x),
-            min(h, y + ph - pad_y)
-        )
+        padded_bbox = padded_text_bbox(x, y, pw, ph, w, h)
         
         # 사용 가능한 영역 계산
         available_width = padded_bbox[2] - padded_bbox[0]
@@ -371,6 +365,27 @@ def overlay(body: OverlayIn, db: Session = Depends(get_db)):
             print(f"[폰트 추천 조회] ❌ vlm_traces 조회 중 오류 발생: {e}")
             logger.error(f"[폰트 추천 조회] ❌ vlm_traces 조회 중 오류 발생: {e}", exc_info=True)
         
+        # Step 2.5b: 팔레트 기반 폰트 색상/스타일/크기 추천 (텍스트 영역 + overlay 배경 기준, 수 ms)
+        # FONT_RECOMMENDER=palette: 팔레트 추천 사용, LLaVA 추천은 font_name 보정으로만 사용
+        # FONT_RECOMMENDER=llava: LLaVA 추천 사용, 없거나 누락된 필드만 팔레트 추천으로 보완
+        try:
+            palette_recommendation = recommend_text_style(im, padded_bbox, body.text, ol_color)
+            logger.info(f"[폰트 추천] 팔레트 추천: {palette_recommendation}")
+        except Exception as e:
+            palette_recommendation = None
+            logger.warning(f"[폰트 추천] 팔레트 추천 실패: {e}")
+        palette_color = False  # 텍스트 색상 추천이 팔레트 기반인지 (다중 후보 렌더링 시 후보 영역별로 다시 계산)
+        if palette_recommendation:
+            if FONT_RECOMMENDER == "palette" or not font_recommendation:
+                llava_font_name = font_recommendation.get('font_name') if font_recommendation else None
+                font_recommendation = {**palette_recommendation, "font_name": llava_font_name}
+                palette_color = True
+            else:
+                for key in ("font_style", "font_size_category", "font_color_hex"):
+                    if not font_recommendation.get(key):
+                        font_recommendation[key] = palette_recommendation[key]
+                        palette_color = palette_color or key == "font_color_hex"
+        
         # 폰트 매핑은 fonts.py에서 import하여 사용
         
         # 한글 텍스트 감지
@@ -395,7 +410,8 @@ def overlay(body: OverlayIn, db: Session = Depends(get_db)):
             logger.info(f"[폰트 추천] LLaVA 추천: font_name={font_name}, font_style={font_style}")
             
             # 한글 텍스트인데 font_name이 없으면 경고 및 기본 한글 폰트 사용
-            if has_korean and not font_name:
+            # (팔레트 추천은 font_style만 제공하고, 폰트 레지스트리가 한글을 렌더링할 수 있는 face를 선택)
+            if has_korean and not font_name and font_recommendation.get('source') != 'palette':
                 logger.warning(f"[폰트 추천] ⚠️ 한글 텍스트인데 LLaVA가 font_name을 추천하지 않음. 기본 한글 폰트 사용: 'Gmarket Sans'")
                 font_name = 'Gmarket Sans'
                 font_style = 'sans-serif'
@@ -408,39 +424,14 @@ def overlay(body: OverlayIn, db: Session = Depends(get_db)):
             else:
                 logger.info(f"[폰트 추천] LLaVA 추천 없음, 기본값 사용")
         
-        # LLaVA가 추천한 폰트 이름을 직접 사용 (우선순위 없음)
-        font_paths = None
-        if font_name:
-            font_name_lower = font_name.lower().strip()
-            # 정확한 매칭 시도
-            if font_name_lower in FONT_NAME_MAP:
-                recommended_path = FONT_NAME_MAP[font_name_lower]
-                font_paths = [recommended_path]
-                logger.info(f"[폰트 추천] ✓ LLaVA 추천 폰트 이름 사용: {font_name} -> {recommended_path}")
-            else:
-                # 부분 매칭 시도
-                matched_path = None
-                for name_key, path in FONT_NAME_MAP.items():
-                    if name_key in font_name_lower or font_name_lower in name_key:
-                        matched_path = path
-                        break
-                
-                if matched_path:
-                    font_paths = [matched_path]
-                    logger.info(f"[폰트 추천] ✓ LLaVA 추천 폰트 이름 부분 매칭: {font_name} -> {matched_path}")
-                else:
-                    logger.warning(f"[폰트 추천] ⚠ LLaVA 추천 폰트 이름을 찾을 수 없음: {font_name}, font_style 기반으로 폴백")
-        
-        # font_name이 없거나 매칭 실패 시 font_style 기반으로 선택 (fallback, 우선순위 없음)
-        if not font_paths:
-            if font_style and font_style in FONT_STYLE_MAP:
-                # font_style 기반으로 선택하되, 리스트 순서는 fallback용 (우선순위 아님)
-                font_paths = FONT_STYLE_MAP[font_style]
-                logger.info(f"[폰트 추천] LLaVA 추천 font_style 사용 (fallback): {font_style}, 폰트 경로 후보: {len(font_paths)}개")
-            else:
-                # 기본 폰트 경로 (sans-serif, fallback)
-                font_paths = FONT_STYLE_MAP["sans-serif"]
-                logger.info(f"[폰트 추천] 기본값 사용 (fallback): sans-serif, 폰트 경로 후보: {len(font_paths)}개")
+        # 폰트 선택: 폰트 레지스트리에서 텍스트를 렌더링할 수 있는 face를 O(1)로 선택
+        # (추천 폰트 이름 → 추천 font_style → sans-serif, 한글/라틴/숫자 커버리지 검증된 폰트만 사용)
+        font_face, font_source = get_font_registry().resolve(body.text, font_name=font_name, font_style=font_style)
+        font_paths = [font_face.path]
+        if font_source == "name":
+            logger.info(f"[폰트 추천] ✓ 추천 폰트 이름 사용: {font_name} -> {font_face.path}")
+        else:
+            logger.info(f"[폰트 추천] 폰트 레지스트리 선택 ({font_source}): font_name={font_name}, font_style={font_style} -> {font_face.path}")
         
         # 폰트 크기 범위 설정 (이전 코드처럼 넓은 범위 사용)
         # 이전 코드: min=28, max=96 (68px 범위)
@@ -460,7 +451,7 @@ def overlay(body: OverlayIn, db: Session = Depends(get_db)):
                 print(f"[폰트 크기 동적 조정] LLaVA 추천 범위 (참고): {size_range[0]}-{size_range[1]}px")
                 logger.info(f"[폰트 크기] LLaVA 추천 범위 (참고): {size_range}")
                 # LLaVA 추천은 가이드로만 사용, 범위는 제한하지 않음
-                # _fit_text 함수에서 넓은 범위(28-96px) 내에서 최적 크기 선택
+                # fit_text 함수에서 넓은 범위(28-96px) 내에서 최적 크기 선택
             else:
                 print(f"[폰트 크기 동적 조정] ⚠ 알 수 없는 카테고리: {size_category}, 기본 범위 사용")
                 logger.warning(f"[폰트 크기] ⚠ 알 수 없는 카테고리: {size_category}, 기본 범위 사용")
@@ -479,33 +470,16 @@ def overlay(body: OverlayIn, db: Session = Depends(get_db)):
         print(f"[폰트 크기 동적 조정] 최종 범위: {min_font_size}-{max_font_size}px (사용 가능 높이: {available_height}px)")
         logger.info(f"[폰트 크기] 최종 범위: min={min_font_size}, max={max_font_size}, available_height={available_height}")
         
-        # 텍스트를 영역에 맞게 조정 (old/overlay.py의 _fit_text 로직)
-        print(f"[폰트 적용] 텍스트 피팅 시작: 범위=[{min_font_size}, {max_font_size}]px, 영역={available_width}x{available_height}px")
-        logger.info(f"[폰트 적용] 텍스트 피팅 시작: font_paths={font_paths}, size_range=[{min_font_size}, {max_font_size}]")
-        font, wrapped_text = _fit_text(
-            draw, body.text, padded_bbox, font_paths, min_font_size, max_font_size
-        )
-        final_font_size = font.size if hasattr(font, 'size') else None
-        final_font_path = getattr(font, 'path', None)
-        # 실제 사용된 폰트 이름 추출 (경로에서 폰트 이름 추출 또는 원본 font_name 사용)
-        final_font_name = font_name  # LLaVA 추천 또는 사용자 지정 폰트 이름
-        if not final_font_name and final_font_path:
-            # 경로에서 폰트 이름 추출 시도 (예: /path/to/GmarketSans.ttf -> Gmarket Sans)
-            font_filename = os.path.basename(final_font_path)
-            # 파일명에서 확장자 제거하고 폰트 이름으로 사용
-            final_font_name = os.path.splitext(font_filename)[0]
-        
-        print(f"[폰트 적용] ✓ 텍스트 피팅 완료: 최종 폰트 크기={final_font_size}px, 경로={final_font_path or '기본 폰트'}, 줄 수={len(wrapped_text.split(chr(10))) if wrapped_text else 0}")
-        logger.info(f"[폰트 적용] ✓ 텍스트 피팅 완료: font_size={final_font_size}, font_path={final_font_path or 'N/A'}, font_name={final_font_name or 'N/A'}, wrapped_lines={len(wrapped_text.split(chr(10))) if wrapped_text else 0}")
-        
         # 텍스트 색상 (우선순위: 요청 파라미터 > LLaVA 추천 > 기본값)
         text_color_hex = body.text_color
+        recolor_candidates = False  # 팔레트 추천 색상을 적용한 경우 후보 영역별 색상 사용
         logger.info(f"[폰트 색상] 요청 파라미터: {text_color_hex}")
         if not text_color_hex or text_color_hex == "ffffffff":  # 기본값인 경우
             logger.info(f"[폰트 색상] 기본값이므로 LLaVA 추천 확인")
             if font_recommendation and font_recommendation.get('font_color_hex'):
                 recommended_color = font_recommendation.get('font_color_hex')
                 text_color_hex = recommended_color
+                recolor_candidates = palette_color
                 logger.info(f"[폰트 색상] ✓ LLaVA 추천 적용: {text_color_hex}")
             else:
                 logger.info(f"[폰트 색상] LLaVA 추천 없음, 기본값 유지: {text_color_hex}")
@@ -515,17 +489,97 @@ def overlay(body: OverlayIn, db: Session = Depends(get_db)):
         tc = parse_hex_rgba(text_color_hex, (255, 255, 255, 255))
         logger.info(f"[폰트 색상] 최종 적용 색상 (RGBA): {tc}")
         
-        # 텍스트 위치 계산 (중앙 정렬)
-        x_center = (padded_bbox[0] + padded_bbox[2]) / 2
-        y_center = (padded_bbox[1] + padded_bbox[3]) / 2
+        # Step 2.6: 다중 후보 렌더링 (OVERLAY_CANDIDATE_COUNT > 1)
+        # 상위 K개 proposal을 병렬로 렌더링하고 대비 비율 + 금지 영역 겹침으로 사전 평가하여 최적 후보만 사용
+        fitted = None
+        overlay_candidates = None
+        if OVERLAY_CANDIDATE_COUNT > 1 and len(candidate_proposals) > 1:
+            top_proposals = select_top_k_proposals(candidate_proposals, OVERLAY_CANDIDATE_COUNT)
+            if len(top_proposals) > 1:
+                print(f"[다중 후보 렌더링] 상위 {len(top_proposals)}개 proposal 렌더링 및 사전 평가 시작")
+                logger.info(f"[다중 후보 렌더링] 상위 {len(top_proposals)}개 proposal 렌더링 및 사전 평가 시작")
+                try:
+                    forbidden_mask = _load_forbidden_mask(db, job_id, job_variant.img_asset_id)
+                    # 팔레트 추천 색상은 후보 영역의 배경 기준으로 다시 계산 (초기 proposal 영역 색상을 다른 위치에 쓰지 않음)
+                    candidate_text_rgba = (
+                        [_palette_text_rgba(im, proposal, body.text, ol_color, tc) for proposal in top_proposals]
+                        if recolor_candidates else None
+                    )
+                    candidate_results = render_overlay_candidates(
+                        im, top_proposals, body.text, font_paths,
+                        min_font_size, max_font_size, tc, ol_color, forbidden_mask,
+                        candidate_text_rgba=candidate_text_rgba
+                    )
+                    winner = candidate_results[0]
+                    if winner["score"] != float("-inf"):
+                        x, y, pw, ph = winner["box"]
+                        if winner["text_rgba"] != tc:
+                            tc = winner["text_rgba"]
+                            text_color_hex = "%02X%02X%02X" % tc[:3]
+                            logger.info(f"[폰트 색상] ✓ 최적 후보 영역 기준 팔레트 색상 적용: {text_color_hex}")
+                        x_ratio, y_ratio, width_ratio, height_ratio = winner["proposal"]["xywh"]
+                        padded_bbox = padded_text_bbox(x, y, pw, ph, w, h)
+                        available_width = padded_bbox[2] - padded_bbox[0]
+                        available_height = padded_bbox[3] - padded_bbox[1]
+                        fitted = {
+                            "font_path": winner["font_path"],
+                            "font_size": winner["font_size"],
+                            "wrapped_text": winner["wrapped_text"]
+                        }
+                        overlay_candidates = [
+                            {
+                                "source": r["proposal"].get("source"),
+                                "xywh": r["proposal"].get("xywh"),
+                                "score": r["score"],
+                                "contrast_ratio": r["contrast_ratio"],
+                                "readability_score": r["readability_score"],
+                                "forbidden_overlap": r["forbidden_overlap"],
+                                "font_size": r["font_size"],
+                                "text_color_hex": "%02X%02X%02X" % tuple(r["text_rgba"][:3])
+                            }
+                            for r in candidate_results
+                        ]
+                        print(f"[다중 후보 렌더링] ✓ 최적 후보 선택: source={winner['proposal'].get('source')}, score={winner['score']:.3f}, x={x}, y={y}, w={pw}, h={ph}")
+                        logger.info(f"[다중 후보 렌더링] ✓ 최적 후보 선택: source={winner['proposal'].get('source')}, score={winner['score']:.3f}, contrast={winner['contrast_ratio']:.2f}, forbidden_overlap={winner['forbidden_overlap']:.4f}")
+                except Exception as e:
+                    logger.warning(f"[다중 후보 렌더링] 실패, 단일 proposal 방식으로 진행: {e}", exc_info=True)
+                    fitted = None
+        
+        # Step 2.7: 텍스트 레이아웃 + overlay 배경 합성 + 텍스트 그리기
+        # CPU 풀 워커 프로세스에서 실행 (이미지 버퍼는 공유 메모리로 전달, 요청 스레드는 GIL 점유 안 함)
+        # 텍스트 피팅은 old/overlay.py의 _fit_text 로직 (다중 후보 렌더링에서 이미 피팅된 경우 재사용)
+        if fitted is None:
+            print(f"[폰트 적용] 텍스트 피팅 시작: 범위=[{min_font_size}, {max_font_size}]px, 영역={available_width}x{available_height}px")
+            logger.info(f"[폰트 적용] 텍스트 피팅 시작: font_paths={font_paths}, size_range=[{min_font_size}, {max_font_size}]")
+        if ol_color[3] > 0:
+            logger.info(f"[Overlay 배경] 배경 적용: RGBA={ol_color}")
+        else:
+            logger.info(f"[Overlay 배경] 배경 없음 (투명)")
+        im, layout_info = compose_overlay(
+            im, (x, y, pw, ph), body.text, font_paths, min_font_size, max_font_size,
+            tc, ol_color, fitted=fitted
+        )
+        wrapped_text = layout_info["wrapped_text"]
+        final_font_size = layout_info["font_size"]
+        final_font_path = layout_info["font_path"]
+        # 실제 사용된 폰트 이름 추출 (경로에서 폰트 이름 추출 또는 원본 font_name 사용)
+        final_font_name = font_name  # LLaVA 추천 또는 사용자 지정 폰트 이름
+        if not final_font_name and final_font_path:
+            # 경로에서 폰트 이름 추출 시도 (예: /path/to/GmarketSans.ttf -> Gmarket Sans)
+            font_filename = os.path.basename(final_font_path)
+            # 파일명에서 확장자 제거하고 폰트 이름으로 사용
+            final_font_name = os.path.splitext(font_filename)[0]
+        
+        print(f"[폰트 적용] ✓ 텍스트 피팅 완료: 최종 폰트 크기={final_font_size}px, 경로={final_font_path or '기본 폰트'}, 줄 수={len(wrapped_text.split(chr(10))) if wrapped_text else 0}")
+        logger.info(f"[폰트 적용] ✓ 텍스트 피팅 완료: font_size={final_font_size}, font_path={final_font_path or 'N/A'}, font_name={final_font_name or 'N/A'}, wrapped_lines={len(wrapped_text.split(chr(10))) if wrapped_text else 0}")
         
         # 최종 적용 값 요약 로그
         print(f"\n{'='*60}")
         print(f"[폰트 추천 최종 적용 요약]")
         print(f"  - LLaVA 추천 폰트 이름: {font_name or 'N/A'}")
         print(f"  - 폰트 스타일: {font_style or '기본값 (sans-serif)'}")
-        print(f"  - 폰트 크기: {font.size if hasattr(font, 'size') else 'N/A'}px (범위: {min_font_size}-{max_font_size}, 영역 높이: {ph}px)")
-        print(f"  - 폰트 경로: {getattr(font, 'path', '기본 폰트')}")
+        print(f"  - 폰트 크기: {final_font_size or 'N/A'}px (범위: {min_font_size}-{max_font_size}, 영역 높이: {ph}px)")
+        print(f"  - 폰트 경로: {final_font_path or '기본 폰트'}")
         print(f"  - 텍스트 색상: {text_color_hex} (RGBA: {tc})")
         print(f"  - Overlay 배경 색상: {overlay_color_hex or '투명'} (RGBA: {ol_color})")
         print(f"  - 영역 크기: {pw}x{ph}px (이미지: {w}x{h}px)")
@@ -542,8 +596,8 @@ def overlay(body: OverlayIn, db: Session = Depends(get_db)):
         logger.info(f"[폰트 추천 최종 적용 요약]")
         logger.info(f"  - LLaVA 추천 폰트 이름: {font_name or 'N/A'}")
         logger.info(f"  - 폰트 스타일: {font_style or '기본값 (sans-serif)'}")
-        logger.info(f"  - 폰트 크기: {font.size if hasattr(font, 'size') else 'N/A'}px (범위: {min_font_size}-{max_font_size}, 영역 높이: {ph}px)")
-        logger.info(f"  - 폰트 경로: {getattr(font, 'path', '기본 폰트')}")
+        logger.info(f"  - 폰트 크기: {final_font_size or 'N/A'}px (범위: {min_font_size}-{max_font_size}, 영역 높이: {ph}px)")
+        logger.info(f"  - 폰트 경로: {final_font_path or '기본 폰트'}")
         logger.info(f"  - 텍스트 색상: {text_color_hex} (RGBA: {tc})")
         logger.info(f"  - Overlay 배경 색상: {overlay_color_hex or '투명'} (RGBA: {ol_color})")
         logger.info(f"  - 영역 크기: {pw}x{ph}px (이미지: {w}x{h}px)")
@@ -552,17 +606,6 @@ def overlay(body: OverlayIn, db: Session = Depends(get_db)):
         if font_recommendation:
             logger.info(f"  - LLaVA 추천 내용: {font_recommendation}")
         
-        # multiline_text로 그리기 (old/overlay.py 방식)
-        draw.multiline_text(
-            (x_center, y_center),
-            wrapped_text,
-            font=font,
-            fill=tc,
-            anchor="mm",  # 중앙 정렬
-            align="center",
-            spacing=6,  # 줄 간격
-        )
-        
         # Step 3: 오버레이된 이미지 저장
         meta = save_asset(body.tenant_id, "final", im, ".png")
         
@@ -599,27 +642,38 @@ def overlay(body: OverlayIn, db: Session = Depends(get_db)):
         print(f"{'='*60}\n")
         logger.info(f"[최종 결과물 저장 완료] Asset ID: {meta.get('asset_id')}, URL: {result_url}, Path: {result_path}, Size: {meta.get('width')}x{meta.get('height')}, Latency: {latency_ms:.2f}ms")
         
-        # Step 4: overlay_layouts 테이블에 결과 저장
-        overlay_id = None
+        # Step 4: overlay 결과 저장 (단일 트랜잭션)
+        # overlay_layouts INSERT + image_assets INSERT + jobs_variants UPDATE를 한 번에 커밋
+        # - save_asset에서 생성한 asset_id를 그대로 image_asset_id로 사용 (URL 재조회 불필요)
+        # - jobs_variants는 overlaid_img_asset_id와 status='done'을 하나의 UPDATE로 반영
+        #   → 완료 시 NOTIFY(job_variant_state_changed)는 1회만 발생
+        overlay_id_uuid = uuid.uuid4()
+        try:
+            overlaid_img_asset_id = uuid.UUID(meta.get('asset_id'))
+        except (ValueError, TypeError):
+            overlaid_img_asset_id = uuid.uuid4()
+        
+        # layout JSONB 데이터 구성
+        layout_data = {
+            "text": body.text,
+            "wrapped_text": wrapped_text,  # 줄바꿈된 텍스트 저장
+            "x_align": body.x_align,
+            "y_align": body.y_align,
+            "text_size": body.text_size,
+            "font_name": final_font_name,  # 실제 사용된 폰트 이름
+            "font_size": final_font_size,  # 실제 사용된 폰트 크기
+            "font_path": final_font_path,  # 실제 사용된 폰트 경로
+            "overlay_color": body.overlay_color,
+            "text_color": body.text_color,
+            "margin": body.margin,
+            "render": meta
+        }
+        if overlay_candidates:
+            layout_data["overlay_candidates"] = overlay_candidates  # 다중 후보 사전 평가 결과
+        
+        # SAVEPOINT: 저장 실패 시 running 상태(Step 0.6)는 유지한 채 이 블록만 롤백
+        savepoint = db.begin_nested()
         try:
-            overlay_id_uuid = uuid.uuid4()
-            
-            # layout JSONB 데이터 구성
-            layout_data = {
-                "text": body.text,
-                "wrapped_text": wrapped_text,  # 줄바꿈된 텍스트 저장
-                "x_align": body.x_align,
-                "y_align": body.y_align,
-                "text_size": body.text_size,
-                "font_name": final_font_name,  # 실제 사용된 폰트 이름
-                "font_size": final_font_size,  # 실제 사용된 폰트 크기
-                "font_path": final_font_path,  # 실제 사용된 폰트 경로
-                "overlay_color": body.overlay_color,
-                "text_color": body.text_color,
-                "margin": body.margin,
-                "render": meta
-            }
-            
             # overlay_layouts에 저장 (raw SQL 사용, pk는 SERIAL로 자동 생성)
             db.execute(
                 text("""
@@ -646,113 +700,62 @@ def overlay(body: OverlayIn, db: Session = Depends(get_db)):
                     "latency_ms": latency_ms
                 }
             )
-            db.commit()
-            overlay_id = str(overlay_id_uuid)
-            logger.info(f"Overlay layout saved to DB: overlay_id={overlay_id}, proposal_id={body.proposal_id}, latency_ms={latency_ms:.2f}")
-        except Exception as e:
-            logger.error(f"Failed to save overlay layout to DB: {e}")
-            db.rollback()
-            # DB 저장 실패해도 결과는 반환
-            logger.warning(f"Overlay layout DB save failed but continuing: {e}")
-        
-        # Step 4.5: 최종 overlay 이미지를 image_assets에 저장하고 jobs_variants.overlaid_img_asset_id 업데이트
-        overlaid_img_asset_id = None
-        try:
-            # meta에서 asset_id 추출 (이미 save_asset에서 생성됨)
-            asset_id_str = meta.get('asset_id')
-            if asset_id_str:
-                try:
-                    overlaid_img_asset_id = uuid.UUID(asset_id_str)
-                except (ValueError, TypeError):
-                    overlaid_img_asset_id = uuid.uuid4()
-            else:
-                overlaid_img_asset_id = uuid.uuid4()
             
-            # image_assets에 저장 (이미 존재하면 업데이트)
-            existing_asset = db.execute(
+            # 최종 overlay 이미지를 image_assets에 저장
+            db.execute(
                 text("""
-                    SELECT image_asset_id FROM image_assets
-                    WHERE image_url = :image_url
+                    INSERT INTO image_assets (
+                        image_asset_id, image_type, image_url, width, height,
+                        tenant_id, job_id, created_at, updated_at
+                    ) VALUES (
+                        :image_asset_id, 'overlaid', :image_url, :width, :height,
+                        :tenant_id, :job_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                    )
                 """),
-                {"image_url": result_url}
-            ).first()
-            
-            if existing_asset:
-                overlaid_img_asset_id = existing_asset[0]
-                # image_type을 'overlaid'로 업데이트
-                db.execute(
-                    text("""
-                        UPDATE image_assets
-                        SET image_type = 'overlaid',
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE image_asset_id = :image_asset_id
-                    """),
-                    {"image_asset_id": overlaid_img_asset_id}
-                )
-                logger.info(f"Existing image_asset updated to 'overlaid': image_asset_id={overlaid_img_asset_id}")
-            else:
-                # 새로운 image_asset 생성
-                db.execute(
-                    text("""
-                        INSERT INTO image_assets (
-                            image_asset_id, image_type, image_url, width, height,
-                            tenant_id, job_id, created_at, updated_at
-                        ) VALUES (
-                            :image_asset_id, 'overlaid', :image_url, :width, :height,
-                            :tenant_id, :job_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
-                        )
-                    """),
-                    {
-                        "image_asset_id": overlaid_img_asset_id,
-                        "image_url": result_url,
-                        "width": meta.get('width'),
-                        "height": meta.get('height'),
-                        "tenant_id": body.tenant_id,
-                        "job_id": str(job_id)
-                    }
-                )
-                logger.info(f"New image_asset created for overlay: image_asset_id={overlaid_img_asset_id}, url={result_url}")
+                {
+                    "image_asset_id": overlaid_img_asset_id,
+                    "image_url": result_url,
+                    "width": meta.get('width'),
+                    "height": meta.get('height'),
+                    "tenant_id": body.tenant_id,
+                    "job_id": str(job_id)
+                }
+            )
             
-            # jobs_variants.overlaid_img_asset_id 업데이트
-            db.execute(
+            # jobs_variants: overlaid_img_asset_id + status='done' 동시 반영
+            updated_variant = db.execute(
                 text("""
                     UPDATE jobs_variants
                     SET overlaid_img_asset_id = :overlaid_img_asset_id,
+                        status = 'done',
+                        current_step = 'overlay',
                         updated_at = CURRENT_TIMESTAMP
                     WHERE job_variants_id = :job_variants_id
+                    RETURNING job_variants_id, status, current_step
                 """),
                 {
                     "overlaid_img_asset_id": overlaid_img_asset_id,
                     "job_variants_id": job_variants_id
                 }
-            )
+            ).first()
+            if not updated_variant:
+                raise RuntimeError(f"jobs_variants 업데이트 대상 없음: job_variants_id={job_variants_id}")
+            
+            savepoint.commit()
             db.commit()
-            logger.info(f"jobs_variants.overlaid_img_asset_id updated: job_variants_id={job_variants_id}, overlaid_img_asset_id={overlaid_img_asset_id}")
         except Exception as e:
-            logger.error(f"Failed to save overlaid image to image_assets: {e}", exc_info=True)
-            db.rollback()
-            # 실패해도 계속 진행 (overlay_layouts에는 이미 저장됨)
-            logger.warning(f"Overlaid image asset save failed but continuing: {e}")
+            logger.error(f"Overlay 결과 저장 실패 (트랜잭션 롤백): {e}", exc_info=True)
+            if savepoint.is_active:
+                savepoint.rollback()
+            # 상위 예외 처리에서 job_variants 상태를 failed로 업데이트
+            raise
         
-        # Step 5: Overlay 완료 - job 상태 업데이트 (status='done')
-        try:
-            db.execute(
-                text("""
-                    UPDATE jobs_variants 
-                    SET status = 'done', 
-                        current_step = 'overlay',
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE job_variants_id = :job_variants_id
-                """),
-                {"job_variants_id": job_variants_id}
-            )
-            db.commit()
-            logger.info(f"Job variant 상태 업데이트: job_variants_id={job_variants_id}, status='done'")
-        except Exception as e:
-            logger.error(f"Job 상태 업데이트 실패: {e}")
-            db.rollback()
-            # 상태 업데이트 실패해도 결과는 반환
-            logger.warning(f"Job 상태 업데이트 실패했지만 결과는 반환합니다: {e}")
+        overlay_id = str(overlay_id_uuid)
+        logger.info(
+            f"Overlay 결과 저장 완료: overlay_id={overlay_id}, proposal_id={proposal_id_uuid}, "
+            f"overlaid_img_asset_id={overlaid_img_asset_id}, job_variants_id={job_variants_id}, "
+            f"status={updated_variant.status}, latency_ms={latency_ms:.2f}"
+        )
         
         return OverlayOut(
             job_id=body.job_id,
@@ -803,234 +806,55 @@ def overlay(body: OverlayIn, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"서버 오류가 발생했습니다: {str(e)}")
 
 
-def _fit_text(
-    draw: ImageDraw.ImageDraw,
-    text: str,
-    bbox: Tuple[int, int, int, int],
-    font_paths: list,
-    min_font_size: int,
-    max_font_size: int,
-) -> Tuple[ImageFont.FreeTypeFont, str]:
+def _load_forbidden_mask(db: Session, job_id: uuid.UUID, image_asset_id) -> Optional[Image.Image]:
     """
-    텍스트를 bbox에 맞게 조정 (old/overlay.py의 _fit_text 로직)
+    yolo_runs에서 variant 이미지의 금지 영역 마스크 로드
     
     Args:
-        draw: ImageDraw 객체
-        text: 원본 텍스트
-        bbox: (x0, y0, x1, y1) 형식의 박스
-        font_paths: 폰트 경로 후보 리스트
-        min_font_size: 최소 폰트 크기
-        max_font_size: 최대 폰트 크기
+        db: DB 세션
+        job_id: Job ID
+        image_asset_id: variant 이미지 asset ID
     
     Returns:
-        (font, wrapped_text): 최적의 폰트와 줄바꿈된 텍스트
+        금지 영역 마스크 (L 모드) 또는 None
     """
-    max_width = bbox[2] - bbox[0]
-    max_height = bbox[3] - bbox[1]
-    
-    # 큰 폰트부터 작은 폰트까지 시도
-    logger.warning(f"Fitting text in bbox: max_width={max_width}, max_height={max_height}, font_size_range=[{min_font_size}, {max_font_size}]")
-    
-    for size in range(max_font_size, min_font_size - 1, -2):
-        font = _load_font(font_paths, size)
-        wrapped = _wrap_text(draw, text, font, max_width)
-        
-        # multiline_textbbox로 정확한 크기 계산
-        try:
-            bbox_text = draw.multiline_textbbox(
-                (0, 0),
-                wrapped,
-                font=font,
-                spacing=6,
-                align="center",
-            )
-            text_width = bbox_text[2] - bbox_text[0]
-            text_height = bbox_text[3] - bbox_text[1]
-            
-            logger.warning(f"Font size {size}: text_width={text_width}, text_height={text_height}, wrapped_lines={len(wrapped.split(chr(10)))}")
-            
-            if text_width <= max_width and text_height <= max_height:
-                logger.warning(f"✓ Text fitted with font size {size}: width={text_width}/{max_width}, height={text_height}/{max_height}")
-                return font, wrapped
-        except AttributeError:
-            # multiline_textbbox가 없는 경우 fallback
-            try:
-                # 각 줄의 크기를 개별적으로 계산
-                lines = wrapped.split("\n")
-                text_width = 0
-                text_height = 0
-                for line in lines:
-                    try:
-                        line_bbox = draw.textbbox((0, 0), line, font=font)
-                        line_w = line_bbox[2] - line_bbox[0]
-                        line_h = line_bbox[3] - line_bbox[1]
-                    except AttributeError:
-                        try:
-                            line_w, line_h = draw.textsize(line, font=font)
-                        except:
-                            line_w = len(line) * size // 2
-                            line_h = size
-                    text_width = max(text_width, line_w)
-                    text_height += line_h
-                text_height += 6 * (len(lines) - 1)  # spacing
-                
-                if text_width <= max_width and text_height <= max_height:
-                    logger.info(f"Text fitted with font size {size} (fallback): width={text_width}/{max_width}, height={text_height}/{max_height}")
-                    return font, wrapped
-            except Exception as e:
-                logger.warning(f"Error calculating text size for font {size}: {e}")
-                continue
-    
-    # 최소 폰트 크기로 강제 적용
-    logger.warning(
-        f"텍스트를 박스에 맞추지 못했습니다. 최소 폰트 크기 {min_font_size}로 강제 적용합니다."
-    )
-    font = _load_font(font_paths, min_font_size)
-    wrapped = _wrap_text(draw, text, font, max_width)
-    return font, wrapped
+    if not image_asset_id:
+        return None
+    yolo_run = db.query(YOLORun).filter(
+        YOLORun.job_id == job_id,
+        YOLORun.image_asset_id == image_asset_id
+    ).first()
+    if not yolo_run or not yolo_run.forbidden_mask_url:
+        return None
+    try:
+        return Image.open(abs_from_url(yolo_run.forbidden_mask_url)).convert("L")
+    except Exception as e:
+        logger.warning(f"금지 영역 마스크 로드 실패: {yolo_run.forbidden_mask_url}, {e}")
+        return None
 
 
-def _wrap_text(
-    draw: ImageDraw.ImageDraw,
+def _palette_text_rgba(
+    image: Image.Image,
+    proposal: dict,
     text: str,
-    font: ImageFont.FreeTypeFont,
-    max_width: int,
-) -> str:
+    overlay_rgba: tuple,
+    default: tuple
+) -> tuple:
     """
-    텍스트를 단어 단위로 나누어서 max_width에 맞게 줄바꿈
-    쉼표(,)나 마침표(.) 뒤에서 자연스러운 줄바꿈 우선 고려
-    
-    Args:
-        draw: ImageDraw 객체
-        text: 원본 텍스트
-        font: 폰트 객체
-        max_width: 최대 너비
-    
-    Returns:
-        줄바꿈된 텍스트
-    """
-    words = text.split()
-    if not words:
-        return text
-    
-    lines: list = []
-    current: list = []
-    
-    for i, word in enumerate(words):
-        test_line = " ".join(current + [word]) if current else word
-        
-        # 텍스트 너비 계산
-        try:
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            width = bbox[2] - bbox[0]
-        except AttributeError:
-            try:
-                width, _ = draw.textsize(test_line, font=font)
-            except:
-                # 최후의 수단: 대략적인 계산
-                width = len(test_line) * font.size // 2
-        
-        # 너비가 초과하는 경우
-        if width > max_width:
-            if not current:
-                # 첫 단어도 너비 초과하면 그냥 추가 (강제)
-                current.append(word)
-            else:
-                # 현재 줄을 저장하고 새 줄 시작
-                # 쉼표나 마침표 뒤에서 줄바꿈이 자연스러운지 확인
-                should_break_at_punctuation = False
-                
-                # 현재 줄의 마지막 단어에 쉼표나 마침표가 있는지 확인
-                if current:
-                    last_word = current[-1]
-                    # 쉼표나 마침표로 끝나는 경우 (한글/영문 모두 지원)
-                    if (last_word.endswith(',') or last_word.endswith('.') or 
-                        last_word.endswith('，') or last_word.endswith('。')):
-                        should_break_at_punctuation = True
-                        logger.debug(f"[줄바꿈] 구두점 뒤에서 자연스러운 줄바꿈: '{last_word}'")
-                
-                # 현재 줄 저장
-                lines.append(" ".join(current))
-                
-                # 새 줄 시작
-                current = [word]
-                
-                # 구두점 뒤에서 줄바꿈한 경우 로그
-                if should_break_at_punctuation:
-                    logger.debug(f"[줄바꿈] 구두점 뒤에서 줄바꿈 완료")
-        else:
-            # 너비가 초과하지 않으면 현재 줄에 추가
-            current.append(word)
-            
-            # 쉼표나 마침표 뒤에서 자연스러운 줄바꿈 고려
-            # 현재 단어가 구두점으로 끝나는 경우, 구두점 뒤에서 줄바꿈 우선 고려
-            if (word.endswith(',') or word.endswith('.') or 
-                word.endswith('，') or word.endswith('。')):
-                # 다음 단어가 있는지 확인
-                if i + 1 < len(words):
-                    next_word = words[i + 1]
-                    # 다음 단어를 추가한 경우의 너비 확인
-                    test_with_next = " ".join(current + [next_word])
-                    try:
-                        bbox_next = draw.textbbox((0, 0), test_with_next, font=font)
-                        width_with_next = bbox_next[2] - bbox_next[0]
-                    except AttributeError:
-                        try:
-                            width_with_next, _ = draw.textsize(test_with_next, font=font)
-                        except:
-                            width_with_next = len(test_with_next) * font.size // 2
-                    
-                    # 구두점 뒤에서 줄바꿈 조건:
-                    # 1. 다음 단어를 추가하면 너비를 초과하는 경우
-                    # 2. 현재 너비가 max_width의 50% 이상인 경우 (자연스러운 줄바꿈) - 70%에서 50%로 완화
-                    # 3. 구두점 뒤에서 항상 줄바꿈 고려 (너비가 충분해도 구두점 뒤에서 줄바꿈)
-                    should_break = False
-                    if width_with_next > max_width:
-                        should_break = True
-                        logger.info(f"[줄바꿈] 구두점 뒤에서 예방적 줄바꿈: '{word}' 다음에 '{next_word}' 추가 시 너비 초과 예상 (현재: {width:.1f}/{max_width}, 다음: {width_with_next:.1f}/{max_width})")
-                    elif width >= max_width * 0.5:  # 70%에서 50%로 완화
-                        should_break = True
-                        logger.info(f"[줄바꿈] 구두점 뒤에서 자연스러운 줄바꿈: '{word}' (현재 너비: {width:.1f}/{max_width}, {width/max_width*100:.1f}% 사용)")
-                    else:
-                        # 너비가 충분해도 구두점 뒤에서 줄바꿈 고려 (특히 쉼표의 경우)
-                        # 단, 너비가 너무 작으면(30% 미만) 줄바꿈하지 않음
-                        if width >= max_width * 0.3 and word.endswith(','):
-                            should_break = True
-                            logger.info(f"[줄바꿈] 구두점(쉼표) 뒤에서 강제 줄바꿈: '{word}' (현재 너비: {width:.1f}/{max_width}, {width/max_width*100:.1f}% 사용)")
-                    
-                    if should_break:
-                        lines.append(" ".join(current))
-                        current = []
-    
-    # 마지막 줄 추가
-    if current:
-        lines.append(" ".join(current))
-    
-    return "\n".join(lines)
-
+    proposal 영역(패딩 적용) 배경 기준 팔레트 추천 텍스트 색상
 
-def _load_font(font_paths: list, size: int) -> ImageFont.FreeTypeFont:
-    """
-    여러 경로에서 폰트 로드 시도 (old/overlay.py의 _load_font 로직)
-    
-    Args:
-        font_paths: 폰트 경로 후보 리스트
-        size: 폰트 크기
-    
     Returns:
-        ImageFont 객체
+        텍스트 색상 RGBA (추천 실패 시 default)
     """
-    for path in font_paths:
-        try:
-            font = ImageFont.truetype(path, size)
-            logger.debug(f"Font loaded: {path} (size={size})")
-            return font
-        except Exception as exc:
-            logger.debug(f"Failed to load font {path}: {exc}")
-            continue
-    
-    logger.warning(f"사용 가능한 폰트를 찾지 못했습니다. 기본 폰트를 사용합니다. font_paths={font_paths}")
-    return ImageFont.load_default()
+    w, h = image.size
+    x_ratio, y_ratio, width_ratio, height_ratio = proposal["xywh"]
+    x, y, pw, ph = (int(w * x_ratio), int(h * y_ratio), int(w * width_ratio), int(h * height_ratio))
+    try:
+        recommendation = recommend_text_style(image, padded_text_bbox(x, y, pw, ph, w, h), text, overlay_rgba)
+    except Exception as e:
+        logger.warning(f"[폰트 색상] 후보 영역 팔레트 추천 실패, 기본 추천 색상 사용: {e}")
+        return default
+    return parse_hex_rgba(recommendation["font_color_hex"], default)
 
 
 def _select_best_proposal_with_diversity(
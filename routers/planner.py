@@ -9,10 +9,10 @@
 # - YOLO 감지 결과 활용
 ########################################################
 # created_at: 2025-11-20
-# updated_at: 2025-12-03
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: Planner logic
-# version: 2.2.1
+# version: 2.4.0
 # status: development
 # tags: planner
 # dependencies: fastapi, pydantic, PIL, requests
@@ -25,10 +25,13 @@ from PIL import Image, ImageDraw, ImageFont
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 import uuid
+import numpy as np
 from models import PlannerIn, PlannerOut, ProposalOut
 from utils import abs_from_url, save_asset
-from services.planner_service import propose_overlay_positions
+from services.planner_service import propose_overlay_positions_task
+from services.cpu_pool import run_cpu_task, optional_shared_array
 from database import get_db, Job, JobInput, ImageAsset, Detection, YOLORun, PlannerProposal, JobVariant
+from services.stage_metrics import timed_stage
 import logging
 
 logger = logging.getLogger(__name__)
@@ -37,6 +40,7 @@ router = APIRouter(prefix="/api/yh/planner", tags=["planner"])
 
 
 @router.post("", response_model=PlannerOut, summary="텍스트 오버레이 위치 제안")
+@timed_stage("planner")
 def planner(body: PlannerIn, db: Session = Depends(get_db)):
     """
     이미지에 텍스트 오버레이를 배치할 최적의 위치를 제안합니다.
@@ -224,15 +228,19 @@ def planner(body: PlannerIn, db: Session = Depends(get_db)):
         import time
         start_time = time.time()
         try:
-            result = propose_overlay_positions(
-                image=im,
-                detections=detections,
-                forbidden_mask=forbidden_mask,
-                min_overlay_width=body.min_overlay_width,
-                min_overlay_height=body.min_overlay_height,
-                max_proposals=body.max_proposals,
-                max_forbidden_iou=body.max_forbidden_iou
-            )
+            # 마스크 연산은 CPU 풀 워커 프로세스에서 실행 (마스크 버퍼는 공유 메모리로 전달)
+            mask_array = np.array(forbidden_mask.convert("L")) if forbidden_mask is not None else None
+            with optional_shared_array(mask_array) as mask_handle:
+                result = run_cpu_task(
+                    propose_overlay_positions_task,
+                    im.size,
+                    detections,
+                    mask_handle,
+                    min_overlay_width=body.min_overlay_width,
+                    min_overlay_height=body.min_overlay_height,
+                    max_proposals=body.max_proposals,
+                    max_forbidden_iou=body.max_forbidden_iou
+                )
             latency_ms = (time.time() - start_time) * 1000
             logger.info(f"Planner 위치 제안 생성 완료: latency={latency_ms:.2f}ms, proposals={len(result.get('proposals', []))}")
         except Exception as e:
@@ -7,10 +7,10 @@
 # - evaluations 테이블에 결과 저장
 ########################################################
 # created_at: 2025-11-26
-# updated_at: 2025-11-30
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: Readability evaluation API
-# version: 1.1.0
+# version: 1.2.0
 # status: production
 # tags: readability, evaluation
 # dependencies: fastapi, pydantic, PIL, sqlalchemy
@@ -29,6 +29,7 @@ from models import ReadabilityEvalIn, ReadabilityEvalOut
 from utils import abs_from_url
 from services.readability_service import evaluate_readability
 from database import get_db, Job, OverlayLayout, JobVariant, ImageAsset
+from services.stage_metrics import timed_stage
 import logging
 
 logger = logging.getLogger(__name__)
@@ -37,6 +38,7 @@ router = APIRouter(prefix="/api/yh/readability", tags=["readability-eval"])
 
 
 @router.post("/evaluate", response_model=ReadabilityEvalOut)
+@timed_stage("readability_eval")
 def evaluate_readability_api(body: ReadabilityEvalIn, db: Session = Depends(get_db)):
     """
     가독성 평가: 텍스트와 배경 색상 대비 확인
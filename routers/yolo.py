@@ -7,10 +7,10 @@
 # - job 상태 업데이트
 ########################################################
 # created_at: 2025-11-20
-# updated_at: 2025-11-28
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: YOLO detection logic with DB integration
-# version: 1.1.0
+# version: 1.3.1
 # status: production
 # tags: yolo, detection
 # dependencies: fastapi, pydantic, PIL, sqlalchemy
@@ -22,6 +22,7 @@ import json
 import os
 import uuid
 import time
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends
 from PIL import Image
 from sqlalchemy.orm import Session
@@ -30,14 +31,34 @@ from models import DetectIn, DetectOut
 from utils import abs_from_url, save_asset
 from services.yolo_service import detect_forbidden_areas
 from database import get_db, Job, JobInput, ImageAsset, Detection, YOLORun, JobVariant
+from services.stage_metrics import timed_stage
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/yh/yolo", tags=["yolo"])
 
+# yolo_runs.telemetry 컬럼 존재 여부 (첫 저장 시 한 번 확인, 컬럼 추가 전 DB면 텔레메트리 저장 생략)
+_telemetry_column: Optional[bool] = None
+
+
+def _has_telemetry_column(db: Session) -> bool:
+    """yolo_runs.telemetry 컬럼이 있는지 (결과는 프로세스 동안 캐시)"""
+    global _telemetry_column
+    if _telemetry_column is None:
+        _telemetry_column = db.execute(
+            text("""
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'yolo_runs' AND column_name = 'telemetry'
+            """)
+        ).first() is not None
+        if not _telemetry_column:
+            logger.warning("yolo_runs.telemetry 컬럼 없음, 텔레메트리는 DB에 저장하지 않음 (docs/01_schema.sql의 ALTER 적용 필요)")
+    return _telemetry_column
+
 
 @router.post("/detect", response_model=DetectOut)
+@timed_stage("yolo_detect")
 def detect(body: DetectIn, db: Session = Depends(get_db)):
     """
     YOLO 금지 영역 감지 (DB 연동)
@@ -271,21 +292,23 @@ def detect(body: DetectIn, db: Session = Depends(get_db)):
         # Step 5-2: yolo_runs 테이블에 메타데이터 저장
         if image_asset_id:
             yolo_run_id = uuid.uuid4()
+            with_telemetry = _has_telemetry_column(db)
             db.execute(
-                text("""
+                text(f"""
                     INSERT INTO yolo_runs (
                         yolo_run_id, job_id, image_asset_id, forbidden_mask_url,
-                        model_name, detection_count, latency_ms, created_at, updated_at
+                        model_name, detection_count, latency_ms,{" telemetry," if with_telemetry else ""} created_at, updated_at
                     )
                     VALUES (
                         :yolo_run_id, :job_id, :image_asset_id, :forbidden_mask_url,
-                        :model_name, :detection_count, :latency_ms, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                        :model_name, :detection_count, :latency_ms,{" CAST(:telemetry AS jsonb)," if with_telemetry else ""}
+                        CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
                     )
                     ON CONFLICT (job_id) DO UPDATE SET
                         forbidden_mask_url = EXCLUDED.forbidden_mask_url,
                         model_name = EXCLUDED.model_name,
                         detection_count = EXCLUDED.detection_count,
-                        latency_ms = EXCLUDED.latency_ms,
+                        latency_ms = EXCLUDED.latency_ms,{" telemetry = EXCLUDED.telemetry," if with_telemetry else ""}
                         updated_at = CURRENT_TIMESTAMP
                 """),
                 {
@@ -295,7 +318,8 @@ def detect(body: DetectIn, db: Session = Depends(get_db)):
                     "forbidden_mask_url": forbidden_mask_url,
                     "model_name": body.model,
                     "detection_count": len(detection_ids),
-                    "latency_ms": latency_ms
+                    "latency_ms": latency_ms,
+                    "telemetry": json.dumps(result.get("telemetry"))
                 }
             )
             db.flush()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+OpenAI 호환 로컬 가짜 서버 (오프라인 부하 테스트용)
+/v1/chat/completions만 구현하며, 지연 시간과 429/5xx 오류 비율을 설정하여
+GPT 텍스트 경로(eng_to_kor, feed_gen)의 동시성 제한 / 재시도 / 백오프를 API 비용 없이 검증
+
+사용 방법:
+    python3 scripts/fake_openai_server.py --port 8099 --latency-ms 800 --jitter-ms 400 --error-rate 0.1
+    # 앱 실행 시 GPT_BASE_URL=http://127.0.0.1:8099/v1 로 지정 (API 키 불필요)
+"""
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: OpenAI-compatible fake chat completions server for offline load tests
+# version: 1.0.0
+########################################################
+
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="fake-openai")
+
+# 실행 옵션 (main에서 설정)
+SETTINGS = {
+    "latency_ms": 500.0,
+    "jitter_ms": 200.0,
+    "error_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    "retry_after": 1.0,
+}
+STATS = {"requests": 0, "errors": 0, "rate_limited": 0, "in_flight": 0, "max_in_flight": 0}
+
+
+def _approx_tokens(text: str) -> int:
+    """대략적인 토큰 수 (4글자당 1토큰)"""
+    return max(1, len(text) // 4)
+
+
+def _completion_content(body: dict) -> str:
+    """요청 형태에 맞는 가짜 응답 본문 (JSON 모드면 피드 글 JSON, 아니면 번역문)"""
+    user_text = next((m.get("content", "") for m in reversed(body.get("messages", [])) if m.get("role") == "user"), "")
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        return json.dumps({
+            "instagram_ad_copy": f"[fake] 오늘의 추천 메뉴를 만나보세요! ({len(user_text)}자 입력)",
+            "hashtags": "#맛집 #맛스타그램 #먹스타그램 #푸드스타그램 #데일리"
+        }, ensure_ascii=False)
+    return f"[fake] 번역된 광고 문구 ({len(user_text)}자 입력)"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    STATS["requests"] += 1
+    STATS["in_flight"] += 1
+    STATS["max_in_flight"] = max(STATS["max_in_flight"], STATS["in_flight"])
+    try:
+        delay = max(0.0, SETTINGS["latency_ms"] + random.uniform(-1, 1) * SETTINGS["jitter_ms"]) / 1000.0
+        await asyncio.sleep(delay)
+
+        roll = random.random()
+        if roll < SETTINGS["rate_limit_rate"]:
+            STATS["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": str(SETTINGS["retry_after"])},
+                content={"error": {"message": "Rate limit reached (fake)", "type": "rate_limit_error"}}
+            )
+        if roll < SETTINGS["rate_limit_rate"] + SETTINGS["error_rate"]:
+            STATS["errors"] += 1
+            return JSONResponse(
+                status_code=random.choice([500, 502, 503]),
+                content={"error": {"message": "Upstream error (fake)", "type": "server_error"}}
+            )
+
+        content = _completion_content(body)
+        prompt_tokens = sum(_approx_tokens(m.get("content", "")) for m in body.get("messages", []))
+        completion_tokens = _approx_tokens(content)
+        return {
+            "id": f"chatcmpl-fake-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+    finally:
+        STATS["in_flight"] -= 1
+
+
+@app.get("/stats")
+def stats():
+    """누적 요청 / 오류 / 최대 동시 요청 수"""
+    return {**STATS, "settings": SETTINGS}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="OpenAI 호환 로컬 가짜 서버")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="호스트 (기본값: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8099, help="포트 (기본값: 8099)")
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="평균 응답 지연 (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=200.0, help="지연 변동 폭 (±ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="5xx 오류 비율 (0~1)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 오류 비율 (0~1)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429 응답의 Retry-After (초)")
+    args = parser.parse_args()
+
+    SETTINGS.update({
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "error_rate": args.error_rate,
+        "rate_limit_rate": args.rate_limit_rate,
+        "retry_after": args.retry_after,
+    })
+    print(f"fake OpenAI 서버 시작: http://{args.host}:{args.port}/v1 (settings={SETTINGS})")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
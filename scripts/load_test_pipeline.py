@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+"""
+파이프라인 end-to-end 부하 테스트 (stub 모델, 로컬 Postgres)
+LLaVA / YOLO / EasyOCR은 stub 모델(STUB_MODELS=all), GPT는 OpenAI 호환 가짜 서버로 교체한 앱을 띄우고
+초당 N개 job(job당 variant 3개)을 주입하여 리스너 → 트리거 → 단계 API 경로의 처리량을 측정
+
+측정 항목:
+- 단계별 처리량 (완료 요청 / 초), 평균 처리 시간, 오류 수 (앱 /metrics의 pipeline_stage_seconds)
+- 단계별 대기열 깊이 (이전 단계 done인데 다음 단계가 시작되지 않은 variant / job 수, 실행 중인 수의 평균 / 최대)
+- job end-to-end 지연 p50 / p95 / p99 (jobs.created_at → instagram_feed_gen done)
+- DB 쿼리 수 (앱 SQLAlchemy 단계별 db_queries_total, DB 전체 트랜잭션 수, pg_stat_statements가 있으면 호출 수)
+
+사용 방법:
+    # 빈 DB에 스키마 적용 후 0.5 job/s로 2분 주입
+    python3 scripts/load_test_pipeline.py --database-url postgresql://feedlyai:pw@localhost:5432/feedlyai_load \\
+        --apply-schema --rate 0.5 --duration 120
+
+    # 지연 분포 변경 + 결과 JSON 저장
+    python3 scripts/load_test_pipeline.py --rate 2 --duration 300 \\
+        --stub-latency "llava=lognormal:2500:0.4,yolo=normal:80:20,ocr=const:150" \\
+        --gpt-latency-ms 1200 --output logs/load_test.json
+
+    # 이미 실행 중인 앱(다중 워커 등)에 주입만 (앱은 STUB_MODELS / GPT_BASE_URL로 직접 실행)
+    python3 scripts/load_test_pipeline.py --app-url http://127.0.0.1:8011 --rate 1 --duration 60
+
+주의:
+- 운영 DB에 실행하지 마세요 (job / variant / 자산 행을 생성합니다, 테넌트: load_test_{실행 ID})
+- 리스너 트리거가 필요합니다 (--apply-schema 시 docs/03_state_notify_triggers.sql로 db/init과 같은 함수 / 트리거 생성)
+"""
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: End-to-end pipeline load generator with stub model backends
+# version: 1.0.0
+########################################################
+
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import argparse
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+SCHEMA_FILES = [
+    project_root / "docs" / "01_schema.sql",
+    project_root / "docs" / "03_state_notify_triggers.sql",
+    project_root / "docs" / "04_notify_trace_context.sql",  # 트리거 함수가 있어야 적용되므로 03 다음
+]
+REQUIRED_TRIGGERS = ("job_variant_state_change_trigger", "job_state_change_trigger")
+FINAL_STEP = "instagram_feed_gen"
+AD_COPY = "Spicy Pork Kimchi Stew – one spoon and you'll forget everything else."
+
+running = True
+
+
+def signal_handler(sig, frame):
+    """종료 신호 처리 (주입 중단 후 결과 보고)"""
+    global running
+    print("\n종료 신호 수신. 주입을 중단하고 결과를 집계합니다...")
+    running = False
+
+
+# ==============================
+# 준비: 스키마, 프로세스
+# ==============================
+
+def apply_schema(engine, files: List[Path]):
+    """SQL 파일 적용 (파일 전체를 한 번에 실행, $$ 함수 본문 포함)"""
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for path in files:
+            print(f"  - 스키마 적용: {path.relative_to(project_root)}")
+            cursor.execute(path.read_text(encoding="utf-8"))
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def check_triggers(engine) -> List[str]:
+    """리스너가 사용하는 NOTIFY 트리거 중 없는 것"""
+    from sqlalchemy import text
+    with engine.connect() as conn:
+        existing = {row[0] for row in conn.execute(
+            text("SELECT tgname FROM pg_trigger WHERE tgname = ANY(:names)"), {"names": list(REQUIRED_TRIGGERS)}
+        )}
+    return [name for name in REQUIRED_TRIGGERS if name not in existing]
+
+
+def start_process(args: List[str], env: Dict[str, str], log_path: Path) -> subprocess.Popen:
+    """하위 프로세스 실행 (출력은 로그 파일로)"""
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    log_file = open(log_path, "w", encoding="utf-8")
+    return subprocess.Popen(
+        [sys.executable] + args, cwd=str(project_root), env=env,
+        stdout=log_file, stderr=subprocess.STDOUT
+    )
+
+
+def wait_ready(app_url: str, timeout: float, process: Optional[subprocess.Popen] = None) -> bool:
+    """앱 /healthz가 ready가 될 때까지 대기"""
+    import httpx
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            return False
+        try:
+            response = httpx.get(f"{app_url}/healthz", timeout=2)
+            if response.status_code == 200 and response.json().get("ready"):
+                return True
+        except httpx.HTTPError:
+            pass
+        time.sleep(1)
+    return False
+
+
+# ==============================
+# 측정: 메트릭, DB 통계
+# ==============================
+
+def scrape_metrics(app_url: str) -> Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float]:
+    """앱 /metrics → {(샘플 이름, 라벨): 값}"""
+    import httpx
+    from prometheus_client.parser import text_string_to_metric_families
+    try:
+        body = httpx.get(f"{app_url}/metrics", timeout=5).text
+    except httpx.HTTPError as e:
+        print(f"⚠ /metrics 수집 실패: {e}")
+        return {}
+    samples = {}
+    for family in text_string_to_metric_families(body):
+        for sample in family.samples:
+            samples[(sample.name, tuple(sorted(sample.labels.items())))] = sample.value
+    return samples
+
+
+def metric_delta(before: Dict, after: Dict, name: str, group_by: str) -> Dict[str, float]:
+    """카운터 / 히스토그램 샘플의 증가분을 라벨 값별로 합산"""
+    result: Dict[str, float] = {}
+    for key, value in after.items():
+        sample_name, labels = key
+        if sample_name != name:
+            continue
+        label = dict(labels).get(group_by, "")
+        result[label] = result.get(label, 0.0) + value - before.get(key, 0.0)
+    return result
+
+
+def db_counters(engine) -> Dict[str, Optional[float]]:
+    """DB 전체 트랜잭션 수 (리스너 asyncpg 포함), pg_stat_statements 호출 수 (확장 없으면 None)"""
+    from sqlalchemy import text
+    with engine.connect() as conn:
+        xacts = conn.execute(text(
+            "SELECT xact_commit + xact_rollback FROM pg_stat_database WHERE datname = current_database()"
+        )).scalar()
+        try:
+            calls = conn.execute(text("SELECT sum(calls) FROM pg_stat_statements")).scalar()
+        except Exception:
+            conn.rollback()
+            calls = None
+    return {"transactions": float(xacts or 0), "statements": float(calls) if calls is not None else None}
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """선형 보간 백분위수"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+class QueueSampler(threading.Thread):
+    """주기적으로 단계별 대기열 깊이 수집 (이번 실행 테넌트의 job / variant만)"""
+
+    def __init__(self, engine, tenant_id: str, interval: float):
+        super().__init__(name="queue-sampler", daemon=True)
+        from services.pipeline_trigger import PIPELINE_STAGES
+        self.engine = engine
+        self.tenant_id = tenant_id
+        self.interval = interval
+        # 이전 단계 → 다음 단계 (variant 단계 / job 단계)
+        self.stages = [
+            (prev_step, info['next_step'], bool(info.get('is_job_level')))
+            for (prev_step, status), info in PIPELINE_STAGES.items() if status == 'done'
+        ]
+        self.samples: List[Dict[str, Dict[str, int]]] = []
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+        self.join(timeout=self.interval * 2)
+
+    def run(self):
+        from sqlalchemy import text
+        while not self._stop.wait(self.interval):
+            try:
+                with self.engine.connect() as conn:
+                    variant_rows = conn.execute(text("""
+                        SELECT jv.current_step, jv.status, count(*)
+                        FROM jobs_variants jv JOIN jobs j ON j.job_id = jv.job_id
+                        WHERE j.tenant_id = :tenant_id
+                        GROUP BY 1, 2
+                    """), {"tenant_id": self.tenant_id}).fetchall()
+                    job_rows = conn.execute(text("""
+                        SELECT current_step, status, count(*)
+                        FROM jobs WHERE tenant_id = :tenant_id
+                        GROUP BY 1, 2
+                    """), {"tenant_id": self.tenant_id}).fetchall()
+            except Exception as e:
+                print(f"⚠ 대기열 샘플링 실패: {e}")
+                continue
+            variants = {(r[0], r[1]): r[2] for r in variant_rows}
+            jobs = {(r[0], r[1]): r[2] for r in job_rows}
+            sample = {}
+            for prev_step, next_step, is_job_level in self.stages:
+                counts = jobs if is_job_level else variants
+                sample[next_step] = {
+                    "waiting": counts.get((prev_step, "done"), 0),
+                    "running": counts.get((next_step, "running"), 0),
+                }
+            self.samples.append(sample)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """단계별 대기 / 실행 중 수의 평균, 최대"""
+        result = {}
+        for _, next_step, _ in self.stages:
+            waiting = [s[next_step]["waiting"] for s in self.samples]
+            running_counts = [s[next_step]["running"] for s in self.samples]
+            result[next_step] = {
+                "waiting_avg": round(sum(waiting) / len(waiting), 2) if waiting else 0.0,
+                "waiting_max": max(waiting, default=0),
+                "running_avg": round(sum(running_counts) / len(running_counts), 2) if running_counts else 0.0,
+                "running_max": max(running_counts, default=0),
+            }
+        return result
+
+
+# ==============================
+# 주입
+# ==============================
+
+def prepare_images(tenant_id: str, variants: int) -> List[Dict[str, Any]]:
+    """variant별 합성 이미지 저장 (모든 job이 같은 이미지 파일을 공유)"""
+    import numpy as np
+    from PIL import Image
+    from utils import save_asset
+    assets = []
+    for i in range(variants):
+        y, x = np.mgrid[0:1024, 0:1024]
+        pixels = np.stack([(x + 80 * i) % 256, (y + 40 * i) % 256, (x + y) // 8 % 256], axis=-1).astype(np.uint8)
+        assets.append(save_asset(tenant_id, f"load_test_variant_{i + 1}", Image.fromarray(pixels, "RGB"), ".jpg"))
+    return assets
+
+
+def create_job(engine, tenant_id: str, assets: List[Dict[str, Any]]) -> str:
+    """
+    job 1개와 variant N개 생성 후 img_gen done으로 변경 (한 트랜잭션, 커밋 시 variant별 NOTIFY)
+
+    scripts/background_job_creator.py와 같은 초기 상태 (jobs: running / vlm_analyze, variants: img_gen)
+    """
+    from sqlalchemy import text
+    job_id = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO jobs (job_id, tenant_id, status, current_step, created_at, updated_at)
+            VALUES (:job_id, :tenant_id, 'running', 'vlm_analyze', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+        """), {"job_id": job_id, "tenant_id": tenant_id})
+        conn.execute(text("""
+            INSERT INTO job_inputs (job_id, desc_eng, created_at, updated_at)
+            VALUES (:job_id, :desc_eng, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+        """), {"job_id": job_id, "desc_eng": AD_COPY})
+        variant_ids = []
+        for order, asset in enumerate(assets, 1):
+            image_asset_id = uuid.uuid4()
+            conn.execute(text("""
+                INSERT INTO image_assets (
+                    image_asset_id, image_type, image_url, width, height, tenant_id, job_id, created_at, updated_at
+                ) VALUES (
+                    :image_asset_id, 'generated', :url, :width, :height, :tenant_id, :job_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                )
+            """), {
+                "image_asset_id": image_asset_id, "url": asset["url"], "width": asset["width"],
+                "height": asset["height"], "tenant_id": tenant_id, "job_id": job_id
+            })
+            job_variants_id = uuid.uuid4()
+            conn.execute(text("""
+                INSERT INTO jobs_variants (
+                    job_variants_id, job_id, img_asset_id, creation_order, status, current_step, created_at, updated_at
+                ) VALUES (
+                    :job_variants_id, :job_id, :img_asset_id, :creation_order, 'running', 'img_gen', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                )
+            """), {
+                "job_variants_id": job_variants_id, "job_id": job_id,
+                "img_asset_id": image_asset_id, "creation_order": order
+            })
+            variant_ids.append(job_variants_id)
+        # AFTER UPDATE 트리거 발동 (img_gen done → vlm_analyze 트리거)
+        conn.execute(text("""
+            UPDATE jobs_variants
+            SET status = 'done', updated_at = CURRENT_TIMESTAMP
+            WHERE job_variants_id = ANY(:ids)
+        """), {"ids": variant_ids})
+    return str(job_id)
+
+
+def inject(engine, tenant_id: str, assets: List[Dict[str, Any]], rate: float, duration: float) -> List[str]:
+    """rate job/s로 duration초 동안 주입 (예정 시각 기준, 밀리면 따라잡기)"""
+    job_ids = []
+    started = time.time()
+    total = int(rate * duration)
+    for i in range(total):
+        if not running:
+            break
+        scheduled = started + i / rate
+        delay = scheduled - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -1:
+            print(f"⚠ 주입 지연 {-delay:.1f}s (DB 쓰기가 주입 속도를 따라가지 못함)")
+        try:
+            job_ids.append(create_job(engine, tenant_id, assets))
+        except Exception as e:
+            print(f"✗ job 생성 실패: {e}")
+        if (i + 1) % max(1, int(rate * 10)) == 0:
+            print(f"  주입: {i + 1}/{total} jobs ({time.time() - started:.0f}s)")
+    return job_ids
+
+
+def job_states(engine, tenant_id: str) -> List[Dict[str, Any]]:
+    """이번 실행 job의 상태 / 생성 / 갱신 시각"""
+    from sqlalchemy import text
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT job_id, current_step, status, created_at, updated_at
+            FROM jobs WHERE tenant_id = :tenant_id
+        """), {"tenant_id": tenant_id}).mappings().fetchall()
+    return [dict(row) for row in rows]
+
+
+def wait_drain(engine, tenant_id: str, expected: int, timeout: float) -> List[Dict[str, Any]]:
+    """모든 job이 완료(instagram_feed_gen done) 또는 실패할 때까지 대기"""
+    deadline = time.time() + timeout
+    while True:
+        states = job_states(engine, tenant_id)
+        finished = [s for s in states if (s["current_step"] == FINAL_STEP and s["status"] == "done") or s["status"] == "failed"]
+        if len(finished) >= expected or time.time() >= deadline or not running:
+            return states
+        print(f"  완료 대기: {len(finished)}/{expected} jobs")
+        time.sleep(2)
+
+
+# ==============================
+# 보고
+# ==============================
+
+def build_report(args, job_ids: List[str], states: List[Dict[str, Any]], elapsed: float,
+                 metrics_before: Dict, metrics_after: Dict, db_before: Dict, db_after: Dict,
+                 queues: Dict[str, Dict[str, float]], gpt_stats: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    completed = [s for s in states if s["current_step"] == FINAL_STEP and s["status"] == "done"]
+    failed = [s for s in states if s["status"] == "failed"]
+    e2e = [(s["updated_at"] - s["created_at"]).total_seconds() for s in completed]
+
+    counts = metric_delta(metrics_before, metrics_after, "pipeline_stage_seconds_count", "stage")
+    sums = metric_delta(metrics_before, metrics_after, "pipeline_stage_seconds_sum", "stage")
+    errors: Dict[str, float] = {}
+    for key, value in metrics_after.items():
+        name, labels = key
+        labels = dict(labels)
+        if name == "pipeline_stage_seconds_count" and labels.get("outcome") != "ok":
+            errors[labels["stage"]] = errors.get(labels["stage"], 0.0) + value - metrics_before.get(key, 0.0)
+    stages = {
+        stage: {
+            "requests": int(count),
+            "throughput_per_s": round(count / elapsed, 3) if elapsed else None,
+            "avg_seconds": round(sums.get(stage, 0.0) / count, 3) if count else None,
+            "errors": int(errors.get(stage, 0)),
+        }
+        for stage, count in sorted(counts.items()) if count
+    }
+
+    queries = metric_delta(metrics_before, metrics_after, "db_queries_total", "stage")
+    statements = None
+    if db_before["statements"] is not None and db_after["statements"] is not None:
+        statements = int(db_after["statements"] - db_before["statements"])
+    injected = len(job_ids)
+    app_queries = sum(queries.values())
+
+    return {
+        "run": {
+            "tenant_id": args.tenant_id,
+            "rate_jobs_per_s": args.rate,
+            "duration_s": args.duration,
+            "variants_per_job": args.variants,
+            "stub_latency": args.stub_latency,
+            "gpt_latency_ms": args.gpt_latency_ms,
+            "elapsed_s": round(elapsed, 1),
+        },
+        "jobs": {
+            "injected": injected,
+            "completed": len(completed),
+            "failed": len(failed),
+            "incomplete": injected - len(completed) - len(failed),
+            "throughput_per_s": round(len(completed) / elapsed, 3) if elapsed else None,
+        },
+        "e2e_seconds": {
+            "p50": percentile(e2e, 50),
+            "p95": percentile(e2e, 95),
+            "p99": percentile(e2e, 99),
+            "max": max(e2e, default=None),
+        },
+        "stages": stages,
+        "queues": queues,
+        "db": {
+            "app_queries_by_stage": {stage: int(n) for stage, n in sorted(queries.items()) if n},
+            "app_queries_per_job": round(app_queries / injected, 1) if injected else None,
+            "transactions": int(db_after["transactions"] - db_before["transactions"]),
+            "statements": statements,
+        },
+        "gpt_fake_server": gpt_stats,
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    def _fmt(value):
+        return f"{value:.2f}" if isinstance(value, float) else ("-" if value is None else str(value))
+
+    print("\n" + "=" * 70)
+    print("부하 테스트 결과")
+    print("=" * 70)
+    jobs = report["jobs"]
+    print(f"Jobs: 주입 {jobs['injected']}, 완료 {jobs['completed']}, 실패 {jobs['failed']}, "
+          f"미완료 {jobs['incomplete']} (완료 처리량 {_fmt(jobs['throughput_per_s'])} job/s)")
+    e2e = report["e2e_seconds"]
+    print(f"End-to-end: p50 {_fmt(e2e['p50'])}s, p95 {_fmt(e2e['p95'])}s, p99 {_fmt(e2e['p99'])}s, max {_fmt(e2e['max'])}s")
+
+    print(f"\n{'stage':20s} {'req':>6s} {'req/s':>8s} {'avg s':>8s} {'err':>5s} {'wait avg/max':>14s} {'run avg/max':>13s}")
+    for stage, s in report["stages"].items():
+        q = report["queues"].get(stage, {})
+        wait = f"{_fmt(q.get('waiting_avg'))}/{_fmt(q.get('waiting_max'))}" if q else "-"
+        run = f"{_fmt(q.get('running_avg'))}/{_fmt(q.get('running_max'))}" if q else "-"
+        print(f"{stage:20s} {s['requests']:6d} {_fmt(s['throughput_per_s']):>8s} {_fmt(s['avg_seconds']):>8s} "
+              f"{s['errors']:5d} {wait:>14s} {run:>13s}")
+
+    db = report["db"]
+    print(f"\nDB: 앱 쿼리 {sum(db['app_queries_by_stage'].values())} (job당 {_fmt(db['app_queries_per_job'])}), "
+          f"트랜잭션 {db['transactions']}, 전체 statement {_fmt(db['statements'])}")
+    for stage, n in db["app_queries_by_stage"].items():
+        print(f"  - {stage}: {n}")
+    if report["gpt_fake_server"]:
+        gpt = report["gpt_fake_server"]
+        print(f"GPT(가짜 서버): 요청 {gpt.get('requests')}, 최대 동시 {gpt.get('max_in_flight')}")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="파이프라인 end-to-end 부하 테스트 (stub 모델)")
+    parser.add_argument("--database-url", type=str, default=os.getenv("DATABASE_URL", ""), help="부하 테스트용 Postgres URL")
+    parser.add_argument("--apply-schema", action="store_true", help="docs/01, 03, 04 SQL 적용 (빈 DB)")
+    parser.add_argument("--rate", type=float, default=0.5, help="초당 주입 job 수 (기본값: 0.5)")
+    parser.add_argument("--duration", type=float, default=60, help="주입 시간(초) (기본값: 60)")
+    parser.add_argument("--variants", type=int, default=3, help="job당 variant 수 (기본값: 3)")
+    parser.add_argument("--drain-timeout", type=float, default=600, help="주입 후 완료 대기 시간(초) (기본값: 600)")
+    parser.add_argument("--stub-latency", type=str, default="llava=lognormal:1500:0.3,yolo=normal:60:15,ocr=normal:150:40",
+                        help="stub 모델 지연 분포 (STUB_LATENCY 형식)")
+    parser.add_argument("--gpt-latency-ms", type=float, default=800, help="가짜 GPT 서버 평균 지연 (ms)")
+    parser.add_argument("--gpt-jitter-ms", type=float, default=300, help="가짜 GPT 서버 지연 변동 폭 (±ms)")
+    parser.add_argument("--port", type=int, default=8711, help="앱 포트 (기본값: 8711)")
+    parser.add_argument("--gpt-port", type=int, default=8799, help="가짜 GPT 서버 포트 (기본값: 8799)")
+    parser.add_argument("--app-url", type=str, default=None, help="이미 실행 중인 앱 주소 (지정 시 앱 / 가짜 서버를 띄우지 않음)")
+    parser.add_argument("--assets-dir", type=str, default=None, help="ASSETS_DIR (기본값: 임시 디렉토리, --app-url이면 앱과 같은 경로 필요)")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="대기열 샘플링 간격(초)")
+    parser.add_argument("--output", type=str, default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--log-dir", type=str, default="logs", help="앱 / 가짜 서버 로그 경로 (기본값: logs)")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url 또는 DATABASE_URL이 필요합니다")
+    args.tenant_id = f"load_test_{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+    # config / database import 전에 설정 (앱 프로세스와 같은 DB, 자산 경로)
+    if args.app_url:
+        assets_dir = args.assets_dir or os.getenv("ASSETS_DIR")
+    else:
+        assets_dir = args.assets_dir or tempfile.mkdtemp(prefix="feedlyai_load_")
+    os.environ["DATABASE_URL"] = args.database_url
+    if assets_dir:
+        os.environ["ASSETS_DIR"] = assets_dir
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    from sqlalchemy import text
+    from database import engine
+
+    if args.apply_schema:
+        apply_schema(engine, SCHEMA_FILES)
+    missing = check_triggers(engine)
+    if missing:
+        print(f"✗ NOTIFY 트리거 없음: {missing} (--apply-schema 또는 docs/03_state_notify_triggers.sql 적용 필요)")
+        sys.exit(1)
+
+    processes: List[subprocess.Popen] = []
+    app_url = args.app_url
+    log_dir = project_root / args.log_dir
+    try:
+        if app_url is None:
+            app_url = f"http://127.0.0.1:{args.port}"
+            env = dict(os.environ)
+            env.update({
+                "HOST": "127.0.0.1",
+                "PORT": str(args.port),
+                "STUB_MODELS": "all",
+                "STUB_LATENCY": args.stub_latency,
+                "MODEL_PRELOAD": "llava,yolo,ocr",
+                "GPT_BASE_URL": f"http://127.0.0.1:{args.gpt_port}/v1",
+                # 모든 job이 같은 입력이므로 캐시를 끄고 매번 GPT 호출
+                "GPT_CACHE_ENABLED": "false",
+                "ENABLE_JOB_STATE_LISTENER": "true",
+                "APP_ROLES": "all",
+            })
+            print(f"가짜 GPT 서버 시작: 포트 {args.gpt_port} (로그: {log_dir / 'load_test_gpt.log'})")
+            processes.append(start_process([
+                "scripts/fake_openai_server.py", "--port", str(args.gpt_port),
+                "--latency-ms", str(args.gpt_latency_ms), "--jitter-ms", str(args.gpt_jitter_ms)
+            ], env, log_dir / "load_test_gpt.log"))
+            print(f"앱 시작: {app_url} (STUB_MODELS=all, 로그: {log_dir / 'load_test_app.log'})")
+            processes.append(start_process(["main.py"], env, log_dir / "load_test_app.log"))
+        if not wait_ready(app_url, timeout=180, process=processes[-1] if processes else None):
+            print(f"✗ 앱이 준비되지 않았습니다: {app_url} (로그 확인)")
+            sys.exit(1)
+        print(f"✓ 앱 준비 완료: {app_url}")
+
+        assets = prepare_images(args.tenant_id, args.variants)
+        with engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO tenants (tenant_id, display_name, created_at, updated_at)
+                VALUES (:tenant_id, :tenant_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                ON CONFLICT (tenant_id) DO NOTHING
+            """), {"tenant_id": args.tenant_id})
+
+        metrics_before = scrape_metrics(app_url)
+        db_before = db_counters(engine)
+        sampler = QueueSampler(engine, args.tenant_id, args.sample_interval)
+        sampler.start()
+
+        print(f"\n주입 시작: {args.rate} job/s × {args.duration:.0f}s (variant {args.variants}개, 테넌트 {args.tenant_id})")
+        started = time.time()
+        job_ids = inject(engine, args.tenant_id, assets, args.rate, args.duration)
+        print(f"주입 완료: {len(job_ids)} jobs, 완료 대기 (최대 {args.drain_timeout:.0f}s)...")
+        states = wait_drain(engine, args.tenant_id, len(job_ids), args.drain_timeout)
+        elapsed = time.time() - started
+
+        sampler.stop()
+        metrics_after = scrape_metrics(app_url)
+        db_after = db_counters(engine)
+        gpt_stats = None
+        if processes:
+            import httpx
+            try:
+                gpt_stats = httpx.get(f"http://127.0.0.1:{args.gpt_port}/stats", timeout=5).json()
+            except httpx.HTTPError:
+                pass
+
+        report = build_report(args, job_ids, states, elapsed, metrics_before, metrics_after,
+                              db_before, db_after, sampler.summary(), gpt_stats)
+        print_report(report)
+        if args.output:
+            Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+            Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+            print(f"결과 저장: {args.output}")
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""CPU 작업 프로세스 풀 - planner/overlay CPU 연산 오프로드"""
+########################################################
+# CPU 바운드 작업용 프로세스 풀
+#
+# 기능:
+# - 앱 시작 시 워커 프로세스를 미리 생성하고 워밍업 (NumPy/PIL import, 폰트 로드)
+# - 요청 스레드의 NumPy 마스크 연산 / 텍스트 레이아웃·합성을 워커 프로세스에서 실행
+#   → GIL 경합 없이 코어 수만큼 처리량 확장, asyncio 리스너 스레드 기아 방지
+# - 이미지/마스크 버퍼는 공유 메모리로 전달 (pickle 복사 없음)
+# - 풀 비활성화(CPU_POOL_WORKERS=0) 또는 풀 손상 시 현재 프로세스에서 실행
+# - 프로파일링 중인 요청의 작업은 워커 안에서 샘플링하여 단계 프로파일에 합산 (stage_profiler)
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Managed process pool for CPU-bound planner/overlay work
+# version: 1.2.0
+# status: development
+# tags: pool, multiprocessing, shared-memory
+# dependencies: numpy, pillow
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import os
+import functools
+import threading
+import weakref
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+import numpy as np
+import logging
+from config import CPU_POOL_WORKERS
+from services.stage_metrics import track_inference
+from services.stage_profiler import stage_profiler, sample_call
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+class SharedArray(NamedTuple):
+    """공유 메모리에 올린 NumPy 배열 핸들 (pickle 가능, 워커로 전달)"""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+@contextmanager
+def shared_array(array: np.ndarray) -> Iterator[SharedArray]:
+    """
+    배열을 공유 메모리에 복사하고 핸들 반환 (블록 종료 시 해제)
+
+    Args:
+        array: 공유할 NumPy 배열
+
+    Yields:
+        SharedArray 핸들
+    """
+    array = np.ascontiguousarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    try:
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+        view[...] = array
+        del view
+        yield SharedArray(shm.name, tuple(array.shape), array.dtype.str)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+@contextmanager
+def optional_shared_array(array: Optional[np.ndarray]) -> Iterator[Optional[SharedArray]]:
+    """array가 None이면 None, 아니면 shared_array 핸들"""
+    if array is None:
+        yield None
+    else:
+        with shared_array(array) as handle:
+            yield handle
+
+
+def attach_array(source: Union[SharedArray, np.ndarray, None]) -> Optional[np.ndarray]:
+    """
+    SharedArray 핸들을 NumPy 배열로 연결 (ndarray/None은 그대로 반환)
+
+    반환된 배열은 공유 메모리 뷰이며, 배열(및 파생 뷰)이 해제될 때 매핑이 닫힌다.
+
+    Args:
+        source: SharedArray 핸들, ndarray 또는 None
+
+    Returns:
+        NumPy 배열 (또는 None)
+    """
+    if not isinstance(source, SharedArray):
+        return source
+    # spawn 워커는 부모의 resource_tracker를 공유하므로 별도 등록 해제 불필요 (세그먼트 해제는 생성 측 담당)
+    shm = shared_memory.SharedMemory(name=source.name)
+    array = np.ndarray(source.shape, dtype=np.dtype(source.dtype), buffer=shm.buf)
+    # 배열이 버퍼를 참조하는 동안에는 close()할 수 없으므로 배열 해제 시점에 닫음
+    weakref.finalize(array, shm.close)
+    return array
+
+
+def _warm_worker():
+    """워커 초기화: 무거운 모듈 import 및 폰트 로드"""
+    from PIL import Image, ImageDraw
+    from services import overlay_service, planner_service  # noqa: F401
+    from services.font_registry import get_font_registry
+
+    overlay_service.enable_font_cache()
+    registry = get_font_registry()
+    draw = ImageDraw.Draw(Image.new("L", (64, 64)))
+    for face in registry.faces.values():
+        font = overlay_service.load_font([face.path], 32)
+        draw.text((0, 0), "가A", font=font)  # 글리프 캐시 워밍업
+    loaded = len(registry.faces)
+    np.zeros((64, 64), dtype=np.uint8).mean()
+    logger.info(f"[CPU Pool] 워커 워밍업 완료: pid={os.getpid()}, fonts={loaded}")
+
+
+def _ping() -> int:
+    """워커 생성 확인용"""
+    return os.getpid()
+
+
+def get_cpu_pool() -> Optional[ProcessPoolExecutor]:
+    """프로세스 풀 가져오기 (없으면 생성, 비활성화 시 None)"""
+    global _pool
+    if CPU_POOL_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # fork는 리스너/모델 스레드가 있는 프로세스에서 안전하지 않으므로 spawn 사용
+                _pool = ProcessPoolExecutor(
+                    max_workers=CPU_POOL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker
+                )
+                logger.info(f"[CPU Pool] 프로세스 풀 생성: workers={CPU_POOL_WORKERS}")
+    return _pool
+
+
+def start_cpu_pool():
+    """
+    프로세스 풀 사전 생성 (앱 시작 시 호출)
+
+    모든 워커가 생성되고 워밍업을 마칠 때까지 대기하여 첫 요청이 spawn 비용을 치르지 않도록 한다.
+    """
+    pool = get_cpu_pool()
+    if pool is None:
+        logger.info("[CPU Pool] 비활성화됨 (CPU_POOL_WORKERS=0), 요청 스레드에서 실행")
+        return
+    # ProcessPoolExecutor는 대기 작업 수만큼만 워커를 띄우므로 워커 수만큼 제출
+    pids = {f.result() for f in [pool.submit(_ping) for _ in range(CPU_POOL_WORKERS)]}
+    logger.info(f"[CPU Pool] 워커 준비 완료: {len(pids)}개 pid={sorted(pids)}")
+
+
+def shutdown_cpu_pool():
+    """프로세스 풀 종료 (앱 종료 시 호출)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+            logger.info("[CPU Pool] 프로세스 풀 종료")
+
+
+def _reset_cpu_pool():
+    """손상된 프로세스 풀 폐기 (다음 호출에서 재생성)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def run_cpu_task(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    CPU 작업을 워커 프로세스에서 실행하고 결과 반환
+
+    fn과 인자는 pickle 가능해야 한다 (모듈 최상위 함수, 이미지 버퍼는 SharedArray로 전달).
+    풀이 비활성화되었거나 손상되면 현재 프로세스에서 실행한다.
+    프로파일링 중인 요청이면 워커에서 샘플링한 스택을 단계 프로파일에 합산한다.
+    실행 시간은 단계 메트릭의 inference 구간으로 기록한다 (model="cpu_pool").
+    """
+    with track_inference("cpu_pool"):
+        pool = get_cpu_pool()
+        if pool is not None:
+            stage = stage_profiler.current_stage()
+            try:
+                if stage is None:
+                    return pool.submit(fn, *args, **kwargs).result()
+                result, stacks = pool.submit(sample_call, stage_profiler.interval, fn, *args, **kwargs).result()
+                stage_profiler.merge(stage, stacks)
+                return result
+            except BrokenProcessPool as e:
+                logger.warning(f"[CPU Pool] 프로세스 풀 오류, 현재 프로세스에서 실행: {e}")
+                _reset_cpu_pool()
+        return fn(*args, **kwargs)
+
+
+def map_cpu_tasks(fn: Callable[[Any], Any], tasks: Iterable[Any]) -> List[Any]:
+    """
+    여러 CPU 작업을 워커 프로세스에 분산 실행하고 입력 순서대로 결과 반환
+
+    풀이 비활성화되었거나 손상되면 현재 프로세스에서 순차 실행한다.
+    """
+    tasks = list(tasks)
+    with track_inference("cpu_pool"):
+        pool = get_cpu_pool()
+        if pool is not None:
+            stage = stage_profiler.current_stage()
+            try:
+                if stage is None:
+                    return list(pool.map(fn, tasks))
+                results = []
+                for result, stacks in pool.map(functools.partial(sample_call, stage_profiler.interval, fn), tasks):
+                    stage_profiler.merge(stage, stacks)
+                    results.append(result)
+                return results
+            except BrokenProcessPool as e:
+                logger.warning(f"[CPU Pool] 프로세스 풀 오류, 현재 프로세스에서 순차 실행: {e}")
+                _reset_cpu_pool()
+        return [fn(task) for task in tasks]
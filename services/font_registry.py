@@ -0,0 +1,283 @@
+"""폰트 레지스트리 서비스"""
+########################################################
+# 폰트 레지스트리
+#
+# 기능:
+# - 시작 시 fonts.py의 모든 폰트 파일을 1회 검증 (렌더링 시 폰트는 경로로 열고 파일 공유는 OS 페이지 캐시에 맡김)
+# - 정규화된 이름 / 스타일 / 유니코드 커버리지(한글 음절, 라틴, 숫자)로 인덱싱
+# - 폰트 이름 퍼지 매칭 테이블 (LLaVA 추천 이름 → 폰트)
+# - 텍스트를 실제로 렌더링할 수 있는 폰트를 O(1)로 선택 (디스크 탐색, load_default 폴백 없음)
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Font registry with preloaded faces and a Hangul-coverage index
+# version: 1.0.1
+# status: development
+# tags: font, registry, overlay
+# dependencies: pillow
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import os
+import re
+import difflib
+import threading
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+from PIL import ImageFont
+import logging
+from fonts import FONT_STYLE_MAP, FONT_NAME_MAP
+
+logger = logging.getLogger(__name__)
+
+# 커버리지 검사용 샘플 문자 (모두 렌더링 가능해야 해당 스크립트 지원으로 판단)
+COVERAGE_SAMPLES = {
+    "hangul": "가각한글뷁힣",
+    "latin": "AaGgQzZ",
+    "digits": "0123456789"
+}
+# 어떤 폰트에도 없는 문자 (.notdef 글리프 비교 기준)
+_NOTDEF_PROBE = "\uffff"
+_PROBE_SIZE = 32
+
+_HANGUL_PATTERN = re.compile(r"[가-힣]")
+_LATIN_PATTERN = re.compile(r"[A-Za-z]")
+_DIGIT_PATTERN = re.compile(r"[0-9]")
+
+
+class FontFace(NamedTuple):
+    """검증된 폰트 face 정보"""
+    path: str
+    family: str
+    style_name: str
+    styles: Tuple[str, ...]      # FONT_STYLE_MAP에서 속한 스타일
+    coverage: FrozenSet[str]     # {"hangul", "latin", "digits"} 부분집합
+
+    def covers(self, required: FrozenSet[str]) -> bool:
+        """required 스크립트를 모두 렌더링할 수 있는지"""
+        return required <= self.coverage
+
+
+def normalize_font_name(name: str) -> str:
+    """폰트 이름 정규화 (소문자, 공백 정리)"""
+    return " ".join(name.lower().split())
+
+
+def _compact_font_name(name: str) -> str:
+    """폰트 이름 압축 키 (소문자, 영숫자/한글만)"""
+    return re.sub(r"[^0-9a-z가-힣]", "", name.lower())
+
+
+def required_coverage(text: str) -> FrozenSet[str]:
+    """텍스트 렌더링에 필요한 스크립트 집합"""
+    required = set()
+    if _HANGUL_PATTERN.search(text):
+        required.add("hangul")
+    if _LATIN_PATTERN.search(text):
+        required.add("latin")
+    if _DIGIT_PATTERN.search(text):
+        required.add("digits")
+    return frozenset(required)
+
+
+def _glyph_signature(font: ImageFont.FreeTypeFont, ch: str) -> Tuple[Tuple[int, int], bytes]:
+    """글리프 비트맵 서명 (크기 + 픽셀)"""
+    mask = font.getmask(ch)
+    return mask.size, bytes(mask)
+
+
+def _probe_coverage(font: ImageFont.FreeTypeFont) -> FrozenSet[str]:
+    """샘플 문자 렌더링 결과를 .notdef 글리프와 비교하여 스크립트 커버리지 판별"""
+    notdef = _glyph_signature(font, _NOTDEF_PROBE)
+    coverage = set()
+    for script, samples in COVERAGE_SAMPLES.items():
+        covered = True
+        for ch in samples:
+            signature = _glyph_signature(font, ch)
+            if signature == notdef or not any(signature[1]):
+                covered = False
+                break
+        if covered:
+            coverage.add(script)
+    return frozenset(coverage)
+
+
+class FontRegistry:
+    """검증된 폰트 face 레지스트리 (시작 시 1회 구축, 이후 조회 전용)"""
+
+    def __init__(self):
+        self.faces: Dict[str, FontFace] = {}                        # path -> face
+        self._by_name: Dict[str, FontFace] = {}                     # 정규화/압축 이름 -> face
+        self._by_style: Dict[str, List[FontFace]] = {}              # 스타일 -> face 리스트 (FONT_STYLE_MAP 순서)
+        self._by_coverage: Dict[Tuple[Optional[str], FrozenSet[str]], FontFace] = {}  # (스타일, 필요 커버리지) -> face
+        self._fuzzy_cache: Dict[str, Optional[FontFace]] = {}
+        self._fuzzy_lock = threading.Lock()
+
+    def build(self):
+        """fonts.py의 모든 폰트 파일 검증 및 인덱스 구축"""
+        styles_by_path: Dict[str, List[str]] = {}
+        for style, paths in FONT_STYLE_MAP.items():
+            for path in paths:
+                styles_by_path.setdefault(path, []).append(style)
+        all_paths = list(styles_by_path) + [p for p in FONT_NAME_MAP.values() if p not in styles_by_path]
+
+        for path in dict.fromkeys(all_paths):
+            face = self._load_face(path, tuple(styles_by_path.get(path, ())))
+            if face is not None:
+                self.faces[path] = face
+
+        # 이름 인덱스: FONT_NAME_MAP 키 > 폰트 family 이름 > 파일명
+        for name, path in FONT_NAME_MAP.items():
+            if path in self.faces:
+                self._index_name(name, self.faces[path])
+        for face in self.faces.values():
+            self._index_name(f"{face.family} {face.style_name}", face)
+            self._index_name(face.family, face)
+            self._index_name(os.path.splitext(os.path.basename(face.path))[0], face)
+
+        # 스타일 인덱스 및 (스타일, 커버리지) 조합별 첫 번째 렌더링 가능 face
+        for style, paths in FONT_STYLE_MAP.items():
+            self._by_style[style] = [self.faces[p] for p in paths if p in self.faces]
+        coverage_sets = {frozenset()}
+        for script in COVERAGE_SAMPLES:
+            coverage_sets |= {s | {script} for s in coverage_sets}
+        for required in coverage_sets:
+            for style, faces in self._by_style.items():
+                face = next((f for f in faces if f.covers(required)), None)
+                if face is not None:
+                    self._by_coverage[(style, required)] = face
+            face = next((f for f in self.faces.values() if f.covers(required)), None)
+            if face is not None:
+                self._by_coverage[(None, required)] = face
+
+        hangul_count = sum(1 for f in self.faces.values() if "hangul" in f.coverage)
+        logger.info(f"[FontRegistry] 구축 완료: faces={len(self.faces)}/{len(set(all_paths))}, 한글 지원={hangul_count}, 이름 키={len(self._by_name)}")
+
+    def _load_face(self, path: str, styles: Tuple[str, ...]) -> Optional[FontFace]:
+        """폰트 파일 1개 검증 (FreeType으로 열기, 커버리지 검사)"""
+        if not os.path.isfile(path):
+            logger.warning(f"[FontRegistry] 폰트 파일 없음: {path}")
+            return None
+        try:
+            font = ImageFont.truetype(path, _PROBE_SIZE)
+            family, style_name = font.getname()
+            coverage = _probe_coverage(font)
+        except Exception as e:
+            logger.warning(f"[FontRegistry] 폰트 검증 실패: {path}: {e}")
+            return None
+        return FontFace(path, family or "", style_name or "", styles, coverage)
+
+    def _index_name(self, name: str, face: FontFace):
+        """이름 인덱스 등록 (먼저 등록된 이름 우선)"""
+        for key in (normalize_font_name(name), _compact_font_name(name)):
+            if key:
+                self._by_name.setdefault(key, face)
+
+    def lookup_name(self, font_name: str) -> Optional[FontFace]:
+        """
+        폰트 이름으로 face 조회 (정확 → 압축 키 → 퍼지 매칭, 퍼지 결과는 캐시)
+
+        Args:
+            font_name: 폰트 이름 (예: "Gmarket Sans", "gmarketsans bold")
+
+        Returns:
+            FontFace 또는 None
+        """
+        if not font_name:
+            return None
+        face = self._by_name.get(normalize_font_name(font_name))
+        if face is not None:
+            return face
+        compact = _compact_font_name(font_name)
+        if not compact:
+            return None
+        face = self._by_name.get(compact)
+        if face is not None:
+            return face
+        with self._fuzzy_lock:
+            if compact in self._fuzzy_cache:
+                return self._fuzzy_cache[compact]
+        face = self._fuzzy_match(compact)
+        with self._fuzzy_lock:
+            self._fuzzy_cache[compact] = face
+        return face
+
+    def _fuzzy_match(self, compact: str) -> Optional[FontFace]:
+        """부분 문자열 매칭 (가장 긴 키 우선) → 유사도 매칭"""
+        compact_keys = [k for k in self._by_name if " " not in k]
+        partial = [k for k in compact_keys if k in compact or compact in k]
+        if partial:
+            return self._by_name[max(partial, key=len)]
+        close = difflib.get_close_matches(compact, compact_keys, n=1, cutoff=0.8)
+        return self._by_name[close[0]] if close else None
+
+    def resolve(
+        self,
+        text: str,
+        font_name: Optional[str] = None,
+        font_style: Optional[str] = None
+    ) -> Tuple[FontFace, str]:
+        """
+        텍스트를 렌더링할 수 있는 face 선택
+
+        우선순위: 추천 폰트 이름 → 추천 스타일 → sans-serif → 전체 레지스트리 (모두 커버리지 충족 필수)
+
+        Args:
+            text: 렌더링할 텍스트
+            font_name: 추천/요청 폰트 이름 (Optional)
+            font_style: 추천 폰트 스타일 (Optional)
+
+        Returns:
+            (face, source): source는 "name" | "style" | "default" | "any" | "uncovered"
+
+        Raises:
+            RuntimeError: 검증된 폰트가 하나도 없는 경우
+        """
+        if not self.faces:
+            raise RuntimeError("사용 가능한 폰트가 없습니다 (폰트 레지스트리 비어 있음)")
+        required = required_coverage(text)
+
+        if font_name:
+            face = self.lookup_name(font_name)
+            if face is None:
+                logger.warning(f"[FontRegistry] 폰트 이름을 찾을 수 없음: {font_name}, 스타일 기반으로 선택")
+            elif face.covers(required):
+                return face, "name"
+            else:
+                logger.warning(
+                    f"[FontRegistry] 폰트가 텍스트를 렌더링할 수 없음: {font_name} -> {face.path} "
+                    f"(필요={sorted(required)}, 지원={sorted(face.coverage)}), 스타일 기반으로 선택"
+                )
+
+        if font_style and (font_style, required) in self._by_coverage:
+            return self._by_coverage[(font_style, required)], "style"
+        if ("sans-serif", required) in self._by_coverage:
+            return self._by_coverage[("sans-serif", required)], "default"
+        if (None, required) in self._by_coverage:
+            return self._by_coverage[(None, required)], "any"
+
+        # 필요한 스크립트를 모두 지원하는 폰트가 없음: 가장 많이 지원하는 폰트 사용 (에러 로그로 명시)
+        preferred = self._by_style.get(font_style or "", []) + self._by_style.get("sans-serif", []) + list(self.faces.values())
+        face = max(preferred, key=lambda f: len(f.coverage & required))
+        logger.error(
+            f"[FontRegistry] 텍스트를 완전히 렌더링할 수 있는 폰트 없음 (필요={sorted(required)}), "
+            f"부분 지원 폰트 사용: {face.path} (지원={sorted(face.coverage)})"
+        )
+        return face, "uncovered"
+
+
+_registry: Optional[FontRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_font_registry() -> FontRegistry:
+    """폰트 레지스트리 가져오기 (없으면 구축, 프로세스당 1회)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = FontRegistry()
+                registry.build()
+                _registry = registry
+    return _registry
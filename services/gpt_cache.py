@@ -0,0 +1,244 @@
+"""GPT 응답 캐시 서비스"""
+########################################################
+# GPT 응답 메모이제이션 (content-addressed cache)
+#
+# 기능:
+# - (모델, 프롬프트 템플릿 버전, 정규화된 입력, temperature) 해시를 키로 GPT 결과 재사용
+# - 프로세스 메모리 LRU → Postgres gpt_response_cache 테이블 순으로 조회 (DB는 프로세스/재시작 간 공유)
+# - GPT_CACHE_MAX_TEMPERATURE보다 높은 temperature(샘플링) 호출은 캐시하지 않음 (기본 0.3: 번역만, 피드 글(0.7)은 opt-in)
+# - GPT_CACHE_TTL_HOURS가 지난 DB 행은 저장 시 주기적으로 삭제 (최대 _PURGE_INTERVAL_SECONDS마다 1회)
+# - job 재시도(ad_copy_gen_kor 최대 20회)나 같은 스토어/메뉴 조합 반복 시 GPT 호출 생략
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Content-addressed GPT response cache (in-memory LRU + Postgres)
+# version: 1.0.2
+# status: development
+# tags: gpt, cache, memoization
+# dependencies: sqlalchemy, prometheus_client
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import logging
+from prometheus_client import Counter
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from config import GPT_CACHE_ENABLED, GPT_CACHE_SIZE, GPT_CACHE_TTL_HOURS, GPT_CACHE_MAX_TEMPERATURE
+
+logger = logging.getLogger(__name__)
+
+# 만료된 DB 행 삭제 간격 (초)
+_PURGE_INTERVAL_SECONDS = 3600
+
+gpt_cache_lookups_total = Counter(
+    'gpt_cache_lookups_total',
+    'GPT response cache lookups by operation and result',
+    ['operation', 'result']  # result: memory_hit | db_hit | miss
+)
+
+
+def _normalize(value: Any) -> Any:
+    """입력 정규화 (유니코드 NFC, 앞뒤 공백 제거, 연속 공백 1개로)"""
+    if isinstance(value, str):
+        return " ".join(unicodedata.normalize("NFC", value).split())
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_cache_key(operation: str, model: str, template_version: str, inputs: Dict[str, Any], temperature: float) -> str:
+    """
+    캐시 키 생성 (정규화된 입력의 sha256)
+
+    Args:
+        operation: 작업 이름 ("eng_to_kor", "feed_gen")
+        model: GPT 모델 이름
+        template_version: 프롬프트 템플릿 버전 (템플릿 텍스트 해시, 프롬프트가 바뀌면 이전 결과를 재사용하지 않음)
+        inputs: 프롬프트에 들어가는 입력 값
+        temperature: 호출 temperature
+    """
+    payload = json.dumps(
+        {
+            "operation": operation,
+            "model": model,
+            "template_version": template_version,
+            "inputs": _normalize(inputs),
+            "temperature": round(float(temperature), 4)
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GPTResponseCache:
+    """메모리 LRU + Postgres 2단계 GPT 응답 캐시"""
+
+    def __init__(self, max_entries: int = GPT_CACHE_SIZE, ttl_seconds: float = GPT_CACHE_TTL_HOURS * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_available = True  # 테이블이 없는 등 DB 오류 시 메모리 캐시만 사용
+        self._last_purge = 0.0
+
+    def cacheable(self, temperature: float) -> bool:
+        """캐시 대상 여부 (비활성화 또는 샘플링 temperature면 False)"""
+        return GPT_CACHE_ENABLED and temperature <= GPT_CACHE_MAX_TEMPERATURE
+
+    def get(self, operation: str, key: str) -> Optional[Dict[str, Any]]:
+        """캐시 조회 (메모리 → DB), 없으면 None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    gpt_cache_lookups_total.labels(operation=operation, result="memory_hit").inc()
+                    return entry[1]
+                del self._entries[key]
+
+        result = self._db_get(key)
+        if result is not None:
+            self._remember(key, result, now)
+            gpt_cache_lookups_total.labels(operation=operation, result="db_hit").inc()
+            return result
+        gpt_cache_lookups_total.labels(operation=operation, result="miss").inc()
+        return None
+
+    def put(self, operation: str, key: str, model: str, template_version: str, temperature: float, result: Dict[str, Any]):
+        """캐시 저장 (메모리 + DB upsert, 주기적으로 만료 행 삭제)"""
+        now = time.time()
+        self._remember(key, result, now)
+        self._db_put(operation, key, model, template_version, temperature, result)
+        with self._lock:
+            purge = now - self._last_purge >= _PURGE_INTERVAL_SECONDS
+            if purge:
+                self._last_purge = now
+        if purge:
+            self._db_purge()
+
+    def _remember(self, key: str, result: Dict[str, Any], created_at: float):
+        with self._lock:
+            self._entries[key] = (created_at, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _db_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self._db_available:
+            return None
+        from database import SessionLocal
+        db = SessionLocal()
+        try:
+            row = db.execute(
+                text("""
+                    UPDATE gpt_response_cache
+                    SET hit_count = hit_count + 1,
+                        last_hit_at = CURRENT_TIMESTAMP
+                    WHERE cache_key = :cache_key
+                      AND created_at > CURRENT_TIMESTAMP - make_interval(secs => :ttl_seconds)
+                    RETURNING result
+                """),
+                {"cache_key": key, "ttl_seconds": self.ttl_seconds}
+            ).first()
+            db.commit()
+            return row.result if row else None
+        except Exception as e:
+            db.rollback()
+            self._disable_db(e)
+            return None
+        finally:
+            db.close()
+
+    def _db_put(self, operation: str, key: str, model: str, template_version: str, temperature: float, result: Dict[str, Any]):
+        if not self._db_available:
+            return
+        from database import SessionLocal
+        db = SessionLocal()
+        try:
+            db.execute(
+                text("""
+                    INSERT INTO gpt_response_cache (
+                        cache_key, operation, model_name, template_version, temperature,
+                        result, hit_count, created_at, last_hit_at
+                    )
+                    VALUES (
+                        :cache_key, :operation, :model_name, :template_version, :temperature,
+                        CAST(:result AS jsonb), 0, CURRENT_TIMESTAMP, NULL
+                    )
+                    ON CONFLICT (cache_key) DO UPDATE
+                    SET result = EXCLUDED.result,
+                        hit_count = 0,
+                        created_at = CURRENT_TIMESTAMP,
+                        last_hit_at = NULL
+                """),
+                {
+                    "cache_key": key,
+                    "operation": operation,
+                    "model_name": model,
+                    "template_version": template_version,
+                    "temperature": temperature,
+                    "result": json.dumps(result, ensure_ascii=False)
+                }
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            self._disable_db(e)
+        finally:
+            db.close()
+
+    def _db_purge(self):
+        """TTL이 지난 캐시 행 삭제 (선행 실행 공유 행은 speculative_text_service에서 자체 TTL로 정리)"""
+        if not self._db_available:
+            return
+        from database import SessionLocal
+        db = SessionLocal()
+        try:
+            deleted = db.execute(
+                text("""
+                    DELETE FROM gpt_response_cache
+                    WHERE created_at <= CURRENT_TIMESTAMP - make_interval(secs => :ttl_seconds)
+                      AND cache_key NOT LIKE 'speculative:%'
+                """),
+                {"ttl_seconds": self.ttl_seconds}
+            ).rowcount
+            db.commit()
+            if deleted:
+                logger.info(f"[GPTCache] 만료된 캐시 행 삭제: {deleted}건")
+        except Exception as e:
+            db.rollback()
+            self._disable_db(e)
+        finally:
+            db.close()
+
+    def _disable_db(self, error: Exception):
+        """DB 캐시 오류 처리 (gpt_response_cache 테이블이 없으면 이후 메모리 캐시만 사용)"""
+        if isinstance(error, ProgrammingError):
+            if self._db_available:
+                self._db_available = False
+                logger.warning(f"[GPTCache] gpt_response_cache 테이블 사용 불가, 메모리 캐시만 사용: {error}")
+        else:
+            logger.warning(f"[GPTCache] DB 캐시 조회/저장 실패 (GPT 호출로 진행): {error}")
+
+    def clear(self):
+        """메모리 캐시 비우기"""
+        with self._lock:
+            self._entries.clear()
+
+
+# 프로세스 전역 캐시
+gpt_response_cache = GPTResponseCache()
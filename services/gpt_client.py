@@ -0,0 +1,303 @@
+"""비동기 GPT 클라이언트"""
+########################################################
+# 공유 커넥션 풀 기반 비동기 OpenAI 클라이언트
+#
+# 기능:
+# - 전용 이벤트 루프 스레드에서 AsyncOpenAI + httpx 커넥션 풀 1개를 공유
+#   (async 엔드포인트, 동기 코드(선행 실행 스레드) 어디서 호출해도 같은 풀 사용)
+# - 동시 호출 수 제한 (GPT_MAX_CONCURRENCY, 초과 요청은 대기)
+# - 429 / 5xx / 연결 오류 시 지수 백오프 + full jitter 재시도 (Retry-After 헤더 우선)
+# - 호출별 지연 시간 / 대기 시간 / 시도 횟수 / 토큰 사용량 반환 (llm_traces 저장용) 및 Prometheus 메트릭
+# - GPT_BASE_URL로 OpenAI 호환 서버 지정 가능 (로컬 부하 테스트: scripts/fake_openai_server.py)
+# - GPT 추론 백엔드 "openai" (GPT_BACKEND, services/inference_backends.py)
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Async pooled OpenAI client with bounded concurrency and retry/backoff
+# version: 1.2.0
+# status: development
+# tags: gpt, openai, async, retry
+# dependencies: openai, httpx, prometheus_client
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import time
+import random
+import asyncio
+import contextlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import httpx
+from prometheus_client import Counter, Histogram
+from services.stage_metrics import track_inference
+from services.inference_backends import GptBackend
+from config import (
+    GPT_API_KEY, GPT_BASE_URL, GPT_MAX_CONCURRENCY, GPT_MAX_CONNECTIONS,
+    GPT_MAX_RETRIES, GPT_BACKOFF_BASE_SECONDS, GPT_BACKOFF_MAX_SECONDS, GPT_TIMEOUT_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+# 재시도 대상 HTTP 상태 코드
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# 메트릭 정의
+gpt_requests_total = Counter(
+    'gpt_requests_total',
+    'GPT API calls by operation and outcome',
+    ['operation', 'outcome']
+)
+gpt_request_seconds = Histogram(
+    'gpt_request_seconds',
+    'GPT API call latency including retries',
+    ['operation'],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+)
+gpt_queue_wait_seconds = Histogram(
+    'gpt_queue_wait_seconds',
+    'Time spent waiting for a GPT concurrency slot',
+    ['operation'],
+    buckets=(0.001, 0.01, 0.1, 0.5, 1, 2, 5, 10, 30)
+)
+gpt_retries_total = Counter(
+    'gpt_retries_total',
+    'GPT API retries by reason',
+    ['operation', 'reason']
+)
+gpt_tokens_total = Counter(
+    'gpt_tokens_total',
+    'GPT tokens used',
+    ['operation', 'kind']
+)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """openai 예외에서 HTTP 상태 코드 추출 (연결 오류 등은 None)"""
+    return getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+
+
+def _is_retryable(error: Exception) -> Tuple[bool, str]:
+    """재시도 여부와 사유 (메트릭 라벨)"""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES, str(status)
+    # 응답이 없는 오류 (연결 실패, 타임아웃)
+    if isinstance(error, (httpx.TransportError, asyncio.TimeoutError)) or type(error).__name__ in (
+        "APIConnectionError", "APITimeoutError"
+    ):
+        return True, "connection"
+    return False, type(error).__name__
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Retry-After 헤더 값 (초), 없거나 해석할 수 없으면 None"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    재시도 대기 시간 (지수 백오프 + full jitter)
+
+    Args:
+        attempt: 실패한 시도 번호 (1부터)
+        retry_after: 서버가 지정한 대기 시간 (있으면 우선, 상한 GPT_BACKOFF_MAX_SECONDS)
+    """
+    if retry_after is not None:
+        return min(max(retry_after, 0.0), GPT_BACKOFF_MAX_SECONDS)
+    cap = min(GPT_BACKOFF_MAX_SECONDS, GPT_BACKOFF_BASE_SECONDS * (2 ** (attempt - 1)))
+    return random.uniform(0, cap)
+
+
+def extract_token_usage(response: Any) -> Optional[Dict[str, int]]:
+    """응답의 토큰 사용량 (없으면 None)"""
+    usage = getattr(response, "usage", None)
+    if usage is None or getattr(usage, "total_tokens", None) is None:
+        return None
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens
+    }
+
+
+def response_to_dict(response: Any, token_usage: Optional[Dict[str, int]]) -> Dict[str, Any]:
+    """OpenAI 응답 객체를 JSONB 저장용 dict로 변환"""
+    return {
+        "id": response.id,
+        "object": response.object,
+        "created": response.created,
+        "model": response.model,
+        "choices": [
+            {
+                "index": choice.index,
+                "message": {
+                    "role": choice.message.role,
+                    "content": choice.message.content
+                },
+                "finish_reason": choice.finish_reason
+            }
+            for choice in response.choices
+        ],
+        "usage": token_usage
+    }
+
+
+class AsyncGPTClient(GptBackend):
+    """전용 이벤트 루프에서 동작하는 공유 AsyncOpenAI 클라이언트 (GPT openai 백엔드)"""
+
+    kind = "openai"
+
+    def __init__(self):
+        super().__init__(max_batch_size=1, max_concurrency=GPT_MAX_CONCURRENCY, remote=True)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """전용 루프 스레드와 클라이언트 생성 (첫 호출 시 1회)"""
+        if self._loop is not None:
+            return self._loop
+        with self._lock:
+            if self._loop is None:
+                api_key = GPT_API_KEY or ("local" if GPT_BASE_URL else "")
+                if not api_key:
+                    raise ValueError("OPENAPI_KEY 또는 GPT_API_KEY 환경 변수가 설정되지 않았습니다. .env 파일에 OPENAPI_KEY를 설정해주세요.")
+                from openai import AsyncOpenAI
+
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="gpt-client-loop", daemon=True)
+                thread.start()
+
+                async def _create():
+                    self._http_client = httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=GPT_MAX_CONNECTIONS,
+                            max_keepalive_connections=GPT_MAX_CONNECTIONS
+                        ),
+                        timeout=httpx.Timeout(GPT_TIMEOUT_SECONDS, connect=10.0)
+                    )
+                    # 재시도는 이 클래스에서 직접 처리 (SDK 내장 재시도 비활성화)
+                    self._client = AsyncOpenAI(
+                        api_key=api_key,
+                        base_url=GPT_BASE_URL or None,
+                        http_client=self._http_client,
+                        max_retries=0
+                    )
+                    # INFERENCE_MAX_CONCURRENCY의 gpt 값이 있으면 우선 (0이면 제한 없음)
+                    concurrency = self.capabilities.max_concurrency
+                    self._semaphore = asyncio.Semaphore(concurrency) if concurrency > 0 else contextlib.nullcontext()
+
+                asyncio.run_coroutine_threadsafe(_create(), loop).result()
+                self._thread = thread
+                self._loop = loop
+                logger.info(
+                    f"[GPTClient] 비동기 GPT 클라이언트 시작: base_url={GPT_BASE_URL or 'default'}, "
+                    f"concurrency={self.capabilities.max_concurrency}, connections={GPT_MAX_CONNECTIONS}, retries={GPT_MAX_RETRIES}"
+                )
+        return self._loop
+
+    async def _chat(self, operation: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+        """전용 루프에서 실행: 동시성 슬롯 확보 → 호출 → 실패 시 백오프 재시도"""
+        queued_at = time.perf_counter()
+        async with self._semaphore:
+            queue_wait = time.perf_counter() - queued_at
+            gpt_queue_wait_seconds.labels(operation=operation).observe(queue_wait)
+            start = time.perf_counter()
+            attempt = 0
+            retry_reasons: List[str] = []
+            while True:
+                attempt += 1
+                try:
+                    response = await self._client.chat.completions.create(messages=messages, **params)
+                    break
+                except Exception as e:
+                    retryable, reason = _is_retryable(e)
+                    if not retryable or attempt > GPT_MAX_RETRIES:
+                        gpt_requests_total.labels(operation=operation, outcome="error").inc()
+                        gpt_request_seconds.labels(operation=operation).observe(time.perf_counter() - start)
+                        raise
+                    delay = backoff_delay(attempt, _retry_after_seconds(e))
+                    retry_reasons.append(reason)
+                    gpt_retries_total.labels(operation=operation, reason=reason).inc()
+                    logger.warning(
+                        f"[GPTClient] {operation} 호출 실패 ({reason}), {delay:.2f}s 후 재시도 "
+                        f"({attempt}/{GPT_MAX_RETRIES}): {e}"
+                    )
+                    await asyncio.sleep(delay)
+            elapsed = time.perf_counter() - start
+
+        token_usage = extract_token_usage(response)
+        gpt_requests_total.labels(operation=operation, outcome="ok").inc()
+        gpt_request_seconds.labels(operation=operation).observe(elapsed)
+        if token_usage:
+            gpt_tokens_total.labels(operation=operation, kind="prompt").inc(token_usage["prompt_tokens"] or 0)
+            gpt_tokens_total.labels(operation=operation, kind="completion").inc(token_usage["completion_tokens"] or 0)
+        stats = {
+            "latency_ms": elapsed * 1000,
+            "queue_wait_ms": queue_wait * 1000,
+            "attempts": attempt,
+            "retry_reasons": retry_reasons,
+            "token_usage": token_usage
+        }
+        return response, stats
+
+    async def achat(self, operation: str, messages: List[Dict[str, str]], **params) -> Tuple[Any, Dict[str, Any]]:
+        """
+        chat.completions 호출 (async 코드용, 호출한 이벤트 루프를 막지 않음)
+
+        Args:
+            operation: 메트릭/로그용 작업 이름 (예: "eng_to_kor", "feed_gen")
+            messages: 메시지 리스트
+            **params: model, max_tokens, temperature, response_format 등
+
+        Returns:
+            (응답 객체, {"latency_ms", "queue_wait_ms", "attempts", "retry_reasons", "token_usage"})
+        """
+        loop = self._ensure_started()
+        with track_inference(params.get("model") or "gpt"):
+            return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._chat(operation, messages, params), loop))
+
+    def chat(self, operation: str, messages: List[Dict[str, str]], **params) -> Tuple[Any, Dict[str, Any]]:
+        """chat.completions 호출 (동기 코드용, 결과가 나올 때까지 현재 스레드 대기)"""
+        loop = self._ensure_started()
+        with track_inference(params.get("model") or "gpt"):
+            return asyncio.run_coroutine_threadsafe(self._chat(operation, messages, params), loop).result()
+
+    def close(self):
+        """커넥션 풀과 전용 루프 종료 (앱 종료 시 호출)"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            if loop is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._http_client.aclose(), loop).result(timeout=5)
+            except Exception as e:
+                logger.warning(f"[GPTClient] 커넥션 풀 종료 실패: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join(timeout=5)
+            self._client = None
+            self._http_client = None
+            self._semaphore = None
+
+
+# 프로세스 전역 클라이언트
+gpt_client = AsyncGPTClient()
@@ -5,12 +5,15 @@
 # - OpenAI API 연동
 # - 인스타그램 피드 글 생성
 # - 해시태그 생성
+# - 공유 비동기 클라이언트 사용 (커넥션 풀, 동시성 제한, 재시도: services/gpt_client.py)
+# - 추론 백엔드 (GPT_BACKEND): openai (공유 클라이언트) | stub (고정 응답, services/stub_models.py)
+# - 응답 캐시 (같은 입력이면 GPT 호출 생략: services/gpt_cache.py)
 ########################################################
 # created_at: 2025-11-26
-# updated_at: 2025-12-01
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: GPT service for text generation and translation
-# version: 1.1.0
+# version: 1.4.1
 # status: production
 # tags: gpt, service, translation
 # dependencies: openai, fastapi
@@ -18,63 +21,77 @@
 # copyright: 2025 FeedlyAI Team
 ########################################################
 
-import os
-import time
 import json
+import time
+import hashlib
+import inspect
+import asyncio
 import logging
-from typing import Optional, Dict, Any
-from openai import OpenAI
-from config import GPT_API_KEY, GPT_MODEL_NAME, GPT_MAX_TOKENS
+from typing import Dict, Any, List, Optional, Tuple
+from config import GPT_MODEL_NAME, GPT_MAX_TOKENS
+from services.gpt_client import gpt_client, response_to_dict
+from services.inference_backends import register_backend, get_backend
+from services.stub_models import StubGptBackend
+from services.gpt_cache import gpt_response_cache, make_cache_key
 
 logger = logging.getLogger(__name__)
 
-# OpenAI 클라이언트 초기화
-_client: Optional[OpenAI] = None
+# 단계별 temperature (번역은 일관성을 위해 낮게)
+FEED_TEMPERATURE = 0.7
+TRANSLATE_TEMPERATURE = 0.3
 
+# 캐시에 저장하지 않는 호출별 필드
+_UNCACHED_FIELDS = ("latency_ms", "call_stats", "cache_hit")
 
-def get_gpt_client() -> OpenAI:
-    """OpenAI 클라이언트 가져오기 (싱글톤 패턴)"""
-    global _client
-    if _client is None:
-        api_key = GPT_API_KEY
-        if not api_key:
-            raise ValueError("OPENAPI_KEY 또는 GPT_API_KEY 환경 변수가 설정되지 않았습니다. .env 파일에 OPENAPI_KEY를 설정해주세요.")
-        _client = OpenAI(api_key=api_key)
-    return _client
+# 추론 백엔드 등록 (GPT_BACKEND로 선택)
+register_backend("gpt", "openai", lambda: gpt_client)
+register_backend("gpt", "stub", StubGptBackend)
 
 
-def generate_instagram_feed(
+def _cache_key(operation: str, template_version: str, inputs: Dict[str, Any], params: Dict[str, Any]) -> Optional[str]:
+    """응답 캐시 키 (캐시 대상이 아니면 None)"""
+    if not gpt_response_cache.cacheable(params["temperature"]):
+        return None
+    return make_cache_key(operation, params["model"], template_version, inputs, params["temperature"])
+
+
+def _cached_result(cached: Dict[str, Any], lookup_start: float) -> Dict[str, Any]:
+    """
+    캐시된 결과를 반환 형식으로 변환
+    
+    GPT를 호출하지 않았으므로 token_usage는 None (원래 호출의 사용량은 cached_token_usage),
+    latency_ms는 캐시 조회 시간.
+    """
+    result = dict(cached)
+    result["cached_token_usage"] = result.pop("token_usage", None)
+    result["token_usage"] = None
+    result["latency_ms"] = (time.perf_counter() - lookup_start) * 1000
+    result["call_stats"] = None
+    result["cache_hit"] = True
+    return result
+
+
+def _store_result(operation: str, key: Optional[str], template_version: str, params: Dict[str, Any], result: Dict[str, Any]):
+    """GPT 결과를 응답 캐시에 저장 (실패해도 결과 반환에는 영향 없음)"""
+    result["cache_hit"] = False
+    if key is None:
+        return
+    try:
+        cached = {k: v for k, v in result.items() if k not in _UNCACHED_FIELDS}
+        gpt_response_cache.put(operation, key, params["model"], template_version, params["temperature"], cached)
+    except Exception as e:
+        logger.warning(f"GPT 응답 캐시 저장 실패: {e}")
+
+
+def _build_feed_request(
     refined_ad_copy_eng: str,
     tone_style: str,
     product_description: str,
     store_information: str,
     gpt_prompt: str
-) -> Dict[str, Any]:
-    """
-    GPT를 사용하여 인스타그램 피드 글 생성
-    
-    Args:
-        refined_ad_copy_eng: 조정된 광고문구 (영어)
-        tone_style: 톤 & 스타일
-        product_description: 제품 설명
-        store_information: 스토어 정보
-        gpt_prompt: GPT 프롬프트
-    
-    Returns:
-        Dict[str, Any]: {
-            "instagram_ad_copy": 인스타그램 광고문구,
-            "hashtags": 해시태그 문자열,
-            "prompt_used": 사용된 프롬프트,
-            "latency_ms": API 호출 소요 시간 (밀리초),
-            "token_usage": 토큰 사용량 정보,
-            "gpt_response_raw": GPT API 원본 응답 (JSONB 형식)
-        }
-    """
-    try:
-        client = get_gpt_client()
-        
-        # 프롬프트 구성
-        system_prompt = """You are an expert Instagram content creator specializing in creating engaging ad copy and relevant hashtags for Korean audiences. 
+) -> Tuple[str, str, Dict[str, Any]]:
+    """인스타그램 피드 글 생성 요청 구성 → (system_prompt, user_prompt, 호출 파라미터)"""
+    system_prompt = """You are an expert Instagram content creator specializing in creating engaging ad copy and relevant hashtags for Korean audiences. 
 Your task is to create compelling Instagram feed posts in Korean that:
 1. Are engaging and authentic
 2. Match the brand's tone and style
@@ -104,8 +121,8 @@ Example format:
     "instagram_ad_copy": "맛있는 부대찌개를 만나보세요! ...",
     "hashtags": "#부대찌개 #맛집 #서울맛집 #강남맛집 #한국음식 #맛스타그램 #먹스타그램 #푸드스타그램 #맛있는음식 #데일리"
 }"""
-        
-        user_prompt = f"""{gpt_prompt}
+    
+    user_prompt = f"""{gpt_prompt}
 
 **Refined Ad Copy (English):**
 {refined_ad_copy_eng}
@@ -127,131 +144,198 @@ Requirements:
 3. MUST include 5-10 relevant Korean hashtags in the "hashtags" field
 4. Hashtags should be related to: the product name, food category, location (if provided), and popular Korean Instagram food hashtags
 5. Make sure the hashtags field is never empty"""
+    params = {
+        "model": GPT_MODEL_NAME,
+        "max_tokens": GPT_MAX_TOKENS,
+        "temperature": FEED_TEMPERATURE,
+        "response_format": {"type": "json_object"}  # JSON 형식으로 응답 받기
+    }
+    return system_prompt, user_prompt, params
 
-        # GPT API 호출 (latency 측정)
-        start_time = time.time()
-        response = client.chat.completions.create(
-            model=GPT_MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=GPT_MAX_TOKENS,
-            temperature=0.7,
-            response_format={"type": "json_object"}  # JSON 형식으로 응답 받기
-        )
-        latency_ms = (time.time() - start_time) * 1000  # 밀리초로 변환
-        
-        # 응답 파싱
-        response_text = response.choices[0].message.content
-        result = json.loads(response_text)
-        
-        instagram_ad_copy = result.get("instagram_ad_copy", "")
-        hashtags = result.get("hashtags", "").strip()
-        
-        # 해시태그가 비어있거나 없을 경우 fallback 처리
-        if not hashtags:
-            logger.warning("⚠️ GPT 응답에 해시태그가 없습니다. 기본 해시태그 생성 시도...")
-            # 기본 해시태그 생성 (제품 설명에서 키워드 추출)
-            fallback_hashtags = []
-            if product_description:
-                # 제품명 추출 시도
-                if "부대찌개" in product_description:
-                    fallback_hashtags.append("#부대찌개")
-                if "맛집" in product_description or "맛" in product_description:
-                    fallback_hashtags.append("#맛집")
-            # 기본 해시태그 추가
-            fallback_hashtags.extend([
-                "#맛스타그램", "#먹스타그램", "#푸드스타그램", 
-                "#한국음식", "#데일리"
-            ])
-            if store_information and ("서울" in store_information or "강남" in store_information):
-                fallback_hashtags.append("#서울맛집")
-                if "강남" in store_information:
-                    fallback_hashtags.append("#강남맛집")
-            
-            hashtags = " ".join(fallback_hashtags[:10])  # 최대 10개
-            logger.info(f"✓ Fallback 해시태그 생성: {hashtags}")
-        
-        # 해시태그 정리 (공백 정리, 중복 제거)
-        hashtag_list = [tag.strip() for tag in hashtags.split() if tag.strip().startswith("#")]
-        hashtags = " ".join(list(dict.fromkeys(hashtag_list)))  # 중복 제거하면서 순서 유지
-        
-        # 프롬프트 구성 (디버깅용)
-        prompt_used = f"System: {system_prompt}\n\nUser: {user_prompt}"
-        
-        # 토큰 사용량 추출
-        token_usage = None
-        if hasattr(response, 'usage') and response.usage:
-            token_usage = {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens
-            }
-        
-        # GPT API 원본 응답 (JSONB 형식으로 저장 가능하도록 dict로 변환)
-        gpt_response_raw = None
-        try:
-            # OpenAI 응답 객체를 dict로 변환
-            gpt_response_raw = {
-                "id": response.id,
-                "object": response.object,
-                "created": response.created,
-                "model": response.model,
-                "choices": [
-                    {
-                        "index": choice.index,
-                        "message": {
-                            "role": choice.message.role,
-                            "content": choice.message.content
-                        },
-                        "finish_reason": choice.finish_reason
-                    }
-                    for choice in response.choices
-                ],
-                "usage": token_usage
-            }
-        except Exception as e:
-            logger.warning(f"GPT 응답 원본 저장 중 오류: {e}")
-        
-        logger.info(f"✓ 인스타그램 피드 글 생성 완료 (latency: {latency_ms:.2f}ms)")
-        logger.debug(f"생성된 글 길이: {len(instagram_ad_copy)}자, 해시태그: {hashtags}")
-        
-        return {
-            "instagram_ad_copy": instagram_ad_copy,
-            "hashtags": hashtags,
-            "prompt_used": prompt_used,
-            "latency_ms": latency_ms,
-            "token_usage": token_usage,
-            "gpt_response_raw": gpt_response_raw
-        }
+
+def _template_version(operation: str, build_request) -> str:
+    """
+    프롬프트 템플릿 버전 (응답 캐시 키에 포함)
+
+    입력 자리에 {인자 이름}을 넣어 만든 system/user 프롬프트와 호출 파라미터(모델, temperature 제외)의 해시.
+    프롬프트 문구를 고치면 버전이 자동으로 바뀌어 이전 캐시 결과를 재사용하지 않는다.
+    """
+    placeholders = {name: "{" + name + "}" for name in inspect.signature(build_request).parameters}
+    system_prompt, user_prompt, params = build_request(**placeholders)
+    template_params = {k: v for k, v in params.items() if k not in ("model", "temperature")}
+    payload = json.dumps([system_prompt, user_prompt, template_params], ensure_ascii=False, sort_keys=True)
+    return f"{operation}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]}"
+
+
+FEED_TEMPLATE_VERSION = _template_version("feed_gen", _build_feed_request)
+
+
+def _messages(system_prompt: str, user_prompt: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def _finish_feed(
+    response: Any,
+    stats: Dict[str, Any],
+    system_prompt: str,
+    user_prompt: str,
+    product_description: str,
+    store_information: str
+) -> Dict[str, Any]:
+    """피드 글 응답 파싱 및 결과 구성"""
+    # 응답 파싱
+    response_text = response.choices[0].message.content
+    result = json.loads(response_text)
+    
+    instagram_ad_copy = result.get("instagram_ad_copy", "")
+    hashtags = result.get("hashtags", "").strip()
+    
+    # 해시태그가 비어있거나 없을 경우 fallback 처리
+    if not hashtags:
+        logger.warning("⚠️ GPT 응답에 해시태그가 없습니다. 기본 해시태그 생성 시도...")
+        # 기본 해시태그 생성 (제품 설명에서 키워드 추출)
+        fallback_hashtags = []
+        if product_description:
+            # 제품명 추출 시도
+            if "부대찌개" in product_description:
+                fallback_hashtags.append("#부대찌개")
+            if "맛집" in product_description or "맛" in product_description:
+                fallback_hashtags.append("#맛집")
+        # 기본 해시태그 추가
+        fallback_hashtags.extend([
+            "#맛스타그램", "#먹스타그램", "#푸드스타그램", 
+            "#한국음식", "#데일리"
+        ])
+        if store_information and ("서울" in store_information or "강남" in store_information):
+            fallback_hashtags.append("#서울맛집")
+            if "강남" in store_information:
+                fallback_hashtags.append("#강남맛집")
         
-    except Exception as e:
-        logger.error(f"❌ GPT API 호출 중 오류: {e}")
-        raise
+        hashtags = " ".join(fallback_hashtags[:10])  # 최대 10개
+        logger.info(f"✓ Fallback 해시태그 생성: {hashtags}")
+    
+    # 해시태그 정리 (공백 정리, 중복 제거)
+    hashtag_list = [tag.strip() for tag in hashtags.split() if tag.strip().startswith("#")]
+    hashtags = " ".join(list(dict.fromkeys(hashtag_list)))  # 중복 제거하면서 순서 유지
+    
+    token_usage = stats["token_usage"]
+    latency_ms = stats["latency_ms"]
+    logger.info(f"✓ 인스타그램 피드 글 생성 완료 (latency: {latency_ms:.2f}ms, attempts: {stats['attempts']})")
+    logger.debug(f"생성된 글 길이: {len(instagram_ad_copy)}자, 해시태그: {hashtags}")
+    
+    return {
+        "instagram_ad_copy": instagram_ad_copy,
+        "hashtags": hashtags,
+        "prompt_used": f"System: {system_prompt}\n\nUser: {user_prompt}",  # 디버깅용
+        "latency_ms": latency_ms,
+        "token_usage": token_usage,
+        "gpt_response_raw": response_to_dict(response, token_usage),
+        "call_stats": _call_stats(stats)
+    }
 
 
-def translate_eng_to_kor(ad_copy_eng: str) -> Dict[str, Any]:
+def _call_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """llm_traces.response에 저장할 호출 통계 (대기 시간, 시도 횟수, 재시도 사유)"""
+    return {
+        "queue_wait_ms": round(stats["queue_wait_ms"], 2),
+        "attempts": stats["attempts"],
+        "retry_reasons": stats["retry_reasons"]
+    }
+
+
+async def generate_instagram_feed_async(
+    refined_ad_copy_eng: str,
+    tone_style: str,
+    product_description: str,
+    store_information: str,
+    gpt_prompt: str
+) -> Dict[str, Any]:
     """
-    GPT를 사용하여 영어 광고문구를 한글로 변환
+    GPT를 사용하여 인스타그램 피드 글 생성 (async, 호출한 이벤트 루프를 막지 않음)
     
     Args:
-        ad_copy_eng: 영어 광고문구
+        refined_ad_copy_eng: 조정된 광고문구 (영어)
+        tone_style: 톤 & 스타일
+        product_description: 제품 설명
+        store_information: 스토어 정보
+        gpt_prompt: GPT 프롬프트
     
     Returns:
         Dict[str, Any]: {
-            "ad_copy_kor": 한글 광고문구,
+            "instagram_ad_copy": 인스타그램 광고문구,
+            "hashtags": 해시태그 문자열,
             "prompt_used": 사용된 프롬프트,
-            "latency_ms": API 호출 소요 시간 (밀리초),
+            "latency_ms": API 호출 소요 시간 (밀리초, 재시도 포함),
             "token_usage": 토큰 사용량 정보,
-            "gpt_response_raw": GPT API 원본 응답 (JSONB 형식)
+            "gpt_response_raw": GPT API 원본 응답 (JSONB 형식),
+            "call_stats": {"queue_wait_ms", "attempts", "retry_reasons"} (캐시 사용 시 None),
+            "cache_hit": 응답 캐시 사용 여부 (True면 token_usage는 None, 원래 사용량은 cached_token_usage)
         }
     """
+    inputs = {
+        "refined_ad_copy_eng": refined_ad_copy_eng,
+        "tone_style": tone_style,
+        "product_description": product_description,
+        "store_information": store_information,
+        "gpt_prompt": gpt_prompt
+    }
+    system_prompt, user_prompt, params = _build_feed_request(**inputs)
+    lookup_start = time.perf_counter()
+    key = _cache_key("feed_gen", FEED_TEMPLATE_VERSION, inputs, params)
+    if key is not None:
+        cached = await asyncio.to_thread(gpt_response_cache.get, "feed_gen", key)
+        if cached is not None:
+            logger.info("✓ 인스타그램 피드 글 캐시 사용 (GPT 호출 생략)")
+            return _cached_result(cached, lookup_start)
     try:
-        client = get_gpt_client()
-        
-        # 프롬프트 구성
-        system_prompt = """You are an expert translator specializing in translating English ad copy to Korean.
+        response, stats = await get_backend("gpt").achat("feed_gen", _messages(system_prompt, user_prompt), **params)
+        result = _finish_feed(response, stats, system_prompt, user_prompt, product_description, store_information)
+    except Exception as e:
+        logger.error(f"❌ GPT API 호출 중 오류: {e}")
+        raise
+    await asyncio.to_thread(_store_result, "feed_gen", key, FEED_TEMPLATE_VERSION, params, result)
+    return result
+
+
+def generate_instagram_feed(
+    refined_ad_copy_eng: str,
+    tone_style: str,
+    product_description: str,
+    store_information: str,
+    gpt_prompt: str
+) -> Dict[str, Any]:
+    """GPT를 사용하여 인스타그램 피드 글 생성 (동기, 반환값은 generate_instagram_feed_async와 동일)"""
+    inputs = {
+        "refined_ad_copy_eng": refined_ad_copy_eng,
+        "tone_style": tone_style,
+        "product_description": product_description,
+        "store_information": store_information,
+        "gpt_prompt": gpt_prompt
+    }
+    system_prompt, user_prompt, params = _build_feed_request(**inputs)
+    lookup_start = time.perf_counter()
+    key = _cache_key("feed_gen", FEED_TEMPLATE_VERSION, inputs, params)
+    if key is not None:
+        cached = gpt_response_cache.get("feed_gen", key)
+        if cached is not None:
+            logger.info("✓ 인스타그램 피드 글 캐시 사용 (GPT 호출 생략)")
+            return _cached_result(cached, lookup_start)
+    try:
+        response, stats = get_backend("gpt").chat("feed_gen", _messages(system_prompt, user_prompt), **params)
+        result = _finish_feed(response, stats, system_prompt, user_prompt, product_description, store_information)
+    except Exception as e:
+        logger.error(f"❌ GPT API 호출 중 오류: {e}")
+        raise
+    _store_result("feed_gen", key, FEED_TEMPLATE_VERSION, params, result)
+    return result
+
+
+def _build_translate_request(ad_copy_eng: str) -> Tuple[str, str, Dict[str, Any]]:
+    """영어 → 한글 변환 요청 구성 → (system_prompt, user_prompt, 호출 파라미터)"""
+    system_prompt = """You are an expert translator specializing in translating English ad copy to Korean.
 Your task is to translate English advertising copy into natural, engaging Korean that:
 1. Maintains the original meaning and intent
 2. Sounds natural and authentic in Korean
@@ -260,96 +344,94 @@ Your task is to translate English advertising copy into natural, engaging Korean
 5. Keeps the same length and impact as the original
 
 Return only the Korean translation without any additional explanation or formatting."""
-        
-        user_prompt = f"""Translate the following English ad copy to Korean:
+    
+    user_prompt = f"""Translate the following English ad copy to Korean:
 
 {ad_copy_eng}
 
 Please provide only the Korean translation, maintaining the original tone and style."""
+    params = {
+        "model": GPT_MODEL_NAME,
+        "max_tokens": GPT_MAX_TOKENS,
+        "temperature": TRANSLATE_TEMPERATURE
+    }
+    return system_prompt, user_prompt, params
 
-        # GPT API 호출 (latency 측정)
-        start_time = time.time()
-        response = client.chat.completions.create(
-            model=GPT_MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=GPT_MAX_TOKENS,
-            temperature=0.3,  # 번역은 일관성을 위해 낮은 temperature 사용
-        )
-        latency_ms = (time.time() - start_time) * 1000  # 밀리초로 변환
-        
-        # 응답 파싱
-        response_text = response.choices[0].message.content.strip()
-        ad_copy_kor = response_text
-        
-        # 프롬프트 구성 (디버깅용)
-        prompt_used = f"System: {system_prompt}\n\nUser: {user_prompt}"
-        
-        # 토큰 사용량 추출 (feed_gen과 동일한 방식)
-        token_usage = None
-        try:
-            # response.usage 확인
-            if hasattr(response, 'usage'):
-                usage_obj = response.usage
-                if usage_obj is not None:
-                    # usage 객체의 속성 확인
-                    if hasattr(usage_obj, 'prompt_tokens') and hasattr(usage_obj, 'completion_tokens') and hasattr(usage_obj, 'total_tokens'):
-                        token_usage = {
-                            "prompt_tokens": usage_obj.prompt_tokens,
-                            "completion_tokens": usage_obj.completion_tokens,
-                            "total_tokens": usage_obj.total_tokens
-                        }
-                        logger.info(f"✓ 토큰 사용량 추출 성공: prompt={token_usage['prompt_tokens']}, completion={token_usage['completion_tokens']}, total={token_usage['total_tokens']}")
-                    else:
-                        logger.warning(f"⚠️ usage 객체에 필요한 속성이 없습니다. usage_obj={usage_obj}, dir={dir(usage_obj)}")
-                else:
-                    logger.warning(f"⚠️ response.usage가 None입니다.")
-            else:
-                logger.warning(f"⚠️ response에 usage 속성이 없습니다. response 타입={type(response)}, dir={[x for x in dir(response) if not x.startswith('_')]}")
-        except Exception as e:
-            logger.error(f"❌ 토큰 사용량 추출 중 오류: {e}", exc_info=True)
-            import traceback
-            logger.error(f"트레이스백: {traceback.format_exc()}")
-        
-        # GPT API 원본 응답 (JSONB 형식으로 저장 가능하도록 dict로 변환)
-        gpt_response_raw = None
-        try:
-            # OpenAI 응답 객체를 dict로 변환
-            gpt_response_raw = {
-                "id": response.id,
-                "object": response.object,
-                "created": response.created,
-                "model": response.model,
-                "choices": [
-                    {
-                        "index": choice.index,
-                        "message": {
-                            "role": choice.message.role,
-                            "content": choice.message.content
-                        },
-                        "finish_reason": choice.finish_reason
-                    }
-                    for choice in response.choices
-                ],
-                "usage": token_usage
-            }
-        except Exception as e:
-            logger.warning(f"GPT 응답 원본 저장 중 오류: {e}")
-        
-        logger.info(f"✓ 영어 → 한글 변환 완료 (latency: {latency_ms:.2f}ms)")
-        logger.debug(f"변환된 글 길이: {len(ad_copy_kor)}자")
-        
-        return {
-            "ad_copy_kor": ad_copy_kor,
-            "prompt_used": prompt_used,
-            "latency_ms": latency_ms,
-            "token_usage": token_usage,
-            "gpt_response_raw": gpt_response_raw
+
+TRANSLATE_TEMPLATE_VERSION = _template_version("eng_to_kor", _build_translate_request)
+
+
+def _finish_translate(response: Any, stats: Dict[str, Any], system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+    """번역 응답 파싱 및 결과 구성"""
+    ad_copy_kor = response.choices[0].message.content.strip()
+    token_usage = stats["token_usage"]
+    if token_usage is None:
+        logger.warning("⚠️ GPT 응답에 토큰 사용량(usage)이 없습니다.")
+    latency_ms = stats["latency_ms"]
+    logger.info(f"✓ 영어 → 한글 변환 완료 (latency: {latency_ms:.2f}ms, attempts: {stats['attempts']})")
+    logger.debug(f"변환된 글 길이: {len(ad_copy_kor)}자")
+    
+    return {
+        "ad_copy_kor": ad_copy_kor,
+        "prompt_used": f"System: {system_prompt}\n\nUser: {user_prompt}",  # 디버깅용
+        "latency_ms": latency_ms,
+        "token_usage": token_usage,
+        "gpt_response_raw": response_to_dict(response, token_usage),
+        "call_stats": _call_stats(stats)
+    }
+
+
+async def translate_eng_to_kor_async(ad_copy_eng: str) -> Dict[str, Any]:
+    """
+    GPT를 사용하여 영어 광고문구를 한글로 변환 (async, 호출한 이벤트 루프를 막지 않음)
+    
+    Args:
+        ad_copy_eng: 영어 광고문구
+    
+    Returns:
+        Dict[str, Any]: {
+            "ad_copy_kor": 한글 광고문구,
+            "prompt_used": 사용된 프롬프트,
+            "latency_ms": API 호출 소요 시간 (밀리초, 재시도 포함),
+            "token_usage": 토큰 사용량 정보,
+            "gpt_response_raw": GPT API 원본 응답 (JSONB 형식),
+            "call_stats": {"queue_wait_ms", "attempts", "retry_reasons"} (캐시 사용 시 None),
+            "cache_hit": 응답 캐시 사용 여부 (True면 token_usage는 None, 원래 사용량은 cached_token_usage)
         }
-        
+    """
+    system_prompt, user_prompt, params = _build_translate_request(ad_copy_eng)
+    lookup_start = time.perf_counter()
+    key = _cache_key("eng_to_kor", TRANSLATE_TEMPLATE_VERSION, {"ad_copy_eng": ad_copy_eng}, params)
+    if key is not None:
+        cached = await asyncio.to_thread(gpt_response_cache.get, "eng_to_kor", key)
+        if cached is not None:
+            logger.info("✓ 영어 → 한글 변환 캐시 사용 (GPT 호출 생략)")
+            return _cached_result(cached, lookup_start)
+    try:
+        response, stats = await get_backend("gpt").achat("eng_to_kor", _messages(system_prompt, user_prompt), **params)
+        result = _finish_translate(response, stats, system_prompt, user_prompt)
     except Exception as e:
         logger.error(f"❌ GPT API 호출 중 오류: {e}")
         raise
+    await asyncio.to_thread(_store_result, "eng_to_kor", key, TRANSLATE_TEMPLATE_VERSION, params, result)
+    return result
 
+
+def translate_eng_to_kor(ad_copy_eng: str) -> Dict[str, Any]:
+    """GPT를 사용하여 영어 광고문구를 한글로 변환 (동기, 반환값은 translate_eng_to_kor_async와 동일)"""
+    system_prompt, user_prompt, params = _build_translate_request(ad_copy_eng)
+    lookup_start = time.perf_counter()
+    key = _cache_key("eng_to_kor", TRANSLATE_TEMPLATE_VERSION, {"ad_copy_eng": ad_copy_eng}, params)
+    if key is not None:
+        cached = gpt_response_cache.get("eng_to_kor", key)
+        if cached is not None:
+            logger.info("✓ 영어 → 한글 변환 캐시 사용 (GPT 호출 생략)")
+            return _cached_result(cached, lookup_start)
+    try:
+        response, stats = get_backend("gpt").chat("eng_to_kor", _messages(system_prompt, user_prompt), **params)
+        result = _finish_translate(response, stats, system_prompt, user_prompt)
+    except Exception as e:
+        logger.error(f"❌ GPT API 호출 중 오류: {e}")
+        raise
+    _store_result("eng_to_kor", key, TRANSLATE_TEMPLATE_VERSION, params, result)
+    return result
@@ -0,0 +1,403 @@
+"""추론 백엔드 서비스"""
+########################################################
+# 모델 계열(LLaVA / YOLO / OCR / GPT)별 추론 백엔드 인터페이스와 설정 기반 선택
+#
+# 기능:
+# - 계열별 인터페이스 (LlavaBackend / YoloBackend / OcrBackend / GptBackend)
+#   서비스 코드(process_image_with_llava, detect_forbidden_areas, extract_text_from_image, gpt_service)는
+#   get_backend(계열)로 받은 백엔드만 호출 (모델 로딩 방식 / 실행 위치를 몰라도 됨)
+# - 백엔드 종류: local (이 프로세스에서 torch 추론), onnx (YOLO), remote (추론 워커 HTTP 호출),
+#   stub (고정 응답, services/stub_models.py), openai (GPT)
+#   *_BACKEND 설정으로 선택, 구현은 각 서비스 모듈이 register_backend()로 등록
+# - 백엔드별 처리 능력 선언 (BackendCapabilities: 최대 배치 크기, 최대 동시 추론 수, 원격 여부)
+#   slot()이 max_concurrency를 적용 (초과 요청은 대기, 대기 시간 / 실행 중 수 메트릭)
+# - remote 백엔드: 이미지를 base64 PNG로 추론 워커(routers/inference_worker.py)에 전달,
+#   워커 측 텔레메트리를 받아 호출 측 텔레메트리에 반영 (total_ms는 네트워크 포함 왕복 시간)
+#
+# 예: API 노드는 CPU만 (LLAVA_BACKEND=remote, INFERENCE_WORKER_URL=http://gpu-worker:8011),
+#     GPU 노드는 APP_ROLES=inference_worker, MODEL_PRELOAD=llava로 실행
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Pluggable inference backend interface (local / onnx / remote / stub) per model family
+# version: 1.0.0
+# status: development
+# tags: inference, backend, model
+# dependencies: httpx, pillow, prometheus_client
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import io
+import time
+import base64
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+import logging
+import httpx
+from PIL import Image
+from prometheus_client import Counter, Gauge, Histogram
+from services.inference_telemetry import InferenceTelemetry
+from services.stage_metrics import track_inference
+from services.tracing import inject_headers
+from config import (
+    LLAVA_BACKEND, YOLO_BACKEND, OCR_BACKEND, GPT_BACKEND,
+    INFERENCE_WORKER_URL, INFERENCE_WORKER_TIMEOUT_SECONDS, INFERENCE_MAX_CONCURRENCY
+)
+
+logger = logging.getLogger(__name__)
+
+# 계열별 설정된 백엔드 종류
+BACKEND_CONFIG = {
+    "llava": LLAVA_BACKEND,
+    "yolo": YOLO_BACKEND,
+    "ocr": OCR_BACKEND,
+    "gpt": GPT_BACKEND,
+}
+
+# 계열 → 구현을 등록하는 서비스 모듈 (get_backend 시 import)
+BACKEND_MODULES = {
+    "llava": "services.llava_service",
+    "yolo": "services.yolo_service",
+    "ocr": "services.ocr_service",
+    "gpt": "services.gpt_service",
+}
+
+# 메트릭 정의
+inference_backend_queue_wait_seconds = Histogram(
+    'inference_backend_queue_wait_seconds',
+    'Time spent waiting for an inference backend concurrency slot',
+    ['family', 'backend'],
+    buckets=(0.001, 0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60)
+)
+inference_backend_in_flight = Gauge(
+    'inference_backend_in_flight',
+    'Inference calls currently holding a backend slot',
+    ['family', 'backend']
+)
+inference_worker_requests_total = Counter(
+    'inference_worker_requests_total',
+    'Remote inference worker calls by outcome',
+    ['family', 'outcome']
+)
+
+
+class BackendCapabilities(NamedTuple):
+    """백엔드 처리 능력 (스케줄러 / 호출 측이 배치 크기와 동시 호출 수를 정할 때 사용)"""
+    max_batch_size: int  # 호출 1회에 넣을 수 있는 최대 입력 수
+    max_concurrency: int  # 동시 추론 수 상한 (0이면 제한 없음)
+    remote: bool  # 다른 프로세스 / 서버에서 실행 (이 프로세스 메모리를 쓰지 않음)
+
+
+class InferenceBackend:
+    """추론 백엔드 공통 (처리 능력 선언, 동시 추론 수 제한)"""
+
+    family = ""
+    kind = ""
+
+    def __init__(self, max_batch_size: int = 1, max_concurrency: int = 0, remote: bool = False):
+        # INFERENCE_MAX_CONCURRENCY에 지정된 계열은 설정값 우선
+        max_concurrency = INFERENCE_MAX_CONCURRENCY.get(self.family, max_concurrency)
+        self.capabilities = BackendCapabilities(max_batch_size, max_concurrency, remote)
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """추론 구간 (max_concurrency 초과 시 슬롯이 날 때까지 대기)"""
+        queued_at = time.perf_counter()
+        if self._slots is not None:
+            self._slots.acquire()
+        inference_backend_queue_wait_seconds.labels(family=self.family, backend=self.kind).observe(
+            time.perf_counter() - queued_at
+        )
+        inference_backend_in_flight.labels(family=self.family, backend=self.kind).inc()
+        try:
+            yield
+        finally:
+            inference_backend_in_flight.labels(family=self.family, backend=self.kind).dec()
+            if self._slots is not None:
+                self._slots.release()
+
+    def describe(self) -> Dict[str, Any]:
+        """백엔드 종류와 처리 능력 (/healthz, /inference/backends)"""
+        return {"backend": self.kind, **self.capabilities._asdict()}
+
+    def close(self):
+        """백엔드 자원 정리 (앱 종료 시 호출)"""
+
+
+class LlavaBackend(InferenceBackend):
+    """LLaVA 백엔드 인터페이스"""
+
+    family = "llava"
+
+    def generate(
+        self,
+        image: Image.Image,
+        prompt: str,
+        max_new_tokens: int,
+        temperature: float,
+        do_sample: bool,
+        stop_detector=None,
+        telemetry: Optional[InferenceTelemetry] = None
+    ) -> str:
+        """
+        이미지 + 프롬프트 → 응답 텍스트
+
+        stop_detector가 있으면 파서가 완료되는 즉시 생성을 중단하고, 반환 전에 stop_detector.result를 채운다.
+        telemetry에는 구간별 시간 / 토큰 수를 기록한다 (메트릭 기록은 호출 측).
+        """
+        raise NotImplementedError
+
+
+class YoloBackend(InferenceBackend):
+    """YOLO 백엔드 인터페이스"""
+
+    family = "yolo"
+
+    def register(self, model_name: str) -> Optional[str]:
+        """모델을 모델 레지스트리에 등록하고 키 반환 (이 프로세스에서 로드하지 않는 백엔드는 None)"""
+        return None
+
+    def detect(
+        self,
+        images: List[Image.Image],
+        model_name: str,
+        conf: float,
+        iou: float,
+        classes: Optional[List[int]] = None,
+        telemetry: Optional[InferenceTelemetry] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        이미지 배치 감지 (len(images) <= capabilities.max_batch_size)
+
+        Returns:
+            이미지별 [{"boxes": [[x1, y1, x2, y2], ...], "confidences": [...], "classes": [...], "names": {id: 라벨}}]
+        """
+        raise NotImplementedError
+
+
+class OcrBackend(InferenceBackend):
+    """OCR 백엔드 인터페이스"""
+
+    family = "ocr"
+
+    def readtext(self, image_array: Any) -> List[Tuple[Any, str, float]]:
+        """이미지 배열 → [(bbox [[x, y] x 4], 텍스트, 신뢰도), ...] (EasyOCR readtext 형식)"""
+        raise NotImplementedError
+
+
+class GptBackend(InferenceBackend):
+    """GPT 백엔드 인터페이스 (동시 호출 수는 백엔드 내부에서 제한)"""
+
+    family = "gpt"
+
+    def chat(self, operation: str, messages: List[Dict[str, str]], **params) -> Tuple[Any, Dict[str, Any]]:
+        """
+        chat.completions 호출 (동기)
+
+        Returns:
+            (OpenAI 응답 형식 객체, {"latency_ms", "queue_wait_ms", "attempts", "retry_reasons", "token_usage"})
+        """
+        raise NotImplementedError
+
+    async def achat(self, operation: str, messages: List[Dict[str, str]], **params) -> Tuple[Any, Dict[str, Any]]:
+        """chat.completions 호출 (async, 반환값은 chat과 동일)"""
+        raise NotImplementedError
+
+
+# ==============================
+# 백엔드 등록 / 선택
+# ==============================
+
+_factories: Dict[str, Dict[str, Callable[[], InferenceBackend]]] = {}
+_backends: Dict[str, InferenceBackend] = {}
+_lock = threading.Lock()
+
+
+def register_backend(family: str, kind: str, factory: Callable[[], InferenceBackend]):
+    """백엔드 구현 등록 (서비스 모듈 import 시 호출, 생성은 선택될 때 1회)"""
+    _factories.setdefault(family, {})[kind] = factory
+
+
+def get_backend(family: str) -> InferenceBackend:
+    """
+    설정(*_BACKEND)으로 선택된 백엔드 반환 (프로세스당 1개)
+
+    Raises:
+        ValueError: 해당 계열에 없는 백엔드 종류
+    """
+    backend = _backends.get(family)
+    if backend is not None:
+        return backend
+    if family not in _factories:
+        import importlib
+        importlib.import_module(BACKEND_MODULES[family])
+    with _lock:
+        backend = _backends.get(family)
+        if backend is None:
+            kind = BACKEND_CONFIG[family]
+            factory = _factories.get(family, {}).get(kind)
+            if factory is None:
+                raise ValueError(
+                    f"알 수 없는 {family.upper()}_BACKEND 값: {kind} "
+                    f"(사용 가능: {', '.join(_factories.get(family, {}))})"
+                )
+            backend = factory()
+            _backends[family] = backend
+            logger.info(f"[InferenceBackend] {family} 백엔드: {backend.describe()}")
+    return backend
+
+
+def backend_status() -> Dict[str, Dict[str, Any]]:
+    """생성된 백엔드의 종류와 처리 능력"""
+    return {family: backend.describe() for family, backend in list(_backends.items())}
+
+
+def close_backends():
+    """생성된 백엔드와 추론 워커 커넥션 풀 정리 (앱 종료 시 호출)"""
+    for family, backend in list(_backends.items()):
+        try:
+            backend.close()
+        except Exception as e:
+            logger.warning(f"[InferenceBackend] {family} 백엔드 종료 실패: {e}")
+    worker_client.close()
+
+
+# ==============================
+# remote 백엔드 (추론 워커 HTTP 호출)
+# ==============================
+
+def encode_image(image: Image.Image) -> str:
+    """PIL Image → base64 PNG (무손실, 로컬 추론과 같은 입력)"""
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def decode_image(data: str) -> Image.Image:
+    """base64 이미지 → PIL Image"""
+    image = Image.open(io.BytesIO(base64.b64decode(data)))
+    image.load()
+    return image
+
+
+def apply_telemetry(telemetry: Optional[InferenceTelemetry], data: Optional[Dict[str, Any]]):
+    """워커가 측정한 구간별 시간 / 토큰 수를 호출 측 텔레메트리에 반영 (total_ms는 호출 측 왕복 시간 유지)"""
+    if telemetry is None or not data:
+        return
+    for key in ("preprocess_ms", "vision_encode_ms", "prefill_ms", "decode_ms", "postprocess_ms",
+                "tokens_generated", "peak_memory_mb", "batch_size", "cache_hits"):
+        if data.get(key) is not None:
+            setattr(telemetry, key, data[key])
+
+
+class InferenceWorkerClient:
+    """추론 워커 HTTP 클라이언트 (remote 백엔드 공용 커넥션 풀)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+
+    def _get_client(self) -> httpx.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    if not INFERENCE_WORKER_URL:
+                        raise ValueError("INFERENCE_WORKER_URL이 설정되지 않았습니다 (remote 추론 백엔드에 필요)")
+                    self._client = httpx.Client(
+                        base_url=INFERENCE_WORKER_URL,
+                        timeout=httpx.Timeout(INFERENCE_WORKER_TIMEOUT_SECONDS, connect=10.0),
+                        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32)
+                    )
+        return self._client
+
+    def post(self, family: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST /inference/{family} (trace context 전파, 실패 시 httpx 예외)"""
+        try:
+            response = self._get_client().post(f"/inference/{family}", json=payload, headers=inject_headers())
+            response.raise_for_status()
+        except Exception:
+            inference_worker_requests_total.labels(family=family, outcome="error").inc()
+            raise
+        inference_worker_requests_total.labels(family=family, outcome="ok").inc()
+        return response.json()
+
+    def close(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+
+# 프로세스 전역 워커 클라이언트
+worker_client = InferenceWorkerClient()
+
+
+class RemoteLlavaBackend(LlavaBackend):
+    """LLaVA remote 백엔드 (생성 중단 조건은 파서 설정으로 전달해 워커에서 적용)"""
+
+    kind = "remote"
+
+    def __init__(self):
+        super().__init__(max_batch_size=1, max_concurrency=4, remote=True)
+
+    def generate(self, image, prompt, max_new_tokens, temperature, do_sample, stop_detector=None, telemetry=None) -> str:
+        started = time.perf_counter()
+        with track_inference("llava"):
+            data = worker_client.post("llava", {
+                "image": encode_image(image),
+                "prompt": prompt,
+                "max_new_tokens": max_new_tokens,
+                "temperature": temperature,
+                "do_sample": do_sample,
+                "stop": stop_detector.to_spec() if stop_detector is not None else None,
+            })
+        response = data["response"]
+        if stop_detector is not None:
+            stop_detector.feed(response)
+        apply_telemetry(telemetry, data.get("telemetry"))
+        if telemetry is not None:
+            telemetry.total_ms = (time.perf_counter() - started) * 1000
+        return response
+
+
+class RemoteYoloBackend(YoloBackend):
+    """YOLO remote 백엔드"""
+
+    kind = "remote"
+
+    def __init__(self):
+        super().__init__(max_batch_size=8, max_concurrency=8, remote=True)
+
+    def detect(self, images, model_name, conf, iou, classes=None, telemetry=None) -> List[Dict[str, Any]]:
+        with track_inference("yolo"):
+            data = worker_client.post("yolo", {
+                "images": [encode_image(image) for image in images],
+                "model_name": model_name,
+                "conf": conf,
+                "iou": iou,
+                "classes": classes,
+            })
+        apply_telemetry(telemetry, data.get("telemetry"))
+        # JSON 객체 키는 문자열이므로 클래스 ID를 다시 정수로
+        return [
+            {**result, "names": {int(cls_id): label for cls_id, label in result["names"].items()}}
+            for result in data["results"]
+        ]
+
+
+class RemoteOcrBackend(OcrBackend):
+    """OCR remote 백엔드"""
+
+    kind = "remote"
+
+    def __init__(self):
+        super().__init__(max_batch_size=1, max_concurrency=4, remote=True)
+
+    def readtext(self, image_array: Any) -> List[Tuple[Any, str, float]]:
+        with track_inference("ocr"):
+            data = worker_client.post("ocr", {"image": encode_image(Image.fromarray(image_array))})
+        return [(bbox, text, confidence) for bbox, text, confidence in data["results"]]
@@ -0,0 +1,212 @@
+"""모델 추론 텔레메트리"""
+########################################################
+# 모델 추론 1회(generate / predict)의 구간별 시간과 자원 사용량 기록
+#
+# 기능:
+# - 구간: preprocess(입력 변환) / vision_encode(비전 인코더) / prefill(프롬프트 forward, 첫 토큰까지)
+#   / decode(나머지 토큰 생성) / postprocess(결과 후처리, YOLO)
+# - 생성 토큰 수, decode 토큰/초, 최대 메모리, 배치 크기, 모델 상주 캐시 hit
+# - Prometheus 메트릭으로 내보내고, 현재 tracing span(inference.*)에 속성으로 기록
+# - collect_telemetry()로 한 요청에서 발생한 추론 기록을 모아 vlm_traces / yolo_runs JSONB에 저장
+#
+# 최대 메모리:
+# - CUDA: 추론 구간 torch.cuda.max_memory_allocated (디바이스 전역 통계라 동시 추론 시 서로 포함될 수 있음)
+# - CPU: 프로세스 최대 RSS (ru_maxrss, 프로세스 시작 이후 최댓값)
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Per-inference phase timings, token throughput and memory telemetry
+# version: 1.0.0
+# status: development
+# tags: metrics, inference, llava, yolo
+# dependencies: prometheus_client
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import sys
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+import logging
+from prometheus_client import Counter, Gauge, Histogram
+from services.tracing import current_span
+
+logger = logging.getLogger(__name__)
+
+PHASES = ('preprocess', 'vision_encode', 'prefill', 'decode', 'postprocess')
+
+inference_phase_seconds = Histogram(
+    'inference_phase_seconds',
+    'Model inference time by phase (preprocess, vision_encode, prefill, decode, postprocess)',
+    ['model', 'phase'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+inference_tokens_generated_total = Counter(
+    'inference_tokens_generated_total',
+    'Tokens generated by model inference',
+    ['model']
+)
+inference_decode_tokens_per_second = Histogram(
+    'inference_decode_tokens_per_second',
+    'Decode throughput per generation (tokens after the first / decode time)',
+    ['model'],
+    buckets=(1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200)
+)
+inference_batch_size = Histogram(
+    'inference_batch_size',
+    'Inference batch size',
+    ['model'],
+    buckets=(1, 2, 4, 8, 16, 32)
+)
+inference_peak_memory_bytes = Gauge(
+    'inference_peak_memory_bytes',
+    'Peak memory of the last inference (CUDA allocated or process max RSS)',
+    ['model']
+)
+inference_model_cache_total = Counter(
+    'inference_model_cache_total',
+    'Inference calls by whether the model was already resident',
+    ['model', 'result']  # hit | miss
+)
+
+# 요청 단위 수집기 (collect_telemetry 구간, 핸들러 스레드로 전파)
+_collector: contextvars.ContextVar[Optional[List["InferenceTelemetry"]]] = contextvars.ContextVar(
+    'inference_telemetry_collector', default=None
+)
+
+
+class InferenceTelemetry:
+    """모델 추론 1회 기록 (측정하지 않은 구간은 None)"""
+
+    def __init__(self, model: str, batch_size: int = 1, cache_hit: bool = False):
+        self.model = model
+        self.batch_size = batch_size
+        self.cache_hits = 1 if cache_hit else 0
+        self.preprocess_ms: Optional[float] = None
+        self.vision_encode_ms: Optional[float] = None
+        self.prefill_ms: Optional[float] = None
+        self.decode_ms: Optional[float] = None
+        self.postprocess_ms: Optional[float] = None
+        self.total_ms: Optional[float] = None
+        self.tokens_generated: Optional[int] = None
+        self.peak_memory_mb: Optional[float] = None
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """decode 처리량 (첫 토큰은 prefill에서 생성되므로 제외)"""
+        if not self.tokens_generated or self.tokens_generated < 2 or not self.decode_ms:
+            return None
+        return (self.tokens_generated - 1) / (self.decode_ms / 1000)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'model': self.model,
+            'preprocess_ms': self.preprocess_ms,
+            'vision_encode_ms': self.vision_encode_ms,
+            'prefill_ms': self.prefill_ms,
+            'decode_ms': self.decode_ms,
+            'postprocess_ms': self.postprocess_ms,
+            'total_ms': self.total_ms,
+            'tokens_generated': self.tokens_generated,
+            'tokens_per_second': self.tokens_per_second,
+            'peak_memory_mb': self.peak_memory_mb,
+            'batch_size': self.batch_size,
+            'cache_hits': self.cache_hits,
+        }
+
+
+def reset_peak_memory(device: str):
+    """추론 시작 전 CUDA 최대 메모리 통계 초기화 (CPU는 프로세스 최댓값이라 초기화 없음)"""
+    torch = sys.modules.get("torch")
+    if device == "cuda" and torch is not None:
+        try:
+            torch.cuda.reset_peak_memory_stats()
+        except Exception:
+            pass
+
+
+def peak_memory_mb(device: str) -> Optional[float]:
+    """추론 구간 최대 메모리 (MB)"""
+    torch = sys.modules.get("torch")
+    try:
+        if device == "cuda" and torch is not None:
+            return torch.cuda.max_memory_allocated() / 1024**2
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KB
+    except Exception:
+        return None
+
+
+def record(telemetry: InferenceTelemetry):
+    """추론 1회 기록 (메트릭 + 현재 span 속성 + 요청 수집기)"""
+    model = telemetry.model
+    for phase in PHASES:
+        value = getattr(telemetry, f"{phase}_ms")
+        if value is not None:
+            inference_phase_seconds.labels(model=model, phase=phase).observe(value / 1000)
+    if telemetry.tokens_generated:
+        inference_tokens_generated_total.labels(model=model).inc(telemetry.tokens_generated)
+    if telemetry.tokens_per_second is not None:
+        inference_decode_tokens_per_second.labels(model=model).observe(telemetry.tokens_per_second)
+    inference_batch_size.labels(model=model).observe(telemetry.batch_size)
+    if telemetry.peak_memory_mb is not None:
+        inference_peak_memory_bytes.labels(model=model).set(telemetry.peak_memory_mb * 1024**2)
+    inference_model_cache_total.labels(model=model, result='hit' if telemetry.cache_hits else 'miss').inc()
+
+    span = current_span()
+    if span is not None:
+        for key, value in telemetry.to_dict().items():
+            span.set_attribute(f"inference.{key}", value)
+
+    records = _collector.get()
+    if records is not None:
+        records.append(telemetry)
+
+
+@contextmanager
+def collect_telemetry() -> Iterator[List[InferenceTelemetry]]:
+    """
+    구간 안에서 기록된 추론 텔레메트리 수집
+
+    사용 예:
+        with collect_telemetry() as telemetry:
+            result = validate_image_and_text(...)
+        response_data = {**result, "telemetry": summarize_telemetry(telemetry)}
+    """
+    records: List[InferenceTelemetry] = []
+    token = _collector.set(records)
+    try:
+        yield records
+    finally:
+        _collector.reset(token)
+
+
+def summarize_telemetry(records: List[InferenceTelemetry]) -> Dict[str, Any]:
+    """추론 기록 목록 → JSONB 저장용 dict (생성별 기록 + 합계)"""
+    def _sum(key: str) -> Optional[float]:
+        values = [getattr(t, key) for t in records if getattr(t, key) is not None]
+        return sum(values) if values else None
+
+    tokens = _sum('tokens_generated')
+    decode_ms = _sum('decode_ms')
+    decode_tokens = sum(t.tokens_generated - 1 for t in records if t.decode_ms and (t.tokens_generated or 0) > 1)
+    peaks = [t.peak_memory_mb for t in records if t.peak_memory_mb is not None]
+    return {
+        'generations': [t.to_dict() for t in records],
+        'total': {
+            'generation_count': len(records),
+            'preprocess_ms': _sum('preprocess_ms'),
+            'vision_encode_ms': _sum('vision_encode_ms'),
+            'prefill_ms': _sum('prefill_ms'),
+            'decode_ms': decode_ms,
+            'postprocess_ms': _sum('postprocess_ms'),
+            'total_ms': _sum('total_ms'),
+            'tokens_generated': tokens,
+            'tokens_per_second': decode_tokens / (decode_ms / 1000) if decode_ms and decode_tokens else None,
+            'peak_memory_mb': max(peaks) if peaks else None,
+            'batch_size': max((t.batch_size for t in records), default=None),
+            'cache_hits': sum(t.cache_hits for t in records),
+        }
+    }
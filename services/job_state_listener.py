@@ -3,11 +3,11 @@ PostgreSQL LISTEN/NOTIFY를 사용한 Job 상태 변화 리스너
 """
 ########################################################
 # created_at: 2025-11-28
-# updated_at: 2025-12-04
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: PostgreSQL LISTEN/NOTIFY를 사용한 Job 상태 변화 리스너
-# version: 2.3.2
-# changes: iou_eval 단계 수동 복구 로직 추가 (주기적 체크)
+# version: 2.10.1
+# changes: NOTIFY payload의 traceparent로 이벤트 처리 span 시작 (단계 핸들러 → 리스너 → 다음 단계 trace 연결)
 # status: development
 # tags: database, listener, notify
 # dependencies: asyncpg, fastapi
@@ -19,12 +19,46 @@ import asyncio
 import json
 import logging
 import uuid
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
 import asyncpg
-from config import DATABASE_URL, JOB_STATE_LISTENER_RECONNECT_DELAY
+from prometheus_client import Counter
+from config import (
+    LISTENER_LEADER_ELECTION, LISTENER_LEADER_RETRY_SECONDS,
+    DATABASE_URL, JOB_STATE_LISTENER_RECONNECT_DELAY, LISTENER_COALESCE_WINDOW_MS, JOB_STATE_MIRROR_RECONCILE_SECONDS,
+    LISTENER_PROBE_INTERVAL_SECONDS, LISTENER_PROBE_TIMEOUT_SECONDS, LISTENER_CATCHUP_SKEW_SECONDS,
+    RECOVERY_SCAN_INTERVAL_SECONDS
+)
+from services.job_state_mirror import job_state_mirror, parse_timestamp
+from services.retry_scheduler import retry_scheduler, backoff_delay, worst_failure_class
+from services.recovery_scan import RecoveryScanner
+from services.tracing import start_span, parse_traceparent
 
 logger = logging.getLogger(__name__)
 
+# variant 이벤트 처리 결과
+# - processed: 트리거 처리
+# - coalesced: 처리 대기 중인 이벤트를 더 최신 이벤트로 대체
+# - absorbed: 방금 처리한 상태와 같은 (current_step, status) 이벤트라 처리 생략
+listener_variant_events_total = Counter(
+    'listener_variant_events_total',
+    'job_variant_state_changed notifications by handling result',
+    ['result']
+)
+listener_reconnects_total = Counter(
+    'listener_reconnects_total',
+    'Job state listener reconnects by cause',
+    ['cause']  # terminated | probe_failed
+)
+listener_catchup_events_total = Counter(
+    'listener_catchup_events_total',
+    'State transitions replayed after a listener reconnect',
+    ['channel']
+)
+
+# 첫 재연결 대기 (초), 실패가 이어지면 JOB_STATE_LISTENER_RECONNECT_DELAY까지 2배씩 증가
+RECONNECT_MIN_DELAY = 0.2
+
 # 최대 재시도 횟수 (Job 단위)
 MAX_JOB_RETRY_COUNT = 20
 
@@ -36,18 +70,37 @@ class JobStateListener:
         self.running = False
         self.reconnect_delay = JOB_STATE_LISTENER_RECONNECT_DELAY
         self.pending_tasks: set = set()  # 실행 중인 태스크 추적
-        self.recovery_check_interval = 60  # 수동 복구 체크 간격 (초, 기본 1분)
+        self.recovery_check_interval = RECOVERY_SCAN_INTERVAL_SECONDS  # 복구 스캔 간격 (초)
         self.recovery_task: Optional[asyncio.Task] = None  # 수동 복구 백그라운드 태스크
+        self.recovery_scanner = RecoveryScanner()  # 마지막 스캔 이후 변경분만 조사
+        self.mirror_reconcile_task: Optional[asyncio.Task] = None  # 상태 미러 DB 대조 백그라운드 태스크
+        # 연결 생존 확인 / 누락 이벤트 보정
+        self.reconnect_attempts = 0  # 연속 연결 실패 횟수 (재연결 대기 시간 계산)
+        self.watermark: Optional[float] = None  # 마지막으로 확인한 DB updated_at / 서버 시각 (epoch 초)
+        self._conn_lost: Optional[asyncio.Event] = None  # termination listener가 설정
+        # job_variants_id별 이벤트 병합
+        self.coalesce_window = LISTENER_COALESCE_WINDOW_MS / 1000.0
+        self.variant_pending: Dict[str, dict] = {}  # job_variants_id → 처리 대기 중인 최신 이벤트
+        self.variant_workers: Dict[str, asyncio.Task] = {}  # job_variants_id → 이벤트 처리 태스크 (variant당 1개)
     
     async def start(self):
         """리스너 시작"""
         self.running = True
         # 수동 복구 백그라운드 태스크 시작
         self.recovery_task = asyncio.create_task(self._periodic_recovery_check())
+        # 상태 미러 주기적 DB 대조 태스크 시작
+        self.mirror_reconcile_task = asyncio.create_task(self._periodic_mirror_reconcile())
+        # 재시도 스케줄러 시작 (예약된 재시도도 종료 시 완료 대기 대상으로 추적)
+        retry_scheduler.start(spawn=self._spawn_tracked)
         await self._listen_loop()
     
-    async def stop(self):
-        """리스너 중지 (실행 중인 태스크 완료 대기)"""
+    async def stop(self, wait_for_tasks: bool = True):
+        """
+        리스너 중지 (실행 중인 태스크 완료 대기)
+        
+        Args:
+            wait_for_tasks: False면 실행 중인 트리거(단계 API 호출)를 기다리지 않고 LISTEN만 즉시 중지 (리더 역할 상실 시)
+        """
         self.running = False
         
         # 수동 복구 태스크 중지
@@ -58,8 +111,19 @@ class JobStateListener:
             except asyncio.CancelledError:
                 logger.info("수동 복구 태스크 중지됨")
         
+        # 재시도 스케줄러 중지 (대기 중인 예약은 재시작 후 복구 로직이 다시 예약)
+        await retry_scheduler.stop()
+        
+        # 상태 미러 대조 태스크 중지
+        if self.mirror_reconcile_task and not self.mirror_reconcile_task.done():
+            self.mirror_reconcile_task.cancel()
+            try:
+                await self.mirror_reconcile_task
+            except asyncio.CancelledError:
+                pass
+        
         # 실행 중인 태스크 완료 대기
-        if self.pending_tasks:
+        if self.pending_tasks and wait_for_tasks:
             logger.info(f"실행 중인 {len(self.pending_tasks)}개 태스크 완료 대기 중...")
             # 최대 5분 대기 (LLaVA 로딩 및 긴 파이프라인 단계 고려)
             try:
@@ -75,10 +139,18 @@ class JobStateListener:
                 # (실제 파이프라인 실행은 10분 타임아웃이 있으므로 자동으로 종료됨)
         
         if self.conn:
+            job_state_mirror.deactivate()
             await self.conn.close()
             self.conn = None
             logger.info("Job State Listener 중지됨")
     
+    def _spawn_tracked(self, coro) -> asyncio.Task:
+        """백그라운드 태스크 실행 (종료 시 완료 대기하도록 추적)"""
+        task = asyncio.create_task(coro)
+        self.pending_tasks.add(task)
+        task.add_done_callback(self.pending_tasks.discard)
+        return task
+    
     async def _listen_loop(self):
         """리스너 메인 루프 (재연결 포함)"""
         while self.running:
@@ -90,8 +162,11 @@ class JobStateListener:
             except Exception as e:
                 logger.error(f"리스너 오류 발생: {e}", exc_info=True)
                 if self.running:
-                    logger.info(f"{self.reconnect_delay}초 후 재연결 시도...")
-                    await asyncio.sleep(self.reconnect_delay)
+                    # 일시적 끊김은 바로 재연결, 연속 실패 시 JOB_STATE_LISTENER_RECONNECT_DELAY까지 증가
+                    delay = min(self.reconnect_delay, RECONNECT_MIN_DELAY * (2 ** self.reconnect_attempts))
+                    self.reconnect_attempts += 1
+                    logger.info(f"{delay:.1f}초 후 재연결 시도...")
+                    await asyncio.sleep(delay)
     
     async def _connect_and_listen(self):
         """PostgreSQL 연결 및 LISTEN 시작"""
@@ -103,15 +178,28 @@ class JobStateListener:
             self.conn = await asyncpg.connect(asyncpg_url)
             logger.info("PostgreSQL 연결 성공 (Job State Listener)")
             
+            # 서버 종료 / 네트워크 끊김 감지 (asyncpg가 연결 종료 시 호출)
+            self._conn_lost = asyncio.Event()
+            self.conn.add_termination_listener(lambda conn: self._conn_lost.set())
+            
             # LISTEN 시작 (jobs 테이블과 jobs_variants 테이블 모두)
             await self.conn.add_listener('job_state_changed', self._handle_notification)
             await self.conn.add_listener('job_variant_state_changed', self._handle_variant_notification)
             logger.info("LISTEN 'job_state_changed' 시작")
             logger.info("LISTEN 'job_variant_state_changed' 시작")
             
-            # 연결이 끊길 때까지 대기
-            while self.running:
-                await asyncio.sleep(1)
+            # LISTEN 이후 DB 스냅샷으로 상태 미러 동기화 (연결 전/끊긴 동안의 이벤트 보정)
+            await job_state_mirror.reconcile(self.conn)
+            job_state_mirror.active = True
+            logger.info("상태 미러 동기화 완료")
+            
+            # 재연결이면 끊긴 동안 발행된 상태 변화 재생
+            if self.watermark is not None:
+                await self._catch_up_missed_events()
+            self.reconnect_attempts = 0
+            
+            # 연결이 끊길 때까지 대기 (종료 감지 또는 probe 실패 시 예외 → 재연결)
+            await self._watch_connection()
                 
         except asyncio.CancelledError:
             raise
@@ -119,17 +207,93 @@ class JobStateListener:
             logger.error(f"PostgreSQL 연결 오류: {e}", exc_info=True)
             raise
         finally:
+            # 연결이 끊기면 이벤트가 누락될 수 있으므로 재연결 후 동기화 전까지 미러 사용 중지
+            job_state_mirror.deactivate()
             if self.conn:
                 try:
                     await self.conn.remove_listener('job_state_changed', self._handle_notification)
                     await self.conn.remove_listener('job_variant_state_changed', self._handle_variant_notification)
-                    await self.conn.close()
+                    await self.conn.close(timeout=LISTENER_PROBE_TIMEOUT_SECONDS)
                     logger.info("PostgreSQL 연결 종료 (Job State Listener)")
                 except Exception as e:
                     logger.error(f"연결 종료 중 오류: {e}")
+                    self.conn.terminate()
                 finally:
                     self.conn = None
     
+    async def _watch_connection(self):
+        """
+        LISTEN 연결 생존 확인
+        
+        - termination listener: 서버가 연결을 닫으면 즉시 감지
+        - 주기적 probe (SELECT NOW()): 응답 없는 half-open 연결 감지, 응답한 서버 시각으로 watermark 갱신
+          (이벤트가 없는 동안에도 재연결 시 재생 범위가 커지지 않도록)
+        """
+        while self.running:
+            try:
+                await asyncio.wait_for(self._conn_lost.wait(), timeout=LISTENER_PROBE_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                try:
+                    server_now = await asyncio.wait_for(
+                        self.conn.fetchval("SELECT NOW()"), timeout=LISTENER_PROBE_TIMEOUT_SECONDS
+                    )
+                except Exception as e:
+                    listener_reconnects_total.labels(cause='probe_failed').inc()
+                    raise ConnectionError(f"LISTEN 연결 probe 실패: {e!r}") from e
+                self._advance_watermark(server_now)
+                continue
+            listener_reconnects_total.labels(cause='terminated').inc()
+            raise ConnectionError("LISTEN 연결 종료 감지")
+    
+    def _advance_watermark(self, value: Any):
+        """watermark 갱신 (NOTIFY payload의 updated_at 또는 probe 서버 시각)"""
+        timestamp = parse_timestamp(value)
+        if timestamp is not None and (self.watermark is None or timestamp > self.watermark):
+            self.watermark = timestamp
+    
+    async def _catch_up_missed_events(self):
+        """
+        재연결 직후 watermark 이후 변경된 jobs_variants / jobs 행을 NOTIFY와 같은 경로로 재생
+        
+        updated_at은 트랜잭션 시작 시각이라 커밋이 늦은 행은 watermark보다 이전일 수 있으므로
+        LISTENER_CATCHUP_SKEW_SECONDS만큼 앞에서부터 조회한다.
+        이미 처리한 상태는 병합(coalescing)과 트리거의 상태 확인으로 중복 실행되지 않는다.
+        """
+        since = datetime.fromtimestamp(self.watermark - LISTENER_CATCHUP_SKEW_SECONDS, timezone.utc)
+        variants = await self.conn.fetch(
+            """
+            SELECT jv.job_variants_id::text AS job_variants_id, jv.job_id::text AS job_id,
+                   jv.current_step, jv.status, jv.img_asset_id::text AS img_asset_id,
+                   j.tenant_id, jv.updated_at
+            FROM jobs_variants jv
+            INNER JOIN jobs j ON jv.job_id = j.job_id
+            WHERE jv.updated_at > $1
+            ORDER BY jv.updated_at
+            """,
+            since
+        )
+        jobs = await self.conn.fetch(
+            """
+            SELECT job_id::text AS job_id, current_step, status, tenant_id, updated_at
+            FROM jobs
+            WHERE updated_at > $1
+            ORDER BY updated_at
+            """,
+            since
+        )
+        logger.info(
+            f"재연결 후 누락 이벤트 재생: since={since.isoformat()}, "
+            f"variants={len(variants)}, jobs={len(jobs)}"
+        )
+        for row in variants:
+            listener_catchup_events_total.labels(channel='job_variant_state_changed').inc()
+            self._handle_variant_notification(
+                self.conn, None, 'job_variant_state_changed', json.dumps(dict(row), default=str)
+            )
+        for row in jobs:
+            listener_catchup_events_total.labels(channel='job_state_changed').inc()
+            self._handle_notification(self.conn, None, 'job_state_changed', json.dumps(dict(row), default=str))
+    
     def _handle_notification(self, conn, pid, channel, payload):
         """NOTIFY 이벤트 핸들러"""
         try:
@@ -139,6 +303,10 @@ class JobStateListener:
             current_step = data.get('current_step')
             status = data.get('status')
             tenant_id = data.get('tenant_id')
+            job_state_mirror.apply_job_event(job_id, current_step, status, tenant_id, data.get('updated_at'))
+            if status == 'done':
+                retry_scheduler.record_success('job', job_id)
+            self._advance_watermark(data.get('updated_at'))
             
             print(f"[LISTENER] Job 상태 변화 감지: job_id={job_id}, current_step={current_step}, status={status}")
             logger.info(
@@ -148,9 +316,12 @@ class JobStateListener:
             
             # 비동기로 처리 (이벤트 핸들러는 동기 함수이므로)
             # 태스크를 추적하여 종료 시 완료 대기
-            task = asyncio.create_task(
+            task = asyncio.create_task(self._run_traced(
+                "listener.job_event",
+                {'job_id': job_id, 'current_step': current_step, 'status': status},
+                data.get('traceparent'),
                 self._process_job_state_change(job_id, current_step, status, tenant_id)
-            )
+            ))
             self.pending_tasks.add(task)
             # 태스크 완료 시 자동으로 제거
             task.add_done_callback(self.pending_tasks.discard)
@@ -169,6 +340,12 @@ class JobStateListener:
             status = data.get('status')
             tenant_id = data.get('tenant_id')
             img_asset_id = data.get('img_asset_id')
+            job_state_mirror.apply_variant_event(
+                job_variants_id, job_id, current_step, status, tenant_id, img_asset_id, data.get('updated_at')
+            )
+            self._advance_watermark(data.get('updated_at'))
+            if status == 'done':
+                retry_scheduler.record_success('variant', job_variants_id)
             
             print(f"[LISTENER] Job Variant 상태 변화 감지: job_variants_id={job_variants_id}, job_id={job_id}, current_step={current_step}, status={status}")
             logger.info(
@@ -176,24 +353,83 @@ class JobStateListener:
                 f"current_step={current_step}, status={status}, tenant_id={tenant_id}, img_asset_id={img_asset_id}"
             )
             
-            # 비동기로 처리 (이벤트 핸들러는 동기 함수이므로)
+            # job_variants_id별로 병합하여 비동기 처리 (이벤트 핸들러는 동기 함수이므로)
+            self._enqueue_variant_event({
+                'job_variants_id': job_variants_id,
+                'job_id': job_id,
+                'current_step': current_step,
+                'status': status,
+                'tenant_id': tenant_id,
+                'img_asset_id': img_asset_id,
+                'traceparent': data.get('traceparent')
+            })
+            
+        except Exception as e:
+            logger.error(f"이벤트 처리 오류 (variant): {e}", exc_info=True)
+    
+    def _enqueue_variant_event(self, event: dict):
+        """
+        variant 이벤트를 job_variants_id별 최신 상태로 병합
+        
+        한 단계 실행 중 jobs_variants가 여러 번 업데이트되면(running → done, overlaid_img_asset_id,
+        복구 로직의 retry_count/updated_at 갱신) 이벤트가 연달아 오므로,
+        처리 대기 중인 이벤트는 최신 이벤트로 대체하고 variant당 처리 태스크는 1개만 실행한다.
+        """
+        job_variants_id = event['job_variants_id']
+        if job_variants_id in self.variant_pending:
+            listener_variant_events_total.labels(result='coalesced').inc()
+        self.variant_pending[job_variants_id] = event
+        
+        if job_variants_id not in self.variant_workers:
             # 태스크를 추적하여 종료 시 완료 대기
-            task = asyncio.create_task(
-                self._process_job_variant_state_change(
-                    job_variants_id=job_variants_id,
-                    job_id=job_id,
-                    current_step=current_step,
-                    status=status,
-                    tenant_id=tenant_id,
-                    img_asset_id=img_asset_id
-                )
-            )
+            task = asyncio.create_task(self._drain_variant_events(job_variants_id))
+            self.variant_workers[job_variants_id] = task
             self.pending_tasks.add(task)
             # 태스크 완료 시 자동으로 제거
             task.add_done_callback(self.pending_tasks.discard)
-            
-        except Exception as e:
-            logger.error(f"이벤트 처리 오류 (variant): {e}", exc_info=True)
+    
+    async def _drain_variant_events(self, job_variants_id: str):
+        """
+        variant 이벤트 처리 태스크 (variant당 1개)
+        
+        병합 윈도우 동안 이벤트를 모은 뒤 최신 이벤트만 처리하고,
+        트리거 처리 중(다음 단계 API 실행 중) 도착한 이벤트는 처리가 끝난 뒤 최신 1개만 이어서 처리한다.
+        방금 처리한 것과 같은 (current_step, status) 이벤트는 중복 트리거이므로 흡수한다.
+        """
+        try:
+            if self.coalesce_window > 0:
+                await asyncio.sleep(self.coalesce_window)
+            last_state = None
+            while True:
+                event = self.variant_pending.pop(job_variants_id, None)
+                if event is None:
+                    break
+                state = (event['current_step'], event['status'])
+                if state == last_state:
+                    listener_variant_events_total.labels(result='absorbed').inc()
+                    logger.debug(
+                        f"처리 중 도착한 동일 상태 이벤트 흡수: job_variants_id={job_variants_id}, "
+                        f"current_step={state[0]}, status={state[1]}"
+                    )
+                    continue
+                last_state = state
+                listener_variant_events_total.labels(result='processed').inc()
+                traceparent = event.pop('traceparent', None)
+                await self._run_traced(
+                    "listener.variant_event",
+                    {'job_id': event['job_id'], 'job_variants_id': job_variants_id,
+                     'current_step': event['current_step'], 'status': event['status']},
+                    traceparent,
+                    self._process_job_variant_state_change(**event)
+                )
+        finally:
+            # pop 이후 await 없이 종료하므로 새 이벤트는 새 태스크가 처리
+            self.variant_workers.pop(job_variants_id, None)
+    
+    async def _run_traced(self, name: str, attributes: dict, traceparent: Optional[str], coro):
+        """이벤트 처리 span 안에서 실행 (NOTIFY를 발생시킨 단계 핸들러의 trace에 연결)"""
+        with start_span(name, attributes, parent=parse_traceparent(traceparent), kind='consumer'):
+            await coro
     
     async def _process_job_state_change(
         self, 
@@ -221,124 +457,11 @@ class JobStateListener:
                 'iou_eval': 8
             }
             
-            # 1) Job이 failed인 경우: 재시도 가능하면 현재 단계 재실행
+            # 1) Job이 failed인 경우: 재시도 가능하면 실패 유형별 백오프 후 현재 단계 재실행 예약
             if status == 'failed' and current_step and current_step in YH_STEPS:
-                from services.pipeline_trigger import retry_pipeline_stage
-                
-                # Job/Variants 상태 확인 및 최대 재시도 횟수 체크
-                asyncpg_url = DATABASE_URL.replace("postgresql://", "postgres://")
-                conn: Optional[asyncpg.Connection] = None
-                try:
-                    conn = await asyncpg.connect(asyncpg_url)
-                    
-                    row = await conn.fetchrow(
-                        """
-                        SELECT 
-                            j.retry_count,
-                            COUNT(jv.job_variants_id) AS total_variants,
-                            COUNT(*) FILTER (
-                                WHERE jv.status = 'failed' 
-                                  AND jv.current_step = $2
-                            ) AS failed_at_step,
-                            COUNT(*) FILTER (
-                                WHERE jv.status IN ('running', 'queued')
-                            ) AS running_or_queued
-                        FROM jobs j
-                        LEFT JOIN jobs_variants jv 
-                            ON j.job_id = jv.job_id
-                        WHERE j.job_id = $1
-                        GROUP BY j.retry_count
-                        """,
-                        uuid.UUID(job_id),
-                        current_step,
-                    )
-                    
-                    if row:
-                        retry_count = row["retry_count"] or 0
-                        total_variants = row["total_variants"] or 0
-                        failed_at_step = row["failed_at_step"] or 0
-                        running_or_queued = row["running_or_queued"] or 0
-                    else:
-                        retry_count = 0
-                        total_variants = 0
-                        failed_at_step = 0
-                        running_or_queued = 0
-                    
-                    # 재시도 조건:
-                    # - 최대 재시도 횟수 미만
-                    # - 모든 variants가 동일 단계에서 failed
-                    # - 진행 중인 variants 없음
-                    can_retry = (
-                        total_variants > 0
-                        and failed_at_step == total_variants
-                        and running_or_queued == 0
-                        and retry_count < MAX_JOB_RETRY_COUNT
-                    )
-                    
-                    if can_retry:
-                        new_retry_count = retry_count + 1
-                        
-                        # Job을 running으로 되돌리고 retry_count 증가
-                        await conn.execute(
-                            """
-                            UPDATE jobs
-                            SET status = 'running',
-                                retry_count = retry_count + 1,
-                                updated_at = CURRENT_TIMESTAMP
-                            WHERE job_id = $1
-                              AND status = 'failed'
-                              AND current_step = $2
-                            """,
-                            uuid.UUID(job_id),
-                            current_step,
-                        )
-                        
-                        # 해당 단계에서 failed인 variants의 retry_count 증가
-                        await conn.execute(
-                            """
-                            UPDATE jobs_variants
-                            SET retry_count = retry_count + 1,
-                                updated_at = CURRENT_TIMESTAMP
-                            WHERE job_id = $1
-                              AND current_step = $2
-                              AND status = 'failed'
-                            """,
-                            uuid.UUID(job_id),
-                            current_step,
-                        )
-                        
-                        logger.warning(
-                            f"⚠️ Job 실패 재시도: job_id={job_id}, "
-                            f"current_step={current_step}, "
-                            f"retry_count={new_retry_count}/{MAX_JOB_RETRY_COUNT}, "
-                            f"variants={total_variants}"
-                        )
-                        
-                        # 현재 단계 다시 실행 (동일 API 재호출)
-                        await retry_pipeline_stage(
-                            job_id=job_id,
-                            current_step=current_step,
-                            tenant_id=tenant_id,
-                        )
-                        
-                        # 재시도 스케줄 후에는 뒤처진 variant 복구 및 다음 단계 트리거는 건너뜀
-                        return
-                    else:
-                        if retry_count >= MAX_JOB_RETRY_COUNT:
-                            logger.warning(
-                                f"최대 재시도 횟수 초과로 Job 재시도 스킵: "
-                                f"job_id={job_id}, current_step={current_step}, "
-                                f"retry_count={retry_count}"
-                            )
-                except Exception as retry_error:
-                    logger.error(
-                        f"Job 실패 재시도 로직 실행 중 오류: job_id={job_id}, "
-                        f"current_step={current_step}, error={retry_error}",
-                        exc_info=True,
-                    )
-                finally:
-                    if conn:
-                        await conn.close()
+                if await self._schedule_job_retry(job_id, current_step, tenant_id):
+                    # 재시도 예약 후에는 뒤처진 variant 복구 및 다음 단계 트리거는 건너뜀
+                    return
             
             # 2) Job이 running 또는 failed 상태이고 yh 파트 단계인 경우 뒤처진 variants 확인
             # (failed 상태도 확인하여 실패한 variants를 재시도)
@@ -360,6 +483,210 @@ class JobStateListener:
                 exc_info=True
             )
     
+    async def _fetch_job_retry_state(self, conn: asyncpg.Connection, job_id: str, current_step: str):
+        """Job/Variants 상태 확인 및 최대 재시도 횟수 체크 → (retry_count, can_retry, 실패 variant ID 목록)"""
+        row = await conn.fetchrow(
+            """
+            SELECT 
+                j.retry_count,
+                COUNT(jv.job_variants_id) AS total_variants,
+                COUNT(*) FILTER (
+                    WHERE jv.status = 'failed' 
+                      AND jv.current_step = $2
+                ) AS failed_at_step,
+                COUNT(*) FILTER (
+                    WHERE jv.status IN ('running', 'queued')
+                ) AS running_or_queued,
+                ARRAY_AGG(jv.job_variants_id::text) FILTER (
+                    WHERE jv.status = 'failed'
+                      AND jv.current_step = $2
+                ) AS failed_variant_ids
+            FROM jobs j
+            LEFT JOIN jobs_variants jv 
+                ON j.job_id = jv.job_id
+            WHERE j.job_id = $1
+            GROUP BY j.retry_count
+            """,
+            uuid.UUID(job_id),
+            current_step,
+        )
+        
+        if row:
+            retry_count = row["retry_count"] or 0
+            total_variants = row["total_variants"] or 0
+            failed_at_step = row["failed_at_step"] or 0
+            running_or_queued = row["running_or_queued"] or 0
+            failed_variant_ids = list(row["failed_variant_ids"] or [])
+        else:
+            retry_count = 0
+            total_variants = 0
+            failed_at_step = 0
+            running_or_queued = 0
+            failed_variant_ids = []
+        
+        # 재시도 조건:
+        # - 최대 재시도 횟수 미만
+        # - 모든 variants가 동일 단계에서 failed
+        # - 진행 중인 variants 없음
+        can_retry = (
+            total_variants > 0
+            and failed_at_step == total_variants
+            and running_or_queued == 0
+            and retry_count < MAX_JOB_RETRY_COUNT
+        )
+        return retry_count, can_retry, failed_variant_ids
+    
+    async def _persist_next_attempt(self, conn: asyncpg.Connection, table: str, id_column: str, ids: list, next_attempt_at: Optional[datetime]):
+        """next_attempt_at 저장 (재시작 후 복구 로직이 백오프를 이어받도록, 컬럼이 없으면 메모리 예약만 사용)"""
+        if not retry_scheduler.persist_next_attempt or not ids:
+            return
+        try:
+            await conn.execute(
+                f"""
+                UPDATE {table}
+                SET next_attempt_at = $2
+                WHERE {id_column} = ANY($1::uuid[])
+                """,
+                [uuid.UUID(str(i)) for i in ids],
+                next_attempt_at,
+            )
+        except asyncpg.exceptions.UndefinedColumnError as e:
+            retry_scheduler.persist_next_attempt = False
+            logger.warning(f"next_attempt_at 컬럼 없음, 재시도 예약은 메모리에만 유지: {e}")
+    
+    async def _schedule_job_retry(self, job_id: str, current_step: str, tenant_id: str) -> bool:
+        """
+        Job 실패 재시도 예약 (즉시 재실행하지 않고 실패 유형별 백오프 후 실행)
+        
+        Returns:
+            재시도가 예약되었으면 True (재시도 불가 조건이면 False)
+        """
+        key = ('job', str(job_id))
+        asyncpg_url = DATABASE_URL.replace("postgresql://", "postgres://")
+        conn: Optional[asyncpg.Connection] = None
+        try:
+            conn = await asyncpg.connect(asyncpg_url)
+            retry_count, can_retry, failed_variant_ids = await self._fetch_job_retry_state(conn, job_id, current_step)
+            
+            if not can_retry:
+                if retry_count >= MAX_JOB_RETRY_COUNT:
+                    logger.warning(
+                        f"최대 재시도 횟수 초과로 Job 재시도 스킵: "
+                        f"job_id={job_id}, current_step={current_step}, "
+                        f"retry_count={retry_count}"
+                    )
+                return False
+            
+            if retry_scheduler.is_scheduled(key):
+                return True
+            
+            # variant들의 실패 유형 중 가장 긴 백오프 적용 (GPU OOM이 섞여 있으면 OOM 기준)
+            failure_class = worst_failure_class([retry_scheduler.failure_class(v) for v in failed_variant_ids])
+            delay = backoff_delay(failure_class, retry_count + 1)
+            due_at, _ = retry_scheduler.schedule(
+                key, 'job', failure_class, delay,
+                lambda: self._retry_failed_job(job_id, current_step, tenant_id)
+            )
+            next_attempt_at = datetime.fromtimestamp(due_at, timezone.utc)
+            await self._persist_next_attempt(conn, 'jobs', 'job_id', [job_id], next_attempt_at)
+            await self._persist_next_attempt(conn, 'jobs_variants', 'job_variants_id', failed_variant_ids, next_attempt_at)
+            
+            logger.warning(
+                f"⚠️ Job 실패 재시도 예약: job_id={job_id}, "
+                f"current_step={current_step}, failure_class={failure_class}, "
+                f"delay={delay:.1f}s, retry_count={retry_count + 1}/{MAX_JOB_RETRY_COUNT}, "
+                f"variants={len(failed_variant_ids)}"
+            )
+            return True
+        except Exception as retry_error:
+            # 예약하지 못한 job은 다음 복구 스캔에서 다시 조사
+            self.recovery_scanner.retry_later(job_id)
+            logger.error(
+                f"Job 실패 재시도 예약 중 오류: job_id={job_id}, "
+                f"current_step={current_step}, error={retry_error}",
+                exc_info=True,
+            )
+            return False
+        finally:
+            if conn:
+                await conn.close()
+    
+    async def _retry_failed_job(self, job_id: str, current_step: str, tenant_id: str):
+        """예약 시각에 Job 실패 재시도 실행 (조건 재확인 후 현재 단계 재실행)"""
+        from services.pipeline_trigger import retry_pipeline_stage
+        
+        asyncpg_url = DATABASE_URL.replace("postgresql://", "postgres://")
+        conn: Optional[asyncpg.Connection] = None
+        try:
+            conn = await asyncpg.connect(asyncpg_url)
+            retry_count, can_retry, failed_variant_ids = await self._fetch_job_retry_state(conn, job_id, current_step)
+            
+            # 대기 중 다른 경로로 복구되었거나 조건이 바뀌었으면 스킵
+            if not can_retry:
+                logger.info(
+                    f"예약된 Job 재시도 스킵 (상태 변경): job_id={job_id}, "
+                    f"current_step={current_step}, retry_count={retry_count}"
+                )
+                return
+            
+            new_retry_count = retry_count + 1
+            
+            # Job을 running으로 되돌리고 retry_count 증가
+            await conn.execute(
+                """
+                UPDATE jobs
+                SET status = 'running',
+                    retry_count = retry_count + 1,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE job_id = $1
+                  AND status = 'failed'
+                  AND current_step = $2
+                """,
+                uuid.UUID(job_id),
+                current_step,
+            )
+            
+            # 해당 단계에서 failed인 variants의 retry_count 증가
+            await conn.execute(
+                """
+                UPDATE jobs_variants
+                SET retry_count = retry_count + 1,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE job_id = $1
+                  AND current_step = $2
+                  AND status = 'failed'
+                """,
+                uuid.UUID(job_id),
+                current_step,
+            )
+            await self._persist_next_attempt(conn, 'jobs', 'job_id', [job_id], None)
+            await self._persist_next_attempt(conn, 'jobs_variants', 'job_variants_id', failed_variant_ids, None)
+            
+            logger.warning(
+                f"⚠️ Job 실패 재시도: job_id={job_id}, "
+                f"current_step={current_step}, "
+                f"retry_count={new_retry_count}/{MAX_JOB_RETRY_COUNT}, "
+                f"variants={len(failed_variant_ids)}"
+            )
+        except Exception as retry_error:
+            self.recovery_scanner.retry_later(job_id)
+            logger.error(
+                f"Job 실패 재시도 로직 실행 중 오류: job_id={job_id}, "
+                f"current_step={current_step}, error={retry_error}",
+                exc_info=True,
+            )
+            return
+        finally:
+            if conn:
+                await conn.close()
+        
+        # 현재 단계 다시 실행 (동일 API 재호출, 실패한 variant는 pipeline_trigger가 실패 유형 기록)
+        await retry_pipeline_stage(
+            job_id=job_id,
+            current_step=current_step,
+            tenant_id=tenant_id,
+        )
+    
     async def _recover_stuck_variants(
         self,
         job_id: str,
@@ -367,27 +694,43 @@ class JobStateListener:
         tenant_id: str,
         step_order: dict
     ):
-        """뒤처진 variants 감지 및 재시작"""
+        """뒤처진 variants 감지 및 재시작 예약 (실행은 retry scheduler가 백오프 후 수행)"""
         try:
             import asyncpg
             from config import DATABASE_URL
-            from services.pipeline_trigger import trigger_next_pipeline_stage_for_variant
             
             job_step_order = step_order.get(job_current_step, -1)
             if job_step_order < 0:
                 logger.debug(f"알 수 없는 단계: job_id={job_id}, current_step={job_current_step}")
                 return
             
+            # 해당 job의 variants: 상태 미러 우선 (뒤처진 variant가 없으면 DB 연결 없이 종료)
+            mirrored_job = await job_state_mirror.load_job(job_id)
+            if mirrored_job is not None:
+                variants = [
+                    {
+                        'job_variants_id': uuid.UUID(v.job_variants_id),
+                        'current_step': v.current_step,
+                        'status': v.status,
+                        'img_asset_id': v.img_asset_id,
+                        'creation_order': None
+                    }
+                    for v in job_state_mirror.variants_of(mirrored_job)
+                ]
+                if not any(0 <= step_order.get(v['current_step'], -1) < job_step_order for v in variants):
+                    return
+            
             asyncpg_url = DATABASE_URL.replace("postgresql://", "postgres://")
             conn = await asyncpg.connect(asyncpg_url)
             try:
-                # 해당 job의 모든 variants 조회
-                variants = await conn.fetch("""
-                    SELECT job_variants_id, current_step, status, img_asset_id, creation_order
-                    FROM jobs_variants
-                    WHERE job_id = $1
-                    ORDER BY creation_order
-                """, uuid.UUID(job_id))
+                if mirrored_job is None:
+                    # 해당 job의 모든 variants 조회
+                    variants = await conn.fetch("""
+                        SELECT job_variants_id, current_step, status, img_asset_id, creation_order
+                        FROM jobs_variants
+                        WHERE job_id = $1
+                        ORDER BY creation_order
+                    """, uuid.UUID(job_id))
                 
                 if not variants:
                     logger.debug(f"Variants를 찾을 수 없음: job_id={job_id}")
@@ -395,8 +738,7 @@ class JobStateListener:
                 
                 # 뒤처진 variants 찾기
                 stuck_count = 0
-                recovered_count = 0
-                failed_count = 0
+                scheduled_count = 0
                 
                 for variant in variants:
                     variant_id = variant['job_variants_id']
@@ -417,11 +759,7 @@ class JobStateListener:
                         )
                         
                         # 재시작 전에 variant 상태를 다시 확인 (다른 프로세스가 이미 처리했을 수 있음)
-                        current_variant = await conn.fetchrow("""
-                            SELECT status, current_step
-                            FROM jobs_variants
-                            WHERE job_variants_id = $1
-                        """, variant_id)
+                        current_variant = await self._fetch_variant_state(conn, variant_id)
                         
                         if not current_variant:
                             logger.warning(f"Variant를 찾을 수 없음: job_variants_id={variant_id}")
@@ -437,176 +775,31 @@ class JobStateListener:
                             )
                             continue
                         
-                        # Variant가 done 상태이면 다음 단계 트리거
-                        if variant_status == 'done':
-                            try:
-                                # 트리거 호출 직전에 variant 상태를 다시 확인 (다른 프로세스가 이미 처리했을 수 있음)
-                                final_variant = await conn.fetchrow("""
-                                    SELECT status, current_step
-                                    FROM jobs_variants
-                                    WHERE job_variants_id = $1
-                                """, variant_id)
-                                
-                                if not final_variant:
-                                    logger.warning(f"Variant를 찾을 수 없음: job_variants_id={variant_id}")
-                                    continue
-                                
-                                # 상태가 변경되었으면 스킵
-                                if (final_variant['status'] != variant_status or 
-                                    final_variant['current_step'] != variant_step):
-                                    logger.info(
-                                        f"Variant 상태가 변경되어 스킵: job_variants_id={variant_id}, "
-                                        f"old: {variant_step} ({variant_status}), "
-                                        f"new: {final_variant['current_step']} ({final_variant['status']})"
-                                    )
-                                    continue
-                                
-                                # retry_count 증가
-                                await conn.execute("""
-                                    UPDATE jobs_variants
-                                    SET retry_count = retry_count + 1,
-                                        updated_at = CURRENT_TIMESTAMP
-                                    WHERE job_variants_id = $1
-                                """, variant_id)
-                                
-                                # 현재 retry_count 조회
-                                current_retry = await conn.fetchval("""
-                                    SELECT retry_count
-                                    FROM jobs_variants
-                                    WHERE job_variants_id = $1
-                                """, variant_id)
-                                
-                                logger.info(
-                                    f"뒤처진 variant 재시작 시도: job_variants_id={variant_id}, "
-                                    f"current_step={variant_step} → 다음 단계, retry_count={current_retry}"
-                                )
-                                
-                                await trigger_next_pipeline_stage_for_variant(
-                                    job_variants_id=str(variant_id),
-                                    job_id=job_id,
-                                    current_step=variant_step,
-                                    status='done',
-                                    tenant_id=tenant_id,
-                                    img_asset_id=str(variant['img_asset_id']) if variant['img_asset_id'] else ''
-                                )
-                                
-                                # 재시작 후 상태 확인 (약간의 지연 후)
-                                import asyncio
-                                await asyncio.sleep(1)
-                                
-                                updated_variant = await conn.fetchrow("""
-                                    SELECT status, current_step
-                                    FROM jobs_variants
-                                    WHERE job_variants_id = $1
-                                """, variant_id)
-                                
-                                if updated_variant and updated_variant['current_step'] != variant_step:
-                                    recovered_count += 1
-                                    logger.info(
-                                        f"✅ 뒤처진 variant 재시작 성공: job_variants_id={variant_id}, "
-                                        f"{variant_step} → {updated_variant['current_step']}"
-                                    )
-                                else:
-                                    logger.warning(
-                                        f"⚠️  뒤처진 variant 재시작 후 상태 미변경: job_variants_id={variant_id}, "
-                                        f"current_step={variant_step}"
-                                    )
-                                    
-                            except Exception as trigger_error:
-                                failed_count += 1
-                                logger.error(
-                                    f"❌ 뒤처진 variant 재시작 실패: job_variants_id={variant_id}, "
-                                    f"current_step={variant_step}, error={trigger_error}",
-                                    exc_info=True
-                                )
-                        
-                        # Variant가 failed 상태이면 재시도 (다음 단계로 진행 시도)
-                        elif variant_status == 'failed':
-                            try:
-                                # retry_count 증가 및 failed 상태를 done으로 변경
-                                # (실패한 단계를 건너뛰고 다음 단계로 진행)
-                                await conn.execute("""
-                                    UPDATE jobs_variants
-                                    SET status = 'done',
-                                        retry_count = retry_count + 1,
-                                        updated_at = CURRENT_TIMESTAMP
-                                    WHERE job_variants_id = $1
-                                """, variant_id)
-                                
-                                # 현재 retry_count 조회
-                                current_retry = await conn.fetchval("""
-                                    SELECT retry_count
-                                    FROM jobs_variants
-                                    WHERE job_variants_id = $1
-                                """, variant_id)
-                                
-                                logger.info(
-                                    f"실패한 variant 재시도: job_variants_id={variant_id}, "
-                                    f"current_step={variant_step}, retry_count={current_retry}"
-                                )
-                                
-                                # 다음 단계 트리거
-                                await trigger_next_pipeline_stage_for_variant(
-                                    job_variants_id=str(variant_id),
-                                    job_id=job_id,
-                                    current_step=variant_step,
-                                    status='done',  # done 상태로 변경하여 다음 단계 진행
-                                    tenant_id=tenant_id,
-                                    img_asset_id=str(variant['img_asset_id']) if variant['img_asset_id'] else ''
-                                )
-                                
-                                # 재시도 후 상태 확인
-                                import asyncio
-                                await asyncio.sleep(1)
-                                
-                                updated_variant = await conn.fetchrow("""
-                                    SELECT status, current_step
-                                    FROM jobs_variants
-                                    WHERE job_variants_id = $1
-                                """, variant_id)
-                                
-                                if updated_variant and updated_variant['status'] != 'failed':
-                                    recovered_count += 1
-                                    logger.info(
-                                        f"✅ 실패한 variant 재시도 성공: job_variants_id={variant_id}, "
-                                        f"{variant_step} ({variant_status}) → {updated_variant['current_step']} ({updated_variant['status']})"
-                                    )
-                                else:
-                                    logger.warning(
-                                        f"⚠️  실패한 variant 재시도 후 여전히 failed: job_variants_id={variant_id}"
-                                    )
-                                    
-                            except Exception as retry_error:
-                                failed_count += 1
-                                logger.error(
-                                    f"❌ 실패한 variant 재시도 실패: job_variants_id={variant_id}, "
-                                    f"error={retry_error}",
-                                    exc_info=True
-                                )
+                        # done(트리거 누락) 또는 failed(실패 유형별 백오프)이면 재시작 예약
+                        if variant_status in ('done', 'failed'):
+                            if await self._schedule_variant_retry(
+                                conn,
+                                job_variants_id=str(variant_id),
+                                job_id=job_id,
+                                current_step=variant_step,
+                                status=variant_status,
+                                tenant_id=tenant_id,
+                                img_asset_id=str(variant['img_asset_id']) if variant['img_asset_id'] else ''
+                            ):
+                                scheduled_count += 1
                         
-                        # Variant가 running 상태이고 오래 실행 중인 경우 (5분 이상)
+                        # Variant가 running 상태인 경우 (현재는 로깅만, 오래 실행 중인 variant는 멈춘 variant 감지에서 처리)
                         elif variant_status == 'running':
-                            from datetime import datetime, timezone
-                            updated_at = variant.get('updated_at')
-                            if updated_at:
-                                if isinstance(updated_at, datetime):
-                                    time_diff = (datetime.now(timezone.utc) - updated_at.replace(tzinfo=timezone.utc)).total_seconds()
-                                    if time_diff > 300:  # 5분 이상
-                                        logger.warning(
-                                            f"오래 실행 중인 variant 감지: job_variants_id={variant_id}, "
-                                            f"running 시간: {int(time_diff)}초, current_step={variant_step}"
-                                        )
-                                        
-                                        # 상태를 다시 확인하여 필요시 재시도
-                                        # (현재는 로깅만, 추후 재시도 로직 추가 가능)
+                            logger.debug(
+                                f"뒤처진 variant 실행 중: job_variants_id={variant_id}, current_step={variant_step}"
+                            )
                 
                 if stuck_count > 0:
                     logger.info(
-                        f"뒤처진 variants 복구 완료: job_id={job_id}, "
+                        f"뒤처진 variants 재시작 예약 완료: job_id={job_id}, "
                         f"job_step={job_current_step}, "
                         f"stuck_count={stuck_count}, "
-                        f"recovered_count={recovered_count}, "
-                        f"failed_count={failed_count}"
+                        f"scheduled_count={scheduled_count}"
                     )
             finally:
                 await conn.close()
@@ -616,6 +809,145 @@ class JobStateListener:
                 exc_info=True
             )
     
+    async def _schedule_variant_retry(
+        self,
+        conn: asyncpg.Connection,
+        job_variants_id: str,
+        job_id: str,
+        current_step: str,
+        status: str,
+        tenant_id: str,
+        img_asset_id: str
+    ) -> bool:
+        """
+        variant 재시작 예약
+        
+        - done: 다음 단계 트리거가 누락된 경우 → 짧은 대기 후 재트리거 ('stalled')
+        - failed: 기록된 실패 유형(GPU OOM / 입력 없음 / 타임아웃 / 일시 오류)별 백오프 후 다음 단계 진행
+        
+        Returns:
+            새로 예약했으면 True (이미 예약되어 있으면 False)
+        """
+        key = ('variant', job_variants_id)
+        if retry_scheduler.is_scheduled(key):
+            return False
+        failure_class = 'stalled' if status == 'done' else retry_scheduler.failure_class(job_variants_id)
+        delay = backoff_delay(failure_class, retry_scheduler.next_attempt(key))
+        due_at, _ = retry_scheduler.schedule(
+            key, 'variant', failure_class, delay,
+            lambda: self._retry_stuck_variant(job_variants_id, job_id, current_step, status, tenant_id, img_asset_id)
+        )
+        await self._persist_next_attempt(
+            conn, 'jobs_variants', 'job_variants_id', [job_variants_id], datetime.fromtimestamp(due_at, timezone.utc)
+        )
+        logger.info(
+            f"variant 재시작 예약: job_variants_id={job_variants_id}, current_step={current_step}, "
+            f"status={status}, failure_class={failure_class}, delay={delay:.1f}s"
+        )
+        return True
+    
+    async def _retry_stuck_variant(
+        self,
+        job_variants_id: str,
+        job_id: str,
+        current_step: str,
+        status: str,
+        tenant_id: str,
+        img_asset_id: str
+    ):
+        """예약 시각에 뒤처진 / 실패한 variant 재시작 (상태 재확인 후 다음 단계 트리거)"""
+        from services.pipeline_trigger import trigger_next_pipeline_stage_for_variant
+        
+        variant_id = uuid.UUID(job_variants_id)
+        asyncpg_url = DATABASE_URL.replace("postgresql://", "postgres://")
+        try:
+            conn = await asyncpg.connect(asyncpg_url)
+            try:
+                # 트리거 호출 직전에 variant 상태를 다시 확인 (대기 중 다른 경로로 처리되었을 수 있음)
+                final_variant = await self._fetch_variant_state(conn, variant_id)
+                if not final_variant:
+                    logger.warning(f"Variant를 찾을 수 없음: job_variants_id={job_variants_id}")
+                    return
+                if final_variant['status'] != status or final_variant['current_step'] != current_step:
+                    logger.info(
+                        f"Variant 상태가 변경되어 스킵: job_variants_id={job_variants_id}, "
+                        f"old: {current_step} ({status}), "
+                        f"new: {final_variant['current_step']} ({final_variant['status']})"
+                    )
+                    return
+                
+                if status == 'failed':
+                    # retry_count 증가 및 failed 상태를 done으로 변경
+                    # (실패한 단계를 건너뛰고 다음 단계로 진행)
+                    await conn.execute("""
+                        UPDATE jobs_variants
+                        SET status = 'done',
+                            retry_count = retry_count + 1,
+                            updated_at = CURRENT_TIMESTAMP
+                        WHERE job_variants_id = $1
+                    """, variant_id)
+                    # NOTIFY 도착 전에 트리거의 상태 확인이 미러를 보므로 바로 반영
+                    job_state_mirror.apply_variant_event(job_variants_id, job_id, current_step, 'done', tenant_id)
+                else:
+                    # retry_count 증가
+                    await conn.execute("""
+                        UPDATE jobs_variants
+                        SET retry_count = retry_count + 1,
+                            updated_at = CURRENT_TIMESTAMP
+                        WHERE job_variants_id = $1
+                    """, variant_id)
+                    job_state_mirror.touch_variant(job_variants_id)
+                await self._persist_next_attempt(conn, 'jobs_variants', 'job_variants_id', [job_variants_id], None)
+                
+                # 현재 retry_count 조회
+                current_retry = await conn.fetchval("""
+                    SELECT retry_count
+                    FROM jobs_variants
+                    WHERE job_variants_id = $1
+                """, variant_id)
+            finally:
+                await conn.close()
+            
+            logger.info(
+                f"뒤처진 variant 재시작 시도: job_variants_id={job_variants_id}, "
+                f"current_step={current_step} ({status}) → 다음 단계, retry_count={current_retry}"
+            )
+            
+            # 다음 단계 트리거 (다음 단계 API 완료까지 대기하므로 별도 polling 없이 결과 확인)
+            await trigger_next_pipeline_stage_for_variant(
+                job_variants_id=job_variants_id,
+                job_id=job_id,
+                current_step=current_step,
+                status='done',
+                tenant_id=tenant_id,
+                img_asset_id=img_asset_id
+            )
+            
+            updated_variant = job_state_mirror.variant(job_variants_id)
+            if updated_variant and updated_variant.state != (current_step, 'done'):
+                logger.info(
+                    f"✅ 뒤처진 variant 재시작 성공: job_variants_id={job_variants_id}, "
+                    f"{current_step} ({status}) → {updated_variant.current_step} ({updated_variant.status})"
+                )
+        except Exception as retry_error:
+            self.recovery_scanner.retry_later(job_id)
+            logger.error(
+                f"❌ 뒤처진 variant 재시작 실패: job_variants_id={job_variants_id}, "
+                f"current_step={current_step}, error={retry_error}",
+                exc_info=True
+            )
+    
+    async def _fetch_variant_state(self, conn: asyncpg.Connection, variant_id):
+        """variant 현재 상태 (상태 미러 우선, 미러에 없으면 DB 조회)"""
+        mirrored = job_state_mirror.variant(str(variant_id))
+        if mirrored is not None:
+            return {'status': mirrored.status, 'current_step': mirrored.current_step}
+        return await conn.fetchrow("""
+            SELECT status, current_step
+            FROM jobs_variants
+            WHERE job_variants_id = $1
+        """, variant_id)
+    
     async def _process_job_variant_state_change(
         self,
         job_variants_id: str,
@@ -639,60 +971,36 @@ class JobStateListener:
                 img_asset_id=img_asset_id
             )
             
-            # 멈춘 variant 감지 및 재시도: done 상태인데 오래 업데이트되지 않은 variant 확인
+            # 멈춘 variant 감지 및 재시도: done 상태인데 5분 이상 업데이트되지 않은 variant (상태 미러)
+            # 미러를 쓸 수 없으면 주기 복구 스캔(lagging_done)이 처리하므로 DB 조회하지 않음
             if status == 'done' and current_step:
-                import asyncio
-                import asyncpg
-                from config import DATABASE_URL
+                mirrored_job = await job_state_mirror.load_job(job_id)
+                if mirrored_job is None:
+                    return
+                stuck_variants = job_state_mirror.stuck_done_variants(mirrored_job, older_than_seconds=300)
+                if not stuck_variants:
+                    return
                 
-                # 5분 이상 업데이트되지 않은 done 상태 variant 확인
                 asyncpg_url = DATABASE_URL.replace("postgresql://", "postgres://")
                 try:
                     conn = await asyncpg.connect(asyncpg_url)
                     try:
-                        # 같은 job_id의 다른 variant들이 더 진행된 경우, 멈춘 variant 재시도
-                        stuck_variants = await conn.fetch("""
-                            SELECT jv1.job_variants_id, jv1.current_step, jv1.updated_at
-                            FROM jobs_variants jv1
-                            WHERE jv1.job_id = $1
-                              AND jv1.status = 'done'
-                              AND jv1.current_step != 'iou_eval'
-                              AND jv1.updated_at < NOW() - INTERVAL '5 minutes'
-                              AND EXISTS (
-                                  SELECT 1
-                                  FROM jobs_variants jv2
-                                  WHERE jv2.job_id = jv1.job_id
-                                    AND jv2.current_step > jv1.current_step
-                                    AND jv2.status = 'done'
-                              )
-                        """, uuid.UUID(job_id))
-                        
                         for stuck in stuck_variants:
-                            stuck_id = str(stuck['job_variants_id'])
-                            stuck_step = stuck['current_step']
                             logger.warning(
-                                f"멈춘 variant 감지: job_variants_id={stuck_id}, current_step={stuck_step}, "
-                                f"updated_at={stuck['updated_at']}"
+                                f"멈춘 variant 감지: job_variants_id={stuck.job_variants_id}, "
+                                f"current_step={stuck.current_step}, "
+                                f"updated_at={datetime.fromtimestamp(stuck.updated_at, timezone.utc)}"
                             )
                             
-                            # retry_count 증가 및 상태를 다시 업데이트하여 트리거 발동
-                            await conn.execute("""
-                                UPDATE jobs_variants
-                                SET retry_count = retry_count + 1,
-                                    updated_at = CURRENT_TIMESTAMP
-                                WHERE job_variants_id = $1
-                            """, uuid.UUID(stuck_id))
-                            
-                            # 현재 retry_count 조회
-                            current_retry = await conn.fetchval("""
-                                SELECT retry_count
-                                FROM jobs_variants
-                                WHERE job_variants_id = $1
-                            """, uuid.UUID(stuck_id))
-                            
-                            logger.info(
-                                f"멈춘 variant 재시도: job_variants_id={stuck_id}, "
-                                f"current_step={stuck_step}, retry_count={current_retry}"
+                            # 다음 단계 재트리거 예약 (retry_count / updated_at 갱신만으로는 NOTIFY가 발생하지 않음)
+                            await self._schedule_variant_retry(
+                                conn,
+                                job_variants_id=stuck.job_variants_id,
+                                job_id=job_id,
+                                current_step=stuck.current_step,
+                                status='done',
+                                tenant_id=tenant_id,
+                                img_asset_id=str(stuck.img_asset_id) if stuck.img_asset_id else ''
                             )
                     finally:
                         await conn.close()
@@ -706,7 +1014,7 @@ class JobStateListener:
             )
     
     async def _periodic_recovery_check(self):
-        """주기적으로 iou_eval 단계에서 모든 variants가 done인데 job이 done이 아닌 경우 수정"""
+        """주기적으로 복구 스캔 실행 (합류 누락, 뒤처진 / 실패 / 오래 실행 중인 variants)"""
         logger.info(f"수동 복구 체크 시작 (간격: {self.recovery_check_interval}초)")
         
         while self.running:
@@ -716,7 +1024,7 @@ class JobStateListener:
                 if not self.running:
                     break
                 
-                await self._check_and_fix_iou_eval_jobs()
+                await self._run_recovery_scan()
                 
             except asyncio.CancelledError:
                 logger.info("수동 복구 체크 취소됨")
@@ -726,116 +1034,175 @@ class JobStateListener:
                 # 오류 발생 시에도 계속 실행
                 await asyncio.sleep(10)  # 오류 발생 시 10초 대기 후 재시도
     
-    async def _check_and_fix_iou_eval_jobs(self):
-        """iou_eval 단계에서 모든 variants가 done인데 job이 done이 아닌 경우 수정"""
+    async def _periodic_mirror_reconcile(self):
+        """주기적으로 상태 미러를 DB와 대조 (누락된 NOTIFY 보정, 완료된 job 정리)"""
+        while self.running:
+            try:
+                await asyncio.sleep(JOB_STATE_MIRROR_RECONCILE_SECONDS)
+                
+                # 리스너 연결이 없으면 재연결 시 동기화하므로 스킵
+                if not self.running or not job_state_mirror.active:
+                    continue
+                
+                # LISTEN 연결과 별도 연결 사용 (LISTEN 연결에서 다른 쿼리와 동시 실행 방지)
+                conn = await asyncpg.connect(DATABASE_URL.replace("postgresql://", "postgres://"))
+                try:
+                    await job_state_mirror.reconcile(conn)
+                finally:
+                    await conn.close()
+                
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"상태 미러 DB 대조 오류: {e}", exc_info=True)
+    
+    async def _run_recovery_scan(self):
+        """
+        증분 복구 스캔: 마지막 스캔 이후 변경된 (또는 새로 오래된) jobs / variants만 조사하여 복구
+        
+        - join_not_fired: 모든 variants가 iou_eval done인데 job이 running → job을 done으로 (job 레벨 단계 트리거)
+        - failed_job: 모든 variants가 같은 단계에서 실패 → job 재시도 예약
+        - failed_variant / lagging_done: 뒤처진 variant → variant 재시작 예약
+        - stale_running: 단계 API 타임아웃보다 오래 running → failed(timeout)로 전환 (다음 스캔에서 재시도 대상)
+        """
+        asyncpg_url = DATABASE_URL.replace("postgresql://", "postgres://")
         try:
-            import asyncpg
-            from config import DATABASE_URL
-            
-            asyncpg_url = DATABASE_URL.replace("postgresql://", "postgres://")
             conn = await asyncpg.connect(asyncpg_url)
-            
             try:
-                # 조건을 만족하는 job 찾기
-                # - current_step = 'iou_eval'
-                # - status = 'running'
-                # - 모든 variants가 iou_eval, done
-                # - failed, running, queued variant 없음
-                jobs_to_fix = await conn.fetch("""
-                    SELECT 
-                        j.job_id,
-                        j.status,
-                        j.current_step,
-                        COUNT(jv.job_variants_id) as total_variants,
-                        COUNT(*) FILTER (WHERE jv.status = 'done' AND jv.current_step = 'iou_eval') as iou_done_count,
-                        COUNT(*) FILTER (WHERE jv.status = 'failed') as failed_count,
-                        COUNT(*) FILTER (WHERE jv.status = 'running') as running_count,
-                        COUNT(*) FILTER (WHERE jv.status = 'queued') as queued_count
-                    FROM jobs j
-                    INNER JOIN jobs_variants jv ON j.job_id = jv.job_id
-                    WHERE j.current_step = 'iou_eval'
-                      AND j.status = 'running'
-                    GROUP BY j.job_id, j.status, j.current_step
-                    HAVING COUNT(*) FILTER (WHERE jv.status = 'done' AND jv.current_step = 'iou_eval') = COUNT(jv.job_variants_id)
-                       AND COUNT(*) FILTER (WHERE jv.status = 'failed') = 0
-                       AND COUNT(*) FILTER (WHERE jv.status = 'running') = 0
-                       AND COUNT(*) FILTER (WHERE jv.status = 'queued') = 0
-                """)
+                rows = await self.recovery_scanner.scan(conn, MAX_JOB_RETRY_COUNT)
+                if not rows:
+                    logger.debug("수동 복구 대상 없음 (최근 변경된 job 모두 정상 상태)")
+                    return
                 
-                if jobs_to_fix:
-                    logger.warning(
-                        f"수동 복구 대상 발견: {len(jobs_to_fix)}개 job이 iou_eval, done 조건을 만족하지만 running 상태"
-                    )
-                    
-                    fixed_count = 0
-                    for job in jobs_to_fix:
-                        job_id = job['job_id']
-                        total = job['total_variants']
-                        iou_done = job['iou_done_count']
-                        
-                        try:
-                            # Job을 done으로 업데이트 (수동 복구이므로 retry_count 증가)
-                            result = await conn.execute("""
-                                UPDATE jobs
-                                SET status = 'done',
-                                    current_step = 'iou_eval',
-                                    retry_count = retry_count + 1,
-                                    updated_at = CURRENT_TIMESTAMP
-                                WHERE job_id = $1
-                                  AND status = 'running'
-                                  AND current_step = 'iou_eval'
-                            """, job_id)
-                            
-                            # 현재 retry_count 조회
-                            current_retry = await conn.fetchval("""
-                                SELECT retry_count
-                                FROM jobs
-                                WHERE job_id = $1
-                            """, job_id)
-                            
-                            if result == "UPDATE 1":
-                                fixed_count += 1
-                                logger.info(
-                                    f"✅ 수동 복구 완료: job_id={job_id}, "
-                                    f"variants: {iou_done}/{total} 모두 iou_eval, done, retry_count={current_retry}"
-                                )
-                            else:
-                                logger.debug(
-                                    f"수동 복구 스킵: job_id={job_id} (이미 처리됨 또는 상태 변경됨)"
-                                )
-                                
-                        except Exception as fix_error:
-                            logger.error(
-                                f"수동 복구 실패: job_id={job_id}, error={fix_error}",
-                                exc_info=True
-                            )
-                    
-                    if fixed_count > 0:
-                        logger.info(f"수동 복구 완료: {fixed_count}개 job을 done으로 업데이트")
-                else:
-                    logger.debug("수동 복구 대상 없음 (모든 job이 정상 상태)")
-                    
+                logger.info(f"복구 스캔 대상 발견: {len(rows)}건")
+                for row in rows:
+                    try:
+                        await self._apply_recovery_action(conn, row)
+                    except Exception as fix_error:
+                        # 다음 스캔에서 다시 조사 (watermark는 이미 이 행을 지나감)
+                        self.recovery_scanner.retry_later(row['job_id'])
+                        logger.error(
+                            f"복구 실패: rule={row['rule']}, job_id={row['job_id']}, "
+                            f"job_variants_id={row['job_variants_id']}, error={fix_error}",
+                            exc_info=True
+                        )
             finally:
                 await conn.close()
-                
         except Exception as e:
             logger.error(f"수동 복구 체크 오류: {e}", exc_info=True)
+    
+    async def _apply_recovery_action(self, conn: asyncpg.Connection, row: asyncpg.Record):
+        """복구 스캔 결과 1건 처리"""
+        rule = row['rule']
+        job_id = str(row['job_id'])
+        tenant_id = row['tenant_id']
+        
+        if rule == 'join_not_fired':
+            # Job을 done으로 업데이트 (수동 복구이므로 retry_count 증가)
+            result = await conn.execute("""
+                UPDATE jobs
+                SET status = 'done',
+                    current_step = 'iou_eval',
+                    retry_count = retry_count + 1,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE job_id = $1
+                  AND status = 'running'
+                  AND current_step = $2
+            """, row['job_id'], row['current_step'])
+            if result == "UPDATE 1":
+                job_state_mirror.apply_job_event(job_id, 'iou_eval', 'done', tenant_id)
+                logger.info(f"✅ 수동 복구 완료: job_id={job_id}, 모든 variants iou_eval, done → job done")
+            else:
+                logger.debug(f"수동 복구 스킵: job_id={job_id} (이미 처리됨 또는 상태 변경됨)")
+        
+        elif rule == 'failed_job':
+            await self._schedule_job_retry(job_id, row['current_step'], tenant_id)
+        
+        elif rule in ('failed_variant', 'lagging_done'):
+            job_variants_id = str(row['job_variants_id'])
+            logger.warning(
+                f"뒤처진 variant 감지 (복구 스캔): rule={rule}, job_id={job_id}, "
+                f"job_variants_id={job_variants_id}, current_step={row['current_step']}, "
+                f"status={row['status']}, updated_at={row['updated_at']}"
+            )
+            await self._schedule_variant_retry(
+                conn,
+                job_variants_id=job_variants_id,
+                job_id=job_id,
+                current_step=row['current_step'],
+                status=row['status'],
+                tenant_id=tenant_id,
+                img_asset_id=str(row['img_asset_id']) if row['img_asset_id'] else ''
+            )
+        
+        elif rule == 'stale_running':
+            # 스캔 이후 갱신되었으면 (단계가 아직 진행 중) 변경하지 않음
+            job_variants_id = str(row['job_variants_id'])
+            result = await conn.execute("""
+                UPDATE jobs_variants
+                SET status = 'failed',
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE job_variants_id = $1
+                  AND status = 'running'
+                  AND updated_at = $2
+            """, row['job_variants_id'], row['updated_at'])
+            if result == "UPDATE 1":
+                retry_scheduler.record_failure(job_variants_id, "stage timed out (stale running)")
+                job_state_mirror.apply_variant_event(job_variants_id, job_id, row['current_step'], 'failed', tenant_id)
+                logger.warning(
+                    f"⚠️ 오래 실행 중인 variant를 failed(timeout)로 전환: job_variants_id={job_variants_id}, "
+                    f"current_step={row['current_step']}, updated_at={row['updated_at']}"
+                )
 
 
 # 전역 리스너 인스턴스
 _listener: Optional[JobStateListener] = None
+_elector = None  # LeaderElector (LISTENER_LEADER_ELECTION=true인 경우)
 
-async def start_listener():
-    """리스너 시작 (FastAPI startup에서 호출)"""
+def _run_listener(watermark: Optional[float] = None):
+    """리스너 인스턴스 생성 및 백그라운드 태스크로 시작"""
+    global _listener
+    _listener = JobStateListener()
+    # 리더 승계 시 이전 리더가 놓쳤을 수 있는 상태 변화부터 재생
+    _listener.watermark = watermark
+    asyncio.create_task(_listener.start())
+    logger.info("Job State Listener 시작됨")
+
+async def _on_elected(server_now: float):
+    """리더 선출 시 리스너 시작 (이전 리더의 lock 해제 감지 지연만큼 앞에서부터 재생)"""
+    _run_listener(watermark=server_now - LISTENER_LEADER_RETRY_SECONDS - LISTENER_PROBE_INTERVAL_SECONDS)
+
+async def _on_demoted():
+    """리더 역할 상실 시 리스너 즉시 중지 (진행 중인 단계 API 호출은 백그라운드에서 계속)"""
     global _listener
-    if _listener is None:
-        _listener = JobStateListener()
-        # 백그라운드 태스크로 시작
-        asyncio.create_task(_listener.start())
-        logger.info("Job State Listener 시작됨")
+    if _listener:
+        await _listener.stop(wait_for_tasks=False)
+        _listener = None
+
+async def start_listener():
+    """리스너 시작 (FastAPI startup에서 호출, 리더 선출 사용 시 리더가 된 프로세스만 실행)"""
+    global _elector
+    if _listener is not None or _elector is not None:
+        return
+    if LISTENER_LEADER_ELECTION:
+        from services.leader_election import LeaderElector
+        _elector = LeaderElector(on_elected=_on_elected, on_demoted=_on_demoted)
+        _elector.start()
+        logger.info("Job State Listener 리더 선출 시작 (리더가 되면 리스너 실행)")
+    else:
+        _run_listener()
 
 async def stop_listener():
     """리스너 중지 (FastAPI shutdown에서 호출)"""
+    global _elector
+    if _elector:
+        # 리더 역할 종료는 아래에서 실행 중인 태스크 완료까지 대기
+        _elector.on_demoted = _stop_listener_gracefully
+        await _elector.stop()
+        _elector = None
+    await _stop_listener_gracefully()
+
+async def _stop_listener_gracefully():
     global _listener
     if _listener:
         await _listener.stop()
@@ -0,0 +1,397 @@
+"""Job / Variant 상태 메모리 미러"""
+########################################################
+# 리스너가 받은 NOTIFY 이벤트로 진행 중인 jobs / jobs_variants 상태를 메모리에 유지
+#
+# 기능:
+# - NOTIFY payload(job_id, current_step, status, tenant_id, updated_at)로 상태 갱신
+# - job별 (current_step, status) 카운트 유지 → 합류(모든 variants 완료) 판단 O(1)
+# - 뒤처진 / 멈춘 variant 판단을 SQL 없이 메모리에서 수행
+# - 처음 보는 job은 1회 DB 로드, 주기적으로 DB와 대조(reconcile)하여 누락 이벤트 보정
+# - 리스너 연결이 끊긴 동안은 비활성(authoritative 아님) → 호출 측은 기존 SQL 경로 사용
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: In-memory mirror of active job / variant states built from NOTIFY payloads
+# version: 1.0.0
+# status: development
+# tags: listener, notify, cache, pipeline
+# dependencies: asyncpg, prometheus_client
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import time
+import uuid
+import logging
+from collections import Counter as StateCounter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+import asyncpg
+from prometheus_client import Counter, Gauge
+from config import DATABASE_URL, JOB_STATE_MIRROR_WINDOW_HOURS
+
+logger = logging.getLogger(__name__)
+
+# variant 단계 순서 (뒤처진 variant 판단용)
+STEP_ORDER = {
+    'img_gen': 0,
+    'vlm_analyze': 1,
+    'yolo_detect': 2,
+    'planner': 3,
+    'overlay': 4,
+    'vlm_judge': 5,
+    'ocr_eval': 6,
+    'readability_eval': 7,
+    'iou_eval': 8
+}
+
+job_state_mirror_lookups_total = Counter(
+    'job_state_mirror_lookups_total',
+    'Job state mirror lookups by operation and result',
+    ['operation', 'result']  # result: hit | miss (SQL 경로 사용)
+)
+job_state_mirror_drift_total = Counter(
+    'job_state_mirror_drift_total',
+    'Mirror entries corrected by DB reconcile (missed or out-of-order notifications)',
+    ['kind']
+)
+job_state_mirror_entries = Gauge(
+    'job_state_mirror_entries',
+    'Entries held in the job state mirror',
+    ['kind']
+)
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """NOTIFY payload / DB의 updated_at → epoch 초 (없거나 해석 불가면 None)"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return None
+
+
+def _parse_updated_at(value: Any) -> float:
+    """updated_at → epoch 초 (없거나 해석 불가면 현재 시각)"""
+    parsed = parse_timestamp(value)
+    return parsed if parsed is not None else time.time()
+
+
+def _key(value: Any) -> str:
+    """UUID 표기 정규화 (payload 문자열 / asyncpg UUID 모두 같은 키)"""
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return str(value)
+
+
+class VariantState:
+    """variant 1개의 미러 상태"""
+    __slots__ = ('job_variants_id', 'job_id', 'current_step', 'status', 'img_asset_id', 'updated_at', 'seq')
+
+    def __init__(self, job_variants_id: str, job_id: str, current_step: Optional[str], status: Optional[str],
+                 img_asset_id: Optional[str], updated_at: float, seq: int):
+        self.job_variants_id = job_variants_id
+        self.job_id = job_id
+        self.current_step = current_step
+        self.status = status
+        self.img_asset_id = img_asset_id
+        self.updated_at = updated_at
+        self.seq = seq  # 마지막 갱신 순번 (reconcile 중 도착한 이벤트 보존용)
+
+    @property
+    def state(self) -> Tuple[Optional[str], Optional[str]]:
+        return self.current_step, self.status
+
+
+class JobState:
+    """job 1개의 미러 상태 (variant 집합과 (current_step, status) 카운트 포함)"""
+    __slots__ = ('job_id', 'current_step', 'status', 'tenant_id', 'updated_at', 'seq',
+                 'variant_ids', 'state_counts', 'loaded')
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.current_step: Optional[str] = None
+        self.status: Optional[str] = None
+        self.tenant_id: Optional[str] = None
+        self.updated_at = 0.0
+        self.seq = 0
+        self.variant_ids: Set[str] = set()
+        self.state_counts: StateCounter = StateCounter()
+        self.loaded = False  # DB에서 variant 전체를 로드했는지 (False면 total 판단 불가)
+
+
+class JobStateMirror:
+    """진행 중인 jobs / jobs_variants 상태 메모리 미러 (리스너 이벤트 루프에서만 사용)"""
+
+    def __init__(self, window_hours: float = JOB_STATE_MIRROR_WINDOW_HOURS):
+        self.window_hours = window_hours
+        self.active = False  # 리스너 연결 + 초기 동기화 완료 시 True (끊기면 이벤트 누락 가능 → False)
+        self._jobs: Dict[str, JobState] = {}
+        self._variants: Dict[str, VariantState] = {}
+        self._seq = 0
+
+    # ------------------------------------------------------------------
+    # 이벤트 반영
+    # ------------------------------------------------------------------
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    def _job(self, job_id: str) -> JobState:
+        job = self._jobs.get(job_id)
+        if job is None:
+            job = self._jobs[job_id] = JobState(job_id)
+        return job
+
+    def _set_variant(self, job_variants_id: str, job_id: str, current_step: Optional[str], status: Optional[str],
+                     img_asset_id: Optional[str], updated_at: float, seq: int) -> bool:
+        """variant 상태 기록 및 job 카운트 갱신, 상태가 바뀌었으면 True"""
+        variant = self._variants.get(job_variants_id)
+        job = self._job(job_id)
+        if variant is None:
+            self._variants[job_variants_id] = VariantState(
+                job_variants_id, job_id, current_step, status, img_asset_id, updated_at, seq
+            )
+            job.variant_ids.add(job_variants_id)
+            job.state_counts[(current_step, status)] += 1
+            return True
+        changed = variant.state != (current_step, status)
+        if changed:
+            job.state_counts[variant.state] -= 1
+            if job.state_counts[variant.state] <= 0:
+                del job.state_counts[variant.state]
+            job.state_counts[(current_step, status)] += 1
+        variant.current_step = current_step
+        variant.status = status
+        if img_asset_id:
+            variant.img_asset_id = img_asset_id
+        variant.updated_at = updated_at
+        variant.seq = seq
+        return changed
+
+    def apply_variant_event(self, job_variants_id: str, job_id: str, current_step: Optional[str], status: Optional[str],
+                            tenant_id: Optional[str] = None, img_asset_id: Optional[str] = None, updated_at: Any = None):
+        """job_variant_state_changed 이벤트 (또는 자체 UPDATE 직후) 반영"""
+        if not job_variants_id or not job_id:
+            return
+        job_id = _key(job_id)
+        self._set_variant(
+            _key(job_variants_id), job_id, current_step, status, img_asset_id or None,
+            _parse_updated_at(updated_at), self._next_seq()
+        )
+        if tenant_id:
+            self._job(job_id).tenant_id = tenant_id
+
+    def apply_job_event(self, job_id: str, current_step: Optional[str], status: Optional[str],
+                        tenant_id: Optional[str] = None, updated_at: Any = None):
+        """job_state_changed 이벤트 (또는 자체 UPDATE 직후) 반영"""
+        if not job_id:
+            return
+        job = self._job(_key(job_id))
+        job.current_step = current_step
+        job.status = status
+        if tenant_id:
+            job.tenant_id = tenant_id
+        job.updated_at = _parse_updated_at(updated_at)
+        job.seq = self._next_seq()
+
+    def touch_variant(self, job_variants_id: str):
+        """상태 변화 없이 updated_at만 갱신한 경우 (retry_count 증가 등, NOTIFY 없음)"""
+        variant = self._variants.get(_key(job_variants_id))
+        if variant is not None:
+            variant.updated_at = time.time()
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def variant(self, job_variants_id: str) -> Optional[VariantState]:
+        """variant 상태 (미러 비활성 또는 모르는 variant면 None → SQL 경로)"""
+        if not self.active:
+            return None
+        variant = self._variants.get(_key(job_variants_id))
+        job_state_mirror_lookups_total.labels(operation='variant', result='hit' if variant else 'miss').inc()
+        return variant
+
+    def job(self, job_id: str) -> Optional[JobState]:
+        """job 상태 (미러 비활성 또는 모르는 job이면 None)"""
+        if not self.active:
+            return None
+        job = self._jobs.get(_key(job_id))
+        return job if job is not None and job.status is not None else None
+
+    async def load_job(self, job_id: str) -> Optional[JobState]:
+        """
+        job의 variant 전체가 미러에 있도록 보장 (처음 보는 job이면 DB에서 1회 로드)
+
+        Returns:
+            로드된 JobState (미러 비활성이거나 DB 오류면 None → SQL 경로)
+        """
+        if not self.active:
+            return None
+        job_id = _key(job_id)
+        job = self._jobs.get(job_id)
+        if job is not None and job.loaded:
+            job_state_mirror_lookups_total.labels(operation='job', result='hit').inc()
+            return job
+        job_state_mirror_lookups_total.labels(operation='job', result='miss').inc()
+        try:
+            conn = await asyncpg.connect(DATABASE_URL.replace("postgresql://", "postgres://"))
+            try:
+                await self._load(conn, job_ids=[uuid.UUID(job_id)])
+            finally:
+                await conn.close()
+        except Exception as e:
+            logger.warning(f"[StateMirror] job 로드 실패 (SQL 경로 사용): job_id={job_id}, error={e}")
+            return None
+        job = self._jobs.get(job_id)
+        return job if job is not None and job.loaded else None
+
+    @staticmethod
+    def step_progress(job: JobState, current_step: str, status: str = 'done') -> Tuple[int, int]:
+        """(current_step, status)인 variant 수와 전체 variant 수 (합류 판단)"""
+        return job.state_counts.get((current_step, status), 0), len(job.variant_ids)
+
+    def variants_of(self, job: JobState) -> List[VariantState]:
+        """job의 variant 상태 목록"""
+        return [self._variants[vid] for vid in job.variant_ids if vid in self._variants]
+
+    def stuck_done_variants(self, job: JobState, older_than_seconds: float) -> List[VariantState]:
+        """
+        멈춘 variant: done이지만 older_than_seconds 이상 갱신이 없고,
+        같은 job의 다른 variant가 더 뒤 단계에서 done인 경우
+        """
+        variants = self.variants_of(job)
+        done_orders = [STEP_ORDER.get(v.current_step, -1) for v in variants if v.status == 'done']
+        if not done_orders:
+            return []
+        furthest = max(done_orders)
+        cutoff = time.time() - older_than_seconds
+        return [
+            v for v in variants
+            if v.status == 'done'
+            and v.current_step != 'iou_eval'
+            and v.updated_at < cutoff
+            and STEP_ORDER.get(v.current_step, -1) < furthest
+        ]
+
+    # ------------------------------------------------------------------
+    # DB 동기화
+    # ------------------------------------------------------------------
+    async def _load(self, conn: asyncpg.Connection, job_ids: Optional[List[uuid.UUID]] = None) -> Set[str]:
+        """
+        DB 스냅샷을 미러에 반영 (job_ids가 없으면 진행 중인 job 전체)
+
+        스냅샷 조회 중 도착한 이벤트(seq가 더 큰 항목)는 DB 값으로 덮어쓰지 않는다.
+
+        Returns:
+            스냅샷에 포함된 job_id 집합
+        """
+        seq_at_start = self._seq
+        if job_ids is not None:
+            where = "j.job_id = ANY($1::uuid[])"
+            args: List[Any] = [job_ids]
+        else:
+            where = """
+                NOT (j.status = 'done' AND j.current_step = 'instagram_feed_gen')
+                AND j.updated_at > NOW() - make_interval(hours => $1)
+            """
+            args = [float(self.window_hours)]
+        rows = await conn.fetch(
+            f"""
+            SELECT j.job_id, j.current_step AS job_step, j.status AS job_status, j.tenant_id,
+                   j.updated_at AS job_updated_at,
+                   jv.job_variants_id, jv.current_step, jv.status, jv.img_asset_id, jv.updated_at
+            FROM jobs j
+            LEFT JOIN jobs_variants jv ON j.job_id = jv.job_id
+            WHERE {where}
+            """,
+            *args
+        )
+
+        seen_jobs: Set[str] = set()
+        seen_variants: Dict[str, Set[str]] = {}
+        drift = {'job': 0, 'variant': 0}
+        for row in rows:
+            job_id = _key(row['job_id'])
+            job = self._job(job_id)
+            if job_id not in seen_jobs:
+                seen_jobs.add(job_id)
+                seen_variants[job_id] = set()
+                if job.seq <= seq_at_start:
+                    if job.status is not None and (job.current_step, job.status) != (row['job_step'], row['job_status']):
+                        drift['job'] += 1
+                    job.current_step = row['job_step']
+                    job.status = row['job_status']
+                    job.updated_at = _parse_updated_at(row['job_updated_at'])
+                job.tenant_id = row['tenant_id'] or job.tenant_id
+            if row['job_variants_id'] is None:
+                continue
+            variant_id = _key(row['job_variants_id'])
+            seen_variants[job_id].add(variant_id)
+            existing = self._variants.get(variant_id)
+            if existing is not None and existing.seq > seq_at_start:
+                continue
+            if self._set_variant(
+                variant_id, job_id, row['current_step'], row['status'],
+                str(row['img_asset_id']) if row['img_asset_id'] else None,
+                _parse_updated_at(row['updated_at']), existing.seq if existing else 0
+            ) and existing is not None:
+                drift['variant'] += 1
+
+        # DB에서 사라진 variant 제거 (job 삭제 등)
+        for job_id, variant_ids in seen_variants.items():
+            job = self._jobs[job_id]
+            for variant_id in job.variant_ids - variant_ids:
+                variant = self._variants.get(variant_id)
+                if variant is not None and variant.seq <= seq_at_start:
+                    self._remove_variant(job, variant)
+            job.loaded = True
+
+        for kind, count in drift.items():
+            if count:
+                job_state_mirror_drift_total.labels(kind=kind).inc(count)
+                logger.info(f"[StateMirror] DB 대조로 {kind} 상태 {count}건 보정")
+        return seen_jobs
+
+    def _remove_variant(self, job: JobState, variant: VariantState):
+        job.variant_ids.discard(variant.job_variants_id)
+        job.state_counts[variant.state] -= 1
+        if job.state_counts[variant.state] <= 0:
+            del job.state_counts[variant.state]
+        self._variants.pop(variant.job_variants_id, None)
+
+    async def reconcile(self, conn: asyncpg.Connection):
+        """
+        진행 중인 job 전체를 DB와 대조 (누락 이벤트 보정, 완료/오래된 job 정리)
+
+        리스너 연결 직후와 주기적으로 호출한다.
+        """
+        seq_at_start = self._seq
+        seen_jobs = await self._load(conn)
+        # 스냅샷에 없는 job (완료 / 윈도우 밖) 정리, 조회 중 이벤트가 온 job은 유지
+        for job_id in [job_id for job_id in self._jobs if job_id not in seen_jobs]:
+            job = self._jobs[job_id]
+            if job.seq > seq_at_start or any(
+                self._variants[vid].seq > seq_at_start for vid in job.variant_ids if vid in self._variants
+            ):
+                continue
+            for variant in self.variants_of(job):
+                self._remove_variant(job, variant)
+            del self._jobs[job_id]
+        job_state_mirror_entries.labels(kind='job').set(len(self._jobs))
+        job_state_mirror_entries.labels(kind='variant').set(len(self._variants))
+
+    def deactivate(self):
+        """리스너 연결 끊김 (이후 이벤트 누락 가능, 다시 reconcile 전까지 SQL 경로 사용)"""
+        if self.active:
+            logger.info("[StateMirror] 미러 비활성화 (리스너 연결 끊김)")
+        self.active = False
+
+
+# 프로세스 전역 미러 (리스너와 pipeline_trigger가 같은 이벤트 루프에서 사용)
+job_state_mirror = JobStateMirror()
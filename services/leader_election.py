@@ -0,0 +1,151 @@
+"""리스너 리더 선출 서비스"""
+########################################################
+# Postgres advisory lock 기반 리더 선출 (멀티 워커 / 멀티 레플리카 배포용)
+#
+# 기능:
+# - 전용 연결에서 pg_try_advisory_lock 획득에 성공한 프로세스 1개만 리더
+# - 리더만 JobStateListener 실행 (LISTEN, 트리거, job 레벨 합류, 복구 스캔, 재시도 스케줄러)
+# - 팔로워는 리스너 없이 단계 API만 처리 (리더의 트리거 HTTP 요청을 받아 실행)
+# - 리더 세션이 끊기면 Postgres가 lock을 해제 → 팔로워가 LISTENER_LEADER_RETRY_SECONDS 내 승계
+# - 리더는 lock 연결 생존을 probe하고, 끊기면 즉시 리스너를 중지 (리더 2개 동시 실행 방지)
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Postgres advisory-lock leader election for the job state listener
+# version: 1.0.0
+# status: development
+# tags: listener, leader-election, advisory-lock
+# dependencies: asyncpg, prometheus_client
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+import asyncpg
+from prometheus_client import Counter, Gauge
+from config import (
+    DATABASE_URL, LISTENER_LEADER_LOCK_KEY, LISTENER_LEADER_RETRY_SECONDS,
+    LISTENER_PROBE_INTERVAL_SECONDS, LISTENER_PROBE_TIMEOUT_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+listener_is_leader = Gauge(
+    'listener_is_leader',
+    '1 if this process holds the job state listener leader lock'
+)
+listener_leader_transitions_total = Counter(
+    'listener_leader_transitions_total',
+    'Leader lock acquisitions and losses',
+    ['event']  # elected | demoted
+)
+
+
+class LeaderElector:
+    """advisory lock 보유 동안만 리더 역할 실행"""
+
+    def __init__(
+        self,
+        on_elected: Callable[[float], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]],
+        lock_key: int = LISTENER_LEADER_LOCK_KEY
+    ):
+        """
+        Args:
+            on_elected: 리더가 되었을 때 호출 (인자: lock 획득 시점 DB 서버 시각 epoch 초)
+            on_demoted: lock을 잃었거나 종료할 때 호출
+            lock_key: advisory lock 키 (같은 DB를 쓰는 모든 워커가 같은 값)
+        """
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.lock_key = lock_key
+        self.is_leader = False
+        self.running = False
+        self.conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """선출 루프 시작 (백그라운드 태스크)"""
+        self.running = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """선출 루프 중지 (리더면 역할 종료 후 lock 해제)"""
+        self.running = False
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self._demote()
+        await self._close()
+
+    async def _run(self):
+        while self.running:
+            try:
+                await self._campaign()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[Leader] 리더 선출 연결 오류: {e}")
+            await self._demote()
+            await self._close()
+            if self.running:
+                await asyncio.sleep(LISTENER_LEADER_RETRY_SECONDS)
+
+    async def _campaign(self):
+        """lock 획득 시도 → 획득하면 연결이 살아 있는 동안 리더 유지"""
+        self.conn = await asyncpg.connect(DATABASE_URL.replace("postgresql://", "postgres://"))
+        lost = asyncio.Event()
+        self.conn.add_termination_listener(lambda conn: lost.set())
+
+        while self.running:
+            acquired = await self.conn.fetchval("SELECT pg_try_advisory_lock($1)", self.lock_key)
+            if acquired:
+                break
+            logger.debug(f"[Leader] 팔로워 대기 (lock_key={self.lock_key})")
+            await asyncio.sleep(LISTENER_LEADER_RETRY_SECONDS)
+        else:
+            return
+
+        server_now = await self.conn.fetchval("SELECT EXTRACT(EPOCH FROM NOW())::float8")
+        self.is_leader = True
+        listener_is_leader.set(1)
+        listener_leader_transitions_total.labels(event='elected').inc()
+        logger.info(f"[Leader] 리더 선출됨: lock_key={self.lock_key}")
+        await self.on_elected(server_now)
+
+        # lock 연결 생존 확인 (세션이 끊기면 lock도 해제되므로 즉시 리더 역할 중지)
+        while self.running:
+            try:
+                await asyncio.wait_for(lost.wait(), timeout=LISTENER_PROBE_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                await asyncio.wait_for(self.conn.fetchval("SELECT 1"), timeout=LISTENER_PROBE_TIMEOUT_SECONDS)
+                continue
+            raise ConnectionError("리더 lock 연결 종료")
+
+    async def _demote(self):
+        if not self.is_leader:
+            return
+        self.is_leader = False
+        listener_is_leader.set(0)
+        listener_leader_transitions_total.labels(event='demoted').inc()
+        logger.warning(f"[Leader] 리더 역할 중지: lock_key={self.lock_key}")
+        try:
+            await self.on_demoted()
+        except Exception as e:
+            logger.error(f"[Leader] 리더 역할 중지 중 오류: {e}", exc_info=True)
+
+    async def _close(self):
+        conn, self.conn = self.conn, None
+        if conn is None:
+            return
+        try:
+            # 세션 종료 시 advisory lock 자동 해제
+            await conn.close(timeout=LISTENER_PROBE_TIMEOUT_SECONDS)
+        except Exception:
+            conn.terminate()
@@ -11,10 +11,10 @@
 # KoLLaVA 모델 사용은 테스트 했을 때 영어 모델보다 성능이 떨어지는 것을 확인함.
 ########################################################
 # created_at: 2025-11-20
-# updated_at: 2025-12-04
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: LLaVa model service
-# version: 2.3.0
+# version: 2.11.0
 # status: development
 # tags: llava, model, service
 # dependencies: transformers, torch, accelerate, pillow
@@ -24,125 +24,279 @@
 
 import os
 import re
+import time
 import logging
-import threading
+from contextlib import contextmanager
 from typing import Optional, Dict, Any
 from PIL import Image
-import torch
-from transformers import LlavaProcessor, LlavaForConditionalGeneration
 from config import LLAVA_MODEL_NAME, DEVICE_TYPE, MODEL_DIR, USE_QUANTIZATION
+from config import LLAVA_CPU_PROFILE, LLAVA_CPU_THREADS, LLAVA_CPU_COMPILE, FONT_RECOMMENDER, LLAVA_BACKEND
+from services.model_registry import model_registry
+from services.inference_telemetry import InferenceTelemetry, record, reset_peak_memory, peak_memory_mb
+from services.llava_stream_parser import JsonObjectDetector, FieldsDetector
+from services.inference_backends import LlavaBackend, RemoteLlavaBackend, register_backend, get_backend
+from services.stub_models import StubLlavaBackend
 
+# torch/transformers는 import만으로 수 초가 걸리므로 첫 사용 시점에 import (lazy import)
 logger = logging.getLogger(__name__)
 
-# 디바이스 설정
-DEVICE = DEVICE_TYPE if DEVICE_TYPE == "cuda" and torch.cuda.is_available() else "cpu"
+# 디바이스 설정 (첫 호출 시 torch import 후 결정)
+_device: Optional[str] = None
 
-# 전역 모델 변수 (lazy loading)
-_processor: Optional[LlavaProcessor] = None
-_model: Optional[LlavaForConditionalGeneration] = None
-_model_lock = threading.Lock()  # 모델 로딩 동기화를 위한 락
+# 모델 객체는 모델 레지스트리가 소유 (lazy loading, 사전 로딩, LRU 언로드)
 
 
-def get_llava_model():
-    """LLaVa 모델 및 프로세서 로드 (싱글톤 패턴, thread-safe)"""
-    global _processor, _model
-    
-    # Double-checked locking 패턴으로 thread-safe하게 모델 로딩
-    if _model is None or _processor is None:
-        with _model_lock:
-            # 다시 확인 (다른 스레드가 이미 로딩했을 수 있음)
-            if _model is None or _processor is None:
-                print(f"Loading LLaVa model: {LLAVA_MODEL_NAME} on {DEVICE}")
-                print(f"Model will be saved to: {MODEL_DIR}")
-                
-                # Hugging Face 캐시 디렉토리를 model 폴더로 설정
-                # transformers는 cache_dir 내에 models--{org}--{model-name} 구조로 저장
-                os.environ["HF_HOME"] = MODEL_DIR
-                os.environ["TRANSFORMERS_CACHE"] = MODEL_DIR
-                
-                # 프로세서 로드 (자동으로 MODEL_DIR에 캐시됨)
-                print(f"Downloading/loading processor from Hugging Face...")
-                _processor = LlavaProcessor.from_pretrained(
-                    LLAVA_MODEL_NAME,
-                    cache_dir=MODEL_DIR
-                )
-                
-                # 모델 로드 (자동으로 MODEL_DIR에 캐시됨)
-                print(f"Downloading/loading model from Hugging Face...")
-                print(f"Quantization setting: {'Enabled (8-bit)' if USE_QUANTIZATION else 'Disabled (FP16/FP32)'}")
-                
-                # GPU 메모리 사용량 측정 (로드 전)
-                if DEVICE == "cuda":
-                    torch.cuda.reset_peak_memory_stats()
-                    initial_memory = torch.cuda.memory_allocated() / 1024**3  # GB
-                
-                # 메모리 최적화: 8-bit 양자화 사용 여부에 따라 선택
-                if DEVICE == "cuda" and USE_QUANTIZATION:
-                    try:
-                        from transformers import BitsAndBytesConfig
-                        quantization_config = BitsAndBytesConfig(
-                            load_in_8bit=True,
-                            bnb_8bit_compute_dtype=torch.float16
-                        )
-                        _model = LlavaForConditionalGeneration.from_pretrained(
-                            LLAVA_MODEL_NAME,
-                            quantization_config=quantization_config,
-                            device_map="auto",
-                            low_cpu_mem_usage=True,
-                            cache_dir=MODEL_DIR
-                        )
-                        print("✓ Model loaded with 8-bit quantization for memory efficiency")
-                    except Exception as e:
-                        print(f"⚠ 8-bit quantization failed: {e}")
-                        print("Falling back to standard loading with memory limits...")
-                        # 8-bit 양자화 실패 시 메모리 제한과 함께 로드
-                        _model = LlavaForConditionalGeneration.from_pretrained(
-                            LLAVA_MODEL_NAME,
-                            torch_dtype=torch.float16,
-                            device_map="auto",
-                            low_cpu_mem_usage=True,
-                            cache_dir=MODEL_DIR,
-                            max_memory={0: "20GiB"}  # GPU 메모리 제한
-                        )
-                        print("✓ Model loaded with FP16 (quantization disabled)")
-                elif DEVICE == "cuda":
-                    # 양자화 비활성화: FP16으로 로드
-                    _model = LlavaForConditionalGeneration.from_pretrained(
-                        LLAVA_MODEL_NAME,
-                        torch_dtype=torch.float16,
-                        device_map="auto",
-                        low_cpu_mem_usage=True,
-                        cache_dir=MODEL_DIR
-                    )
-                    print("✓ Model loaded with FP16 (quantization disabled)")
-                else:
-                    # CPU 모드
-                    _model = LlavaForConditionalGeneration.from_pretrained(
-                        LLAVA_MODEL_NAME,
-                        torch_dtype=torch.float32,
-                        device_map=None,
-                        low_cpu_mem_usage=True,
-                        cache_dir=MODEL_DIR
-                    )
-                    _model = _model.to(DEVICE)
-                    print("✓ Model loaded on CPU")
-                
-                # GPU 메모리 사용량 측정 (로드 후)
-                if DEVICE == "cuda":
-                    loaded_memory = torch.cuda.memory_allocated() / 1024**3  # GB
-                    peak_memory = torch.cuda.max_memory_allocated() / 1024**3  # GB
-                    total_memory = torch.cuda.get_device_properties(0).total_memory / 1024**3  # GB
-                    print(f"📊 GPU Memory Usage:")
-                    print(f"   - Allocated: {loaded_memory:.2f} GB")
-                    print(f"   - Peak (during load): {peak_memory:.2f} GB")
-                    print(f"   - Total GPU: {total_memory:.2f} GB")
-                    print(f"   - Usage: {loaded_memory/total_memory*100:.1f}%")
-                
-                _model.eval()
-                print(f"✓ LLaVa model loaded successfully on {DEVICE}")
-                print(f"✓ Model cached in: {MODEL_DIR}")
+def get_device() -> str:
+    """추론 디바이스 반환 (cuda 사용 가능 여부는 첫 호출 시 확인)"""
+    global _device
+    if _device is None:
+        if LLAVA_BACKEND != "local":
+            # remote / stub 백엔드는 이 프로세스에서 torch를 사용하지 않음 (CPU 전용 API 노드)
+            _device = "cpu"
+        else:
+            import torch
+            _device = DEVICE_TYPE if DEVICE_TYPE == "cuda" and torch.cuda.is_available() else "cpu"
+    return _device
+
+
+def _load_llava_model():
+    """LLaVa 모델 및 프로세서 로드 (모델 레지스트리 로더, single-flight는 레지스트리가 보장)"""
+    import torch
+    from transformers import LlavaProcessor, LlavaForConditionalGeneration
+    
+    print(f"Loading LLaVa model: {LLAVA_MODEL_NAME} on {get_device()}")
+    print(f"Model will be saved to: {MODEL_DIR}")
+    
+    # Hugging Face 캐시 디렉토리를 model 폴더로 설정
+    # transformers는 cache_dir 내에 models--{org}--{model-name} 구조로 저장
+    os.environ["HF_HOME"] = MODEL_DIR
+    os.environ["TRANSFORMERS_CACHE"] = MODEL_DIR
+    
+    # 프로세서 로드 (자동으로 MODEL_DIR에 캐시됨)
+    print(f"Downloading/loading processor from Hugging Face...")
+    processor = LlavaProcessor.from_pretrained(
+        LLAVA_MODEL_NAME,
+        cache_dir=MODEL_DIR
+    )
+    
+    # 모델 로드 (자동으로 MODEL_DIR에 캐시됨)
+    print(f"Downloading/loading model from Hugging Face...")
+    print(f"Quantization setting: {'Enabled (8-bit)' if USE_QUANTIZATION else 'Disabled (FP16/FP32)'}")
+    
+    # GPU 메모리 사용량 측정 (로드 전)
+    if get_device() == "cuda":
+        torch.cuda.reset_peak_memory_stats()
+        initial_memory = torch.cuda.memory_allocated() / 1024**3  # GB
+    
+    # 메모리 최적화: 8-bit 양자화 사용 여부에 따라 선택
+    if get_device() == "cuda" and USE_QUANTIZATION:
+        try:
+            from transformers import BitsAndBytesConfig
+            quantization_config = BitsAndBytesConfig(
+                load_in_8bit=True,
+                bnb_8bit_compute_dtype=torch.float16
+            )
+            model = LlavaForConditionalGeneration.from_pretrained(
+                LLAVA_MODEL_NAME,
+                quantization_config=quantization_config,
+                device_map="auto",
+                low_cpu_mem_usage=True,
+                cache_dir=MODEL_DIR
+            )
+            print("✓ Model loaded with 8-bit quantization for memory efficiency")
+        except Exception as e:
+            print(f"⚠ 8-bit quantization failed: {e}")
+            print("Falling back to standard loading with memory limits...")
+            # 8-bit 양자화 실패 시 메모리 제한과 함께 로드
+            model = LlavaForConditionalGeneration.from_pretrained(
+                LLAVA_MODEL_NAME,
+                torch_dtype=torch.float16,
+                device_map="auto",
+                low_cpu_mem_usage=True,
+                cache_dir=MODEL_DIR,
+                max_memory={0: "20GiB"}  # GPU 메모리 제한
+            )
+            print("✓ Model loaded with FP16 (quantization disabled)")
+    elif get_device() == "cuda":
+        # 양자화 비활성화: FP16으로 로드
+        model = LlavaForConditionalGeneration.from_pretrained(
+            LLAVA_MODEL_NAME,
+            torch_dtype=torch.float16,
+            device_map="auto",
+            low_cpu_mem_usage=True,
+            cache_dir=MODEL_DIR
+        )
+        print("✓ Model loaded with FP16 (quantization disabled)")
+    else:
+        # CPU 모드 (LLAVA_CPU_PROFILE: fp32 | bf16 | int8)
+        model = _load_llava_model_cpu(LlavaForConditionalGeneration)
+    
+    # GPU 메모리 사용량 측정 (로드 후)
+    if get_device() == "cuda":
+        loaded_memory = torch.cuda.memory_allocated() / 1024**3  # GB
+        peak_memory = torch.cuda.max_memory_allocated() / 1024**3  # GB
+        total_memory = torch.cuda.get_device_properties(0).total_memory / 1024**3  # GB
+        print(f"📊 GPU Memory Usage:")
+        print(f"   - Allocated: {loaded_memory:.2f} GB")
+        print(f"   - Peak (during load): {peak_memory:.2f} GB")
+        print(f"   - Total GPU: {total_memory:.2f} GB")
+        print(f"   - Usage: {loaded_memory/total_memory*100:.1f}%")
+    
+    model.eval()
+    print(f"✓ LLaVa model loaded successfully on {get_device()}")
+    print(f"✓ Model cached in: {MODEL_DIR}")
+
+    return processor, model
+
+
+def _cpu_supports_bf16() -> bool:
+    """CPU bf16 연산 지원 여부 (oneDNN 기준, 확인 실패 시 False)"""
+    import torch
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except Exception:
+        return False
+
+
+def _quantize_linear_dynamic_int8(targets) -> int:
+    """
+    Linear 레이어를 동적 int8 양자화 Linear로 1개씩 교체 (torch.ao)
     
-    return _processor, _model
+    bf16으로 로드한 모델도 레이어 단위로 fp32 변환 후 양자화하므로 피크 메모리가 fp32 전체 로드보다 작다.
+    
+    Args:
+        targets: 양자화할 (부모 모듈, 자식 이름) 리스트
+    
+    Returns:
+        교체한 레이어 수
+    """
+    import torch
+    from torch.ao.nn.quantized.dynamic import Linear as DynamicQuantizedLinear
+    from torch.ao.quantization import default_dynamic_qconfig, per_channel_dynamic_qconfig
+    
+    # fbgemm/x86 엔진은 채널별 가중치 양자화 지원 (정확도 향상)
+    engine = torch.backends.quantized.engine
+    qconfig = per_channel_dynamic_qconfig if engine in ("fbgemm", "x86") else default_dynamic_qconfig
+    
+    for parent, name in targets:
+        linear = getattr(parent, name).float()
+        linear.qconfig = qconfig
+        setattr(parent, name, DynamicQuantizedLinear.from_float(linear))
+    return len(targets)
+
+
+def _load_llava_model_cpu(model_cls):
+    """
+    CPU 추론 프로파일로 LLaVa 모델 로드 (LLAVA_CPU_PROFILE)
+    
+    - fp32: float32 그대로 로드
+    - bf16: bfloat16 가중치 (CPU 미지원 시 fp32)
+    - int8: bf16(또는 fp32)로 로드 후 언어 모델 Linear 레이어 동적 int8 양자화,
+            나머지 모듈(비전 타워, 임베딩, 정규화)은 fp32 (양자화 Linear 입력 dtype과 일치)
+    """
+    import torch
+    
+    # 스레드 수 설정 (interop 스레드는 첫 병렬 작업 이전에만 변경 가능)
+    threads = LLAVA_CPU_THREADS
+    if threads <= 0:
+        threads = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+    
+    profile = LLAVA_CPU_PROFILE
+    if profile not in ("fp32", "bf16", "int8"):
+        logger.warning(f"알 수 없는 LLAVA_CPU_PROFILE: {profile}, fp32 사용")
+        profile = "fp32"
+    bf16_supported = _cpu_supports_bf16()
+    if profile == "bf16" and not bf16_supported:
+        logger.warning("CPU가 bf16을 지원하지 않아 fp32로 로드합니다")
+        profile = "fp32"
+    
+    # int8도 로드 피크 메모리를 줄이기 위해 가능하면 bf16으로 로드 후 레이어 단위 변환
+    load_dtype = torch.bfloat16 if profile == "bf16" or (profile == "int8" and bf16_supported) else torch.float32
+    model = model_cls.from_pretrained(
+        LLAVA_MODEL_NAME,
+        torch_dtype=load_dtype,
+        device_map=None,
+        low_cpu_mem_usage=True,
+        cache_dir=MODEL_DIR
+    )
+    model = model.to("cpu")
+    
+    if profile == "int8":
+        # 언어 모델(디코더 + lm_head)의 Linear 레이어만 양자화 (비전 타워/프로젝터는 유지)
+        language_model = getattr(model, "language_model", None)
+        if language_model is None:
+            language_model = model
+        targets = [
+            (parent, name)
+            for parent in language_model.modules()
+            for name, child in parent.named_children()
+            if type(child) is torch.nn.Linear
+        ]
+        lm_head = getattr(model, "lm_head", None)
+        if type(lm_head) is torch.nn.Linear:
+            targets.append((model, "lm_head"))
+        quantized = _quantize_linear_dynamic_int8(targets)
+        model = model.float()  # 양자화되지 않은 모듈은 fp32 (양자화 Linear는 fp32 입력 필요)
+        print(f"✓ Dynamic int8 quantization applied to {quantized} Linear layers")
+    
+    if LLAVA_CPU_COMPILE:
+        try:
+            model.forward = torch.compile(model.forward, dynamic=True)
+            print("✓ torch.compile enabled (first request includes compile time)")
+        except Exception as e:
+            logger.warning(f"torch.compile 적용 실패, eager 모드 사용: {e}")
+    
+    print(f"✓ Model loaded on CPU (profile={profile}, threads={threads})")
+    return model
+
+
+def _unload_llava_model(loaded):
+    """LLaVa 모델 언로드 정리 (GPU 메모리 반환은 레지스트리가 처리)"""
+    processor, model = loaded
+    if get_device() == "cuda" and not getattr(model, "is_loaded_in_8bit", False):
+        model.to("cpu")
+
+
+class LocalLlavaBackend(LlavaBackend):
+    """LLaVA local 백엔드 (이 프로세스에서 transformers 생성, 이미지 1장씩)"""
+
+    kind = "local"
+
+    def __init__(self):
+        # 생성은 GPU 연산 / CPU 스레드를 모두 점유하므로 동시 생성 수를 제한 (CPU는 1개)
+        super().__init__(max_batch_size=1, max_concurrency=2 if DEVICE_TYPE == "cuda" else 1)
+        # 모델 레지스트리 등록 (LLaVA 7B: 8-bit 약 7GB, FP16/BF16 약 14GB, CPU int8 약 9GB, FP32 약 29GB)
+        model_registry.register(
+            "llava",
+            _load_llava_model,
+            get_device,
+            estimate_mb=(7500 if USE_QUANTIZATION else 14500) if DEVICE_TYPE == "cuda" else {"bf16": 14500, "int8": 9000}.get(LLAVA_CPU_PROFILE, 29000),
+            unloader=_unload_llava_model
+        )
+
+    def generate(self, image, prompt, max_new_tokens, temperature, do_sample, stop_detector=None, telemetry=None) -> str:
+        # 추론 구간 동안 사용 중으로 표시 (메모리 예산 초과 시에도 언로드되지 않음)
+        with model_registry.use("llava") as (processor, model):
+            return _generate_with_llava(
+                processor, model, image, prompt, max_new_tokens, temperature, do_sample, stop_detector, telemetry
+            )
+
+
+# 추론 백엔드 등록 (LLAVA_BACKEND로 선택, local / stub은 생성 시 모델 레지스트리에 등록)
+register_backend("llava", "local", LocalLlavaBackend)
+register_backend("llava", "remote", RemoteLlavaBackend)
+register_backend("llava", "stub", StubLlavaBackend)
+get_backend("llava")
+
+
+def get_llava_model():
+    """LLaVa 모델 및 프로세서 반환 (모델 레지스트리에서 로드, thread-safe)"""
+    return model_registry.get("llava")
 
 
 def process_image_with_llava(
@@ -153,10 +307,13 @@ def process_image_with_llava(
     # temperature 조절
     temperature: float = 0.1,
     # 샘플링 사용 여부
-    do_sample: bool = False
-) -> str:
+    do_sample: bool = False,
+    stop_detector=None,
+    return_telemetry: bool = False
+):
     """
     LLaVa를 사용하여 이미지와 프롬프트를 처리하고 응답 생성
+    (LLAVA_BACKEND로 선택한 백엔드에서 실행, 백엔드 동시 추론 수 상한까지 대기)
     
     Args:
         image: PIL Image 객체
@@ -164,68 +321,201 @@ def process_image_with_llava(
         max_new_tokens: 최대 생성 토큰 수
         temperature: 생성 온도
         do_sample: 샘플링 사용 여부
+        stop_detector: 증분 파서 (지정 시 파서가 완료되는 즉시 생성 중단, 파싱 결과는 stop_detector.result)
+        return_telemetry: True면 (응답, InferenceTelemetry) 반환
     
     Returns:
-        생성된 텍스트 응답
+        생성된 텍스트 응답 (return_telemetry=True면 (응답, 텔레메트리))
+        텔레메트리는 메트릭 / collect_telemetry 수집기에도 항상 기록됨
     """
-    processor, model = get_llava_model()
+    telemetry = InferenceTelemetry("llava", cache_hit=model_registry.is_loaded("llava"))
+    backend = get_backend("llava")
+    with backend.slot():
+        response = backend.generate(image, prompt, max_new_tokens, temperature, do_sample, stop_detector, telemetry)
+    record(telemetry)
+    return (response, telemetry) if return_telemetry else response
+
+
+def _find_vision_tower(model):
+    """비전 인코더 모듈 (transformers 버전에 따라 model.vision_tower 또는 model.model.vision_tower)"""
+    vision_tower = getattr(model, "vision_tower", None)
+    if vision_tower is None:
+        vision_tower = getattr(getattr(model, "model", None), "vision_tower", None)
+    return vision_tower if hasattr(vision_tower, "register_forward_hook") else None
+
+
+@contextmanager
+def _vision_encode_timing(model, marks: Dict[str, float], sync):
+    """비전 인코더 forward 시간을 marks['vision_ms']에 누적 (forward hook, 구간 종료 시 제거)"""
+    vision_tower = _find_vision_tower(model)
+    if vision_tower is None:
+        yield
+        return
+    
+    def _started(module, args):
+        sync()
+        marks['vision_started'] = time.perf_counter()
+    
+    def _done(module, args, output):
+        sync()
+        marks['vision_ms'] = marks.get('vision_ms', 0.0) + (time.perf_counter() - marks['vision_started']) * 1000
+    
+    hooks = [vision_tower.register_forward_pre_hook(_started), vision_tower.register_forward_hook(_done)]
+    try:
+        yield
+    finally:
+        for hook in hooks:
+            hook.remove()
+
+
+_timing_criteria_class = None
+
+
+def _make_timing_criteria(on_first_token):
+    """첫 토큰 생성 시점 기록용 StoppingCriteria (생성을 중단하지 않음, prefill / decode 구간 분리)"""
+    global _timing_criteria_class
+    import torch
+    from transformers import StoppingCriteria
+
+    if _timing_criteria_class is None:
+        class FirstTokenCriteria(StoppingCriteria):
+            def __init__(self, callback):
+                self.callback = callback
+                self.fired = False
+
+            def __call__(self, input_ids, scores, **kwargs):
+                if not self.fired:
+                    self.fired = True
+                    self.callback()
+                return torch.zeros((input_ids.shape[0],), dtype=torch.bool, device=input_ids.device)
+
+        _timing_criteria_class = FirstTokenCriteria
+
+    return _timing_criteria_class(on_first_token)
+
+
+def _generate_with_llava(
+    processor,
+    model,
+    image: Image.Image,
+    prompt: str,
+    max_new_tokens: int,
+    temperature: float,
+    do_sample: bool,
+    stop_detector=None,
+    telemetry: Optional[InferenceTelemetry] = None
+) -> str:
+    """process_image_with_llava 본체 (로드된 processor/model로 생성, telemetry에 구간별 시간 기록)"""
+    import torch
+    from transformers import StoppingCriteriaList
+    
+    telemetry = telemetry or InferenceTelemetry("llava")
+    device = get_device()
     
+    def _sync():
+        # CUDA는 비동기 실행이므로 구간 경계에서 동기화해야 정확한 시간
+        if device == "cuda":
+            torch.cuda.synchronize()
+    
+    started = time.perf_counter()
     # LLaVa-1.5 프롬프트 형식: USER: <image>\n{prompt}\nASSISTANT:
     # 이미지를 리스트로 전달하고 프롬프트를 올바른 형식으로 구성
     formatted_prompt = f"USER: <image>\n{prompt}\nASSISTANT:"
     
     # GPU 메모리 정리
-    if DEVICE == "cuda":
+    if get_device() == "cuda":
         torch.cuda.empty_cache()
     
+    reset_peak_memory(device)
+    
     # 이미지와 프롬프트 준비 (이미지는 리스트로 전달)
     # 메모리 최적화: CPU에서 처리 후 필요시 GPU로 이동
+    preprocess_started = time.perf_counter()
     inputs = processor(images=[image], text=formatted_prompt, return_tensors="pt")
     
     # GPU로 이동 (8-bit 양자화된 모델은 자동으로 처리됨)
-    if DEVICE == "cuda":
-        inputs = {k: v.to(DEVICE) if isinstance(v, torch.Tensor) else v for k, v in inputs.items()}
+    if get_device() == "cuda":
+        inputs = {k: v.to(get_device()) if isinstance(v, torch.Tensor) else v for k, v in inputs.items()}
+    elif model.dtype == torch.bfloat16:
+        # CPU bf16 프로파일: 이미지 텐서를 모델 dtype으로 변환
+        inputs["pixel_values"] = inputs["pixel_values"].to(torch.bfloat16)
+    _sync()
+    telemetry.preprocess_ms = (time.perf_counter() - preprocess_started) * 1000
+    prompt_length = inputs["input_ids"].shape[1]
+    telemetry.batch_size = int(inputs["input_ids"].shape[0])
+    
+    # 구조화 응답 조기 종료 (JSON 객체가 닫히거나 필요한 필드가 모두 나오면 중단)
+    detector_criteria = []
+    if stop_detector is not None:
+        from services.llava_stream_parser import make_stopping_criteria
+        detector_criteria = list(make_stopping_criteria(processor.tokenizer, prompt_length, stop_detector))
+    
+    # 구간 측정: 비전 인코더 forward (hook), 첫 토큰 시점 (StoppingCriteria는 매 토큰 생성 직후 호출)
+    marks: Dict[str, float] = {}
+    
+    def _first_token():
+        _sync()
+        marks['first_token'] = time.perf_counter()
     
     # 추론 (bitsandbytes 컨텍스트 에러 재시도)
     max_retries = 3
     retry_count = 0
     generate_ids = None
     
-    while retry_count < max_retries:
-        try:
-            with torch.no_grad():
-                generate_ids = model.generate(
-                    **inputs,
-                    max_new_tokens=max_new_tokens,
-                    temperature=temperature,
-                    do_sample=do_sample,
-                    pad_token_id=processor.tokenizer.eos_token_id if processor.tokenizer.pad_token_id is None else processor.tokenizer.pad_token_id
-                )
-            break  # 성공하면 루프 종료
-        except AttributeError as e:
-            if "'CUBLAS_Context' object has no attribute 'context'" in str(e):
-                retry_count += 1
-                if retry_count < max_retries:
-                    print(f"⚠ bitsandbytes 컨텍스트 에러 발생, 재시도 {retry_count}/{max_retries}...")
-                    # GPU 컨텍스트 정리 후 재시도
-                    if DEVICE == "cuda":
-                        torch.cuda.empty_cache()
-                    import time
-                    time.sleep(0.5)  # 짧은 대기 후 재시도
+    with _vision_encode_timing(model, marks, _sync):
+        while retry_count < max_retries:
+            # 재시도 시 마지막 시도 기준으로 측정
+            marks.clear()
+            stopping_criteria = StoppingCriteriaList([_make_timing_criteria(_first_token)] + detector_criteria)
+            try:
+                generate_started = time.perf_counter()
+                with torch.no_grad():
+                    generate_ids = model.generate(
+                        **inputs,
+                        max_new_tokens=max_new_tokens,
+                        temperature=temperature,
+                        do_sample=do_sample,
+                        stopping_criteria=stopping_criteria,
+                        pad_token_id=processor.tokenizer.eos_token_id if processor.tokenizer.pad_token_id is None else processor.tokenizer.pad_token_id
+                    )
+                _sync()
+                generate_ended = time.perf_counter()
+                break  # 성공하면 루프 종료
+            except AttributeError as e:
+                if "'CUBLAS_Context' object has no attribute 'context'" in str(e):
+                    retry_count += 1
+                    if retry_count < max_retries:
+                        print(f"⚠ bitsandbytes 컨텍스트 에러 발생, 재시도 {retry_count}/{max_retries}...")
+                        # GPU 컨텍스트 정리 후 재시도
+                        if get_device() == "cuda":
+                            torch.cuda.empty_cache()
+                        time.sleep(0.5)  # 짧은 대기 후 재시도
+                    else:
+                        print(f"❌ bitsandbytes 컨텍스트 에러 재시도 실패: {e}")
+                        raise
                 else:
-                    print(f"❌ bitsandbytes 컨텍스트 에러 재시도 실패: {e}")
                     raise
-            else:
+            except Exception as e:
+                # 다른 에러는 즉시 전파
                 raise
-        except Exception as e:
-            # 다른 에러는 즉시 전파
-            raise
     
     if generate_ids is None:
         raise RuntimeError("모델 추론 실패: 최대 재시도 횟수 초과")
     
+    # 구간 계산: prefill = 첫 토큰까지 - 비전 인코더 (비전 인코더는 첫 forward 안에서 실행)
+    generated_tokens = int(generate_ids.shape[1] - prompt_length)
+    telemetry.tokens_generated = generated_tokens
+    telemetry.vision_encode_ms = marks.get('vision_ms')
+    first_token = marks.get('first_token', generate_ended)
+    telemetry.prefill_ms = max(0.0, (first_token - generate_started) * 1000 - (telemetry.vision_encode_ms or 0.0))
+    telemetry.decode_ms = (generate_ended - first_token) * 1000
+    telemetry.peak_memory_mb = peak_memory_mb(device)
+    
+    if stop_detector is not None and stop_detector.done:
+        logger.info(f"[LLaVA] 구조화 응답 완료로 조기 종료: {generated_tokens}/{max_new_tokens} 토큰")
+    
     # GPU 메모리 정리
-    if DEVICE == "cuda":
+    if get_device() == "cuda":
         del inputs
         torch.cuda.empty_cache()
     
@@ -243,6 +533,7 @@ def process_image_with_llava(
     elif formatted_prompt in response:
         response = response.replace(formatted_prompt, "").strip()
     
+    telemetry.total_ms = (time.perf_counter() - started) * 1000
     return response
 
 
@@ -457,11 +748,14 @@ IMPORTANT:
     
     try:
         # 폰트 추천은 다양성을 위해 temperature를 높이고 샘플링 활성화
+        # JSON 객체가 닫히면 생성 중단 (뒤따르는 부연 설명 생성 생략)
+        json_detector = JsonObjectDetector()
         response = process_image_with_llava(
             image, 
             font_recommendation_prompt,
             temperature=0.7,  # 다양성을 위해 temperature 증가 (기본값 0.1 → 0.7)
-            do_sample=True   # 샘플링 활성화 (기본값 False → True)
+            do_sample=True,  # 샘플링 활성화 (기본값 False → True)
+            stop_detector=json_detector
         )
         
         # LLaVA 원본 응답 로깅 (디버깅용)
@@ -502,6 +796,11 @@ IMPORTANT:
                 else:
                     json_str = None
         
+        # 스트리밍 파서가 이미 파싱한 JSON 객체가 있으면 그대로 사용
+        if json_detector.result is not None:
+            font_recommendation = json_detector.result
+            json_str = None
+        
         # JSON 파싱 시도
         if json_str:
             try:
@@ -709,6 +1008,17 @@ IMPORTANT:
         return None
 
 
+# Stage 1 Final Assessment 필드 (줄 끝까지 생성되어야 완료로 판단, Reasoning이 마지막 필드)
+VALIDATION_FIELD_PATTERNS = {
+    "match_score": r'match\s+score[:\s]+([^\n]+)\n',
+    "logical_consistency": r'logical\s+consistency[:\s]+([^\n]+)\n',
+    "mismatch_detected": r'mismatch\s+detected[:\s]+([^\n]+)\n',
+    "mismatch_details": r'mismatch\s+details[:\s]+([^\n]+)\n',
+    "overall_assessment": r'overall\s+assessment[:\s]+([^\n]+)\n',
+    "reasoning": r'reasoning[:\s]+([^\n]+)\n'
+}
+
+
 def validate_image_and_text(
     image: Image.Image,
     ad_copy_text: Optional[str] = None,
@@ -739,6 +1049,7 @@ Focus on the product characteristics and visual elements."""
     # 이미지만 먼저 분석
     image_analysis = process_image_with_llava(image, image_analysis_prompt)
     
+    structured_prompt = validation_prompt is None and bool(ad_copy_text)
     if validation_prompt is None:
         # Step 2: 광고 문구와 비교
         if ad_copy_text:
@@ -789,7 +1100,9 @@ RULES:
             validation_prompt = image_analysis_prompt + "\n\n3. Provide general recommendations for advertising use.\n\nProvide your analysis."
     
     # Step 2: 광고 문구와 비교 (이미지 분석 결과 포함)
-    response = process_image_with_llava(image, validation_prompt)
+    # 구조화 프롬프트를 직접 만든 경우 Final Assessment 필드가 모두 나오면 생성 중단
+    fields_detector = FieldsDetector(VALIDATION_FIELD_PATTERNS) if structured_prompt else None
+    response = process_image_with_llava(image, validation_prompt, stop_detector=fields_detector)
     
     # 응답 파싱 - 개선된 로직
     response_lower = response.lower()
@@ -947,13 +1260,14 @@ RULES:
             else:
                 issues.append("Context mismatch detected between image and ad copy")
     
-    # Step 3: 폰트 추천 생성
+    # Step 3: 폰트 추천 생성 (FONT_RECOMMENDER=llava인 경우만, 기본값 palette는 overlay 단계에서 팔레트 기반 추천)
     font_recommendation = None
-    try:
-        font_recommendation = recommend_font(image, ad_copy_text, image_analysis)
-    except Exception as e:
-        # 폰트 추천 실패해도 검증 결과는 반환
-        print(f"Warning: Font recommendation failed: {e}")
+    if FONT_RECOMMENDER == "llava":
+        try:
+            font_recommendation = recommend_font(image, ad_copy_text, image_analysis)
+        except Exception as e:
+            # 폰트 추천 실패해도 검증 결과는 반환
+            print(f"Warning: Font recommendation failed: {e}")
     
     return {
         "is_valid": is_valid,
@@ -1009,27 +1323,32 @@ def judge_final_ad(
 - Provide your response as valid JSON only."""
     
     # GPU 메모리 정리 후 실행
-    if DEVICE == "cuda":
+    if get_device() == "cuda":
+        import torch
         torch.cuda.empty_cache()
     
-    response = process_image_with_llava(image, judge_prompt, max_new_tokens=512, temperature=0.7, do_sample=True)
+    # JSON 객체가 닫히면 생성 중단 (뒤따르는 부연 설명 생성 생략)
+    json_detector = JsonObjectDetector()
+    response = process_image_with_llava(image, judge_prompt, max_new_tokens=512, temperature=0.7, do_sample=True, stop_detector=json_detector)
     
     # GPU 메모리 정리
-    if DEVICE == "cuda":
+    if get_device() == "cuda":
+        import torch
         torch.cuda.empty_cache()
     
-    # JSON 파싱 시도
-    result = _parse_judge_response(response)
+    # JSON 파싱 시도 (스트리밍 파서가 파싱한 객체 우선)
+    result = _parse_judge_response(response, parsed=json_detector.result)
     
     return result
 
 
-def _parse_judge_response(response: str) -> Dict[str, Any]:
+def _parse_judge_response(response: str, parsed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     LLaVA Stage 2 응답 파싱 (JSON 우선, 정규식 fallback)
     
     Args:
         response: LLaVA 응답 텍스트
+        parsed: 생성 중 스트리밍 파서가 파싱한 JSON 객체 (있으면 JSON 추출 생략)
     
     Returns:
         파싱된 판단 결과 딕셔너리
@@ -1038,16 +1357,18 @@ def _parse_judge_response(response: str) -> Dict[str, Any]:
     
     # Step 1: JSON 파싱 시도
     try:
-        # JSON 블록 추출 시도
-        json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(0)
-            
-            # 이스케이프된 언더스코어를 일반 언더스코어로 변환 (LLaVA가 "on\_brief"로 반환하는 경우 대비)
-            json_str = json_str.replace('\\_', '_')
-            
-            parsed = json.loads(json_str)
-            
+        if parsed is None:
+            # JSON 블록 추출 시도
+            json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response, re.DOTALL)
+            if json_match:
+                json_str = json_match.group(0)
+                
+                # 이스케이프된 언더스코어를 일반 언더스코어로 변환 (LLaVA가 "on\_brief"로 반환하는 경우 대비)
+                json_str = json_str.replace('\\_', '_')
+                
+                parsed = json.loads(json_str)
+        
+        if parsed is not None:
             # 필수 필드 확인 및 기본값 설정 (이스케이프된 키와 일반 키 모두 시도)
             result = {
                 "on_brief": parsed.get("on_brief", parsed.get("on\\_brief", False)),
@@ -0,0 +1,204 @@
+"""LLaVa 스트리밍 응답 파서 - 구조화 응답 조기 종료"""
+########################################################
+# LLaVa 생성 조기 종료 (StoppingCriteria)
+#
+# 기능:
+# - 생성 중인 응답을 토큰 단위로 누적하여 증분 파싱
+# - JSON 응답: 첫 번째 JSON 객체가 닫히는 즉시 생성 중단 (문자열/이스케이프 인식)
+# - 필드 응답: 필요한 "Key: value" 줄이 모두 나오면 생성 중단
+# - 디코딩은 토큰 단위 직렬 연산이므로 JSON 뒤의 부연 설명을 생성하지 않는 만큼 지연 시간 감소
+# - 파서 설정 직렬화 (to_spec / detector_from_spec, remote 백엔드가 추론 워커에 같은 중단 조건 전달)
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Streaming JSON/field detectors and StoppingCriteria for LLaVa generation
+# version: 1.1.0
+# status: development
+# tags: llava, generation, stopping-criteria, json
+# dependencies: transformers, torch
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import re
+import json
+from typing import Any, Dict, Optional
+import logging
+
+# transformers/torch는 생성 시점에만 필요하므로 make_stopping_criteria 안에서 import (lazy import)
+logger = logging.getLogger(__name__)
+
+_LINE_COMMENT_PATTERN = re.compile(r'("(?:[^"\\]|\\.)*")|//[^\n]*')
+_TRAILING_COMMA_PATTERN = re.compile(r',\s*([}\]])')
+
+
+def loads_lenient_json(text: str) -> Optional[Any]:
+    """
+    LLaVa가 생성한 JSON 문자열 파싱 (// 주석, 이스케이프된 언더스코어, 후행 콤마 허용)
+
+    Returns:
+        파싱 결과 또는 None (파싱 실패)
+    """
+    cleaned = text.replace('\\_', '_')
+    # 문자열 밖의 // 주석 제거 (문자열 안의 URL 등은 유지)
+    cleaned = _LINE_COMMENT_PATTERN.sub(lambda m: m.group(1) or "", cleaned)
+    cleaned = _TRAILING_COMMA_PATTERN.sub(r'\1', cleaned)
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        return None
+
+
+class JsonObjectDetector:
+    """
+    첫 번째 JSON 객체가 닫히는 시점을 감지하는 증분 파서
+
+    feed()로 생성된 텍스트 조각을 순서대로 전달하면, 중괄호 깊이를 문자열/이스케이프를 고려해 추적한다.
+    객체가 닫히면 done=True, text에 객체 원문, result에 파싱 결과(dict, 실패 시 None)가 저장된다.
+    """
+
+    def __init__(self):
+        self.done = False
+        self.text: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> bool:
+        """텍스트 조각 추가, 객체가 닫혔으면 True"""
+        for ch in chunk:
+            if self.done:
+                break
+            if self._depth == 0:
+                if ch != '{':
+                    continue
+                self._depth = 1
+                self._buffer.append(ch)
+                continue
+            self._buffer.append(ch)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{':
+                self._depth += 1
+            elif ch == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._close()
+        return self.done
+
+    def _close(self):
+        self.done = True
+        self.text = "".join(self._buffer)
+        parsed = loads_lenient_json(self.text)
+        self.result = parsed if isinstance(parsed, dict) else None
+
+    def to_spec(self) -> Dict[str, Any]:
+        """파서 설정 (detector_from_spec으로 새 파서 생성)"""
+        return {"kind": "json"}
+
+
+class FieldsDetector:
+    """
+    필요한 필드 줄이 모두 생성된 시점을 감지하는 증분 파서
+
+    patterns의 정규식이 누적 텍스트에서 모두 매칭되면 done=True, result에 필드별 첫 번째 그룹이 저장된다.
+    줄 끝(\\n)까지 포함하는 정규식을 사용해야 값이 잘리지 않는다.
+    """
+
+    def __init__(self, patterns: Dict[str, str], flags: int = re.IGNORECASE):
+        self.done = False
+        self.result: Dict[str, str] = {}
+        self._patterns = {name: re.compile(pattern, flags) for name, pattern in patterns.items()}
+        self._flags = int(flags)
+        self._text = ""
+
+    def feed(self, chunk: str) -> bool:
+        """텍스트 조각 추가, 모든 필드가 나왔으면 True"""
+        if self.done:
+            return True
+        self._text += chunk
+        for name, pattern in self._patterns.items():
+            if name in self.result:
+                continue
+            match = pattern.search(self._text)
+            if match:
+                self.result[name] = match.group(1).strip()
+        self.done = len(self.result) == len(self._patterns)
+        return self.done
+
+    def to_spec(self) -> Dict[str, Any]:
+        """파서 설정 (detector_from_spec으로 새 파서 생성)"""
+        return {
+            "kind": "fields",
+            "patterns": {name: pattern.pattern for name, pattern in self._patterns.items()},
+            "flags": self._flags
+        }
+
+
+def detector_from_spec(spec: Dict[str, Any]):
+    """to_spec() 결과 → 같은 조건의 새 파서 (추론 워커에서 생성 중단 조건 복원)"""
+    if spec.get("kind") == "json":
+        return JsonObjectDetector()
+    if spec.get("kind") == "fields":
+        return FieldsDetector(spec["patterns"], spec.get("flags", re.IGNORECASE))
+    raise ValueError(f"알 수 없는 파서 종류: {spec.get('kind')}")
+
+
+_criteria_class = None
+
+
+def make_stopping_criteria(tokenizer, prompt_length: int, detector):
+    """
+    detector가 완료되면 생성을 중단하는 StoppingCriteriaList 생성
+
+    Args:
+        tokenizer: 디코딩용 토크나이저 (processor.tokenizer)
+        prompt_length: 입력 프롬프트 토큰 수 (이후 토큰만 디코딩)
+        detector: feed(text) -> bool 인터페이스의 증분 파서 (JsonObjectDetector, FieldsDetector)
+
+    Returns:
+        model.generate(stopping_criteria=...)에 전달할 StoppingCriteriaList
+    """
+    global _criteria_class
+    import torch
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    if _criteria_class is None:
+        class DetectorStoppingCriteria(StoppingCriteria):
+            """생성된 토큰을 디코딩해 증분 파서에 전달하고, 파서가 완료되면 중단"""
+
+            def __init__(self, tokenizer, prompt_length: int, detector):
+                self.tokenizer = tokenizer
+                self.prompt_length = prompt_length
+                self.detector = detector
+                self.decoded = ""
+                self.generated_tokens = 0
+
+            def __call__(self, input_ids, scores, **kwargs):
+                # 배치 크기 1 기준 (process_image_with_llava는 이미지 1장씩 생성)
+                generated = input_ids[0, self.prompt_length:]
+                self.generated_tokens = int(generated.shape[-1])
+                # 멀티바이트 문자/공백 병합을 위해 전체 생성 구간을 디코딩하고 새로 늘어난 부분만 전달
+                text = self.tokenizer.decode(generated, skip_special_tokens=True)
+                if text.endswith("�"):
+                    # 아직 완성되지 않은 멀티바이트 문자 (다음 토큰에서 이어서 디코딩)
+                    text = text[:-1]
+                if len(text) > len(self.decoded):
+                    self.detector.feed(text[len(self.decoded):])
+                    self.decoded = text
+                done = bool(self.detector.done)
+                return torch.full((input_ids.shape[0],), done, dtype=torch.bool, device=input_ids.device)
+
+        _criteria_class = DetectorStoppingCriteria
+
+    return StoppingCriteriaList([_criteria_class(tokenizer, prompt_length, detector)])
@@ -0,0 +1,340 @@
+"""모델 레지스트리 서비스"""
+########################################################
+# 모델 상주(residency) 관리
+#
+# 기능:
+# - LLaVA / YOLO / EasyOCR 모델 로딩을 한 곳에서 관리
+# - 모델별 single-flight 로딩 (동시 첫 요청이 와도 1회만 로드)
+# - 앱 시작 시 백그라운드 사전 로딩 (MODEL_PRELOAD) 및 준비 상태 조회 (/healthz)
+# - 디바이스별 메모리 예산 (GPU/RAM), 예산 초과 시 사용 중이 아닌 모델을 LRU 순으로 언로드
+# - 모델별 로드 시간 / 메모리 사용량 Prometheus 메트릭
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Model residency manager with memory budget and background preload
+# version: 1.2.0
+# status: development
+# tags: model, registry, memory
+# dependencies: prometheus_client
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import gc
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import logging
+from prometheus_client import Counter, Gauge, Histogram
+from services.stage_metrics import track_inference
+from config import MODEL_GPU_MEMORY_BUDGET_MB, MODEL_RAM_BUDGET_MB
+
+logger = logging.getLogger(__name__)
+
+# 모델 상태
+STATUS_NOT_LOADED = "not_loaded"
+STATUS_LOADING = "loading"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+# 메트릭 정의
+model_load_seconds = Histogram(
+    'model_load_seconds',
+    'Model load duration',
+    ['model'],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600)
+)
+model_memory_bytes = Gauge(
+    'model_memory_bytes',
+    'Measured memory used by a loaded model',
+    ['model', 'device']
+)
+model_loaded = Gauge(
+    'model_loaded',
+    'Whether the model is resident (1) or not (0)',
+    ['model']
+)
+model_evictions_total = Counter(
+    'model_evictions_total',
+    'Models unloaded to stay within the memory budget',
+    ['model']
+)
+
+
+def _rss_bytes() -> int:
+    """현재 프로세스 RSS (Linux /proc 기반, 실패 시 0)"""
+    try:
+        import os
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
+
+
+def _cuda_allocated_bytes() -> int:
+    """현재 CUDA 할당 메모리 (torch가 이미 로드된 경우만, 없으면 0)"""
+    torch = sys.modules.get("torch")
+    try:
+        if torch is not None and torch.cuda.is_available():
+            return int(torch.cuda.memory_allocated())
+    except Exception:
+        pass
+    return 0
+
+
+def _release_device_memory():
+    """언로드 후 메모리 반환 (GC + CUDA 캐시 정리)"""
+    gc.collect()
+    torch = sys.modules.get("torch")
+    try:
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except Exception:
+        pass
+
+
+class _ModelEntry:
+    """레지스트리에 등록된 모델 1개의 상태"""
+
+    def __init__(self, name: str, loader: Callable[[], Any], device: Callable[[], str],
+                 estimate_mb: int, unloader: Optional[Callable[[Any], None]]):
+        self.name = name
+        self.loader = loader
+        self.device = device
+        self.estimate_mb = estimate_mb
+        self.unloader = unloader
+        self.load_lock = threading.Lock()  # single-flight 로딩
+        self.model: Any = None
+        self.status = STATUS_NOT_LOADED
+        self.error: Optional[str] = None
+        self.device_name: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.memory_bytes = 0
+        self.last_used = 0.0
+        self.in_use = 0
+
+    def budget_bytes(self) -> int:
+        """예산 계산용 메모리 (측정값이 없으면 추정값)"""
+        return self.memory_bytes or self.estimate_mb * 1024 * 1024
+
+
+class ModelRegistry:
+    """모델 로딩/언로딩 및 메모리 예산 관리"""
+
+    def __init__(self):
+        self._entries: Dict[str, _ModelEntry] = {}
+        self._lock = threading.RLock()  # 레지스트리 상태 보호 (로딩 자체는 모델별 락)
+        self._preload_names: List[str] = []
+
+    def register(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        device: Callable[[], str],
+        estimate_mb: int = 0,
+        unloader: Optional[Callable[[Any], None]] = None
+    ):
+        """
+        모델 등록 (이미 등록된 이름이면 무시)
+
+        Args:
+            name: 모델 이름 (예: "llava", "yolo:yolov8x-seg.pt", "ocr")
+            loader: 모델 객체를 반환하는 로더 (무거운 import는 로더 안에서)
+            device: 모델이 올라갈 디바이스 반환 ("cuda" | "cpu")
+            estimate_mb: 첫 로드 전 예산 계산용 추정 메모리 (MB)
+            unloader: 언로드 시 정리 함수 (Optional)
+        """
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _ModelEntry(name, loader, device, estimate_mb, unloader)
+                model_loaded.labels(model=name).set(0)
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._entries
+
+    def is_loaded(self, name: str) -> bool:
+        """모델이 이미 상주 중인지 (추론 텔레메트리의 캐시 hit 판단)"""
+        entry = self._entries.get(name)
+        return entry is not None and entry.status == STATUS_READY
+
+    def get(self, name: str) -> Any:
+        """
+        모델 반환 (로드되지 않았으면 로드, 동시 호출 시 1회만 로드)
+
+        반환된 모델은 사용 중으로 표시되지 않으므로, 추론 구간에서는 use()를 사용해야 LRU 언로드 대상에서 제외된다.
+        """
+        entry = self._entries[name]
+        if entry.status != STATUS_READY:
+            with entry.load_lock:
+                if entry.status != STATUS_READY:
+                    self._load(entry)
+        entry.last_used = time.time()
+        return entry.model
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[Any]:
+        """추론 구간 동안 모델을 사용 중으로 표시 (예산 초과 시에도 언로드되지 않음, 단계 메트릭의 inference 구간)"""
+        entry = self._entries[name]
+        with self._lock:
+            entry.in_use += 1
+        try:
+            model = self.get(name)
+            with track_inference(name):
+                yield model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.time()
+
+    def _load(self, entry: _ModelEntry):
+        """모델 로드 (entry.load_lock 보유 상태에서 호출)"""
+        device = entry.device()
+        self._make_room(entry, device)
+
+        entry.status = STATUS_LOADING
+        entry.error = None
+        rss_before = _rss_bytes()
+        cuda_before = _cuda_allocated_bytes()
+        start = time.time()
+        logger.info(f"[ModelRegistry] 모델 로드 시작: {entry.name} (device={device})")
+        try:
+            model = entry.loader()
+        except Exception as e:
+            entry.status = STATUS_FAILED
+            entry.error = str(e)
+            logger.error(f"[ModelRegistry] 모델 로드 실패: {entry.name}: {e}")
+            raise
+        elapsed = time.time() - start
+
+        if device == "cuda":
+            memory_bytes = max(0, _cuda_allocated_bytes() - cuda_before)
+        else:
+            memory_bytes = max(0, _rss_bytes() - rss_before)
+        with self._lock:
+            entry.model = model
+            entry.device_name = device
+            entry.load_seconds = elapsed
+            entry.memory_bytes = memory_bytes
+            entry.last_used = time.time()
+            entry.status = STATUS_READY
+
+        model_load_seconds.labels(model=entry.name).observe(elapsed)
+        model_memory_bytes.labels(model=entry.name, device=device).set(memory_bytes)
+        model_loaded.labels(model=entry.name).set(1)
+        logger.info(
+            f"[ModelRegistry] ✓ 모델 로드 완료: {entry.name} (device={device}, "
+            f"load={elapsed:.1f}s, memory={memory_bytes / 1024**2:.0f}MB)"
+        )
+
+    def _budget_bytes(self, device: str) -> int:
+        budget_mb = MODEL_GPU_MEMORY_BUDGET_MB if device == "cuda" else MODEL_RAM_BUDGET_MB
+        return budget_mb * 1024 * 1024
+
+    def _make_room(self, entry: _ModelEntry, device: str):
+        """예산을 넘으면 같은 디바이스의 유휴 모델을 LRU 순으로 언로드"""
+        budget = self._budget_bytes(device)
+        if budget <= 0:
+            return
+        while True:
+            with self._lock:
+                resident = [
+                    e for e in self._entries.values()
+                    if e is not entry and e.status == STATUS_READY and e.device_name == device
+                ]
+                used = sum(e.budget_bytes() for e in resident)
+                if used + entry.budget_bytes() <= budget:
+                    return
+                idle = sorted((e for e in resident if e.in_use == 0), key=lambda e: e.last_used)
+                if not idle:
+                    logger.warning(
+                        f"[ModelRegistry] 메모리 예산 초과 예상이지만 언로드 가능한 유휴 모델 없음: "
+                        f"{entry.name} (device={device}, used={used / 1024**2:.0f}MB, "
+                        f"need={entry.budget_bytes() / 1024**2:.0f}MB, budget={budget / 1024**2:.0f}MB)"
+                    )
+                    return
+                victim = idle[0]
+            logger.info(f"[ModelRegistry] 메모리 예산 확보를 위해 모델 언로드: {victim.name} (LRU)")
+            if self.unload(victim.name):
+                model_evictions_total.labels(model=victim.name).inc()
+
+    def unload(self, name: str) -> bool:
+        """모델 언로드 (사용 중이면 언로드하지 않음)"""
+        entry = self._entries.get(name)
+        if entry is None:
+            return False
+        with entry.load_lock:
+            with self._lock:
+                if entry.status != STATUS_READY or entry.in_use > 0:
+                    return False
+                model = entry.model
+                entry.model = None
+                entry.status = STATUS_NOT_LOADED
+                entry.memory_bytes = 0
+            if entry.unloader is not None:
+                try:
+                    entry.unloader(model)
+                except Exception as e:
+                    logger.warning(f"[ModelRegistry] 언로드 정리 실패: {name}: {e}")
+            del model
+            _release_device_memory()
+        model_loaded.labels(model=name).set(0)
+        model_memory_bytes.labels(model=name, device=entry.device_name or "cpu").set(0)
+        logger.info(f"[ModelRegistry] 모델 언로드 완료: {name}")
+        return True
+
+    def preload(self, names: List[str]) -> threading.Thread:
+        """
+        백그라운드 스레드에서 모델 순차 로드 (앱 시작 시 호출)
+
+        Args:
+            names: 로드할 모델 이름 리스트 (등록되지 않은 이름은 무시)
+
+        Returns:
+            사전 로딩 스레드
+        """
+        names = [n for n in names if n in self._entries]
+        self._preload_names = names
+
+        def _run():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    logger.error(f"[ModelRegistry] 사전 로딩 실패: {name}: {e}")
+
+        thread = threading.Thread(target=_run, name="model-preload", daemon=True)
+        thread.start()
+        logger.info(f"[ModelRegistry] 백그라운드 사전 로딩 시작: {names}")
+        return thread
+
+    def status(self) -> Dict[str, Any]:
+        """
+        모델 상태 요약 (/healthz용)
+
+        Returns:
+            {
+                "ready": bool,  # 사전 로딩 대상 모델이 모두 ready인지
+                "models": {name: {"status", "device", "load_seconds", "memory_mb", "in_use", "error"}}
+            }
+        """
+        with self._lock:
+            models = {
+                e.name: {
+                    "status": e.status,
+                    "device": e.device_name,
+                    "load_seconds": round(e.load_seconds, 2) if e.load_seconds is not None else None,
+                    "memory_mb": round(e.memory_bytes / 1024**2, 1),
+                    "in_use": e.in_use,
+                    "error": e.error
+                }
+                for e in self._entries.values()
+            }
+            ready = all(self._entries[n].status == STATUS_READY for n in self._preload_names)
+        return {"ready": ready, "models": models}
+
+
+# 프로세스 전역 레지스트리
+model_registry = ModelRegistry()
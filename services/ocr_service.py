@@ -4,12 +4,13 @@
 # OCR (Optical Character Recognition) 서비스
 # - EasyOCR을 사용한 텍스트 추출
 # - OCR 정확도 계산
+# - 추론 백엔드 (OCR_BACKEND): local (EasyOCR) | remote (추론 워커) | stub (고정 결과)
 ########################################################
 # created_at: 2025-11-26
-# updated_at: 2025-11-26
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: OCR service for text recognition
-# version: 1.0.0
+# version: 1.3.0
 # status: production
 # tags: ocr, text-recognition
 # dependencies: easyocr, PIL, difflib
@@ -21,36 +22,77 @@ import logging
 from typing import Dict, Any, Optional, Tuple, List
 from PIL import Image
 import difflib
+from services.model_registry import model_registry
+from services.inference_backends import OcrBackend, RemoteOcrBackend, register_backend, get_backend
+from services.stub_models import StubOcrBackend
 
 logger = logging.getLogger(__name__)
 
-# EasyOCR은 lazy import (필요할 때만 로드)
-_ocr_reader = None
+# EasyOCR은 lazy import (필요할 때만 로드), Reader 객체는 모델 레지스트리가 소유
+
+
+def _get_ocr_device() -> str:
+    """EasyOCR 디바이스 (gpu=True로 초기화하므로 CUDA 사용 가능 시 cuda)"""
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _load_ocr_reader():
+    """EasyOCR Reader 로드 (모델 레지스트리 로더)"""
+    try:
+        import easyocr
+        import os
+        from config import EASYOCR_MODEL_DIR
+        
+        # EasyOCR 모델 경로 설정
+        # 환경 변수로 모델 경로 지정 (EasyOCR이 이 경로를 사용)
+        os.environ['EASYOCR_MODULE_PATH'] = EASYOCR_MODEL_DIR
+        
+        # 한글(ko)과 영어(en) 지원
+        reader = easyocr.Reader(['ko', 'en'], gpu=True, model_storage_directory=EASYOCR_MODEL_DIR)
+        logger.info(f"EasyOCR Reader 초기화 완료 (한글, 영어 지원, 모델 경로: {EASYOCR_MODEL_DIR})")
+        return reader
+    except ImportError:
+        logger.error("EasyOCR이 설치되지 않았습니다. pip install easyocr 실행 필요")
+        raise
+    except Exception as e:
+        logger.error(f"EasyOCR Reader 초기화 실패: {e}")
+        raise
+
+
+class LocalOcrBackend(OcrBackend):
+    """OCR local 백엔드 (EasyOCR Reader)"""
+
+    kind = "local"
+
+    def __init__(self):
+        super().__init__(max_batch_size=1, max_concurrency=2)
+        # 모델 레지스트리 등록 (검출 + 한글/영어 인식 모델 약 300MB)
+        model_registry.register("ocr", _load_ocr_reader, _get_ocr_device, estimate_mb=400)
+
+    def readtext(self, image_array):
+        # 추론 구간 동안 사용 중으로 표시 (메모리 예산 초과 시에도 언로드되지 않음)
+        with model_registry.use("ocr") as reader:
+            return reader.readtext(image_array)
+
+
+# 추론 백엔드 등록 (OCR_BACKEND로 선택, local / stub은 생성 시 모델 레지스트리에 등록)
+register_backend("ocr", "local", LocalOcrBackend)
+register_backend("ocr", "remote", RemoteOcrBackend)
+register_backend("ocr", "stub", StubOcrBackend)
+get_backend("ocr")
 
 
 def get_ocr_reader():
-    """EasyOCR Reader 싱글톤"""
-    global _ocr_reader
-    if _ocr_reader is None:
-        try:
-            import easyocr
-            import os
-            from config import EASYOCR_MODEL_DIR
-            
-            # EasyOCR 모델 경로 설정
-            # 환경 변수로 모델 경로 지정 (EasyOCR이 이 경로를 사용)
-            os.environ['EASYOCR_MODULE_PATH'] = EASYOCR_MODEL_DIR
-            
-            # 한글(ko)과 영어(en) 지원
-            _ocr_reader = easyocr.Reader(['ko', 'en'], gpu=True, model_storage_directory=EASYOCR_MODEL_DIR)
-            logger.info(f"EasyOCR Reader 초기화 완료 (한글, 영어 지원, 모델 경로: {EASYOCR_MODEL_DIR})")
-        except ImportError:
-            logger.error("EasyOCR이 설치되지 않았습니다. pip install easyocr 실행 필요")
-            raise
-        except Exception as e:
-            logger.error(f"EasyOCR Reader 초기화 실패: {e}")
-            raise
-    return _ocr_reader
+    """EasyOCR Reader 반환 (모델 레지스트리에서 로드, 1회)"""
+    return model_registry.get("ocr")
+
+
+def read_text(image_array) -> List[Tuple[Any, str, float]]:
+    """선택된 백엔드로 텍스트 인식 (동시 추론 수 제한, EasyOCR readtext 형식)"""
+    backend = get_backend("ocr")
+    with backend.slot():
+        return backend.readtext(image_array)
 
 
 def extract_text_from_image(
@@ -72,8 +114,6 @@ def extract_text_from_image(
         }
     """
     try:
-        reader = get_ocr_reader()
-        
         # 텍스트 영역이 지정된 경우 해당 영역만 추출
         if text_region:
             x, y, width, height = text_region
@@ -94,7 +134,7 @@ def extract_text_from_image(
         # EasyOCR 실행 (PIL Image를 numpy array로 변환)
         import numpy as np
         ocr_image_array = np.array(ocr_image)
-        results = reader.readtext(ocr_image_array)
+        results = read_text(ocr_image_array)
         
         # 결과 파싱
         recognized_texts = []
@@ -0,0 +1,648 @@
+"""Overlay 서비스 - 텍스트 피팅 및 다중 후보 렌더링"""
+########################################################
+# Overlay 렌더링 서비스
+# 
+# 기능:
+# - 텍스트를 영역에 맞게 폰트 크기/줄바꿈 조정 (fit_text, wrap_text)
+# - 상위 K개 proposal 병렬 렌더링 (프로세스 풀)
+# - 렌더링 결과 메모리 내 사전 평가 (대비 비율 + 금지 영역 겹침)
+# - 최종 텍스트 레이아웃/합성 (CPU 풀 워커에서 실행, 공유 메모리 버퍼)
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Overlay text fitting and multi-candidate rendering service
+# version: 1.2.1
+# status: development
+# tags: overlay, service, render
+# dependencies: pillow, numpy
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+from typing import List, Dict, Any, Optional, Tuple
+from PIL import Image, ImageDraw, ImageFont
+import numpy as np
+import logging
+from services.cpu_pool import shared_array, optional_shared_array, attach_array, run_cpu_task, map_cpu_tasks
+from services.readability_service import calculate_contrast_ratio_array, score_contrast_ratio
+
+logger = logging.getLogger(__name__)
+
+# 텍스트 영역 패딩 비율 (overlay 라우터와 동일)
+PADDING_RATIO = 0.08
+# 줄 간격 (multiline_text spacing)
+LINE_SPACING = 6
+# 후보 탈락 기준: 렌더링된 텍스트 영역의 금지 영역 겹침 비율
+MAX_FORBIDDEN_OVERLAP = 0.05
+
+# 폰트 객체 캐시 ((path, size) -> FreeTypeFont)
+# FreeType face는 스레드 간 공유가 안전하지 않으므로 단일 스레드인 CPU 풀 워커에서만 활성화
+_font_cache: Optional[Dict[Tuple[str, int], ImageFont.FreeTypeFont]] = None
+
+
+def enable_font_cache():
+    """현재 프로세스에서 폰트 객체 캐시 활성화 (CPU 풀 워커 초기화 시 호출)"""
+    global _font_cache
+    if _font_cache is None:
+        _font_cache = {}
+
+
+def fit_text(
+    draw: ImageDraw.ImageDraw,
+    text: str,
+    bbox: Tuple[int, int, int, int],
+    font_paths: list,
+    min_font_size: int,
+    max_font_size: int,
+) -> Tuple[ImageFont.FreeTypeFont, str]:
+    """
+    텍스트를 bbox에 맞게 조정 (old/overlay.py의 _fit_text 로직)
+    
+    Args:
+        draw: ImageDraw 객체
+        text: 원본 텍스트
+        bbox: (x0, y0, x1, y1) 형식의 박스
+        font_paths: 폰트 경로 후보 리스트
+        min_font_size: 최소 폰트 크기
+        max_font_size: 최대 폰트 크기
+    
+    Returns:
+        (font, wrapped_text): 최적의 폰트와 줄바꿈된 텍스트
+    """
+    max_width = bbox[2] - bbox[0]
+    max_height = bbox[3] - bbox[1]
+    
+    # 큰 폰트부터 작은 폰트까지 시도
+    logger.warning(f"Fitting text in bbox: max_width={max_width}, max_height={max_height}, font_size_range=[{min_font_size}, {max_font_size}]")
+    
+    for size in range(max_font_size, min_font_size - 1, -2):
+        font = load_font(font_paths, size)
+        wrapped = wrap_text(draw, text, font, max_width)
+        
+        # multiline_textbbox로 정확한 크기 계산
+        try:
+            bbox_text = draw.multiline_textbbox(
+                (0, 0),
+                wrapped,
+                font=font,
+                spacing=6,
+                align="center",
+            )
+            text_width = bbox_text[2] - bbox_text[0]
+            text_height = bbox_text[3] - bbox_text[1]
+            
+            logger.warning(f"Font size {size}: text_width={text_width}, text_height={text_height}, wrapped_lines={len(wrapped.split(chr(10)))}")
+            
+            if text_width <= max_width and text_height <= max_height:
+                logger.warning(f"✓ Text fitted with font size {size}: width={text_width}/{max_width}, height={text_height}/{max_height}")
+                return font, wrapped
+        except AttributeError:
+            # multiline_textbbox가 없는 경우 fallback
+            try:
+                # 각 줄의 크기를 개별적으로 계산
+                lines = wrapped.split("\n")
+                text_width = 0
+                text_height = 0
+                for line in lines:
+                    try:
+                        line_bbox = draw.textbbox((0, 0), line, font=font)
+                        line_w = line_bbox[2] - line_bbox[0]
+                        line_h = line_bbox[3] - line_bbox[1]
+                    except AttributeError:
+                        try:
+                            line_w, line_h = draw.textsize(line, font=font)
+                        except:
+                            line_w = len(line) * size // 2
+                            line_h = size
+                    text_width = max(text_width, line_w)
+                    text_height += line_h
+                text_height += 6 * (len(lines) - 1)  # spacing
+                
+                if text_width <= max_width and text_height <= max_height:
+                    logger.info(f"Text fitted with font size {size} (fallback): width={text_width}/{max_width}, height={text_height}/{max_height}")
+                    return font, wrapped
+            except Exception as e:
+                logger.warning(f"Error calculating text size for font {size}: {e}")
+                continue
+    
+    # 최소 폰트 크기로 강제 적용
+    logger.warning(
+        f"텍스트를 박스에 맞추지 못했습니다. 최소 폰트 크기 {min_font_size}로 강제 적용합니다."
+    )
+    font = load_font(font_paths, min_font_size)
+    wrapped = wrap_text(draw, text, font, max_width)
+    return font, wrapped
+
+
+def wrap_text(
+    draw: ImageDraw.ImageDraw,
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    max_width: int,
+) -> str:
+    """
+    텍스트를 단어 단위로 나누어서 max_width에 맞게 줄바꿈
+    쉼표(,)나 마침표(.) 뒤에서 자연스러운 줄바꿈 우선 고려
+    
+    Args:
+        draw: ImageDraw 객체
+        text: 원본 텍스트
+        font: 폰트 객체
+        max_width: 최대 너비
+    
+    Returns:
+        줄바꿈된 텍스트
+    """
+    words = text.split()
+    if not words:
+        return text
+    
+    lines: list = []
+    current: list = []
+    
+    for i, word in enumerate(words):
+        test_line = " ".join(current + [word]) if current else word
+        
+        # 텍스트 너비 계산
+        try:
+            bbox = draw.textbbox((0, 0), test_line, font=font)
+            width = bbox[2] - bbox[0]
+        except AttributeError:
+            try:
+                width, _ = draw.textsize(test_line, font=font)
+            except:
+                # 최후의 수단: 대략적인 계산
+                width = len(test_line) * font.size // 2
+        
+        # 너비가 초과하는 경우
+        if width > max_width:
+            if not current:
+                # 첫 단어도 너비 초과하면 그냥 추가 (강제)
+                current.append(word)
+            else:
+                # 현재 줄을 저장하고 새 줄 시작
+                # 쉼표나 마침표 뒤에서 줄바꿈이 자연스러운지 확인
+                should_break_at_punctuation = False
+                
+                # 현재 줄의 마지막 단어에 쉼표나 마침표가 있는지 확인
+                if current:
+                    last_word = current[-1]
+                    # 쉼표나 마침표로 끝나는 경우 (한글/영문 모두 지원)
+                    if (last_word.endswith(',') or last_word.endswith('.') or 
+                        last_word.endswith('，') or last_word.endswith('。')):
+                        should_break_at_punctuation = True
+                        logger.debug(f"[줄바꿈] 구두점 뒤에서 자연스러운 줄바꿈: '{last_word}'")
+                
+                # 현재 줄 저장
+                lines.append(" ".join(current))
+                
+                # 새 줄 시작
+                current = [word]
+                
+                # 구두점 뒤에서 줄바꿈한 경우 로그
+                if should_break_at_punctuation:
+                    logger.debug(f"[줄바꿈] 구두점 뒤에서 줄바꿈 완료")
+        else:
+            # 너비가 초과하지 않으면 현재 줄에 추가
+            current.append(word)
+            
+            # 쉼표나 마침표 뒤에서 자연스러운 줄바꿈 고려
+            # 현재 단어가 구두점으로 끝나는 경우, 구두점 뒤에서 줄바꿈 우선 고려
+            if (word.endswith(',') or word.endswith('.') or 
+                word.endswith('，') or word.endswith('。')):
+                # 다음 단어가 있는지 확인
+                if i + 1 < len(words):
+                    next_word = words[i + 1]
+                    # 다음 단어를 추가한 경우의 너비 확인
+                    test_with_next = " ".join(current + [next_word])
+                    try:
+                        bbox_next = draw.textbbox((0, 0), test_with_next, font=font)
+                        width_with_next = bbox_next[2] - bbox_next[0]
+                    except AttributeError:
+                        try:
+                            width_with_next, _ = draw.textsize(test_with_next, font=font)
+                        except:
+                            width_with_next = len(test_with_next) * font.size // 2
+                    
+                    # 구두점 뒤에서 줄바꿈 조건:
+                    # 1. 다음 단어를 추가하면 너비를 초과하는 경우
+                    # 2. 현재 너비가 max_width의 50% 이상인 경우 (자연스러운 줄바꿈) - 70%에서 50%로 완화
+                    # 3. 구두점 뒤에서 항상 줄바꿈 고려 (너비가 충분해도 구두점 뒤에서 줄바꿈)
+                    should_break = False
+                    if width_with_next > max_width:
+                        should_break = True
+                        logger.info(f"[줄바꿈] 구두점 뒤에서 예방적 줄바꿈: '{word}' 다음에 '{next_word}' 추가 시 너비 초과 예상 (현재: {width:.1f}/{max_width}, 다음: {width_with_next:.1f}/{max_width})")
+                    elif width >= max_width * 0.5:  # 70%에서 50%로 완화
+                        should_break = True
+                        logger.info(f"[줄바꿈] 구두점 뒤에서 자연스러운 줄바꿈: '{word}' (현재 너비: {width:.1f}/{max_width}, {width/max_width*100:.1f}% 사용)")
+                    else:
+                        # 너비가 충분해도 구두점 뒤에서 줄바꿈 고려 (특히 쉼표의 경우)
+                        # 단, 너비가 너무 작으면(30% 미만) 줄바꿈하지 않음
+                        if width >= max_width * 0.3 and word.endswith(','):
+                            should_break = True
+                            logger.info(f"[줄바꿈] 구두점(쉼표) 뒤에서 강제 줄바꿈: '{word}' (현재 너비: {width:.1f}/{max_width}, {width/max_width*100:.1f}% 사용)")
+                    
+                    if should_break:
+                        lines.append(" ".join(current))
+                        current = []
+    
+    # 마지막 줄 추가
+    if current:
+        lines.append(" ".join(current))
+    
+    return "\n".join(lines)
+
+
+def load_font(font_paths: list, size: int) -> ImageFont.FreeTypeFont:
+    """
+    여러 경로에서 폰트 로드 시도 (old/overlay.py의 _load_font 로직)
+    
+    Raises:
+        OSError: 어떤 경로도 열 수 없는 경우
+    
+    Args:
+        font_paths: 폰트 경로 후보 리스트
+        size: 폰트 크기
+    
+    Returns:
+        ImageFont 객체
+    """
+    for path in font_paths:
+        if _font_cache is not None and (path, size) in _font_cache:
+            return _font_cache[(path, size)]
+        try:
+            font = ImageFont.truetype(path, size)
+            logger.debug(f"Font loaded: {path} (size={size})")
+            if _font_cache is not None:
+                _font_cache[(path, size)] = font
+            return font
+        except Exception as exc:
+            logger.debug(f"Failed to load font {path}: {exc}")
+            continue
+    
+    # 기본 폰트(load_default)로 조용히 대체하지 않음 (한글이 깨진 결과물 방지)
+    # font_paths는 폰트 레지스트리에서 검증된 경로를 전달해야 함
+    raise OSError(f"폰트를 로드할 수 없습니다: font_paths={font_paths}")
+
+
+def _font_file_path(font: ImageFont.ImageFont) -> Optional[str]:
+    """폰트 파일 경로 (기본 폰트처럼 파일 경로가 없으면 None)"""
+    path = getattr(font, "path", None)
+    return path if isinstance(path, str) else None
+
+
+def padded_text_bbox(
+    x: int, y: int, pw: int, ph: int,
+    img_w: int, img_h: int,
+    padding_ratio: float = PADDING_RATIO
+) -> Tuple[int, int, int, int]:
+    """
+    overlay 영역에 패딩을 적용한 텍스트 영역 계산
+    
+    Args:
+        x, y, pw, ph: overlay 영역 (픽셀)
+        img_w, img_h: 이미지 크기
+        padding_ratio: 패딩 비율
+    
+    Returns:
+        (x0, y0, x1, y1) 형식의 텍스트 영역
+    """
+    pad_x = int(pw * padding_ratio)
+    pad_y = int(ph * padding_ratio)
+    return (
+        max(0, x + pad_x),
+        max(0, y + pad_y),
+        min(img_w, x + pw - pad_x),
+        min(img_h, y + ph - pad_y)
+    )
+
+
+def select_top_k_proposals(
+    proposals_list: List[Dict[str, Any]],
+    k: int,
+    max_forbidden_iou: float = 0.05
+) -> List[Dict[str, Any]]:
+    """
+    점수 상위 K개 proposal 선택 (occlusion_iou 허용 범위 초과 proposal 제외)
+    
+    Args:
+        proposals_list: planner proposal 리스트
+        k: 선택할 개수
+        max_forbidden_iou: 최대 허용 occlusion_iou
+    
+    Returns:
+        점수 내림차순으로 정렬된 proposal 리스트 (최대 k개)
+    """
+    valid = [
+        p for p in proposals_list
+        if p.get("xywh") and p.get("occlusion_iou", 0.0) <= max_forbidden_iou
+    ]
+    valid.sort(key=lambda p: p.get("score") if p.get("score") is not None else 0.5, reverse=True)
+    return valid[:k]
+
+
+def score_overlay_candidate(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    proposal 1개를 메모리에서 렌더링하고 사전 평가 (프로세스 풀 워커에서 실행)
+    
+    텍스트 피팅 후 글리프 마스크를 그려 다음 항목을 계산:
+    - 글리프 아래 배경 픽셀과 텍스트 색상 간 대비 비율 (벡터 연산, 하위 10% 값 사용)
+    - 렌더링된 텍스트 영역과 금지 영역 마스크의 겹침 비율
+    
+    Args:
+        task: {
+            "base": SharedArray | np.ndarray (H, W, 3) uint8,   # 디코딩된 원본 이미지
+            "forbidden": Optional[SharedArray | np.ndarray] (H, W) bool,  # 금지 영역 마스크
+            "proposal": dict,                      # planner proposal (xywh 포함)
+            "text": str,
+            "font_paths": list,
+            "min_font_size": int,
+            "max_font_size": int,
+            "text_rgba": Tuple[int, int, int, int],
+            "overlay_rgba": Tuple[int, int, int, int]
+        }
+    
+    Returns:
+        {
+            "proposal": dict,
+            "box": (x, y, pw, ph),
+            "text_rgba": Tuple[int, int, int, int],
+            "font_path": Optional[str],
+            "font_size": Optional[int],
+            "wrapped_text": str,
+            "contrast_ratio": float,
+            "readability_score": float,
+            "forbidden_overlap": float,
+            "score": float
+        }
+    """
+    return _score_overlay_candidate(task, attach_array(task["base"]), attach_array(task.get("forbidden")))
+
+
+def _score_overlay_candidate(
+    task: Dict[str, Any],
+    base: np.ndarray,
+    forbidden: Optional[np.ndarray]
+) -> Dict[str, Any]:
+    """score_overlay_candidate 본체 (base/forbidden은 연결된 배열)"""
+    proposal = task["proposal"]
+    img_h, img_w = base.shape[:2]
+    
+    x_ratio, y_ratio, width_ratio, height_ratio = proposal["xywh"]
+    x, y, pw, ph = (int(img_w * x_ratio), int(img_h * y_ratio), int(img_w * width_ratio), int(img_h * height_ratio))
+    x0, y0, x1, y1 = padded_text_bbox(x, y, pw, ph, img_w, img_h)
+    
+    result = {
+        "proposal": proposal,
+        "box": (x, y, pw, ph),
+        "text_rgba": task["text_rgba"],
+        "font_path": None,
+        "font_size": None,
+        "wrapped_text": task["text"],
+        "contrast_ratio": 1.0,
+        "readability_score": 0.0,
+        "forbidden_overlap": 1.0,
+        "score": float("-inf")
+    }
+    if x1 <= x0 or y1 <= y0:
+        return result
+    
+    # 텍스트 피팅 (패딩 영역 크기의 로컬 캔버스에서 계산)
+    glyph_mask = Image.new("L", (x1 - x0, y1 - y0), 0)
+    draw = ImageDraw.Draw(glyph_mask)
+    font, wrapped = fit_text(
+        draw, task["text"], (0, 0, x1 - x0, y1 - y0),
+        task["font_paths"], task["min_font_size"], task["max_font_size"]
+    )
+    draw.multiline_text(
+        ((x1 - x0) / 2, (y1 - y0) / 2),
+        wrapped,
+        font=font,
+        fill=255,
+        anchor="mm",
+        align="center",
+        spacing=LINE_SPACING,
+    )
+    mask = np.asarray(glyph_mask) > 127
+    
+    # 글리프 아래 배경 픽셀 (overlay 배경 색상이 있으면 알파 합성)
+    background = base[y0:y1, x0:x1].astype(np.float32)
+    overlay_rgba = task.get("overlay_rgba") or (0, 0, 0, 0)
+    if overlay_rgba[3] > 0:
+        alpha = overlay_rgba[3] / 255.0
+        background = background * (1.0 - alpha) + np.array(overlay_rgba[:3], dtype=np.float32) * alpha
+    glyph_pixels = background[mask]
+    
+    font_size = getattr(font, "size", None)
+    if glyph_pixels.size:
+        contrasts = calculate_contrast_ratio_array(task["text_rgba"][:3], glyph_pixels)
+        contrast_ratio = float(np.percentile(contrasts, 10))
+    else:
+        contrast_ratio = 1.0
+    is_large_text = bool(font_size and font_size / 1.33 >= 18)
+    readability_score = score_contrast_ratio(contrast_ratio, is_large_text)["readability_score"]
+    
+    # 실제 렌더링된 텍스트 영역과 금지 영역의 겹침 비율
+    forbidden_overlap = 0.0
+    if forbidden is not None and mask.any():
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        text_region = forbidden[y0 + rows[0]:y0 + rows[-1] + 1, x0 + cols[0]:x0 + cols[-1] + 1]
+        forbidden_overlap = float(text_region.mean()) if text_region.size else 0.0
+    
+    # 종합 점수: 가독성 60% + 폰트 크기 25% + planner 점수 15%, 금지 영역 겹침은 감점
+    size_range = max(1, task["max_font_size"] - task["min_font_size"])
+    size_score = min(1.0, max(0.0, ((font_size or task["min_font_size"]) - task["min_font_size"]) / size_range))
+    planner_score = proposal.get("score")
+    planner_score = min(1.0, max(0.0, planner_score)) if planner_score is not None else 0.5
+    score = 0.6 * readability_score + 0.25 * size_score + 0.15 * planner_score - 2.0 * forbidden_overlap
+    if forbidden_overlap > MAX_FORBIDDEN_OVERLAP:
+        score -= 1.0
+    
+    result.update({
+        "font_path": _font_file_path(font),
+        "font_size": font_size,
+        "wrapped_text": wrapped,
+        "contrast_ratio": contrast_ratio,
+        "readability_score": float(readability_score),
+        "forbidden_overlap": forbidden_overlap,
+        "score": float(score)
+    })
+    return result
+
+
+def render_overlay_candidates(
+    image: Image.Image,
+    proposals: List[Dict[str, Any]],
+    text: str,
+    font_paths: list,
+    min_font_size: int,
+    max_font_size: int,
+    text_rgba: Tuple[int, int, int, int],
+    overlay_rgba: Tuple[int, int, int, int] = (0, 0, 0, 0),
+    forbidden_mask: Optional[Image.Image] = None,
+    candidate_text_rgba: Optional[List[Tuple[int, int, int, int]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    여러 proposal을 병렬 렌더링하고 사전 평가 점수 내림차순으로 반환
+    
+    이미지는 한 번만 디코딩하여 공유 메모리로 모든 후보(CPU 풀 워커)가 공유하며, 결과 이미지는 반환하지 않는다
+    (최종 후보만 호출 측에서 다시 그려서 저장).
+    
+    Args:
+        image: 원본 이미지
+        proposals: 평가할 proposal 리스트
+        text: 오버레이할 텍스트
+        font_paths: 폰트 경로 후보 리스트
+        min_font_size, max_font_size: 폰트 크기 범위
+        text_rgba: 텍스트 색상
+        overlay_rgba: overlay 배경 색상 (알파 0이면 배경 없음)
+        forbidden_mask: 금지 영역 마스크 (L 모드, Optional)
+        candidate_text_rgba: proposal별 텍스트 색상 (proposals와 같은 순서, 지정 시 text_rgba 대신 사용)
+    
+    Returns:
+        score_overlay_candidate 결과 리스트 (score 내림차순)
+    """
+    base = np.asarray(image.convert("RGB"))
+    forbidden = None
+    if forbidden_mask is not None:
+        mask_img = forbidden_mask.convert("L")
+        if mask_img.size != image.size:
+            mask_img = mask_img.resize(image.size, Image.NEAREST)
+        forbidden = np.asarray(mask_img) > 128
+    
+    # 원본 이미지/마스크는 공유 메모리로 한 번만 전달 (후보마다 pickle 복사하지 않음)
+    with shared_array(base) as base_handle, optional_shared_array(forbidden) as forbidden_handle:
+        tasks = [
+            {
+                "base": base_handle,
+                "forbidden": forbidden_handle,
+                "proposal": proposal,
+                "text": text,
+                "font_paths": font_paths,
+                "min_font_size": min_font_size,
+                "max_font_size": max_font_size,
+                "text_rgba": candidate_text_rgba[i] if candidate_text_rgba else text_rgba,
+                "overlay_rgba": overlay_rgba
+            }
+            for i, proposal in enumerate(proposals)
+        ]
+        results = map_cpu_tasks(score_overlay_candidate, tasks)
+    
+    results.sort(key=lambda r: r["score"], reverse=True)
+    for rank, r in enumerate(results):
+        logger.info(
+            f"[Overlay 후보 렌더링] #{rank + 1} source={r['proposal'].get('source')}, score={r['score']:.3f}, "
+            f"contrast={r['contrast_ratio']:.2f}, readability={r['readability_score']:.3f}, "
+            f"forbidden_overlap={r['forbidden_overlap']:.4f}, font_size={r['font_size']}"
+        )
+    return results
+
+
+def compose_overlay_task(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    텍스트 레이아웃 + overlay 배경 합성 + 텍스트 그리기 (CPU 풀 워커에서 실행)
+    
+    canvas(RGBA 공유 메모리 버퍼)에 결과를 직접 기록한다.
+    
+    Args:
+        task: {
+            "canvas": SharedArray | np.ndarray (H, W, 4) uint8,  # 입력 겸 출력 버퍼
+            "box": (x, y, pw, ph),
+            "text": str,
+            "font_paths": list,
+            "min_font_size": int,
+            "max_font_size": int,
+            "text_rgba": Tuple[int, int, int, int],
+            "overlay_rgba": Tuple[int, int, int, int],
+            "fitted": Optional[dict]  # {"font_path", "font_size", "wrapped_text"} (이미 피팅된 경우)
+        }
+    
+    Returns:
+        {"font_path": Optional[str], "font_size": Optional[int], "wrapped_text": str}
+    """
+    canvas = attach_array(task["canvas"])
+    im = Image.fromarray(np.array(canvas), "RGBA")
+    img_w, img_h = im.size
+    x, y, pw, ph = task["box"]
+    padded_bbox = padded_text_bbox(x, y, pw, ph, img_w, img_h)
+    
+    fitted = task.get("fitted")
+    draw = ImageDraw.Draw(im)
+    if fitted:
+        font = load_font([fitted["font_path"]], fitted["font_size"])
+        wrapped = fitted["wrapped_text"]
+    else:
+        font, wrapped = fit_text(
+            draw, task["text"], padded_bbox, task["font_paths"],
+            task["min_font_size"], task["max_font_size"]
+        )
+    
+    # overlay rect 적용 (선택된 영역에만)
+    overlay_rgba = task.get("overlay_rgba") or (0, 0, 0, 0)
+    if overlay_rgba[3] > 0 and pw > 0 and ph > 0:
+        im.alpha_composite(Image.new("RGBA", (pw, ph), tuple(overlay_rgba)), dest=(x, y))
+    
+    # 텍스트 그리기 (영역 중앙 정렬)
+    draw = ImageDraw.Draw(im)
+    draw.multiline_text(
+        ((padded_bbox[0] + padded_bbox[2]) / 2, (padded_bbox[1] + padded_bbox[3]) / 2),
+        wrapped,
+        font=font,
+        fill=tuple(task["text_rgba"]),
+        anchor="mm",
+        align="center",
+        spacing=LINE_SPACING,
+    )
+    canvas[...] = np.asarray(im)
+    
+    return {
+        "font_path": _font_file_path(font),
+        "font_size": getattr(font, "size", None),
+        "wrapped_text": wrapped
+    }
+
+
+def compose_overlay(
+    image: Image.Image,
+    box: Tuple[int, int, int, int],
+    text: str,
+    font_paths: list,
+    min_font_size: int,
+    max_font_size: int,
+    text_rgba: Tuple[int, int, int, int],
+    overlay_rgba: Tuple[int, int, int, int] = (0, 0, 0, 0),
+    fitted: Optional[Dict[str, Any]] = None
+) -> Tuple[Image.Image, Dict[str, Any]]:
+    """
+    최종 오버레이 이미지 생성 (CPU 풀 워커에서 레이아웃/합성, 이미지 버퍼는 공유 메모리로 전달)
+    
+    Args:
+        image: 원본 이미지
+        box: overlay 영역 (x, y, pw, ph) 픽셀
+        text: 오버레이할 텍스트
+        font_paths: 폰트 경로 후보 리스트
+        min_font_size, max_font_size: 폰트 크기 범위
+        text_rgba: 텍스트 색상
+        overlay_rgba: overlay 배경 색상 (알파 0이면 배경 없음)
+        fitted: 이미 피팅된 폰트/줄바꿈 정보 (다중 후보 렌더링 결과), 없으면 워커에서 피팅
+    
+    Returns:
+        (rendered_image, {"font_path", "font_size", "wrapped_text"})
+    """
+    canvas = np.asarray(image.convert("RGBA"))
+    with shared_array(canvas) as canvas_handle:
+        info = run_cpu_task(compose_overlay_task, {
+            "canvas": canvas_handle,
+            "box": tuple(int(v) for v in box),
+            "text": text,
+            "font_paths": font_paths,
+            "min_font_size": min_font_size,
+            "max_font_size": max_font_size,
+            "text_rgba": tuple(text_rgba),
+            "overlay_rgba": tuple(overlay_rgba),
+            "fitted": fitted
+        })
+        rendered_image = Image.fromarray(np.array(attach_array(canvas_handle)), "RGBA")
+    return rendered_image, info
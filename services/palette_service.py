@@ -0,0 +1,227 @@
+"""팔레트 기반 폰트 스타일 추천 서비스"""
+########################################################
+# 결정적(deterministic) 폰트 색상 / 스타일 / 크기 추천
+#
+# 기능:
+# - 텍스트가 놓일 영역의 대표 색상 팔레트 추출 (NumPy median-cut)
+# - 팔레트 주요 색상 대비 WCAG 대비 비율이 최대인 텍스트 색상 선택
+# - 영역 크기와 텍스트 길이로 font_size_category 결정
+# - 영역 채도/복잡도로 font_style 결정
+# - LLaVA 생성 없이 수 ms 내 실행 (FONT_RECOMMENDER=palette, LLaVA 추천은 선택적 보정)
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Palette-based deterministic font color/style/size recommender
+# version: 1.0.0
+# status: development
+# tags: palette, font, color, wcag
+# dependencies: numpy, pillow
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+from typing import Any, Dict, List, Optional, Tuple
+from PIL import Image
+import numpy as np
+import logging
+from fonts import FONT_SIZE_MAP
+from services.readability_service import calculate_relative_luminance_array
+
+logger = logging.getLogger(__name__)
+
+# 팔레트 추출 설정
+PALETTE_SIZE = 5
+_MAX_SAMPLES = 4096  # 영역 픽셀 샘플 상한 (큰 영역도 ms 단위로 처리)
+# 텍스트 색상 판단에 사용할 팔레트 색상 최소 비중 (작은 잡색 무시)
+_DOMINANT_WEIGHT = 0.1
+# 틴트 색상은 모든 주요 색상 대비 AAA(7:1)를 만족할 때만 사용 (아니면 흰색/검정 중 최대 대비)
+_TINT_MIN_CONTRAST = 7.0
+
+# 글자 폭 추정 (폰트 크기 대비, 한글은 정사각형, 라틴/숫자는 약 0.6)
+_HANGUL_WIDTH = 1.0
+_OTHER_WIDTH = 0.6
+_LINE_HEIGHT = 1.2
+_MAX_LINES = 2
+
+
+def extract_palette(pixels: np.ndarray, size: int = PALETTE_SIZE) -> List[Tuple[Tuple[int, int, int], float]]:
+    """
+    median-cut 팔레트 추출
+
+    범위가 가장 넓은 채널 기준으로 픽셀이 가장 많은 박스를 중앙값에서 반복 분할한다.
+
+    Args:
+        pixels: (N, 3) RGB 배열 (0-255)
+        size: 팔레트 색상 수
+
+    Returns:
+        [(RGB 튜플, 비중), ...] 비중 내림차순
+    """
+    pixels = np.asarray(pixels, dtype=np.uint8).reshape(-1, 3)
+    if len(pixels) == 0:
+        return []
+    if len(pixels) > _MAX_SAMPLES:
+        # 균일 간격 샘플링 (결정적)
+        pixels = pixels[np.linspace(0, len(pixels) - 1, _MAX_SAMPLES).astype(np.int64)]
+
+    boxes = [pixels]
+    while len(boxes) < size:
+        # 분할 가능한 박스 중 (픽셀 수 × 최대 채널 범위)가 가장 큰 박스 선택
+        scores = [len(b) * int(np.ptp(b, axis=0).max()) if len(b) > 1 else 0 for b in boxes]
+        index = int(np.argmax(scores))
+        if scores[index] == 0:
+            break
+        box = boxes.pop(index)
+        channel = int(np.argmax(np.ptp(box, axis=0)))
+        box = box[np.argsort(box[:, channel], kind="stable")]
+        middle = len(box) // 2
+        boxes.extend([box[:middle], box[middle:]])
+
+    # 같은 대표 색상으로 수렴한 박스는 합침
+    total = float(len(pixels))
+    merged: Dict[Tuple[int, int, int], float] = {}
+    for box in boxes:
+        if len(box):
+            color = tuple(int(round(v)) for v in box.mean(axis=0))
+            merged[color] = merged.get(color, 0.0) + len(box) / total
+    return sorted(merged.items(), key=lambda item: item[1], reverse=True)
+
+
+def _region_pixels(
+    image: Image.Image,
+    region: Tuple[int, int, int, int],
+    overlay_rgba: Optional[Tuple[int, int, int, int]] = None
+) -> np.ndarray:
+    """텍스트 영역 (x1, y1, x2, y2) 픽셀, overlay 배경이 있으면 알파 합성한 결과"""
+    x1, y1, x2, y2 = region
+    crop = np.asarray(image.crop((x1, y1, max(x1 + 1, x2), max(y1 + 1, y2))).convert("RGB"), dtype=np.float32)
+    if overlay_rgba and overlay_rgba[3] > 0:
+        alpha = overlay_rgba[3] / 255.0
+        crop = crop * (1.0 - alpha) + np.array(overlay_rgba[:3], dtype=np.float32) * alpha
+    return crop.reshape(-1, 3).astype(np.uint8)
+
+
+def _contrast_matrix(candidates: np.ndarray, backgrounds: np.ndarray) -> np.ndarray:
+    """(C, 3) 후보 색상 × (B, 3) 배경 색상 WCAG 대비 비율 (C, B)"""
+    lc = calculate_relative_luminance_array(candidates)[:, None]
+    lb = calculate_relative_luminance_array(backgrounds)[None, :]
+    return (np.maximum(lc, lb) + 0.05) / (np.minimum(lc, lb) + 0.05)
+
+
+def pick_text_color(palette: List[Tuple[Tuple[int, int, int], float]]) -> Tuple[Tuple[int, int, int], float]:
+    """
+    팔레트 주요 색상 대비 최소 대비 비율이 최대인 텍스트 색상 선택
+
+    후보: 흰색, 검정, 팔레트 색상의 밝은/어두운 틴트 (흰색/검정과 85% 혼합).
+    틴트는 모든 주요 색상 대비 AAA(7:1)를 만족할 때만 선택하여 배경과 어울리는 색을 우선한다.
+
+    Returns:
+        (RGB 튜플, 주요 색상 대비 최소 대비 비율)
+    """
+    if not palette:
+        return (255, 255, 255), 1.0
+    dominant = [color for color, weight in palette if weight >= _DOMINANT_WEIGHT] or [palette[0][0]]
+    backgrounds = np.array(dominant, dtype=np.float32)
+
+    neutrals = np.array([[255, 255, 255], [0, 0, 0]], dtype=np.float32)
+    neutral_scores = _contrast_matrix(neutrals, backgrounds).min(axis=1)
+    best = int(np.argmax(neutral_scores))
+    best_color, best_score = neutrals[best], float(neutral_scores[best])
+
+    colors = np.array([color for color, _ in palette], dtype=np.float32)
+    tints = np.concatenate([colors * 0.15 + 255 * 0.85, colors * 0.15])
+    tint_scores = _contrast_matrix(tints, backgrounds).min(axis=1)
+    tint_index = int(np.argmax(tint_scores))
+    if tint_scores[tint_index] >= _TINT_MIN_CONTRAST:
+        best_color, best_score = tints[tint_index], float(tint_scores[tint_index])
+
+    return tuple(int(round(v)) for v in best_color), best_score
+
+
+def estimate_size_category(text: str, available_width: int, available_height: int) -> Tuple[str, int]:
+    """
+    영역에 들어가는 최대 폰트 크기를 추정하여 FONT_SIZE_MAP 카테고리로 변환
+
+    최대 _MAX_LINES줄 줄바꿈을 가정하고, 글자 폭은 한글 1.0em / 그 외 0.6em로 추정한다.
+
+    Returns:
+        (카테고리, 추정 폰트 크기 px)
+    """
+    text = text or ""
+    units = sum(_HANGUL_WIDTH if "가" <= ch <= "힣" else _OTHER_WIDTH for ch in text if not ch.isspace())
+    units += 0.3 * sum(1 for ch in text if ch.isspace())
+    lines = 1 if units * _LINE_HEIGHT * available_height < available_width else _MAX_LINES
+    by_width = available_width * lines / max(units, 1.0)
+    by_height = available_height / (lines * _LINE_HEIGHT)
+    size = int(max(1, min(by_width, by_height)))
+    for category in ("small", "medium"):
+        if size < FONT_SIZE_MAP[category][1]:
+            return category, size
+    return "large", size
+
+
+def estimate_font_style(pixels: np.ndarray, palette: List[Tuple[Tuple[int, int, int], float]]) -> str:
+    """
+    영역 복잡도/채도로 font_style 결정
+
+    - 배경이 복잡함 (휘도 표준편차 큼) → bold (획이 두꺼워야 읽힘)
+    - 채도가 낮고 밝은 차분한 배경 → serif
+    - 그 외 → sans-serif
+    """
+    luminance = calculate_relative_luminance_array(pixels)
+    if float(luminance.std()) > 0.18:
+        return "bold"
+    colors = np.array([color for color, _ in palette], dtype=np.float32) / 255.0
+    weights = np.array([weight for _, weight in palette], dtype=np.float32)
+    saturation = (colors.max(axis=1) - colors.min(axis=1)) / np.maximum(colors.max(axis=1), 1e-6)
+    if float((saturation * weights).sum()) < 0.2 and float(luminance.mean()) > 0.5:
+        return "serif"
+    return "sans-serif"
+
+
+def recommend_text_style(
+    image: Image.Image,
+    region: Tuple[int, int, int, int],
+    text: str,
+    overlay_rgba: Optional[Tuple[int, int, int, int]] = None
+) -> Dict[str, Any]:
+    """
+    텍스트 영역 팔레트 기반 폰트 색상/스타일/크기 추천 (LLaVA recommend_font와 같은 키)
+
+    Args:
+        image: 원본 이미지
+        region: 텍스트 영역 (x1, y1, x2, y2) 픽셀 좌표 (패딩 적용된 bbox)
+        text: 오버레이 텍스트
+        overlay_rgba: overlay 배경 색상 (있으면 합성한 배경 기준)
+
+    Returns:
+        {
+            "font_style": str,
+            "font_size_category": str,
+            "font_color_hex": str,   # 6자리 hex (# 없음)
+            "reasoning": str,
+            "source": "palette",
+            "palette": [{"hex": str, "weight": float}, ...],
+            "min_contrast": float
+        }
+    """
+    pixels = _region_pixels(image, region, overlay_rgba)
+    palette = extract_palette(pixels)
+    text_rgb, min_contrast = pick_text_color(palette)
+    size_category, estimated_size = estimate_size_category(text, region[2] - region[0], region[3] - region[1])
+    font_style = estimate_font_style(pixels, palette)
+    font_color_hex = "%02X%02X%02X" % text_rgb
+
+    return {
+        "font_style": font_style,
+        "font_size_category": size_category,
+        "font_color_hex": font_color_hex,
+        "reasoning": (
+            f"palette-based: text color {font_color_hex} has min contrast {min_contrast:.2f} "
+            f"against dominant background colors, estimated size {estimated_size}px"
+        ),
+        "source": "palette",
+        "palette": [{"hex": "%02X%02X%02X" % color, "weight": round(weight, 3)} for color, weight in palette],
+        "min_contrast": round(min_contrast, 2)
+    }
@@ -3,10 +3,10 @@ Job 상태 변화에 따라 다음 파이프라인 단계를 자동으로 트리
 """
 ########################################################
 # created_at: 2025-11-28
-# updated_at: 2025-12-04
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: Job 상태 변화에 따라 다음 파이프라인 단계를 자동으로 트리거
-# version: 2.3.0
+# version: 2.8.0
 # status: development
 # tags: pipeline, trigger, automation
 # dependencies: httpx, asyncpg
@@ -19,6 +19,11 @@ import httpx
 import uuid
 from typing import Optional
 from config import HOST, PORT
+from services.speculative_text_service import start_speculative_text_stages
+from services.job_state_mirror import job_state_mirror
+from services.retry_scheduler import retry_scheduler
+from services.stage_metrics import READY_AT_HEADER
+from services.tracing import start_span, inject_headers
 
 logger = logging.getLogger(__name__)
 
@@ -90,6 +95,25 @@ PIPELINE_STAGES = {
     },
 }
 
+def _ready_at_headers(state) -> dict:
+    """이전 단계 done 시각 헤더 (다음 단계의 queue_wait 메트릭 계산용, 미러에 없으면 생략)"""
+    if state is None or state.status != 'done' or not state.updated_at:
+        return {}
+    return {READY_AT_HEADER: f"{state.updated_at:.3f}"}
+
+async def _post_stage(client: httpx.AsyncClient, api_url: str, request_data: dict, step: str, ready_state=None) -> httpx.Response:
+    """단계 API 호출 (client span, traceparent / 이전 단계 done 시각 헤더 포함)"""
+    attributes = {
+        'job_id': request_data.get('job_id'),
+        'job_variants_id': request_data.get('job_variants_id'),
+        'http.url': api_url
+    }
+    with start_span(f"trigger.{step}", attributes, kind='client') as span:
+        response = await client.post(api_url, json=request_data, headers=inject_headers(_ready_at_headers(ready_state)))
+        if span is not None:
+            span.set_attribute('http.status_code', response.status_code)
+        return response
+
 async def trigger_next_pipeline_stage(
     job_id: str,
     current_step: Optional[str],
@@ -175,7 +199,9 @@ async def trigger_next_pipeline_stage(
     
     try:
         async with httpx.AsyncClient(timeout=1800.0) as client:  # 30분 타임아웃
-            response = await client.post(api_url, json=request_data)
+            response = await _post_stage(
+                client, api_url, request_data, stage_info['next_step'], job_state_mirror.job(job_id)
+            )
             response.raise_for_status()
             logger.info(
                 f"파이프라인 단계 실행 성공: job_id={job_id}, "
@@ -239,16 +265,17 @@ async def retry_pipeline_stage(
         
         try:
             async with httpx.AsyncClient(timeout=1800.0) as client:  # 30분 타임아웃
-                response = await client.post(api_url, json=request_data)
+                response = await _post_stage(client, api_url, request_data, current_step)
                 response.raise_for_status()
                 logger.info(
                     f"[RETRY] 파이프라인 단계 재실행 성공 (Job 레벨): job_id={job_id}, "
                     f"current_step={current_step}"
                 )
         except httpx.HTTPError as e:
+            failure_class = retry_scheduler.record_failure(job_id, e)
             logger.error(
                 f"[RETRY] 파이프라인 단계 재실행 실패 (Job 레벨): job_id={job_id}, "
-                f"current_step={current_step}, error={e}"
+                f"current_step={current_step}, failure_class={failure_class}, error={e}"
             )
         except Exception as e:
             logger.error(
@@ -363,16 +390,17 @@ async def retry_pipeline_stage(
                 # API 호출
                 try:
                     async with httpx.AsyncClient(timeout=1800.0) as client:  # 30분 타임아웃
-                        response = await client.post(api_url, json=request_data)
+                        response = await _post_stage(client, api_url, request_data, current_step)
                         response.raise_for_status()
                         logger.info(
                             f"[RETRY] Variant 재시도 성공: job_variants_id={variant_id}, "
                             f"current_step={current_step}"
                         )
                 except httpx.HTTPError as e:
+                    failure_class = retry_scheduler.record_failure(variant_id, e)
                     logger.error(
                         f"[RETRY] Variant 재시도 실패: job_variants_id={variant_id}, "
-                        f"current_step={current_step}, error={e}"
+                        f"current_step={current_step}, failure_class={failure_class}, error={e}"
                     )
                     # 실패 시 다시 failed로 변경
                     await conn.execute(
@@ -523,6 +551,10 @@ async def trigger_next_pipeline_stage_for_variant(
         )
         return
     
+    # Job 레벨 텍스트 단계(ad_copy_gen_kor, instagram_feed_gen) GPT 호출을 variant 처리와 동시에 선행 실행
+    # (결과는 모든 variants 완료 후 Job 레벨 단계 API에서 재사용, job당 1회만 시작)
+    start_speculative_text_stages(job_id)
+    
     # 다음 단계 정보 조회
     # queued 상태일 때는 현재 단계를 실행해야 하므로, 현재 단계의 API를 직접 호출
     if status == 'queued':
@@ -669,16 +701,20 @@ async def trigger_next_pipeline_stage_for_variant(
     
     try:
         async with httpx.AsyncClient(timeout=1800.0) as client:  # 30분 타임아웃
-            response = await client.post(api_url, json=request_data)
+            response = await _post_stage(
+                client, api_url, request_data, stage_info['next_step'], job_state_mirror.variant(job_variants_id)
+            )
             response.raise_for_status()
             logger.info(
                 f"파이프라인 단계 실행 성공 (variant): job_variants_id={job_variants_id}, "
                 f"next_step={stage_info['next_step']}"
             )
     except httpx.HTTPError as e:
+        # 실패 유형 기록 (재시도 스케줄러가 GPU OOM / 입력 없음 / 타임아웃별 백오프 결정)
+        failure_class = retry_scheduler.record_failure(job_variants_id, e)
         logger.error(
             f"파이프라인 단계 실행 실패 (variant): job_variants_id={job_variants_id}, "
-            f"next_step={stage_info['next_step']}, error={e}"
+            f"next_step={stage_info['next_step']}, failure_class={failure_class}, error={e}"
         )
         # 에러는 상위로 전파하지 않음 (로깅만)
     except Exception as e:
@@ -694,10 +730,26 @@ async def _verify_job_variant_state(
     expected_status: str,
     tenant_id: str
 ) -> bool:
-    """Job Variant 상태 재확인 (중복 실행 방지)"""
+    """Job Variant 상태 재확인 (중복 실행 방지, 상태 미러 우선)"""
     import asyncpg
     from config import DATABASE_URL
     
+    # 리스너 상태 미러에 있으면 SQL 없이 판단
+    mirrored = job_state_mirror.variant(job_variants_id)
+    if mirrored is not None:
+        mirrored_job = job_state_mirror.job(mirrored.job_id)
+        if mirrored_job is not None and mirrored_job.tenant_id:
+            if (mirrored.current_step == expected_step
+                and mirrored.status == expected_status
+                and mirrored_job.tenant_id == tenant_id):
+                return True
+            logger.debug(
+                f"Job Variant 상태 불일치 (미러): job_variants_id={job_variants_id}, "
+                f"expected: step={expected_step}, status={expected_status}, "
+                f"actual: step={mirrored.current_step}, status={mirrored.status}"
+            )
+            return False
+    
     asyncpg_url = DATABASE_URL.replace("postgresql://", "postgres://")
     
     try:
@@ -996,10 +1048,21 @@ async def _check_and_trigger_job_level_stage(
     
     asyncpg_url = DATABASE_URL.replace("postgresql://", "postgres://")
     
+    # 상태 미러로 합류 여부 먼저 판단 (마지막 variant 전까지는 DB 조회 없이 종료)
+    mirrored_job = await job_state_mirror.load_job(job_id)
+    if mirrored_job is not None:
+        completed_variants, total_variants = job_state_mirror.step_progress(mirrored_job, current_step, 'done')
+        if total_variants > 0 and completed_variants < total_variants:
+            logger.debug(
+                f"아직 모든 variants가 완료되지 않음 (미러): job_id={job_id}, "
+                f"completed={completed_variants}/{total_variants}"
+            )
+            return
+    
     try:
         conn = await asyncpg.connect(asyncpg_url)
         try:
-            # 모든 variants가 current_step (done) 완료되었는지 확인
+            # 모든 variants가 current_step (done) 완료되었는지 확인 (합류 직전 DB로 최종 확인)
             row = await conn.fetchrow(
                 """
                 SELECT 
@@ -1062,6 +1125,7 @@ async def _check_and_trigger_job_level_stage(
                     uuid.UUID(job_id),
                     current_step
                 )
+                job_state_mirror.apply_job_event(job_id, current_step, 'done', tenant_id)
                 logger.info(
                     f"✅ 모든 variants 완료! Job 레벨 트리거 발동: job_id={job_id}, "
                     f"current_step={current_step} → next_step={stage_info['next_step']}"
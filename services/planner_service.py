@@ -8,10 +8,10 @@
 # - 금지 영역 마스크를 활용한 정교한 계산
 ########################################################
 # created_at: 2025-11-21
-# updated_at: 2025-12-03
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: Planner service for text overlay position proposal
-# version: 1.6.0
+# version: 1.7.0
 # status: development
 # tags: planner, service
 # dependencies: pillow, numpy
@@ -20,10 +20,11 @@
 ########################################################
 
 import uuid
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 from PIL import Image
 import numpy as np
 import logging
+from services.cpu_pool import SharedArray, attach_array
 
 logger = logging.getLogger(__name__)
 
@@ -55,7 +56,59 @@ def propose_overlay_positions(
             "forbidden": [x, y, w, h] (normalized xywh)
         }
     """
-    w, h = image.size
+    # 금지 영역 마스크가 있으면 사용
+    mask_array = None
+    if forbidden_mask:
+        if isinstance(forbidden_mask, Image.Image):
+            mask_array = np.array(forbidden_mask.convert("L"))
+        else:
+            mask_array = np.array(forbidden_mask)
+    
+    return _propose_overlay_positions(
+        image.size, detections, mask_array,
+        min_overlay_width, min_overlay_height, max_proposals, max_forbidden_iou
+    )
+
+
+def propose_overlay_positions_task(
+    image_size: Tuple[int, int],
+    detections: Optional[Dict[str, Any]] = None,
+    forbidden_mask: Optional[Union[SharedArray, np.ndarray]] = None,
+    min_overlay_width: float = 0.5,
+    min_overlay_height: float = 0.12,
+    max_proposals: int = 10,
+    max_forbidden_iou: float = 0.0
+) -> Dict[str, Any]:
+    """
+    텍스트 오버레이 위치 제안 (CPU 풀 워커에서 실행)
+    
+    PIL 이미지 대신 이미지 크기만 받고, 금지 영역 마스크는 공유 메모리 핸들(SharedArray)로 받는다.
+    
+    Args:
+        image_size: (width, height)
+        forbidden_mask: (H, W) uint8 금지 영역 마스크 배열 또는 SharedArray 핸들
+        나머지: propose_overlay_positions와 동일
+    
+    Returns:
+        propose_overlay_positions와 동일
+    """
+    return _propose_overlay_positions(
+        tuple(image_size), detections, attach_array(forbidden_mask),
+        min_overlay_width, min_overlay_height, max_proposals, max_forbidden_iou
+    )
+
+
+def _propose_overlay_positions(
+    image_size: Tuple[int, int],
+    detections: Optional[Dict[str, Any]],
+    mask_array: Optional[np.ndarray],
+    min_overlay_width: float,
+    min_overlay_height: float,
+    max_proposals: int,
+    max_forbidden_iou: float
+) -> Dict[str, Any]:
+    """propose_overlay_positions 본체 (마스크는 (H, W) 배열)"""
+    w, h = image_size
     
     # 금지 영역 계산
     forbidden_regions = []
@@ -69,14 +122,6 @@ def propose_overlay_positions(
             height = min(1.0, (y2 - y1) / h)
             forbidden_regions.append([x, y, width, height])
     
-    # 금지 영역 마스크가 있으면 사용
-    mask_array = None
-    if forbidden_mask:
-        if isinstance(forbidden_mask, Image.Image):
-            mask_array = np.array(forbidden_mask.convert("L"))
-        else:
-            mask_array = np.array(forbidden_mask)
-    
     # 여러 위치 후보 생성 (금지 영역을 제외한 영역에서)
     logger.info(f"[Planner] 후보 생성 시작: w={w}, h={h}, forbidden_regions={len(forbidden_regions) if forbidden_regions else 0}, mask_array={mask_array is not None}")
     candidates = _generate_position_candidates(
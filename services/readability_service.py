@@ -4,12 +4,13 @@
 # 가독성 평가 서비스
 # - WCAG 2.1 대비 비율 계산
 # - 텍스트와 배경 색상 대비 확인
+# - 픽셀 단위 대비 비율 벡터 연산 (overlay 후보 사전 평가용)
 ########################################################
 # created_at: 2025-11-26
-# updated_at: 2025-11-26
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: Readability service for contrast evaluation
-# version: 1.0.0
+# version: 1.1.0
 # status: production
 # tags: readability, contrast, wcag
 # dependencies: PIL, numpy
@@ -77,6 +78,93 @@ def calculate_contrast_ratio(
     return (lighter + 0.05) / (darker + 0.05)
 
 
+def calculate_relative_luminance_array(rgb: np.ndarray) -> np.ndarray:
+    """
+    상대 휘도 계산 (WCAG 2.1, 벡터 연산)
+    
+    Args:
+        rgb: (..., 3) 형태의 RGB 배열 (0-255)
+    
+    Returns:
+        (...) 형태의 상대 휘도 배열 (0.0-1.0)
+    """
+    val = np.asarray(rgb, dtype=np.float32)[..., :3] / 255.0
+    linear = np.where(val <= 0.03928, val / 12.92, ((val + 0.055) / 1.055) ** 2.4)
+    return linear @ np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+
+def calculate_contrast_ratio_array(
+    text_rgb: Tuple[int, int, int],
+    background_rgb: np.ndarray
+) -> np.ndarray:
+    """
+    텍스트 색상과 배경 픽셀들 간의 대비 비율 계산 (WCAG 2.1, 벡터 연산)
+    
+    Args:
+        text_rgb: 텍스트 RGB 튜플 (0-255)
+        background_rgb: (N, 3) 형태의 배경 픽셀 RGB 배열 (0-255)
+    
+    Returns:
+        (N,) 형태의 대비 비율 배열 (1.0-21.0)
+    """
+    text_l = float(calculate_relative_luminance(*text_rgb))
+    bg_l = calculate_relative_luminance_array(background_rgb)
+    lighter = np.maximum(bg_l, text_l)
+    darker = np.minimum(bg_l, text_l)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+def score_contrast_ratio(contrast_ratio: float, is_large_text: bool = False) -> Dict[str, Any]:
+    """
+    대비 비율을 WCAG 기준 및 가독성 점수로 변환
+    
+    Args:
+        contrast_ratio: 대비 비율
+        is_large_text: 큰 텍스트 여부 (WCAG 기준 완화)
+    
+    Returns:
+        {
+            "wcag_aa_compliant": bool,
+            "wcag_aaa_compliant": bool,
+            "readability_score": float  # 0.0-1.0
+        }
+    """
+    # WCAG 기준 확인
+    # AA 기준: 일반 텍스트 4.5:1, 큰 텍스트 3:1
+    # AAA 기준: 일반 텍스트 7:1, 큰 텍스트 4.5:1
+    wcag_aa_threshold = 3.0 if is_large_text else 4.5
+    wcag_aaa_threshold = 4.5 if is_large_text else 7.0
+    
+    wcag_aa_compliant = contrast_ratio >= wcag_aa_threshold
+    wcag_aaa_compliant = contrast_ratio >= wcag_aaa_threshold
+    
+    # 가독성 점수 계산 (0.0-1.0)
+    # 대비 비율이 높을수록 높은 점수
+    # 최소 기준(AA)을 만족하면 0.5, AAA를 만족하면 1.0
+    if wcag_aaa_compliant:
+        readability_score = 1.0
+    elif wcag_aa_compliant:
+        # AA와 AAA 사이의 점수 (0.5-1.0)
+        ratio_range = wcag_aaa_threshold - wcag_aa_threshold
+        if ratio_range > 0:
+            score_range = contrast_ratio - wcag_aa_threshold
+            readability_score = 0.5 + min(0.5, (score_range / ratio_range) * 0.5)
+        else:
+            readability_score = 0.5
+    else:
+        # AA 미만의 점수 (0.0-0.5)
+        if wcag_aa_threshold > 0:
+            readability_score = min(0.5, (contrast_ratio / wcag_aa_threshold) * 0.5)
+        else:
+            readability_score = 0.0
+    
+    return {
+        "wcag_aa_compliant": bool(wcag_aa_compliant),
+        "wcag_aaa_compliant": bool(wcag_aaa_compliant),
+        "readability_score": float(readability_score)
+    }
+
+
 def sample_background_color(
     image: Image.Image,
     text_region: Tuple[int, int, int, int]
@@ -195,34 +283,10 @@ def evaluate_readability(
         text_size_pt = text_size / 1.33
         is_large_text = text_size_pt >= 18
     
-    # WCAG 기준 확인
-    # AA 기준: 일반 텍스트 4.5:1, 큰 텍스트 3:1
-    # AAA 기준: 일반 텍스트 7:1, 큰 텍스트 4.5:1
-    wcag_aa_threshold = 3.0 if is_large_text else 4.5
-    wcag_aaa_threshold = 4.5 if is_large_text else 7.0
-    
-    wcag_aa_compliant = contrast_ratio >= wcag_aa_threshold
-    wcag_aaa_compliant = contrast_ratio >= wcag_aaa_threshold
-    
-    # 가독성 점수 계산 (0.0-1.0)
-    # 대비 비율이 높을수록 높은 점수
-    # 최소 기준(AA)을 만족하면 0.5, AAA를 만족하면 1.0
-    if wcag_aaa_compliant:
-        readability_score = 1.0
-    elif wcag_aa_compliant:
-        # AA와 AAA 사이의 점수 (0.5-1.0)
-        ratio_range = wcag_aaa_threshold - wcag_aa_threshold
-        if ratio_range > 0:
-            score_range = contrast_ratio - wcag_aa_threshold
-            readability_score = 0.5 + min(0.5, (score_range / ratio_range) * 0.5)
-        else:
-            readability_score = 0.5
-    else:
-        # AA 미만의 점수 (0.0-0.5)
-        if wcag_aa_threshold > 0:
-            readability_score = min(0.5, (contrast_ratio / wcag_aa_threshold) * 0.5)
-        else:
-            readability_score = 0.0
+    scored = score_contrast_ratio(contrast_ratio, is_large_text)
+    wcag_aa_compliant = scored["wcag_aa_compliant"]
+    wcag_aaa_compliant = scored["wcag_aaa_compliant"]
+    readability_score = scored["readability_score"]
     
     logger.info(f"가독성 평가 완료: contrast_ratio={contrast_ratio:.2f}, AA={wcag_aa_compliant}, AAA={wcag_aaa_compliant}, score={readability_score:.3f}")
     
@@ -0,0 +1,223 @@
+"""파이프라인 복구 스캔"""
+########################################################
+# watermark 기반 증분 복구 스캔 (전체 jobs GROUP BY / 이벤트당 EXISTS self-join 대체)
+#
+# 기능:
+# - 마지막 스캔 이후 updated_at이 바뀐 jobs / jobs_variants와,
+#   그 사이 대기 시간 기준을 넘긴(= 새로 오래된) running / done variant가 속한 job만 조사
+# - 단계 순서(STEP_ORDER)를 쿼리에 넘겨 문자열 비교 대신 단계 번호로 뒤처짐 판단
+# - 복구 규칙을 쿼리 1번(set-based)으로 판정하여 (rule, job, variant) 행으로 반환
+#   - stale_running: 단계 API 타임아웃보다 오래 running인 variant
+#   - lagging_done: done인데 다음 단계 트리거가 누락되어 다른 variant보다 뒤처진 variant
+#   - failed_variant: 실패 후 재시도 횟수가 남아 있고 job / 다른 variant보다 뒤처진 variant
+#   - failed_job: 모든 variant가 같은 단계에서 실패했고 재시도 횟수가 남은 job
+#   - join_not_fired: 모든 variant가 iou_eval done인데 job 합류(done)가 반영되지 않은 job
+# - 스캔 비용은 테이블 크기가 아니라 최근 변경 건수에 비례 (updated_at 인덱스 range scan)
+# - 복구 처리에 실패한 job은 watermark와 무관하게 다음 스캔에서 다시 조사 (retry_later)
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Incremental watermark-based recovery scan over recently changed jobs / variants
+# version: 1.0.1
+# status: development
+# tags: listener, recovery, pipeline
+# dependencies: asyncpg, prometheus_client
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import logging
+import uuid
+from datetime import timedelta
+from typing import List, Set
+import asyncpg
+from prometheus_client import Counter
+from config import (
+    JOB_STATE_MIRROR_WINDOW_HOURS, LISTENER_CATCHUP_SKEW_SECONDS,
+    RECOVERY_STALE_RUNNING_SECONDS, RECOVERY_LAGGING_DONE_SECONDS
+)
+from services.job_state_mirror import STEP_ORDER
+
+logger = logging.getLogger(__name__)
+
+# 모든 variant가 이 단계를 done으로 마치면 job 레벨 단계(ad_copy_gen_kor)로 합류
+JOIN_STEP = 'iou_eval'
+
+recovery_scan_actions_total = Counter(
+    'recovery_scan_actions_total',
+    'Recovery scan findings by rule',
+    ['rule']  # stale_running | lagging_done | failed_variant | failed_job | join_not_fired
+)
+
+# $1: 단계 이름 배열, $2: 단계 번호 배열, $3: 조사 시작 시각 (직전 스캔 시각 - 여유)
+# $4: stale running 기준 (초), $5: lagging done 기준 (초), $6: 최대 재시도 횟수, $7: 합류 단계
+# $8: 직전 스캔에서 복구 처리가 실패한 job_id 배열
+RECOVERY_SCAN_SQL = """
+WITH step_order(step, ord) AS (
+    SELECT * FROM unnest($1::text[], $2::int[])
+),
+candidates AS (
+    -- 마지막 스캔 이후 변경된 행
+    SELECT job_id FROM jobs_variants WHERE updated_at > $3
+    UNION
+    SELECT job_id FROM jobs WHERE updated_at > $3
+    UNION
+    -- 직전 스캔에서 복구 처리가 실패한 job (변경이 없어도 다시 조사)
+    SELECT unnest($8::uuid[])
+    UNION
+    -- 마지막 스캔 이후 대기 기준을 새로 넘긴 행 (변경 없이 시간만 지나 복구 대상이 된 경우)
+    SELECT job_id FROM jobs_variants
+    WHERE status = 'running'
+      AND updated_at > $3 - make_interval(secs => $4)
+      AND updated_at <= NOW() - make_interval(secs => $4)
+    UNION
+    SELECT job_id FROM jobs_variants
+    WHERE status = 'done'
+      AND updated_at > $3 - make_interval(secs => $5)
+      AND updated_at <= NOW() - make_interval(secs => $5)
+),
+v AS (
+    SELECT
+        jv.job_variants_id,
+        jv.job_id,
+        jv.current_step,
+        jv.status,
+        jv.retry_count,
+        jv.img_asset_id,
+        jv.updated_at,
+        COALESCE(so.ord, -1) AS ord,
+        MAX(COALESCE(so.ord, -1)) FILTER (WHERE jv.status = 'done') OVER w AS max_done_ord,
+        COUNT(*) OVER w AS total_variants,
+        COUNT(*) FILTER (WHERE jv.status = 'done' AND jv.current_step = $7) OVER w AS join_done
+    FROM jobs_variants jv
+    JOIN candidates c ON c.job_id = jv.job_id
+    LEFT JOIN step_order so ON so.step = jv.current_step
+    WINDOW w AS (PARTITION BY jv.job_id)
+),
+jv_rules AS (
+    SELECT
+        CASE
+            WHEN v.status = 'running'
+             AND v.updated_at <= NOW() - make_interval(secs => $4)
+                THEN 'stale_running'
+            WHEN v.status = 'done'
+             AND v.ord >= 0
+             AND v.ord < v.max_done_ord
+             AND v.updated_at <= NOW() - make_interval(secs => $5)
+                THEN 'lagging_done'
+            WHEN v.status = 'failed'
+             AND j.status <> 'failed'
+             AND COALESCE(v.retry_count, 0) < $6
+             AND v.ord >= 0
+             AND v.ord < GREATEST(COALESCE(jo.ord, -1), COALESCE(v.max_done_ord, -1))
+                THEN 'failed_variant'
+        END AS rule,
+        v.*,
+        j.status AS job_status,
+        j.current_step AS job_step,
+        j.retry_count AS job_retry_count,
+        j.tenant_id,
+        COALESCE(jo.ord, -1) AS job_ord,
+        COUNT(*) FILTER (
+            WHERE v.status = 'failed' AND v.current_step = j.current_step
+        ) OVER (PARTITION BY v.job_id) AS failed_at_job_step
+    FROM v
+    JOIN jobs j ON j.job_id = v.job_id
+    LEFT JOIN step_order jo ON jo.step = j.current_step
+)
+SELECT rule, job_id, job_variants_id, current_step, status, img_asset_id, updated_at, tenant_id
+FROM jv_rules
+WHERE rule IS NOT NULL
+UNION ALL
+SELECT DISTINCT ON (job_id)
+    CASE
+        WHEN job_status = 'running'
+         AND job_ord >= 0
+         AND join_done = total_variants
+            THEN 'join_not_fired'
+        ELSE 'failed_job'
+    END AS rule,
+    job_id, NULL, job_step, job_status, NULL, NULL, tenant_id
+FROM jv_rules
+WHERE (
+        job_status = 'running'
+        AND job_ord >= 0
+        AND join_done = total_variants
+    ) OR (
+        -- img_gen(0)은 yh 파트 재시도 대상 아님
+        job_status = 'failed'
+        AND job_ord > 0
+        AND COALESCE(job_retry_count, 0) < $6
+        AND failed_at_job_step = total_variants
+    )
+"""
+
+
+class RecoveryScanner:
+    """
+    watermark 기반 증분 복구 스캔
+
+    첫 스캔은 최근 JOB_STATE_MIRROR_WINDOW_HOURS 범위 전체를 조사하고,
+    이후에는 직전 스캔 시작 시각(DB 서버 시각) 이후 변경분만 조사한다.
+    스캔이 실패하면 watermark를 유지하여 다음 스캔이 같은 범위를 다시 조사한다.
+    조회 후 복구 처리가 실패한 job은 retry_later로 등록하면 다음 스캔에서 다시 조사한다
+    (watermark는 이미 지나갔으므로 등록하지 않으면 해당 행이 다시 바뀔 때까지 조사되지 않음).
+    """
+
+    def __init__(
+        self,
+        stale_running_seconds: float = RECOVERY_STALE_RUNNING_SECONDS,
+        lagging_done_seconds: float = RECOVERY_LAGGING_DONE_SECONDS
+    ):
+        self.stale_running_seconds = stale_running_seconds
+        self.lagging_done_seconds = lagging_done_seconds
+        self.watermark = None  # 직전 스캔 시작 시각 (DB 서버 시각, datetime)
+        self._retry_job_ids: Set[uuid.UUID] = set()  # 복구 처리가 실패하여 다음 스캔에서 다시 조사할 job
+        self._steps = list(STEP_ORDER)
+        self._ords = [STEP_ORDER[step] for step in self._steps]
+
+    async def scan(self, conn: asyncpg.Connection, max_retry_count: int) -> List[asyncpg.Record]:
+        """
+        복구 대상 조회 (조회 성공 시 watermark 전진)
+
+        Args:
+            conn: DB 연결 (LISTEN 연결이 아닌 별도 연결)
+            max_retry_count: 재시도 가능 최대 횟수 (failed_variant / failed_job 판정)
+
+        Returns:
+            (rule, job_id, job_variants_id, current_step, status, img_asset_id, updated_at, tenant_id) 행 목록
+        """
+        scan_started = await conn.fetchval("SELECT NOW()")
+        since = self._since(scan_started)
+        retry_job_ids = list(self._retry_job_ids)
+
+        rows = await conn.fetch(
+            RECOVERY_SCAN_SQL,
+            self._steps,
+            self._ords,
+            since,
+            float(self.stale_running_seconds),
+            float(self.lagging_done_seconds),
+            max_retry_count,
+            JOIN_STEP,
+            retry_job_ids,
+        )
+        self.watermark = scan_started
+        self._retry_job_ids.difference_update(retry_job_ids)
+
+        logger.debug(f"[RecoveryScan] 복구 대상 {len(rows)}건 (since={since.isoformat()})")
+        for row in rows:
+            recovery_scan_actions_total.labels(rule=row['rule']).inc()
+        return rows
+
+    def retry_later(self, job_id):
+        """복구 처리에 실패한 job을 다음 스캔 대상에 추가"""
+        self._retry_job_ids.add(uuid.UUID(str(job_id)))
+
+    def _since(self, scan_started):
+        """조사 시작 시각 (직전 스캔 시작 시각 - 여유, 첫 스캔은 미러 유지 범위 전체)"""
+        if self.watermark is None:
+            return scan_started - timedelta(hours=JOB_STATE_MIRROR_WINDOW_HOURS)
+        # 직전 스캔 시점에 커밋 전이던 트랜잭션의 updated_at을 놓치지 않도록 여유를 둠
+        return self.watermark - timedelta(seconds=LISTENER_CATCHUP_SKEW_SECONDS)
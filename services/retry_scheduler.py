@@ -0,0 +1,260 @@
+"""파이프라인 재시도 스케줄러"""
+########################################################
+# 실패한 job / variant 재시도를 즉시 실행하지 않고 실패 유형별 백오프 후 실행
+#
+# 기능:
+# - 실패 유형 분류 (GPU OOM/CUBLAS, 입력 없음, 타임아웃, 일시 오류, 트리거 누락)
+# - 유형별 지수 백오프 + jitter (GPU OOM은 길게, 트리거 누락은 즉시에 가깝게)
+# - 리스너 이벤트 루프의 hashed timer wheel에서 예약 시각에 재시도 실행 (키당 1개 예약)
+# - 지속적인 실패(GPU OOM 등)가 연속 재시도로 이어져 정상 job의 GPU 시간을 빼앗지 않도록 함
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Delayed retry scheduler with per-failure-class backoff and a timer wheel
+# version: 1.0.0
+# status: development
+# tags: retry, backoff, scheduler, pipeline
+# dependencies: httpx, prometheus_client
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import time
+import random
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+import logging
+import httpx
+from prometheus_client import Counter, Gauge
+from config import RETRY_SCHEDULER_TICK_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# 실패 유형별 백오프 (기본 대기 초, 최대 대기 초)
+FAILURE_BACKOFF = {
+    'oom': (30.0, 900.0),           # GPU OOM / CUBLAS: 다른 작업이 메모리를 비울 때까지 길게 대기
+    'timeout': (20.0, 600.0),       # 단계 API 타임아웃: 부하가 높은 상태
+    'missing_input': (5.0, 120.0),  # 이전 단계 결과 / overlay_id 등이 아직 없음
+    'transient': (2.0, 120.0),      # 그 외 일시 오류 (5xx, 연결 오류)
+    'stalled': (0.5, 1.0),          # 실패가 아닌 트리거 누락 (done인데 다음 단계 미실행)
+}
+_OOM_MARKERS = ('out of memory', 'outofmemoryerror', 'cublas', 'cuda error', 'cudnn_status')
+_TIMEOUT_MARKERS = ('timeout', 'timed out')
+_MISSING_MARKERS = ('찾을 수 없', 'not found', 'no such', '없습니다')
+_WHEEL_SLOTS = 512
+_FAILURE_MEMORY = 10000  # 기억할 최근 실패 유형 수 (job_variants_id / job_id)
+
+retry_scheduled_total = Counter(
+    'retry_scheduled_total',
+    'Pipeline retries scheduled by kind and failure class',
+    ['kind', 'failure_class']
+)
+retry_fired_total = Counter(
+    'retry_fired_total',
+    'Scheduled pipeline retries executed',
+    ['kind']
+)
+retry_pending = Gauge(
+    'retry_pending',
+    'Pipeline retries waiting in the timer wheel'
+)
+
+
+def classify_failure(error: Any) -> str:
+    """
+    실패 유형 분류
+
+    Args:
+        error: 단계 API 호출 예외 (httpx 예외면 응답 상태 코드 / detail 포함) 또는 오류 메시지
+
+    Returns:
+        'oom' | 'timeout' | 'missing_input' | 'transient'
+    """
+    status = None
+    text = str(error)
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        try:
+            text = f"{text} {error.response.text}"
+        except Exception:
+            pass
+    text = text.lower()
+
+    if any(marker in text for marker in _OOM_MARKERS):
+        return 'oom'
+    if isinstance(error, httpx.TimeoutException) or status in (408, 504) or any(m in text for m in _TIMEOUT_MARKERS):
+        return 'timeout'
+    if status in (400, 404, 422) or any(marker in text for marker in _MISSING_MARKERS):
+        return 'missing_input'
+    return 'transient'
+
+
+def backoff_delay(failure_class: str, attempt: int) -> float:
+    """
+    재시도 대기 시간 (지수 백오프 + equal jitter: 상한의 절반 이상은 항상 대기)
+
+    Args:
+        failure_class: classify_failure 결과 또는 'stalled'
+        attempt: 재시도 번호 (1부터)
+    """
+    base, cap = FAILURE_BACKOFF.get(failure_class, FAILURE_BACKOFF['transient'])
+    ceiling = min(cap, base * (2 ** max(attempt - 1, 0)))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def worst_failure_class(classes: List[str]) -> str:
+    """여러 variant의 실패 유형 중 대기 시간이 가장 긴 유형 (job 단위 재시도용)"""
+    known = [c for c in classes if c in FAILURE_BACKOFF] or ['transient']
+    return max(known, key=lambda c: FAILURE_BACKOFF[c][0])
+
+
+class _Entry:
+    __slots__ = ('key', 'kind', 'target_tick', 'due_at', 'factory')
+
+    def __init__(self, key: Hashable, kind: str, target_tick: int, due_at: float,
+                 factory: Callable[[], Awaitable[Any]]):
+        self.key = key
+        self.kind = kind
+        self.target_tick = target_tick
+        self.due_at = due_at
+        self.factory = factory
+
+
+class RetryScheduler:
+    """
+    hashed timer wheel 기반 재시도 스케줄러 (리스너 이벤트 루프에서 사용)
+
+    예약은 키(('job', job_id) / ('variant', job_variants_id))당 1개만 유지하며,
+    이미 예약된 키는 다시 예약해도 기존 시각을 유지한다 (이벤트가 반복돼도 재시도가 당겨지지 않음).
+    """
+
+    def __init__(self, tick_seconds: float = RETRY_SCHEDULER_TICK_SECONDS, slots: int = _WHEEL_SLOTS):
+        self.tick_seconds = tick_seconds
+        self._slots: List[Dict[Hashable, _Entry]] = [{} for _ in range(slots)]
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._tick = 0
+        self._started_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._spawn: Callable[[Awaitable[Any]], Any] = asyncio.ensure_future
+        self._failures: "OrderedDict[str, str]" = OrderedDict()  # key → 최근 실패 유형
+        self._attempts: Dict[Hashable, int] = {}  # key → 연속 재시도 횟수
+        self.persist_next_attempt = True  # next_attempt_at 컬럼이 없으면 False (메모리 예약만 사용)
+
+    # ------------------------------------------------------------------
+    # 실패 기록
+    # ------------------------------------------------------------------
+    def record_failure(self, key: str, error: Any) -> str:
+        """단계 실행 실패 유형 기록 (재시도 예약 시 백오프 결정에 사용)"""
+        failure_class = classify_failure(error)
+        self._failures[str(key)] = failure_class
+        self._failures.move_to_end(str(key))
+        while len(self._failures) > _FAILURE_MEMORY:
+            self._failures.popitem(last=False)
+        return failure_class
+
+    def failure_class(self, key: str) -> str:
+        """기록된 실패 유형 (없으면 'transient')"""
+        return self._failures.get(str(key), 'transient')
+
+    def record_success(self, kind: str, item_id: str):
+        """단계 성공 (연속 재시도 횟수와 실패 유형 초기화)"""
+        self._attempts.pop((kind, str(item_id)), None)
+        self._failures.pop(str(item_id), None)
+
+    def next_attempt(self, key: Hashable) -> int:
+        """이번 재시도 번호 (1부터, record_success 전까지 증가)"""
+        return self._attempts.get(key, 0) + 1
+
+    # ------------------------------------------------------------------
+    # 예약
+    # ------------------------------------------------------------------
+    def schedule(self, key: Hashable, kind: str, failure_class: str, delay: float,
+                 factory: Callable[[], Awaitable[Any]]) -> Tuple[float, bool]:
+        """
+        재시도 예약
+
+        Args:
+            key: 예약 키 (같은 키는 1개만 예약)
+            kind: 메트릭 라벨 ('job' | 'variant')
+            failure_class: 메트릭 라벨
+            delay: 대기 시간 (초)
+            factory: 예약 시각에 실행할 코루틴 생성 함수
+
+        Returns:
+            (실행 예정 시각 epoch 초, 새로 예약했는지)
+        """
+        existing = self._entries.get(key)
+        if existing is not None:
+            return existing.due_at, False
+        ticks = max(1, int(-(-delay // self.tick_seconds)))  # 올림
+        entry = _Entry(key, kind, self._tick + ticks, time.time() + delay, factory)
+        self._entries[key] = entry
+        self._slots[entry.target_tick % len(self._slots)][key] = entry
+        self._attempts[key] = self._attempts.get(key, 0) + 1
+        if len(self._attempts) > _FAILURE_MEMORY:
+            # 성공 기록 없이 끝난 오래된 키 정리 (삽입 순서 기준)
+            self._attempts.pop(next(iter(self._attempts)))
+        retry_scheduled_total.labels(kind=kind, failure_class=failure_class).inc()
+        retry_pending.set(len(self._entries))
+        return entry.due_at, True
+
+    def cancel(self, key: Hashable):
+        """예약 취소 (상태가 이미 진행된 경우)"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._slots[entry.target_tick % len(self._slots)].pop(key, None)
+            retry_pending.set(len(self._entries))
+
+    def is_scheduled(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    # ------------------------------------------------------------------
+    # timer wheel
+    # ------------------------------------------------------------------
+    def start(self, spawn: Optional[Callable[[Awaitable[Any]], Any]] = None):
+        """timer wheel 시작 (리스너 시작 시 호출)"""
+        if spawn is not None:
+            self._spawn = spawn
+        if self._task is None or self._task.done():
+            self._started_at = asyncio.get_running_loop().time() - self._tick * self.tick_seconds
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """timer wheel 중지 (예약은 유지, DB의 next_attempt_at과 복구 로직이 재시작 후 이어받음)"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            # 이벤트 루프가 밀린 만큼 tick을 따라잡음
+            target = int((loop.time() - self._started_at) / self.tick_seconds)
+            while self._tick < target:
+                self._tick += 1
+                self._fire_slot()
+
+    def _fire_slot(self):
+        slot = self._slots[self._tick % len(self._slots)]
+        due = [entry for entry in slot.values() if entry.target_tick <= self._tick]
+        for entry in due:
+            del slot[entry.key]
+            self._entries.pop(entry.key, None)
+            retry_fired_total.labels(kind=entry.kind).inc()
+            try:
+                self._spawn(entry.factory())
+            except Exception as e:
+                logger.error(f"[RetryScheduler] 재시도 실행 실패: key={entry.key}, error={e}", exc_info=True)
+        if due:
+            retry_pending.set(len(self._entries))
+
+
+# 프로세스 전역 스케줄러 (리스너 이벤트 루프에서 실행, pipeline_trigger가 실패 유형 기록)
+retry_scheduler = RetryScheduler()
@@ -0,0 +1,476 @@
+"""Job 레벨 텍스트 단계 선행 실행 서비스"""
+########################################################
+# ad_copy_gen_kor / instagram_feed_gen 선행(speculative) 실행
+#
+# 기능:
+# - 두 단계의 GPT 호출은 job 레벨 텍스트(txt_ad_copy_generations, job_inputs, stores)에만 의존하므로
+#   variant 이미지 처리와 동시에 미리 실행
+# - 결과는 프로세스 메모리 + gpt_response_cache 테이블(speculative:{stage}:{job_id} 키)에 보관
+#   (리스너 리더가 선행 실행해도 합류 요청을 받은 다른 워커/프로세스가 재사용, 업무 테이블 커밋은 기존 라우터가 수행)
+# - 합류 시점(join point)에 입력이 선행 실행 때와 같으면 결과 재사용, 다르거나 실패했으면 버리고 다시 호출
+# - 라우터와 선행 실행이 같은 입력 조회 함수를 사용 (입력 비교 기준 일치)
+# - 가져가지 않은 채 SPECULATIVE_TEXT_TTL_SECONDS가 지난 공유 결과는 주기적으로 삭제
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Speculative early start of job-level GPT text stages
+# version: 1.1.1
+# status: development
+# tags: gpt, speculative, pipeline
+# dependencies: sqlalchemy
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+import logging
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.orm import Session
+from config import ENABLE_SPECULATIVE_TEXT, SPECULATIVE_TEXT_WAIT_SECONDS, SPECULATIVE_TEXT_TTL_SECONDS, GPT_MODEL_NAME
+
+logger = logging.getLogger(__name__)
+
+# 선행 실행 대상 단계 (llm_traces.operation_type과 동일)
+STAGE_ENG_TO_KOR = "eng_to_kor"
+STAGE_FEED_GEN = "feed_gen"
+
+# 인스타그램 피드 글 기본 프롬프트
+FEED_GPT_PROMPT = "인스타그램에 어울리는 매력적이고 친근한 피드 글을 작성해주세요. 한국어로 작성하고, 자연스럽고 매력적인 톤으로 작성해주세요."
+
+
+def fetch_eng_ad_copy(db: Session, job_id: uuid.UUID) -> Optional[str]:
+    """
+    txt_ad_copy_generations에서 영어 광고문구 조회 (refined_ad_copy_eng 우선, 없으면 ad_copy_eng)
+
+    Returns:
+        영어 광고문구 또는 None
+    """
+    row = db.execute(
+        text("""
+            SELECT COALESCE(refined_ad_copy_eng, ad_copy_eng) AS ad_copy_eng
+            FROM txt_ad_copy_generations
+            WHERE job_id = :job_id
+              AND (
+                  (generation_stage = 'refined_ad_copy' AND refined_ad_copy_eng IS NOT NULL)
+                  OR (generation_stage = 'ad_copy_eng' AND ad_copy_eng IS NOT NULL)
+              )
+              AND status = 'done'
+            ORDER BY
+                CASE generation_stage
+                    WHEN 'refined_ad_copy' THEN 1
+                    WHEN 'ad_copy_eng' THEN 2
+                END,
+                created_at DESC
+            LIMIT 1
+        """),
+        {"job_id": job_id}
+    ).first()
+    return row.ad_copy_eng if row and row.ad_copy_eng else None
+
+
+def fetch_feed_context(db: Session, job, job_input) -> Dict[str, str]:
+    """
+    인스타그램 피드 글 생성용 job 레벨 컨텍스트 조회
+
+    Args:
+        db: DB 세션
+        job: Job 레코드 (store_id)
+        job_input: JobInput 레코드 (desc_kor, tone_style_id)
+
+    Returns:
+        {"tone_style": str, "product_description": str, "store_information": str}
+    """
+    product_description = job_input.desc_kor if job_input.desc_kor else ""
+
+    # tone_style_id로 tone_styles 테이블에서 톤 & 스타일 정보 조회
+    tone_style = ""
+    if job_input.tone_style_id:
+        tone_style_row = db.execute(
+            text("""
+                SELECT kor_name, eng_name
+                FROM tone_styles
+                WHERE tone_style_id = :tone_style_id
+            """),
+            {"tone_style_id": job_input.tone_style_id}
+        ).first()
+
+        if tone_style_row:
+            tone_style = tone_style_row.kor_name if tone_style_row.kor_name else (tone_style_row.eng_name if tone_style_row.eng_name else "")
+
+    # jobs.store_id를 통해 stores 테이블에서 스토어 정보 조회
+    store_information = ""
+    if job.store_id:
+        store_row = db.execute(
+            text("""
+                SELECT title, body, store_category
+                FROM stores
+                WHERE store_id = :store_id
+            """),
+            {"store_id": job.store_id}
+        ).first()
+
+        if store_row:
+            # 스토어 정보 조합 (title, body, store_category)
+            store_parts = []
+            if store_row.title:
+                store_parts.append(store_row.title)
+            if store_row.body:
+                store_parts.append(store_row.body)
+            if store_row.store_category:
+                store_parts.append(f"카테고리: {store_row.store_category}")
+            store_information = ", ".join(store_parts) if store_parts else ""
+
+    return {
+        "tone_style": tone_style,
+        "product_description": product_description,
+        "store_information": store_information
+    }
+
+
+class _Speculation(NamedTuple):
+    """선행 실행 1건 (future 결과: (입력, GPT 결과))"""
+    future: Future
+    started_at: float
+
+
+_enabled = False
+_executor: Optional[ThreadPoolExecutor] = None
+_speculations: Dict[Tuple[str, str], _Speculation] = {}
+# 결과를 가져간 (job_id, stage) → 시각 (이후 variant 트리거에서 다시 시작하지 않음)
+_taken: Dict[Tuple[str, str], float] = {}
+_lock = threading.Lock()
+_shared_available = True  # gpt_response_cache 테이블이 없으면 프로세스 메모리 결과만 사용
+# 다른 프로세스에서 진행 중인 선행 실행 결과 확인 간격 (초)
+_SHARED_POLL_SECONDS = 0.5
+# 만료된 공유 결과(speculative:* 행) 삭제 간격 (초)
+_SHARED_PURGE_SECONDS = 600
+_last_purge = 0.0
+
+
+def enable_speculative_text():
+    """선행 실행 활성화 (리스너를 실행하는 프로세스에서 앱 시작 시 호출, 결과는 gpt_response_cache로 다른 워커와 공유)"""
+    global _enabled, _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative-text")
+        _enabled = True
+    logger.info("[Speculative] job 레벨 텍스트 단계 선행 실행 활성화")
+
+
+def shutdown_speculative_text():
+    """선행 실행 종료 (앱 종료 시 호출, 진행 중인 GPT 호출은 기다리지 않음)"""
+    global _enabled, _executor
+    with _lock:
+        _enabled = False
+        executor, _executor = _executor, None
+        unfinished = [key for key, spec in _speculations.items() if not spec.future.done()]
+        _speculations.clear()
+        _taken.clear()
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+    # 완료되지 않은 선행 실행의 진행 중 표시 제거 (다른 워커가 결과를 기다리지 않도록)
+    for key in unfinished:
+        _withdraw_shared(key)
+
+
+def _job_key(job_id: str) -> str:
+    """job_id 표기 정규화 (트리거와 라우터 요청의 대소문자/하이픈 차이 무시)"""
+    try:
+        return str(uuid.UUID(str(job_id)))
+    except ValueError:
+        return str(job_id)
+
+
+def _evict_expired(now: float):
+    """합류 시점에 도달하지 못한 오래된 선행 결과 정리 (_lock 보유 상태에서 호출)"""
+    global _last_purge
+    if now - _last_purge >= _SHARED_PURGE_SECONDS:
+        _last_purge = now
+        _executor.submit(_purge_expired_shared)
+    expired = [key for key, spec in _speculations.items() if now - spec.started_at > SPECULATIVE_TEXT_TTL_SECONDS]
+    for key in expired:
+        _speculations.pop(key).future.cancel()
+    for key in [key for key, taken_at in _taken.items() if now - taken_at > SPECULATIVE_TEXT_TTL_SECONDS]:
+        del _taken[key]
+    if expired:
+        logger.info(f"[Speculative] 만료된 선행 결과 정리: {len(expired)}건")
+
+
+def start_speculative_text_stages(job_id: str):
+    """
+    job의 텍스트 단계(eng_to_kor, feed_gen) GPT 호출을 백그라운드에서 선행 실행 (job당 1회)
+
+    variant 단계 트리거마다 호출해도 되며, 이미 시작된 job은 무시한다.
+    """
+    if not _enabled:
+        return
+    now = time.time()
+    with _lock:
+        if _executor is None:
+            return
+        _evict_expired(now)
+        for stage, runner in ((STAGE_ENG_TO_KOR, _speculate_eng_to_kor), (STAGE_FEED_GEN, _speculate_feed_gen)):
+            key = (_job_key(job_id), stage)
+            if key in _taken:
+                continue
+            existing = _speculations.get(key)
+            # 실패한 선행 실행 (예: 영어 광고문구가 아직 없음)은 다음 트리거에서 다시 시작
+            if existing is None or (existing.future.done() and existing.future.exception() is not None):
+                _speculations[key] = _Speculation(_executor.submit(_run_speculation, key, runner, job_id), now)
+                logger.info(f"[Speculative] 선행 실행 시작: job_id={job_id}, stage={stage}")
+
+
+def _shared_key(key: Tuple[str, str]) -> str:
+    """gpt_response_cache 키 (GPT 응답 캐시의 sha256 키와 겹치지 않는 접두사)"""
+    job_key, stage = key
+    return f"speculative:{stage}:{job_key}"
+
+
+def _publish_shared(key: Tuple[str, str], payload: Dict[str, Any]):
+    """
+    선행 실행 상태/결과를 gpt_response_cache에 기록 (다른 워커/프로세스가 합류 시점에 조회)
+
+    Args:
+        key: (job_id, stage)
+        payload: {"status": "pending"} 또는 {"status": "done", "inputs": 입력, "result": GPT 결과}
+    """
+    if not _shared_available:
+        return
+    from database import SessionLocal
+    db = SessionLocal()
+    try:
+        db.execute(
+            text("""
+                INSERT INTO gpt_response_cache (
+                    cache_key, operation, model_name, template_version, temperature,
+                    result, hit_count, created_at, last_hit_at
+                )
+                VALUES (
+                    :cache_key, :operation, :model_name, 'speculative', NULL,
+                    CAST(:result AS jsonb), 0, CURRENT_TIMESTAMP, NULL
+                )
+                ON CONFLICT (cache_key) DO UPDATE
+                SET result = EXCLUDED.result,
+                    created_at = CURRENT_TIMESTAMP
+            """),
+            {
+                "cache_key": _shared_key(key),
+                "operation": f"speculative_{key[1]}",
+                "model_name": GPT_MODEL_NAME,
+                "result": json.dumps(payload, ensure_ascii=False, default=str)
+            }
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        _shared_error(e)
+    finally:
+        db.close()
+
+
+def _withdraw_shared(key: Tuple[str, str]):
+    """공유 선행 실행 상태/결과 삭제 (실패, 로컬 결과 사용, 종료 시)"""
+    if not _shared_available:
+        return
+    from database import SessionLocal
+    db = SessionLocal()
+    try:
+        db.execute(text("DELETE FROM gpt_response_cache WHERE cache_key = :cache_key"), {"cache_key": _shared_key(key)})
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        _shared_error(e)
+    finally:
+        db.close()
+
+
+def _purge_expired_shared():
+    """가져가지 않은 채 SPECULATIVE_TEXT_TTL_SECONDS가 지난 공유 결과 / 진행 중 표시 삭제"""
+    if not _shared_available:
+        return
+    from database import SessionLocal
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            text("""
+                DELETE FROM gpt_response_cache
+                WHERE cache_key LIKE 'speculative:%'
+                  AND created_at <= CURRENT_TIMESTAMP - make_interval(secs => :ttl_seconds)
+            """),
+            {"ttl_seconds": SPECULATIVE_TEXT_TTL_SECONDS}
+        )
+        db.commit()
+        if result.rowcount:
+            logger.info(f"[Speculative] 만료된 공유 선행 결과 삭제: {result.rowcount}건")
+    except Exception as e:
+        db.rollback()
+        _shared_error(e)
+    finally:
+        db.close()
+
+
+def _claim_shared(key: Tuple[str, str]) -> Optional[Tuple[Any, Dict[str, Any]]]:
+    """
+    다른 프로세스에서 실행된 선행 결과 가져오기 (1회용, 가져가면 삭제)
+
+    선행 실행이 진행 중(pending)이면 SPECULATIVE_TEXT_WAIT_SECONDS까지 기다린다.
+
+    Returns:
+        (입력, GPT 결과) 또는 None (없거나, 만료됐거나, 대기 시간 초과)
+    """
+    if not _shared_available:
+        return None
+    from database import SessionLocal
+    deadline = time.monotonic() + SPECULATIVE_TEXT_WAIT_SECONDS
+    params = {"cache_key": _shared_key(key), "ttl_seconds": SPECULATIVE_TEXT_TTL_SECONDS}
+    while True:
+        db = SessionLocal()
+        try:
+            row = db.execute(
+                text("""
+                    DELETE FROM gpt_response_cache
+                    WHERE cache_key = :cache_key
+                      AND result->>'status' = 'done'
+                      AND created_at > CURRENT_TIMESTAMP - make_interval(secs => :ttl_seconds)
+                    RETURNING result
+                """),
+                params
+            ).first()
+            pending = row is None and db.execute(
+                text("""
+                    SELECT 1 FROM gpt_response_cache
+                    WHERE cache_key = :cache_key
+                      AND result->>'status' = 'pending'
+                      AND created_at > CURRENT_TIMESTAMP - make_interval(secs => :ttl_seconds)
+                """),
+                params
+            ).first() is not None
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            _shared_error(e)
+            return None
+        finally:
+            db.close()
+        if row is not None:
+            return row.result["inputs"], row.result["result"]
+        if not pending or time.monotonic() >= deadline:
+            return None
+        time.sleep(_SHARED_POLL_SECONDS)
+
+
+def _shared_error(error: Exception):
+    """공유 저장소 오류 처리 (gpt_response_cache 테이블이 없으면 이후 프로세스 메모리 결과만 사용)"""
+    global _shared_available
+    if isinstance(error, ProgrammingError):
+        if _shared_available:
+            _shared_available = False
+            logger.warning(f"[Speculative] gpt_response_cache 테이블 사용 불가, 같은 프로세스의 선행 결과만 사용: {error}")
+    else:
+        logger.warning(f"[Speculative] 공유 선행 결과 조회/저장 실패: {error}")
+
+
+def _run_speculation(key: Tuple[str, str], runner, job_id: str) -> Tuple[Any, Dict[str, Any]]:
+    """선행 실행 1건 (진행 중 표시 → GPT 호출 → 결과 공유, 실패 시 공유 표시 삭제)"""
+    _publish_shared(key, {"status": "pending"})
+    try:
+        used_inputs, result = runner(job_id)
+    except Exception:
+        _withdraw_shared(key)
+        raise
+    with _lock:
+        # 합류 시점이 이미 지났거나 (대기 시간 초과로 직접 호출) 종료 중이면 아무도 가져가지 않으므로 공유하지 않음
+        abandoned = key in _taken or not _enabled
+    if abandoned:
+        _withdraw_shared(key)
+    else:
+        _publish_shared(key, {"status": "done", "inputs": used_inputs, "result": result})
+    return used_inputs, result
+
+
+def _speculate_eng_to_kor(job_id: str) -> Tuple[Any, Dict[str, Any]]:
+    """영어 → 한글 광고문구 변환 선행 실행"""
+    from database import SessionLocal
+    from services.gpt_service import translate_eng_to_kor
+
+    db = SessionLocal()
+    try:
+        ad_copy_eng = fetch_eng_ad_copy(db, uuid.UUID(job_id))
+    finally:
+        db.close()
+    if not ad_copy_eng:
+        raise LookupError(f"English ad copy not found: job_id={job_id}")
+    return ad_copy_eng, translate_eng_to_kor(ad_copy_eng)
+
+
+def _speculate_feed_gen(job_id: str) -> Tuple[Any, Dict[str, Any]]:
+    """인스타그램 피드 글 생성 선행 실행"""
+    from database import SessionLocal, Job, JobInput
+    from services.gpt_service import generate_instagram_feed
+
+    db = SessionLocal()
+    try:
+        job_uuid = uuid.UUID(job_id)
+        job = db.query(Job).filter(Job.job_id == job_uuid).first()
+        job_input = db.query(JobInput).filter(JobInput.job_id == job_uuid).first()
+        refined_ad_copy_eng = fetch_eng_ad_copy(db, job_uuid)
+        if not job or not job_input or not refined_ad_copy_eng:
+            raise LookupError(f"Feed inputs not found: job_id={job_id}")
+        inputs = {"refined_ad_copy_eng": refined_ad_copy_eng, **fetch_feed_context(db, job, job_input), "gpt_prompt": FEED_GPT_PROMPT}
+    finally:
+        db.close()
+    return inputs, generate_instagram_feed(**inputs)
+
+
+def take_speculative_result(job_id: str, stage: str, inputs: Any) -> Optional[Dict[str, Any]]:
+    """
+    합류 시점에 선행 실행 결과 가져오기 (1회용, 가져가면 제거)
+
+    선행 실행이 진행 중이면 SPECULATIVE_TEXT_WAIT_SECONDS까지 기다린다.
+    이 프로세스에서 시작한 선행 실행이 없으면 (리스너 리더 등 다른 프로세스에서 실행)
+    gpt_response_cache에 공유된 결과를 사용한다.
+
+    Args:
+        job_id: Job ID
+        stage: STAGE_ENG_TO_KOR | STAGE_FEED_GEN
+        inputs: 합류 시점의 GPT 입력 (선행 실행 입력과 같아야 재사용)
+
+    Returns:
+        GPT 결과 (없거나, 실패했거나, 입력이 달라졌으면 None → 호출 측에서 GPT 직접 호출)
+    """
+    if not ENABLE_SPECULATIVE_TEXT:
+        return None
+    with _lock:
+        key = (_job_key(job_id), stage)
+        speculation = _speculations.pop(key, None)
+        _taken[key] = time.time()
+    if speculation is None:
+        outcome = _claim_shared(key)
+        if outcome is None:
+            return None
+        source = "공유"
+    else:
+        try:
+            outcome = speculation.future.result(timeout=SPECULATIVE_TEXT_WAIT_SECONDS)
+        except Exception as e:
+            # 아직 시작 전이면 취소 (실행 중이면 완료 후 _taken을 보고 결과를 공유하지 않음)
+            speculation.future.cancel()
+            logger.warning(f"[Speculative] 선행 실행 결과 사용 불가, 다시 호출: job_id={job_id}, stage={stage}, error={e}")
+            return None
+        finally:
+            # 같은 결과를 다른 워커가 다시 가져가지 않도록 공유 결과 삭제
+            _withdraw_shared(key)
+        source = f"선행 시작 후 {max(0.0, (time.time() - speculation.started_at) * 1000):.0f}ms"
+    used_inputs, result = outcome
+    if used_inputs != inputs:
+        logger.info(f"[Speculative] 입력이 변경되어 선행 결과 폐기: job_id={job_id}, stage={stage}")
+        return None
+    logger.info(f"[Speculative] ✓ 선행 결과 사용: job_id={job_id}, stage={stage}, {source}")
+    return result
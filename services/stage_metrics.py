@@ -0,0 +1,228 @@
+"""파이프라인 단계 메트릭"""
+########################################################
+# 단계(stage)별 Prometheus 메트릭
+#
+# 기능:
+# - 단계 API 1회 처리 시간을 구간별로 분리 (라벨: stage, phase, outcome)
+#   - queue_wait: 이전 단계 done → 이 단계 핸들러 시작 (트리거 지연 + 스레드풀 대기)
+#   - context_load: 핸들러 시작 → 첫 모델 추론 시작 (DB 조회, 이미지 로드 등)
+#   - inference: 모델 / GPT 추론 시간 합계 (model_registry.use, gpt_client에서 보고)
+#   - persist: 마지막 추론 종료 → 핸들러 종료 (DB 저장 등)
+# - 모델별 동시 추론 수 (in-flight), 단계별 처리 중 요청 수
+# - job 생성(jobs.created_at) → instagram_feed_gen done까지 end-to-end 시간
+# - 재시도 사유별 카운터는 retry_scheduled_total(실패 유형), gpt_retries_total(사유) 사용
+# - 단계 핸들러 / 추론 구간은 tracing span도 함께 기록 (job_id, job_variants_id 속성)
+# - sync 단계 핸들러는 샘플링 프로파일러 대상 (stage_profiler, 선택된 요청만, async 핸들러는 status()에 보고)
+# - 현재 단계 이름 조회 (DB 쿼리 수 메트릭의 stage 라벨)
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Per-stage latency breakdown, in-flight and end-to-end job metrics
+# version: 1.3.1
+# status: development
+# tags: metrics, pipeline, prometheus
+# dependencies: fastapi, prometheus_client
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import time
+import functools
+import inspect
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator, Optional
+import logging
+from fastapi import HTTPException
+from prometheus_client import Gauge, Histogram
+from services.tracing import start_span
+from services.stage_profiler import stage_profiler
+
+logger = logging.getLogger(__name__)
+
+# 트리거 요청 헤더: 이전 단계가 done이 된 시각 (epoch 초, pipeline_trigger가 설정)
+READY_AT_HEADER = "x-pipeline-ready-at"
+
+pipeline_stage_phase_seconds = Histogram(
+    'pipeline_stage_phase_seconds',
+    'Pipeline stage time by phase (queue_wait, context_load, inference, persist)',
+    ['stage', 'phase', 'outcome'],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900, 1800)
+)
+pipeline_stage_seconds = Histogram(
+    'pipeline_stage_seconds',
+    'Pipeline stage handler duration',
+    ['stage', 'outcome'],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900, 1800)
+)
+pipeline_stage_in_progress = Gauge(
+    'pipeline_stage_in_progress',
+    'Pipeline stage requests being handled',
+    ['stage']
+)
+model_inflight = Gauge(
+    'model_inflight',
+    'Inference calls in progress per model',
+    ['model']
+)
+pipeline_job_e2e_seconds = Histogram(
+    'pipeline_job_e2e_seconds',
+    'Job latency from jobs.created_at to instagram_feed_gen done',
+    buckets=(30, 60, 120, 300, 600, 900, 1800, 3600, 7200)
+)
+
+# 요청 도착 시각 / 이전 단계 done 시각 (미들웨어가 설정, 핸들러 스레드로 전파)
+_request_received_at: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    'pipeline_request_received_at', default=None
+)
+_ready_at: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('pipeline_ready_at', default=None)
+_current_stage: contextvars.ContextVar[Optional["StageTimer"]] = contextvars.ContextVar(
+    'pipeline_current_stage', default=None
+)
+
+
+def mark_request_received(ready_at_header: Optional[str]):
+    """요청 도착 기록 (메트릭 미들웨어에서 호출)"""
+    _request_received_at.set(time.time())
+    ready_at = None
+    if ready_at_header:
+        try:
+            ready_at = float(ready_at_header)
+        except ValueError:
+            pass
+    _ready_at.set(ready_at)
+
+
+def current_stage_name() -> Optional[str]:
+    """현재 실행 중인 단계 핸들러 이름 (단계 밖이면 None)"""
+    timer = _current_stage.get()
+    return timer.stage if timer is not None else None
+
+
+def _outcome(error: Optional[BaseException]) -> str:
+    if error is None:
+        return 'ok'
+    if isinstance(error, HTTPException) and error.status_code < 500:
+        return 'client_error'
+    return 'error'
+
+
+class StageTimer:
+    """단계 핸들러 1회 실행의 구간별 시간 (추론 구간은 모델 사용 측에서 보고)"""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.started = time.time()
+        self.first_inference_at: Optional[float] = None
+        self.last_inference_end: Optional[float] = None
+        self.inference_seconds = 0.0
+
+    def add_inference(self, started: float, ended: float):
+        """추론 1회 보고 (동시에 여러 스레드에서 호출될 수 있음, 합계만 누적)"""
+        if self.first_inference_at is None or started < self.first_inference_at:
+            self.first_inference_at = started
+        if self.last_inference_end is None or ended > self.last_inference_end:
+            self.last_inference_end = ended
+        self.inference_seconds += ended - started
+
+    def observe(self, outcome: str):
+        ended = time.time()
+        labels = {'stage': self.stage, 'outcome': outcome}
+        queue_from = _ready_at.get() or _request_received_at.get()
+        if queue_from is not None:
+            pipeline_stage_phase_seconds.labels(phase='queue_wait', **labels).observe(max(0.0, self.started - queue_from))
+        if self.first_inference_at is None:
+            pipeline_stage_phase_seconds.labels(phase='context_load', **labels).observe(ended - self.started)
+        else:
+            pipeline_stage_phase_seconds.labels(phase='context_load', **labels).observe(self.first_inference_at - self.started)
+            pipeline_stage_phase_seconds.labels(phase='inference', **labels).observe(self.inference_seconds)
+            pipeline_stage_phase_seconds.labels(phase='persist', **labels).observe(max(0.0, ended - self.last_inference_end))
+        pipeline_stage_seconds.labels(**labels).observe(ended - self.started)
+
+
+def _span_attributes(stage: str, kwargs: dict) -> dict:
+    """요청 body의 job_id / job_variants_id를 span 속성으로"""
+    body = kwargs.get('body')
+    return {
+        'stage': stage,
+        'job_id': getattr(body, 'job_id', None),
+        'job_variants_id': getattr(body, 'job_variants_id', None),
+    }
+
+
+def timed_stage(stage: str) -> Callable:
+    """
+    단계 API 핸들러 데코레이터 (sync / async 핸들러 모두 지원, FastAPI 시그니처 유지)
+
+    사용 예:
+        @router.post("/evaluate")
+        @timed_stage("ocr_eval")
+        def evaluate_ocr(...): ...
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            # 이벤트 루프 스레드를 다른 요청과 공유하므로 샘플링 대상에서 제외 (status()에 보고)
+            stage_profiler.register_async_stage(stage)
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                timer = StageTimer(stage)
+                token = _current_stage.set(timer)
+                pipeline_stage_in_progress.labels(stage=stage).inc()
+                error = None
+                try:
+                    with start_span(f"stage.{stage}", _span_attributes(stage, kwargs)):
+                        return await func(*args, **kwargs)
+                except BaseException as e:
+                    error = e
+                    raise
+                finally:
+                    pipeline_stage_in_progress.labels(stage=stage).dec()
+                    _current_stage.reset(token)
+                    timer.observe(_outcome(error))
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timer = StageTimer(stage)
+            token = _current_stage.set(timer)
+            pipeline_stage_in_progress.labels(stage=stage).inc()
+            error = None
+            try:
+                with start_span(f"stage.{stage}", _span_attributes(stage, kwargs)), stage_profiler.profile(stage):
+                    return func(*args, **kwargs)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                pipeline_stage_in_progress.labels(stage=stage).dec()
+                _current_stage.reset(token)
+                timer.observe(_outcome(error))
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def track_inference(model: str) -> Iterator[None]:
+    """모델 추론 구간 (모델별 in-flight 수 + 현재 단계의 inference 구간에 보고)"""
+    timer = _current_stage.get()
+    started = time.time()
+    model_inflight.labels(model=model).inc()
+    try:
+        with start_span(f"inference.{model}", {'model': model}):
+            yield
+    finally:
+        model_inflight.labels(model=model).dec()
+        if timer is not None:
+            timer.add_inference(started, time.time())
+
+
+def observe_job_completed(created_at: Any):
+    """job 완료 (instagram_feed_gen done) 시 jobs.created_at 기준 end-to-end 시간 기록"""
+    if not isinstance(created_at, datetime):
+        return
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    pipeline_job_e2e_seconds.observe(max(0.0, (datetime.now(timezone.utc) - created_at).total_seconds()))
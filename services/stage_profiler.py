@@ -0,0 +1,342 @@
+"""단계 샘플링 프로파일러"""
+########################################################
+# 프로세스 내부 통계적 스택 샘플링 프로파일러 (py-spy 방식, 추가 의존성 없음)
+#
+# 기능:
+# - 단계 핸들러(timed_stage) 요청 중 일부만 선택하여 프로파일링
+#   (PROFILER_STAGES로 대상 단계 제한, PROFILER_SAMPLE_RATIO로 요청 비율)
+# - 선택된 요청이 실행 중일 때만 샘플러 스레드가 PROFILER_INTERVAL_MS 간격으로
+#   해당 핸들러 스레드의 스택을 sys._current_frames()로 수집 (요청 코드에 계측 없음)
+# - 선택된 요청이 CPU 프로세스 풀(cpu_pool)에 넘긴 작업은 워커 안에서 같은 간격으로 샘플링하여
+#   결과와 함께 돌려받아 단계 통계에 합산 (스택 루트에 [cpu_pool] 표시)
+# - 단계별 collapsed-stack 파일 저장 ({PROFILER_DIR}/{stage}/{시각}.collapsed)
+#   → flamegraph.pl, inferno-flamegraph, speedscope로 flamegraph 생성
+# - 단계별 hot 함수 top-N (self: 스택 최상단, total: 스택에 포함된 샘플 비율)
+# - 관리자 API(/admin/profiler)로 실행 중 설정 변경 (재배포 불필요)
+#
+# 비용:
+# - 선택되지 않은 요청은 난수 1회 비교만 수행
+# - 샘플 1회는 대상 스레드 스택 순회 (수십 µs), 1% 요청 비율에서 상시 사용 가능
+#
+# 제약:
+# - sync 핸들러만 대상 (async 핸들러는 이벤트 루프 스레드를 다른 요청과 공유)
+#   → 대상에 포함된 async 단계는 경고 로그를 남기고 status()의 skipped_async_stages로 보고
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Runtime-toggleable in-process sampling profiler for pipeline stages
+# version: 1.1.0
+# status: development
+# tags: profiling, performance, pipeline
+# dependencies: prometheus_client
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import os
+import sys
+import time
+import random
+import threading
+from collections import Counter as TallyCounter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+from prometheus_client import Counter
+from config import (
+    PROFILER_ENABLED, PROFILER_SAMPLE_RATIO, PROFILER_STAGES, PROFILER_INTERVAL_MS,
+    PROFILER_DUMP_INTERVAL_SECONDS, PROFILER_DIR
+)
+
+logger = logging.getLogger(__name__)
+
+_MAX_STACKS_PER_STAGE = 20000  # 단계별 고유 스택 수 상한 (초과분은 [truncated]로 합산)
+_MAX_STACK_DEPTH = 128
+
+profiler_samples_total = Counter(
+    'profiler_samples_total',
+    'Stack samples collected by the stage profiler',
+    ['stage']
+)
+profiler_profiled_requests_total = Counter(
+    'profiler_profiled_requests_total',
+    'Stage requests selected for profiling',
+    ['stage']
+)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> List[str]:
+    """프레임 → 루트부터의 함수 라벨 리스트"""
+    labels = []
+    while frame is not None and len(labels) < _MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def sample_call(interval: float, fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, Dict[str, int]]:
+    """
+    fn 실행 중 현재 스레드 스택을 interval(초) 간격으로 샘플링 (CPU 풀 워커에서 실행)
+
+    Returns:
+        (fn 결과, collapsed stack → 샘플 수)
+    """
+    target = threading.get_ident()
+    stacks: TallyCounter = TallyCounter()
+    finished = threading.Event()
+
+    def sample():
+        while not finished.wait(interval):
+            frame = sys._current_frames().get(target)
+            if frame is not None:
+                stacks[";".join(_collapse(frame))] += 1
+            del frame
+
+    sampler = threading.Thread(target=sample, name="stage-profiler-worker", daemon=True)
+    sampler.start()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        finished.set()
+        sampler.join()
+    return result, dict(stacks)
+
+
+class _StageSamples:
+    """단계 1개의 샘플 집계 (dump 구간 스택 + reset 이후 누적 함수 통계)"""
+
+    def __init__(self):
+        self.window: TallyCounter = TallyCounter()  # 마지막 dump 이후 collapsed stack → 샘플 수
+        self.self_counts: TallyCounter = TallyCounter()  # 함수 → 스택 최상단 샘플 수
+        self.total_counts: TallyCounter = TallyCounter()  # 함수 → 스택에 포함된 샘플 수
+        self.samples = 0
+        self.requests = 0
+
+    def add(self, labels: List[str], count: int = 1):
+        key = ";".join(labels)
+        if key in self.window or len(self.window) < _MAX_STACKS_PER_STAGE:
+            self.window[key] += count
+        else:
+            self.window["[truncated]"] += count
+        self.self_counts[labels[-1]] += count
+        for label in set(labels):
+            self.total_counts[label] += count
+        self.samples += count
+
+
+class StageProfiler:
+    """요청 선택 + 백그라운드 스택 샘플러"""
+
+    def __init__(self):
+        self.enabled = PROFILER_ENABLED
+        self.sample_ratio = PROFILER_SAMPLE_RATIO
+        self.stages = set(PROFILER_STAGES)  # 비어 있으면 모든 단계
+        self.interval = PROFILER_INTERVAL_MS / 1000
+        self.dump_interval = PROFILER_DUMP_INTERVAL_SECONDS
+        self._lock = threading.Lock()
+        self._active: Dict[int, str] = {}  # 프로파일링 중인 핸들러 스레드 id → 단계
+        self._stats: Dict[str, _StageSamples] = {}
+        self._async_stages: set = set()  # 샘플링할 수 없는 async 단계 핸들러
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_dump = time.time()
+
+    def configure(
+        self,
+        enabled: Optional[bool] = None,
+        sample_ratio: Optional[float] = None,
+        stages: Optional[List[str]] = None,
+        interval_ms: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """실행 중 설정 변경 (None인 항목은 유지), 비활성화 시 남은 샘플 저장"""
+        with self._lock:
+            if sample_ratio is not None:
+                self.sample_ratio = min(1.0, max(0.0, sample_ratio))
+            if stages is not None:
+                self.stages = {stage.strip() for stage in stages if stage.strip()}
+            if interval_ms is not None:
+                self.interval = max(1.0, interval_ms) / 1000
+            was_enabled = self.enabled
+            if enabled is not None:
+                self.enabled = enabled
+        logger.info(
+            f"[Profiler] 설정 변경: enabled={self.enabled}, ratio={self.sample_ratio}, "
+            f"stages={sorted(self.stages) or 'all'}, interval={self.interval * 1000:.0f}ms"
+        )
+        self._warn_async_stages()
+        if was_enabled and not self.enabled:
+            self.dump()
+        return self.status()
+
+    def register_async_stage(self, stage: str):
+        """async 단계 핸들러 등록 (timed_stage에서 호출, 프로파일링 대상이면 생략됨을 알림)"""
+        with self._lock:
+            self._async_stages.add(stage)
+        self._warn_async_stages()
+
+    def _skipped_async_stages(self) -> List[str]:
+        """대상 단계 중 async 핸들러라 샘플링하지 않는 단계"""
+        if not self.enabled:
+            return []
+        return sorted(stage for stage in self._async_stages if not self.stages or stage in self.stages)
+
+    def _warn_async_stages(self):
+        skipped = self._skipped_async_stages()
+        if skipped:
+            logger.warning(f"[Profiler] async 단계 핸들러는 프로파일링하지 않음: {skipped}")
+
+    def _selected(self, stage: str) -> bool:
+        if not self.enabled or (self.stages and stage not in self.stages):
+            return False
+        return self.sample_ratio >= 1.0 or random.random() < self.sample_ratio
+
+    def current_stage(self) -> Optional[str]:
+        """현재 스레드가 프로파일링 중인 요청을 처리 중이면 단계 이름 (CPU 풀 작업 샘플링 여부 판단)"""
+        return self._active.get(threading.get_ident())
+
+    def merge(self, stage: str, stacks: Dict[str, int]):
+        """CPU 풀 워커에서 sample_call로 수집한 스택을 단계 통계에 합산"""
+        if not stacks:
+            return
+        with self._lock:
+            stats = self._stats.setdefault(stage, _StageSamples())
+            for stack, count in stacks.items():
+                stats.add(["[cpu_pool]"] + stack.split(";"), count)
+        profiler_samples_total.labels(stage=stage).inc(sum(stacks.values()))
+
+    @contextmanager
+    def profile(self, stage: str) -> Iterator[bool]:
+        """
+        단계 핸들러 실행 구간 (선택된 요청이면 현재 스레드를 샘플링 대상으로 등록)
+
+        Yields:
+            이번 요청이 프로파일링 대상인지
+        """
+        if not self._selected(stage):
+            yield False
+            return
+        tid = threading.get_ident()
+        with self._lock:
+            self._active[tid] = stage
+            self._stats.setdefault(stage, _StageSamples()).requests += 1
+            self._ensure_sampler()
+        profiler_profiled_requests_total.labels(stage=stage).inc()
+        self._wakeup.set()
+        try:
+            yield True
+        finally:
+            with self._lock:
+                self._active.pop(tid, None)
+
+    def _ensure_sampler(self):
+        """샘플러 스레드 시작 (self._lock 보유 상태에서 호출)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="stage-profiler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        sampler_tid = threading.get_ident()
+        while True:
+            # 스냅샷 전에 clear (그 사이 등록된 요청의 wakeup을 놓치지 않도록)
+            self._wakeup.clear()
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                # 프로파일링 중인 요청이 없으면 대기 (dump 주기 확인용으로 주기적으로 깨어남)
+                self._wakeup.wait(timeout=min(self.dump_interval, 60))
+                self._maybe_dump()
+                continue
+            frames = sys._current_frames()
+            with self._lock:
+                for tid, stage in active.items():
+                    frame = frames.get(tid)
+                    if frame is None or tid == sampler_tid:
+                        continue
+                    self._stats.setdefault(stage, _StageSamples()).add(_collapse(frame))
+                    profiler_samples_total.labels(stage=stage).inc()
+            del frames
+            self._maybe_dump()
+            time.sleep(self.interval)
+
+    def _maybe_dump(self):
+        if time.time() - self._last_dump >= self.dump_interval:
+            self.dump()
+
+    def dump(self) -> List[str]:
+        """마지막 dump 이후 수집된 스택을 단계별 collapsed-stack 파일로 저장 (저장한 경로 반환)"""
+        with self._lock:
+            windows = {stage: stats.window for stage, stats in self._stats.items() if stats.window}
+            for stage in windows:
+                self._stats[stage].window = TallyCounter()
+            self._last_dump = time.time()
+        paths = []
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        for stage, window in windows.items():
+            directory = os.path.join(PROFILER_DIR, stage)
+            path = os.path.join(directory, f"{timestamp}.collapsed")
+            try:
+                os.makedirs(directory, exist_ok=True)
+                with open(path, "a", encoding="utf-8") as f:
+                    for stack, count in window.most_common():
+                        f.write(f"{stack} {count}\n")
+                paths.append(path)
+            except OSError as e:
+                logger.warning(f"[Profiler] {stage} 프로파일 저장 실패: {e}")
+        if paths:
+            logger.info(f"[Profiler] 프로파일 저장: {paths}")
+        return paths
+
+    def top(self, stage: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+        """단계별 hot 함수 top-N (reset 이후 누적, 비율은 해당 단계 샘플 대비 %)"""
+        with self._lock:
+            stages = [stage] if stage else sorted(self._stats)
+            result = {}
+            for name in stages:
+                stats = self._stats.get(name)
+                if stats is None or not stats.samples:
+                    continue
+                result[name] = {
+                    'samples': stats.samples,
+                    'requests': stats.requests,
+                    'self': [
+                        {'function': func, 'samples': count, 'percent': round(100 * count / stats.samples, 2)}
+                        for func, count in stats.self_counts.most_common(limit)
+                    ],
+                    'total': [
+                        {'function': func, 'samples': count, 'percent': round(100 * count / stats.samples, 2)}
+                        for func, count in stats.total_counts.most_common(limit)
+                    ],
+                }
+        return result
+
+    def reset(self):
+        """누적 통계 초기화 (저장되지 않은 스택은 먼저 저장)"""
+        self.dump()
+        with self._lock:
+            self._stats = {stage: _StageSamples() for stage in self._active.values()}
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'sample_ratio': self.sample_ratio,
+                'stages': sorted(self.stages),
+                'interval_ms': self.interval * 1000,
+                'dump_interval_seconds': self.dump_interval,
+                'output_dir': PROFILER_DIR,
+                'active_requests': len(self._active),
+                'samples': {stage: stats.samples for stage, stats in self._stats.items()},
+                'skipped_async_stages': self._skipped_async_stages(),
+            }
+
+
+# 프로세스 전역 프로파일러
+stage_profiler = StageProfiler()
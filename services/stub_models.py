@@ -0,0 +1,330 @@
+"""부하 테스트용 stub 모델"""
+########################################################
+# 실제 모델 대신 설정한 지연 시간 분포만큼 대기한 뒤 고정 응답을 반환하는 stub 추론 백엔드
+#
+# 기능:
+# - 계열별 stub 백엔드 (*_BACKEND=stub, STUB_MODELS에 포함된 모델은 기본값이 stub)
+#   LLaVA / YOLO / EasyOCR은 stub 모델을 모델 레지스트리에 등록하므로
+#   single-flight 로딩, in-flight / 추론 메트릭, 텔레메트리는 실제 모델과 같은 경로로 동작
+# - STUB_LATENCY로 모델별 지연 분포 지정 (const / uniform / normal / lognormal, 단위 ms)
+# - LLaVA: 프롬프트 형식(폰트 추천 JSON / Final Assessment / 판정 JSON / 이미지 설명)에 맞는 응답
+# - YOLO: 이미지 중앙 부근 고정 박스
+# - EasyOCR: readtext() 형식의 고정 인식 결과
+# - GPT: OpenAI 응답 형식의 고정 응답 (JSON 모드면 피드 글 JSON, 아니면 번역문, 네트워크 없음)
+#
+# torch / transformers / ultralytics / easyocr / openai 없이 전체 파이프라인 실행 가능 (scripts/load_test_pipeline.py)
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Stub LLaVA / YOLO / OCR / GPT inference backends with configurable latency for load tests
+# version: 1.1.0
+# status: development
+# tags: stub, load-test, model
+# dependencies: pillow, numpy
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import json
+import math
+import time
+import uuid
+import random
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+from PIL import Image
+from config import STUB_LATENCY
+from services.inference_telemetry import InferenceTelemetry
+from services.inference_backends import LlavaBackend, YoloBackend, OcrBackend, GptBackend
+from services.model_registry import model_registry
+from services.stage_metrics import track_inference
+
+logger = logging.getLogger(__name__)
+
+# 모델별 기본 지연 분포 (STUB_LATENCY에 없는 모델, GPU 1장 / OpenAI API 기준 대략적인 실측치)
+DEFAULT_LATENCY = {
+    "llava": "lognormal:1500:0.3",
+    "yolo": "normal:60:15",
+    "ocr": "normal:150:40",
+    "gpt": "normal:800:200",
+}
+class LatencyDistribution:
+    """
+    지연 시간 분포 (ms)
+
+    형식:
+        const:MS
+        uniform:LOW_MS:HIGH_MS
+        normal:MEAN_MS:STD_MS       (0 미만은 0)
+        lognormal:MEDIAN_MS:SIGMA   (긴 꼬리, 생성 모델 지연에 가까움)
+    """
+
+    KINDS = {"const": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+
+    def __init__(self, spec: str):
+        parts = spec.strip().split(":")
+        kind = parts[0].lower()
+        if kind not in self.KINDS or len(parts) - 1 != self.KINDS[kind]:
+            raise ValueError(f"잘못된 지연 분포: {spec} (예: const:100, uniform:50:150, normal:100:20, lognormal:1500:0.3)")
+        self.spec = spec.strip()
+        self.kind = kind
+        self.params = [float(p) for p in parts[1:]]
+
+    def sample_ms(self) -> float:
+        if self.kind == "const":
+            return self.params[0]
+        if self.kind == "uniform":
+            return random.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, random.gauss(*self.params))
+        median, sigma = self.params
+        return median * math.exp(random.gauss(0.0, sigma))
+
+    def __repr__(self) -> str:
+        return f"LatencyDistribution({self.spec!r})"
+
+
+def parse_latency_spec(spec: str) -> Dict[str, LatencyDistribution]:
+    """"llava=lognormal:1500:0.3,yolo=normal:60:15" → 모델별 분포"""
+    result = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        name, _, dist = item.partition("=")
+        result[name.strip().lower()] = LatencyDistribution(dist)
+    return result
+
+
+_latency = {name: LatencyDistribution(spec) for name, spec in DEFAULT_LATENCY.items()}
+_latency.update(parse_latency_spec(STUB_LATENCY))
+
+
+def _wait(model: str) -> float:
+    """모델 지연 시간만큼 대기 (대기한 ms 반환)"""
+    delay_ms = _latency[model].sample_ms()
+    time.sleep(delay_ms / 1000)
+    return delay_ms
+
+
+def _stub_device() -> str:
+    return "cpu"
+
+
+class StubLlava:
+    """LLaVA stub (프롬프트 형식에 맞는 고정 응답)"""
+
+    def generate(
+        self,
+        image: Image.Image,
+        prompt: str,
+        max_new_tokens: int,
+        stop_detector=None,
+        telemetry: Optional[InferenceTelemetry] = None
+    ) -> str:
+        started = time.perf_counter()
+        total_ms = _wait("llava")
+        response = self._response(prompt)
+        if stop_detector is not None:
+            # 스트리밍 생성과 같이 파서에 응답 전달 (호출 측은 stop_detector.result 사용)
+            stop_detector.feed(response)
+        if telemetry is not None:
+            # 실제 생성의 구간 비율을 흉내 (비전 인코더 10%, prefill 15%, decode 나머지)
+            telemetry.preprocess_ms = 0.0
+            telemetry.vision_encode_ms = total_ms * 0.10
+            telemetry.prefill_ms = total_ms * 0.15
+            telemetry.decode_ms = total_ms * 0.75
+            telemetry.tokens_generated = min(max_new_tokens, max(1, len(response) // 4))
+            telemetry.total_ms = (time.perf_counter() - started) * 1000
+        return response
+
+    @staticmethod
+    def _response(prompt: str) -> str:
+        if '"font_style"' in prompt:
+            return json.dumps({
+                "font_style": "sans-serif",
+                "font_name": "Noto Sans KR",
+                "font_size_category": "medium",
+                "font_color_hex": "FFFFFF",
+                "reasoning": "[stub] high contrast on a dark background"
+            }, ensure_ascii=False)
+        if "Final Assessment" in prompt:
+            return (
+                "Match Score: 8/10\n"
+                "Logical Consistency: Yes\n"
+                "Mismatch Detected: No\n"
+                "Mismatch Details: None\n"
+                "Overall Assessment: Suitable\n"
+                "Reasoning: [stub] the ad copy matches the product in the image\n"
+            )
+        if '"on_brief"' in prompt:
+            return json.dumps({
+                "on_brief": True,
+                "occlusion": False,
+                "contrast_ok": True,
+                "cta_present": True,
+                "issues": [],
+                "reasoning": "[stub] text is readable and does not cover the product"
+            })
+        return (
+            "- Product: [stub] kimchi stew\n"
+            "- Characteristics: spicy, red broth, pork and tofu visible\n"
+            "- Setting: restaurant\n"
+            "- Mood: cozy"
+        )
+
+
+class StubYolo:
+    """YOLO stub (이미지 중앙 부근 고정 박스 2개)"""
+
+    names = {0: "person", 45: "bowl", 53: "pizza"}
+
+    def detect(self, image: Image.Image, classes: Optional[List[int]] = None) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """이미지 1장 → (YoloBackend.detect 결과 형식, ultralytics speed 형식 구간별 시간)"""
+        total_ms = _wait("yolo")
+        w, h = image.size
+        boxes = [
+            ([w * 0.30, h * 0.35, w * 0.70, h * 0.80], 0.91, 45),
+            ([w * 0.40, h * 0.45, w * 0.60, h * 0.65], 0.78, 53),
+        ]
+        if classes is not None:
+            boxes = [box for box in boxes if box[2] in classes]
+        result = {
+            "boxes": [box[0] for box in boxes],
+            "confidences": [box[1] for box in boxes],
+            "classes": [box[2] for box in boxes],
+            "names": dict(self.names),
+        }
+        speed = {"preprocess": total_ms * 0.1, "inference": total_ms * 0.8, "postprocess": total_ms * 0.1}
+        return result, speed
+
+
+class StubOcrReader:
+    """EasyOCR Reader stub (readtext 형식의 고정 인식 결과)"""
+
+    def readtext(self, image_array: Any) -> List[Any]:
+        _wait("ocr")
+        height, width = image_array.shape[:2]
+        bbox = [[0, 0], [width, 0], [width, height], [0, height]]
+        return [(bbox, "[stub] 오늘의 추천 메뉴", 0.93)]
+
+
+class StubLlavaBackend(LlavaBackend):
+    """LLaVA stub 백엔드 (모델 레지스트리의 StubLlava 사용)"""
+
+    kind = "stub"
+
+    def __init__(self):
+        super().__init__(max_batch_size=1, max_concurrency=0)
+        model_registry.register("llava", StubLlava, _stub_device)
+
+    def generate(self, image, prompt, max_new_tokens, temperature, do_sample, stop_detector=None, telemetry=None) -> str:
+        with model_registry.use("llava") as model:
+            return model.generate(image, prompt, max_new_tokens, stop_detector, telemetry)
+
+
+class StubYoloBackend(YoloBackend):
+    """YOLO stub 백엔드 (모델 레지스트리의 StubYolo 사용)"""
+
+    kind = "stub"
+
+    def __init__(self):
+        super().__init__(max_batch_size=8, max_concurrency=0)
+
+    def register(self, model_name: str) -> Optional[str]:
+        from services.yolo_service import yolo_model_key
+        key = yolo_model_key(model_name)
+        model_registry.register(key, StubYolo, _stub_device)
+        return key
+
+    def detect(self, images, model_name, conf, iou, classes=None, telemetry=None) -> List[Dict[str, Any]]:
+        results = []
+        speed: Dict[str, float] = {}
+        with model_registry.use(self.register(model_name)) as model:
+            for image in images:
+                result, speed = model.detect(image, classes)
+                results.append(result)
+        if telemetry is not None:
+            telemetry.preprocess_ms = speed.get("preprocess")
+            telemetry.vision_encode_ms = speed.get("inference")
+            telemetry.postprocess_ms = speed.get("postprocess")
+            telemetry.batch_size = len(images)
+        return results
+
+
+class StubOcrBackend(OcrBackend):
+    """OCR stub 백엔드 (모델 레지스트리의 StubOcrReader 사용)"""
+
+    kind = "stub"
+
+    def __init__(self):
+        super().__init__(max_batch_size=1, max_concurrency=0)
+        model_registry.register("ocr", StubOcrReader, _stub_device)
+
+    def readtext(self, image_array: Any) -> List[Tuple[Any, str, float]]:
+        with model_registry.use("ocr") as reader:
+            return reader.readtext(image_array)
+
+
+def _approx_tokens(text: str) -> int:
+    """대략적인 토큰 수 (4글자당 1토큰)"""
+    return max(1, len(text) // 4)
+
+
+class StubGptBackend(GptBackend):
+    """GPT stub 백엔드 (OpenAI 응답 형식의 고정 응답, 가짜 서버 없이 GPT 단계 실행)"""
+
+    kind = "stub"
+
+    def __init__(self):
+        super().__init__(max_batch_size=1, max_concurrency=0)
+
+    def _completion(self, messages: List[Dict[str, str]], params: Dict[str, Any], delay_ms: float) -> Tuple[Any, Dict[str, Any]]:
+        user_text = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        if (params.get("response_format") or {}).get("type") == "json_object":
+            content = json.dumps({
+                "instagram_ad_copy": f"[stub] 오늘의 추천 메뉴를 만나보세요! ({len(user_text)}자 입력)",
+                "hashtags": "#맛집 #맛스타그램 #먹스타그램 #푸드스타그램 #데일리"
+            }, ensure_ascii=False)
+        else:
+            content = f"[stub] 번역된 광고 문구 ({len(user_text)}자 입력)"
+        prompt_tokens = sum(_approx_tokens(m.get("content", "")) for m in messages)
+        completion_tokens = _approx_tokens(content)
+        token_usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+        response = SimpleNamespace(
+            id=f"chatcmpl-stub-{uuid.uuid4().hex[:12]}",
+            object="chat.completion",
+            created=int(time.time()),
+            model=params.get("model", "stub"),
+            choices=[SimpleNamespace(
+                index=0,
+                message=SimpleNamespace(role="assistant", content=content),
+                finish_reason="stop"
+            )],
+            usage=SimpleNamespace(**token_usage)
+        )
+        stats = {
+            "latency_ms": delay_ms,
+            "queue_wait_ms": 0.0,
+            "attempts": 1,
+            "retry_reasons": [],
+            "token_usage": token_usage
+        }
+        return response, stats
+
+    def chat(self, operation: str, messages: List[Dict[str, str]], **params) -> Tuple[Any, Dict[str, Any]]:
+        with track_inference(params.get("model") or "gpt"):
+            delay_ms = _wait("gpt")
+        return self._completion(messages, params, delay_ms)
+
+    async def achat(self, operation: str, messages: List[Dict[str, str]], **params) -> Tuple[Any, Dict[str, Any]]:
+        with track_inference(params.get("model") or "gpt"):
+            delay_ms = _latency["gpt"].sample_ms()
+            await asyncio.sleep(delay_ms / 1000)
+        return self._completion(messages, params, delay_ms)
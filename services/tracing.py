@@ -0,0 +1,312 @@
+"""파이프라인 분산 트레이싱"""
+########################################################
+# 리스너 → 트리거 → HTTP 자기 호출 → 단계 라우터 → 모델 추론 → DB 커밋 구간을 span으로 연결
+#
+# 기능:
+# - W3C traceparent 형식의 trace context (contextvars로 async / 스레드풀 전파)
+# - HTTP 전파: pipeline_trigger가 traceparent 헤더 설정, 메트릭 미들웨어가 서버 span 시작
+# - NOTIFY 전파: 단계 핸들러의 DB 트랜잭션에 app.traceparent 설정 → NOTIFY payload의 traceparent
+#   → 리스너가 이어서 span 시작 (docs/04_notify_trace_context.sql)
+# - 샘플링: 루트 span에서 trace_id 기준으로 결정 (TRACING_SAMPLE_RATIO), 하위 span은 결정을 따름
+# - exporter: JSONL 파일 (오프라인) 또는 OTLP/HTTP JSON (Jaeger, Tempo, OTel Collector)
+#   백그라운드 스레드에서 배치 전송 (요청 경로에서 I/O 없음)
+########################################################
+# created_at: 2026-10-19
+# updated_at: 2026-10-19
+# author: LEEYH205
+# description: Lightweight span tracing with traceparent propagation over HTTP and NOTIFY
+# version: 1.0.0
+# status: development
+# tags: tracing, observability, pipeline
+# dependencies: httpx
+# license: MIT
+# copyright: 2025 FeedlyAI
+########################################################
+
+import os
+import json
+import time
+import queue
+import atexit
+import secrets
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+import logging
+from config import (
+    TRACING_ENABLED, TRACING_SAMPLE_RATIO, TRACING_EXPORTER, TRACING_FILE_PATH,
+    TRACING_OTLP_ENDPOINT, TRACING_SERVICE_NAME
+)
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+_EXPORT_BATCH_SIZE = 256
+_EXPORT_INTERVAL_SECONDS = 2.0
+_EXPORT_QUEUE_SIZE = 10000  # 가득 차면 span 버림 (요청 경로를 막지 않음)
+
+
+class SpanContext:
+    """전파되는 trace context (trace_id, span_id, 샘플링 여부)"""
+    __slots__ = ('trace_id', 'span_id', 'sampled')
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    def to_traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """traceparent 문자열 → SpanContext (형식이 잘못되었으면 None)"""
+    if not value or not isinstance(value, str):
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return SpanContext(parts[1], parts[2], bool(flags & 1))
+
+
+def _sample(trace_id: str) -> bool:
+    """루트 span 샘플링 (trace_id 하위 64비트 기준, 같은 trace는 어디서 판단해도 같은 결과)"""
+    if TRACING_SAMPLE_RATIO >= 1.0:
+        return True
+    if TRACING_SAMPLE_RATIO <= 0.0:
+        return False
+    return int(trace_id[16:], 16) / float(1 << 64) < TRACING_SAMPLE_RATIO
+
+
+class Span:
+    """실행 구간 1개 (샘플링되지 않은 span도 context 전파를 위해 생성, export만 생략)"""
+    __slots__ = ('name', 'context', 'parent_span_id', 'kind', 'attributes', 'start_ns', 'end_ns', 'status', 'error')
+
+    def __init__(self, name: str, context: SpanContext, parent_span_id: Optional[str], kind: str,
+                 attributes: Optional[Dict[str, Any]]):
+        self.name = name
+        self.context = context
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes: Dict[str, Any] = {k: v for k, v in (attributes or {}).items() if v is not None}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = 'ok'
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = 'error'
+        self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.context.trace_id,
+            'span_id': self.context.span_id,
+            'parent_span_id': self.parent_span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'start_ns': self.start_ns,
+            'end_ns': self.end_ns,
+            'duration_ms': (self.end_ns - self.start_ns) / 1e6 if self.end_ns else None,
+            'status': self.status,
+            'error': self.error,
+            'attributes': self.attributes,
+            'service': TRACING_SERVICE_NAME,
+        }
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('tracing_current_span', default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_traceparent() -> Optional[str]:
+    """현재 span의 traceparent (트레이싱 비활성 또는 span 밖이면 None)"""
+    span = _current_span.get()
+    return span.context.to_traceparent() if span is not None else None
+
+
+def inject_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """HTTP 요청 헤더에 traceparent 추가"""
+    headers = dict(headers or {})
+    traceparent = current_traceparent()
+    if traceparent:
+        headers[TRACEPARENT_HEADER] = traceparent
+    return headers
+
+
+@contextmanager
+def start_span(
+    name: str,
+    attributes: Optional[Dict[str, Any]] = None,
+    parent: Optional[SpanContext] = None,
+    kind: str = 'internal'
+) -> Iterator[Optional[Span]]:
+    """
+    span 시작 (sync / async 코드 모두 with 문으로 사용)
+
+    Args:
+        name: span 이름 (예: "listener.variant_event", "stage.ocr_eval")
+        attributes: job_id / job_variants_id 등 속성
+        parent: 원격 부모 context (HTTP 헤더 / NOTIFY payload), 없으면 현재 span
+        kind: internal | server | client | consumer
+    """
+    if not TRACING_ENABLED:
+        yield None
+        return
+
+    parent_span = _current_span.get()
+    if parent is None and parent_span is not None:
+        parent = parent_span.context
+    if parent is not None:
+        context = SpanContext(parent.trace_id, secrets.token_hex(8), parent.sampled)
+        parent_span_id = parent.span_id
+    else:
+        trace_id = secrets.token_hex(16)
+        context = SpanContext(trace_id, secrets.token_hex(8), _sample(trace_id))
+        parent_span_id = None
+
+    span = Span(name, context, parent_span_id, kind, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end_ns = time.time_ns()
+        if context.sampled:
+            _exporter().submit(span)
+
+
+class _SpanExporter:
+    """백그라운드 배치 exporter (file: JSONL 1줄 1 span, otlp: OTLP/HTTP JSON)"""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=_EXPORT_QUEUE_SIZE)
+        self._dropped = 0
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def submit(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self._dropped += 1
+
+    def _drain(self, block: bool) -> List[Span]:
+        batch: List[Span] = []
+        try:
+            if block:
+                batch.append(self._queue.get(timeout=_EXPORT_INTERVAL_SECONDS))
+            while len(batch) < _EXPORT_BATCH_SIZE:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._drain(block=True)
+            if batch:
+                self._export(batch)
+
+    def flush(self):
+        """남은 span 내보내기 (프로세스 종료 시)"""
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                return
+            self._export(batch)
+
+    def _export(self, batch: List[Span]):
+        try:
+            if self.kind == 'otlp':
+                self._export_otlp(batch)
+            else:
+                self._export_file(batch)
+        except Exception as e:
+            logger.warning(f"[Tracing] span {len(batch)}개 내보내기 실패: {e}")
+        if self._dropped:
+            logger.warning(f"[Tracing] export 큐가 가득 차 span {self._dropped}개 버림")
+            self._dropped = 0
+
+    def _export_file(self, batch: List[Span]):
+        directory = os.path.dirname(TRACING_FILE_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(TRACING_FILE_PATH, "a", encoding="utf-8") as f:
+            for span in batch:
+                f.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+
+    def _export_otlp(self, batch: List[Span]):
+        import httpx
+
+        def _value(v: Any) -> Dict[str, Any]:
+            if isinstance(v, bool):
+                return {"boolValue": v}
+            if isinstance(v, int):
+                return {"intValue": str(v)}
+            if isinstance(v, float):
+                return {"doubleValue": v}
+            return {"stringValue": str(v)}
+
+        kinds = {'internal': 1, 'server': 2, 'client': 3, 'producer': 4, 'consumer': 5}
+        spans = []
+        for span in batch:
+            item = {
+                "traceId": span.context.trace_id,
+                "spanId": span.context.span_id,
+                "name": span.name,
+                "kind": kinds.get(span.kind, 1),
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [{"key": k, "value": _value(v)} for k, v in span.attributes.items()],
+                "status": {"code": 2, "message": span.error or ""} if span.status == 'error' else {"code": 1},
+            }
+            if span.parent_span_id:
+                item["parentSpanId"] = span.parent_span_id
+            spans.append(item)
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACING_SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": "feedlyai.pipeline"}, "spans": spans}]
+            }]
+        }
+        httpx.post(TRACING_OTLP_ENDPOINT, json=payload, timeout=5.0).raise_for_status()
+
+
+_exporter_instance: Optional[_SpanExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def _exporter() -> _SpanExporter:
+    global _exporter_instance
+    if _exporter_instance is None:
+        with _exporter_lock:
+            if _exporter_instance is None:
+                _exporter_instance = _SpanExporter(TRACING_EXPORTER)
+    return _exporter_instance
+
+
+def flush():
+    """대기 중인 span 내보내기 (앱 종료 시 호출)"""
+    if _exporter_instance is not None:
+        _exporter_instance.flush()
@@ -8,12 +8,17 @@
 # 금지 영역 감지:
 # - 이미지에서 금지 영역(예: 사람 얼굴, 특정 객체)을 감지
 # - 바운딩 박스(xyxy 형식) 반환
+#
+# 추론 백엔드 (YOLO_BACKEND):
+# - local: ultralytics + torch (.pt)
+# - onnx: ONNX로 내보낸 모델 (MODEL_DIR의 같은 이름 .onnx, 없으면 첫 로드 시 .pt에서 dynamic batch로 내보내기)
+# - remote: 추론 워커 / stub: 고정 박스 (services/inference_backends.py)
 ########################################################
 # created_at: 2025-11-21
-# updated_at: 2025-11-24
+# updated_at: 2026-10-19
 # author: LEEYH205
 # description: YOLO model service
-# version: 0.1.0
+# version: 0.6.0
 # status: development
 # tags: yolo, model, service
 # dependencies: ultralytics, torch, pillow
@@ -23,74 +28,233 @@
 
 import os
 import json
-from typing import Optional, Dict, Any, List
+import time
+from typing import Optional, Dict, Any, List, Tuple, TYPE_CHECKING
 from PIL import Image
 import numpy as np
-import torch
-from ultralytics import YOLO
-from config import DEVICE_TYPE, MODEL_DIR, YOLO_MODEL_NAME, YOLO_CONF_THRESHOLD, YOLO_IOU_THRESHOLD, YOLO_FORBIDDEN_LABELS
+from config import DEVICE_TYPE, MODEL_DIR, YOLO_MODEL_NAME, YOLO_CONF_THRESHOLD, YOLO_IOU_THRESHOLD, YOLO_FORBIDDEN_LABELS, YOLO_BACKEND
 import logging
+from services.model_registry import model_registry
+from services.inference_telemetry import InferenceTelemetry, record, reset_peak_memory, peak_memory_mb
+from services.inference_backends import YoloBackend, RemoteYoloBackend, register_backend, get_backend
+from services.stub_models import StubYoloBackend
+
+# torch/ultralytics는 import만으로 수 초가 걸리므로 첫 사용 시점에 import (lazy import)
+if TYPE_CHECKING:
+    from ultralytics import YOLO
 
 logger = logging.getLogger(__name__)
 
-# 디바이스 설정
-DEVICE = DEVICE_TYPE if DEVICE_TYPE == "cuda" and torch.cuda.is_available() else "cpu"
+# 디바이스 설정 (첫 호출 시 torch import 후 결정)
+_device: Optional[str] = None
 
-# 전역 모델 변수 (lazy loading)
-_model: Optional[YOLO] = None
-_model_path: Optional[str] = None
+# 모델 객체는 모델 레지스트리가 소유 (lazy loading, 사전 로딩, LRU 언로드)
 
 
-def get_yolo_model(model_name: str = "yolov8x-seg.pt") -> YOLO:
-    """YOLO 모델 로드 (싱글톤 패턴)"""
-    global _model, _model_path
-    
-    # 확장자가 없으면 .pt 추가
+def get_device() -> str:
+    """추론 디바이스 반환 (cuda 사용 가능 여부는 첫 호출 시 확인)"""
+    global _device
+    if _device is None:
+        if YOLO_BACKEND not in ("local", "onnx"):
+            # remote / stub 백엔드는 이 프로세스에서 torch를 사용하지 않음 (CPU 전용 API 노드)
+            _device = "cpu"
+        else:
+            import torch
+            _device = DEVICE_TYPE if DEVICE_TYPE == "cuda" and torch.cuda.is_available() else "cpu"
+    return _device
+
+
+def _resolve_model_path(model_name: str) -> str:
+    """모델 파일명을 MODEL_DIR 기준 경로로 변환 (확장자가 없으면 .pt 추가)"""
     if model_name and not model_name.endswith(('.pt', '.onnx', '.engine')):
         model_name = f"{model_name}.pt"
+    return os.path.join(MODEL_DIR, model_name)
+
+
+def _load_yolo_model(model_path: str) -> "YOLO":
+    """YOLO 모델 로드 (모델 레지스트리 로더)"""
+    if not os.path.exists(model_path):
+        # 추가 디버깅: MODEL_DIR 내용 확인
+        if os.path.exists(MODEL_DIR):
+            files = os.listdir(MODEL_DIR)
+            logger.error(f"MODEL_DIR contents: {files}")
+        raise FileNotFoundError(
+            f"YOLO 모델 파일을 찾을 수 없습니다: {model_path}\n"
+            f"다운로드 스크립트를 실행하세요: python download_yolo_model.py"
+        )
     
-    model_path = os.path.join(MODEL_DIR, model_name)
+    print(f"Loading YOLO model: {os.path.basename(model_path)} on {get_device()}")
+    print(f"Model path: {model_path}")
     
-    # 디버깅: 경로 정보 출력
-    logger.info(f"[DEBUG] get_yolo_model called:")
-    logger.info(f"  - model_name parameter: {model_name}")
-    logger.info(f"  - MODEL_DIR: {MODEL_DIR}")
-    logger.info(f"  - YOLO_MODEL_NAME (from config): {YOLO_MODEL_NAME}")
-    logger.info(f"  - model_path: {model_path}")
-    logger.info(f"  - model_path exists: {os.path.exists(model_path)}")
-    logger.info(f"  - _model_path (current): {_model_path}")
+    # YOLO 모델 로드
+    from ultralytics import YOLO
+    model = YOLO(model_path)
     
-    # 모델이 로드되지 않았거나 다른 모델을 요청한 경우
-    if _model is None or _model_path != model_path:
-        if not os.path.exists(model_path):
-            # 추가 디버깅: MODEL_DIR 내용 확인
-            if os.path.exists(MODEL_DIR):
-                files = os.listdir(MODEL_DIR)
-                logger.error(f"MODEL_DIR contents: {files}")
-            raise FileNotFoundError(
-                f"YOLO 모델 파일을 찾을 수 없습니다: {model_path}\n"
-                f"다운로드 스크립트를 실행하세요: python download_yolo_model.py"
-            )
-        
-        print(f"Loading YOLO model: {model_name} on {DEVICE}")
-        print(f"Model path: {model_path}")
-        logger.info(f"[DEBUG] Loading YOLO model: {model_name} on {DEVICE}")
-        logger.info(f"[DEBUG] Model path: {model_path}")
-        
-        # YOLO 모델 로드
-        _model = YOLO(model_path)
-        _model_path = model_path
-        
-        logger.info(f"[DEBUG] _model_path set to: {_model_path}")
-        
-        # 디바이스 설정
-        if DEVICE == "cuda":
-            _model.to(DEVICE)
-        
-        print(f"✓ YOLO model loaded successfully")
-        logger.info(f"[DEBUG] YOLO model loaded successfully, _model_path={_model_path}")
+    # 디바이스 설정
+    if get_device() == "cuda":
+        model.to(get_device())
     
-    return _model
+    print(f"✓ YOLO model loaded successfully")
+    return model
+
+
+def _load_yolo_onnx_model(model_path: str) -> "YOLO":
+    """ONNX YOLO 모델 로드 (모델 레지스트리 로더, .onnx가 없으면 같은 이름의 .pt에서 내보내기)"""
+    onnx_path = os.path.splitext(model_path)[0] + ".onnx"
+    if not os.path.exists(onnx_path):
+        logger.info(f"ONNX 모델이 없어 내보내기: {os.path.basename(model_path)} → {os.path.basename(onnx_path)}")
+        # dynamic=True: 배치 크기 / 입력 크기가 고정되지 않은 그래프 (배치 추론용)
+        onnx_path = _load_yolo_model(model_path).export(format="onnx", dynamic=True, simplify=True)
+    from ultralytics import YOLO
+    print(f"Loading YOLO ONNX model: {os.path.basename(onnx_path)}")
+    model = YOLO(onnx_path)
+    print(f"✓ YOLO ONNX model loaded successfully")
+    return model
+
+
+def yolo_model_key(model_name: str) -> str:
+    """모델 레지스트리 키 (기본 모델(YOLO_MODEL_NAME)은 "yolo", 그 외 모델은 "yolo:{파일명}")"""
+    model_path = _resolve_model_path(model_name)
+    return "yolo" if model_path == _resolve_model_path(YOLO_MODEL_NAME) else f"yolo:{os.path.basename(model_path)}"
+
+
+def _result_to_detections(result) -> Dict[str, Any]:
+    """ultralytics Results → YoloBackend.detect 결과 형식 (클래스 필터링 전 전체 박스)"""
+    boxes = []
+    confidences = []
+    classes = []
+    if result.boxes is not None:
+        for box in result.boxes:
+            boxes.append(box.xyxy[0].cpu().tolist())
+            confidences.append(float(box.conf[0].cpu()))
+            classes.append(int(box.cls[0]))
+    return {"boxes": boxes, "confidences": confidences, "classes": classes, "names": dict(result.names)}
+
+
+class LocalYoloBackend(YoloBackend):
+    """YOLO local 백엔드 (ultralytics + torch, 이미지 리스트를 한 번에 predict)"""
+
+    kind = "local"
+
+    def __init__(self, max_concurrency: int = 2):
+        super().__init__(max_batch_size=8, max_concurrency=max_concurrency)
+
+    def _loader(self, model_path: str):
+        return lambda: _load_yolo_model(model_path)
+
+    def register(self, model_name: str) -> Optional[str]:
+        key = yolo_model_key(model_name)
+        if not model_registry.is_registered(key):
+            # yolov8x-seg 약 140MB (추론 버퍼 포함 여유분)
+            model_registry.register(key, self._loader(_resolve_model_path(model_name)), get_device, estimate_mb=600)
+        return key
+
+    def detect(self, images, model_name, conf, iou, classes=None, telemetry=None) -> List[Dict[str, Any]]:
+        # 추론 구간 동안 사용 중으로 표시 (메모리 예산 초과 시에도 언로드되지 않음)
+        with model_registry.use(self.register(model_name)) as model:
+
+            # GPU 메모리 정리
+            if get_device() == "cuda":
+                import torch
+                torch.cuda.empty_cache()
+                # 메모리 단편화 방지
+                import gc
+                gc.collect()
+
+            reset_peak_memory(get_device())
+            results = model.predict(
+                images,
+                conf=conf,
+                iou=iou,
+                device=get_device(),
+                classes=classes,
+                verbose=False
+            )
+            detections = [_result_to_detections(result) for result in results]
+
+            if telemetry is not None:
+                # ultralytics가 측정한 구간별 시간 (이미지당 ms, 네트워크 forward 전체를 vision_encode로 기록)
+                speed = (getattr(results[0], "speed", None) or {}) if results else {}
+                telemetry.preprocess_ms = speed.get("preprocess")
+                telemetry.vision_encode_ms = speed.get("inference")
+                telemetry.postprocess_ms = speed.get("postprocess")
+                telemetry.batch_size = len(results) if results else 1
+                telemetry.peak_memory_mb = peak_memory_mb(get_device())
+
+        # GPU 메모리 정리
+        if get_device() == "cuda":
+            import torch
+            torch.cuda.empty_cache()
+        return detections
+
+
+class OnnxYoloBackend(LocalYoloBackend):
+    """YOLO onnx 백엔드 (ONNX Runtime 추론, 세션이 GIL을 놓으므로 동시 추론 수를 늘림)"""
+
+    kind = "onnx"
+
+    def __init__(self):
+        super().__init__(max_concurrency=4)
+
+    def _loader(self, model_path: str):
+        return lambda: _load_yolo_onnx_model(model_path)
+
+
+# 추론 백엔드 등록 (YOLO_BACKEND로 선택)
+register_backend("yolo", "local", LocalYoloBackend)
+register_backend("yolo", "onnx", OnnxYoloBackend)
+register_backend("yolo", "remote", RemoteYoloBackend)
+register_backend("yolo", "stub", StubYoloBackend)
+
+
+def register_yolo_model(model_name: str = "yolov8x-seg.pt") -> Optional[str]:
+    """
+    YOLO 모델을 선택된 백엔드로 모델 레지스트리에 등록하고 레지스트리 키 반환
+
+    remote 백엔드는 이 프로세스에서 로드하지 않으므로 None을 반환한다.
+    """
+    return get_backend("yolo").register(model_name)
+
+
+def get_yolo_model(model_name: str = "yolov8x-seg.pt") -> "YOLO":
+    """YOLO 모델 반환 (모델 레지스트리에서 로드, 모델별 1회)"""
+    return model_registry.get(register_yolo_model(model_name))
+
+
+def predict_detections(
+    images: List[Image.Image],
+    model_name: str,
+    conf_threshold: float,
+    iou_threshold: float,
+    classes: Optional[List[int]] = None
+) -> Tuple[List[Dict[str, Any]], InferenceTelemetry]:
+    """
+    선택된 백엔드로 이미지 배치 감지 (동시 추론 수 제한, 텔레메트리 기록)
+
+    Returns:
+        (이미지별 감지 결과 (YoloBackend.detect 형식), 텔레메트리)
+
+    Raises:
+        ValueError: 이미지 수가 백엔드 max_batch_size 초과
+    """
+    backend = get_backend("yolo")
+    if len(images) > backend.capabilities.max_batch_size:
+        raise ValueError(f"YOLO 배치 크기 초과: {len(images)} > {backend.capabilities.max_batch_size}")
+    registry_key = register_yolo_model(model_name)
+    telemetry = InferenceTelemetry(
+        registry_key or "yolo", batch_size=len(images),
+        cache_hit=registry_key is not None and model_registry.is_loaded(registry_key)
+    )
+    started = time.perf_counter()
+    with backend.slot():
+        detections = backend.detect(images, model_name, conf_threshold, iou_threshold, classes, telemetry)
+    telemetry.total_ms = (time.perf_counter() - started) * 1000
+    record(telemetry)
+    return detections, telemetry
+
+
+# 기본 모델 등록 (MODEL_PRELOAD 사전 로딩 대상)
+register_yolo_model(YOLO_MODEL_NAME)
 
 
 def detect_forbidden_areas(
@@ -123,7 +287,8 @@ def detect_forbidden_areas(
             "widths": [100.0, ...],
             "heights": [200.0, ...],
             "model": model_name,
-            "forbidden_mask": PIL Image (L 모드)  # 금지 영역 마스크
+            "forbidden_mask": PIL Image (L 모드),  # 금지 영역 마스크
+            "telemetry": {...}  # 추론 텔레메트리 (preprocess / vision_encode(forward) / postprocess ms, 최대 메모리 등)
         }
     """
     # 설정값 적용 (인자로 전달되지 않으면 config에서 가져옴)
@@ -203,27 +368,12 @@ def detect_forbidden_areas(
             #"potted plant",
             #"teddy bear",
         ]
-    model = get_yolo_model(model_name)
-    
-    # GPU 메모리 정리
-    if DEVICE == "cuda":
-        torch.cuda.empty_cache()
-        # 메모리 단편화 방지
-        import gc
-        gc.collect()
-    
     # YOLO 추론 실행
     # forbidden_labels를 사용하는 경우 모든 클래스를 감지한 후 필터링
     # (이전 코드와 동일한 방식)
     classes_to_detect = target_classes if (target_classes and forbidden_labels is None) else None
-    results = model.predict(
-        image,
-        conf=conf_threshold,
-        iou=iou_threshold,
-        device=DEVICE,
-        classes=classes_to_detect,  # target_classes가 있고 forbidden_labels가 None일 때만 사용
-        verbose=False
-    )
+    results, telemetry = predict_detections([image], model_name, conf_threshold, iou_threshold, classes_to_detect)
+    detections = results[0]
     
     boxes = []
     confidences = []
@@ -234,50 +384,34 @@ def detect_forbidden_areas(
     heights = []
     
     # 결과 파싱
-    if results and len(results) > 0:
-        result = results[0]
+    # 모델의 클래스 이름 (YOLO 모델은 항상 names를 제공)
+    model_names = detections["names"]
+    for (x1, y1, x2, y2), conf, cls_id in zip(detections["boxes"], detections["confidences"], detections["classes"]):
+        # 클래스 이름 가져오기
+        label = model_names.get(cls_id, f"class_{cls_id}")
         
-        # 모델의 클래스 이름 가져오기 (YOLO 모델은 항상 result.names를 제공)
-        model_names = result.names
+        # 라벨 이름 기반 필터링 (이전 코드와 동일)
+        if forbidden_labels and label not in forbidden_labels:
+            continue
         
-        # 바운딩 박스 정보 추출
-        if result.boxes is not None and len(result.boxes) > 0:
-            for box in result.boxes:
-                cls_id = int(box.cls[0])
-                
-                # 클래스 이름 가져오기
-                label = model_names.get(cls_id, f"class_{cls_id}")
-                
-                # 라벨 이름 기반 필터링 (이전 코드와 동일)
-                if forbidden_labels and label not in forbidden_labels:
-                    continue
-                
-                # target_classes 필터링 (forbidden_labels가 None일 때만 사용)
-                if forbidden_labels is None and target_classes is not None:
-                    if cls_id not in target_classes:
-                        continue
-                
-                # xyxy 형식으로 변환
-                x1, y1, x2, y2 = box.xyxy[0].cpu().tolist()
-                conf = float(box.conf[0].cpu())
-                
-                boxes.append([x1, y1, x2, y2])
-                confidences.append(conf)
-                classes.append(cls_id)
-                labels.append(label)
-                
-                # 박스 크기 계산
-                width = x2 - x1
-                height = y2 - y1
-                area = width * height
-                
-                widths.append(width)
-                heights.append(height)
-                areas.append(area)
-    
-    # GPU 메모리 정리
-    if DEVICE == "cuda":
-        torch.cuda.empty_cache()
+        # target_classes 필터링 (forbidden_labels가 None일 때만 사용)
+        if forbidden_labels is None and target_classes is not None:
+            if cls_id not in target_classes:
+                continue
+        
+        boxes.append([x1, y1, x2, y2])
+        confidences.append(conf)
+        classes.append(cls_id)
+        labels.append(label)
+        
+        # 박스 크기 계산
+        width = x2 - x1
+        height = y2 - y1
+        area = width * height
+        
+        widths.append(width)
+        heights.append(height)
+        areas.append(area)
     
     # 금지 영역 마스크 생성
     forbidden_mask = boxes_to_mask(boxes, image.width, image.height)
@@ -311,7 +445,8 @@ def detect_forbidden_areas(
         "heights": heights,
         "model": model_name,
         "forbidden_mask": forbidden_mask,  # PIL Image (L 모드, 0=허용, 255=금지)
-        "detections_json": detections_json  # JSON 형식 (normalized bbox)
+        "detections_json": detections_json,  # JSON 형식 (normalized bbox)
+        "telemetry": telemetry.to_dict()
     }
 
 
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""CPU hot path 마이크로 벤치마크 스크립트 (서버 / DB / 모델 불필요)
+
+Planner 위치 제안, 텍스트 피팅/줄바꿈, proposal 선택, 가독성 평가, 음식 IoU, OCR 정확도 계산을
+생성한 이미지 / 금지 영역 마스크로 해상도, 박스 수, 광고 문구(한/영, 짧은/긴 문구)별로 측정합니다.
+결과는 JSON baseline으로 저장하고, 이후 실행에서 baseline 대비 회귀(threshold 배 이상 느려짐)를 검사합니다.
+
+측정 방식:
+- 입력은 고정 seed로 생성 (실행마다 동일한 이미지 / 박스 / 문구)
+- 케이스마다 워밍업 1회 후 1회 측정이 약 --min-time초가 되도록 반복 횟수를 정하고,
+  --repeat번 측정한 호출당 시간의 중앙값(median)을 대표값으로 사용
+- 측정 중 로그 / print 출력은 억제 (출력 비용이 측정에 섞이지 않도록)
+
+baseline은 측정한 머신에서만 의미가 있으므로 같은 머신에서 저장 → 비교하세요.
+
+사용 방법:
+    python3 test/test_cpu_benchmarks.py --save-baseline
+    python3 test/test_cpu_benchmarks.py                                  # baseline과 비교 (회귀 시 exit 1)
+    python3 test/test_cpu_benchmarks.py --filter planner --repeat 9
+    python3 test/test_cpu_benchmarks.py --threshold 1.5 --output /tmp/bench.json
+    python3 test/test_cpu_benchmarks.py --font /path/to/NanumGothic.ttf   # 폰트 레지스트리가 비어 있는 환경
+"""
+########################################################
+# created_at: 2026-10-19
+# author: LEEYH205
+# description: 오프라인 CPU hot path 마이크로 벤치마크 (JSON baseline + 회귀 검사)
+# version: 1.0.0
+########################################################
+
+import os
+import io
+import sys
+import json
+import time
+import random
+import logging
+import platform
+import statistics
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from services.planner_service import propose_overlay_positions
+from services.overlay_service import fit_text, wrap_text
+from services.readability_service import evaluate_readability
+from services.iou_eval_service import calculate_iou_with_food
+from services.ocr_service import calculate_ocr_accuracy
+from services.font_registry import get_font_registry
+from routers.overlay import _select_best_proposal_with_diversity
+
+DEFAULT_BASELINE = project_root / "test" / "benchmarks" / "cpu_baseline.json"
+
+# 피드 이미지에서 흔한 해상도 (정사각 / 세로형 / 고해상도 원본)
+RESOLUTIONS = [(512, 512), (1080, 1080), (1080, 1350), (2048, 2048)]
+# YOLO 음식 감지 박스 수 (없음 / 일반 / 많은 반찬)
+BOX_COUNTS = [0, 3, 10]
+# 광고 문구 (한/영, 짧은 헤드라인 / 긴 본문형 문구)
+AD_TEXTS = {
+    "ko_short": "오늘만 특가! 신선한 샐러드 20% 할인",
+    "ko_long": "매일 아침 직접 구운 빵과 제철 과일로 만든 브런치 세트, 주말 한정으로 음료까지 무료로 드립니다. 지금 바로 방문하세요!",
+    "en_short": "Fresh Salad Today, 20% Off",
+    "en_long": "Freshly baked bread and seasonal fruit brunch sets every morning. Free drinks on weekends only - visit us today and taste the difference!",
+}
+# 텍스트 피팅 대상 박스 (이미지 대비 비율: 상단 배너 / 하단 넓은 영역)
+FIT_BOXES = {"banner": (0.1, 0.05, 0.9, 0.2), "wide": (0.05, 0.6, 0.95, 0.95)}
+
+
+# ==============================
+# 입력 생성
+# ==============================
+
+def make_image(width: int, height: int, seed: int = 0) -> Image.Image:
+    """그라디언트 + 노이즈 배경 이미지 (실제 사진처럼 영역별 밝기 / 색이 다르도록)"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([
+        255 * x / max(1, width - 1),
+        255 * y / max(1, height - 1),
+        128 + 64 * np.sin(x / 37.0) * np.cos(y / 53.0),
+    ], axis=-1)
+    noise = rng.normal(0, 12, size=base.shape)
+    return Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8), "RGB")
+
+
+def make_boxes(width: int, height: int, count: int, seed: int = 0) -> List[List[float]]:
+    """음식 감지 박스 (xyxy 픽셀 좌표, 이미지 중앙 쪽에 몰리도록)"""
+    rng = random.Random(seed)
+    boxes = []
+    for _ in range(count):
+        w = rng.uniform(0.1, 0.35) * width
+        h = rng.uniform(0.1, 0.35) * height
+        cx = rng.gauss(0.5, 0.15) * width
+        cy = rng.gauss(0.55, 0.15) * height
+        x1 = min(max(0.0, cx - w / 2), width - w)
+        y1 = min(max(0.0, cy - h / 2), height - h)
+        boxes.append([x1, y1, x1 + w, y1 + h])
+    return boxes
+
+
+def make_forbidden_mask(width: int, height: int, boxes: List[List[float]]) -> Image.Image:
+    """감지 박스를 채운 금지 영역 마스크 (L, 255=금지)"""
+    mask = Image.new("L", (width, height), 0)
+    draw = ImageDraw.Draw(mask)
+    for x1, y1, x2, y2 in boxes:
+        draw.rectangle([x1, y1, x2, y2], fill=255)
+    return mask
+
+
+def make_ocr_text(text: str, seed: int = 0) -> str:
+    """OCR 인식 결과 흉내 (일부 문자 누락 / 치환)"""
+    rng = random.Random(seed)
+    chars = []
+    for ch in text:
+        r = rng.random()
+        if r < 0.05:
+            continue
+        chars.append("?" if r < 0.1 else ch)
+    return "".join(chars)
+
+
+def resolve_font_path(font_override: Optional[str], text: str) -> Optional[str]:
+    """텍스트를 렌더링할 폰트 경로 (--font > 폰트 레지스트리)"""
+    if font_override:
+        return font_override
+    try:
+        face, _ = get_font_registry().resolve(text)
+        return face.path
+    except RuntimeError:
+        return None
+
+
+# ==============================
+# 측정
+# ==============================
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    """호출당 시간(ms) 중앙값 / 최솟값 (측정 중 stdout 억제)"""
+    sink = io.StringIO()
+    with redirect_stdout(sink):
+        t = time.perf_counter()
+        func()  # 워밍업 (캐시, lazy import)
+        elapsed = time.perf_counter() - t
+        number = max(1, int(min_time / max(elapsed, 1e-6)))
+        samples = []
+        for _ in range(repeat):
+            sink.seek(0)
+            sink.truncate()
+            t = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - t) / number * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def build_cases(font_override: Optional[str] = None) -> Tuple[Dict[str, Callable[[], Any]], List[str]]:
+    """벤치마크 케이스 이름 → 호출 함수 (건너뛴 케이스 사유 목록 함께 반환)"""
+    cases: Dict[str, Callable[[], Any]] = {}
+    skipped: List[str] = []
+    bench_logger = logging.getLogger("benchmark")
+
+    for width, height in RESOLUTIONS:
+        res = f"{width}x{height}"
+        image = make_image(width, height)
+
+        for count in BOX_COUNTS:
+            boxes = make_boxes(width, height, count, seed=count)
+            mask = make_forbidden_mask(width, height, boxes) if boxes else None
+            detections = {"boxes": boxes} if boxes else None
+
+            cases[f"planner/{res}/boxes={count}"] = (
+                lambda image=image, detections=detections, mask=mask:
+                propose_overlay_positions(image, detections=detections, forbidden_mask=mask)
+            )
+
+            with redirect_stdout(io.StringIO()):
+                proposals = propose_overlay_positions(image, detections=detections, forbidden_mask=mask)["proposals"]
+            for text_key in ("ko_short", "ko_long"):
+                ad_text = AD_TEXTS[text_key]
+                forbidden_position = {"is_center_x": True, "is_top_y": False, "is_bottom_y": count > 0}
+                cases[f"select_proposal/{res}/boxes={count}/{text_key}"] = (
+                    lambda proposals=proposals, ad_text=ad_text, forbidden_position=forbidden_position:
+                    _select_best_proposal_with_diversity(
+                        [dict(p) for p in proposals], bench_logger, ad_text, forbidden_position
+                    )
+                )
+
+            text_region = (0.1, 0.05, 0.8, 0.15)
+            cases[f"iou_with_food/{res}/boxes={count}"] = (
+                lambda boxes=boxes, width=width, height=height:
+                calculate_iou_with_food(text_region, boxes, width, height)
+            )
+
+        region = (int(width * 0.1), int(height * 0.05), int(width * 0.8), int(height * 0.15))
+        cases[f"readability/{res}/sampled"] = (
+            lambda image=image, region=region:
+            evaluate_readability("FFFFFF", image=image, text_region=region, text_size=48)
+        )
+
+        # 텍스트 피팅은 박스 크기(해상도)에 따라 시도하는 폰트 크기 범위가 달라짐
+        if (width, height) not in ((1080, 1080), (2048, 2048)):
+            continue
+        draw = ImageDraw.Draw(image.copy())
+        max_font_size = max(24, height // 10)
+        for text_key, ad_text in AD_TEXTS.items():
+            font_path = resolve_font_path(font_override, ad_text)
+            if font_path is None:
+                skipped.append(f"fit_text/{res}/*/{text_key}: 사용 가능한 폰트 없음 (--font로 지정)")
+                continue
+            for box_key, (x0, y0, x1, y1) in FIT_BOXES.items():
+                bbox = (int(width * x0), int(height * y0), int(width * x1), int(height * y1))
+                cases[f"fit_text/{res}/{box_key}/{text_key}"] = (
+                    lambda draw=draw, ad_text=ad_text, bbox=bbox, font_path=font_path, max_font_size=max_font_size:
+                    fit_text(draw, ad_text, bbox, [font_path], 12, max_font_size)
+                )
+            font, _ = fit_text(draw, ad_text, (0, 0, width // 2, height // 4), [font_path], 12, max_font_size)
+            cases[f"wrap_text/{res}/{text_key}"] = (
+                lambda draw=draw, ad_text=ad_text, font=font, max_width=int(width * 0.8):
+                wrap_text(draw, ad_text, font, max_width)
+            )
+
+    for text_key, ad_text in AD_TEXTS.items():
+        recognized = make_ocr_text(ad_text)
+        cases[f"ocr_accuracy/{text_key}"] = (
+            lambda ad_text=ad_text, recognized=recognized: calculate_ocr_accuracy(ad_text, recognized)
+        )
+
+    return cases, skipped
+
+
+def run_benchmarks(filter_text: Optional[str], repeat: int, min_time: float,
+                   font_override: Optional[str] = None) -> Dict[str, Any]:
+    """모든 케이스 측정 (filter_text가 이름에 포함된 케이스만)"""
+    cases, skipped = build_cases(font_override)
+    for reason in skipped:
+        print(f"  - 건너뜀: {reason}")
+    results = {}
+    for name, func in cases.items():
+        if filter_text and filter_text not in name:
+            continue
+        results[name] = measure(func, repeat, min_time)
+        print(f"  {name:55s} {results[name]['median_ms']:10.3f}ms  (min {results[name]['min_ms']:.3f}ms, x{results[name]['number']})")
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+        },
+        "settings": {"repeat": repeat, "min_time": min_time},
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float, min_delta_ms: float) -> List[str]:
+    """
+    baseline 대비 비교 출력
+
+    Returns:
+        회귀 케이스 목록 (median이 threshold배 이상 느려지고 차이가 min_delta_ms 이상)
+    """
+    regressions = []
+    print("\n" + "-" * 60)
+    print(f"baseline 비교 ({baseline.get('created_at')}, threshold x{threshold})")
+    print("-" * 60)
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"  {name:55s} (baseline 없음)")
+            continue
+        ratio = result["median_ms"] / max(base["median_ms"], 1e-9)
+        regressed = ratio >= threshold and result["median_ms"] - base["median_ms"] >= min_delta_ms
+        mark = "✗" if regressed else ("↑" if ratio <= 1 / threshold else " ")
+        print(f"{mark} {name:55s} {base['median_ms']:10.3f}ms → {result['median_ms']:10.3f}ms  x{ratio:.2f}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="CPU hot path 마이크로 벤치마크")
+    parser.add_argument("--baseline", type=str, default=str(DEFAULT_BASELINE), help="baseline JSON 경로")
+    parser.add_argument("--save-baseline", action="store_true", help="측정 결과를 baseline으로 저장")
+    parser.add_argument("--output", type=str, default=None, help="측정 결과 JSON 저장 경로 (선택)")
+    parser.add_argument("--threshold", type=float, default=1.25, help="회귀 판정 배수 (기본값: 1.25)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="회귀 판정 최소 차이 ms (기본값: 0.05)")
+    parser.add_argument("--filter", type=str, default=None, help="케이스 이름 필터 (예: planner, fit_text/1080x1080)")
+    parser.add_argument("--repeat", type=int, default=5, help="케이스별 측정 횟수 (기본값: 5)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="측정 1회 최소 시간(초) (기본값: 0.2)")
+    parser.add_argument("--font", type=str, default=None, help="텍스트 피팅에 사용할 폰트 파일 (기본값: 폰트 레지스트리)")
+
+    args = parser.parse_args()
+
+    # 측정 대상 함수의 로그 출력 억제
+    logging.disable(logging.CRITICAL)
+
+    print("=" * 60)
+    print("CPU hot path 마이크로 벤치마크")
+    print("=" * 60)
+    current = run_benchmarks(args.filter, args.repeat, args.min_time, args.font)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n결과 저장: {args.output}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n✓ baseline 저장: {baseline_path} ({len(current['results'])}개 케이스)")
+        sys.exit(0)
+
+    if not baseline_path.exists():
+        print(f"\nbaseline 없음: {baseline_path} (--save-baseline으로 먼저 저장하세요)")
+        sys.exit(0)
+
+    regressions = compare(current, json.loads(baseline_path.read_text(encoding="utf-8")),
+                          args.threshold, args.min_delta_ms)
+    print("\n" + "=" * 60)
+    if regressions:
+        print(f"✗ 성능 회귀 {len(regressions)}건: {', '.join(regressions)}")
+    else:
+        print("✓ 성능 회귀 없음")
+    print("=" * 60)
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""앱 import 시간 벤치마크 스크립트
+
+APP_ROLES 프로파일별로 `import main`을 새 프로세스에서 실행하여
+import 시간(-X importtime)과 무거운 ML 모듈 로드 여부를 확인합니다.
+CPU 워커 프로파일(planner/overlay/evals 등)에서 torch/transformers/ultralytics/easyocr/openai가
+import되거나 예산 시간을 넘으면 실패합니다 (import 시간 회귀 방지).
+
+사용 방법:
+    python3 test/test_import_time.py
+    python3 test/test_import_time.py --roles planner,overlay,evals --budget-ms 1500
+    python3 test/test_import_time.py --top 20  # 느린 모듈 상위 20개 출력
+"""
+########################################################
+# created_at: 2026-10-19
+# author: LEEYH205
+# description: APP_ROLES별 import 시간 벤치마크 및 무거운 모듈 lazy import 검증
+# version: 1.0.0
+########################################################
+
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+
+# CPU 워커 프로파일에서 import되면 안 되는 모듈 (첫 사용 시점에 lazy import)
+HEAVY_MODULES = ["torch", "transformers", "ultralytics", "easyocr", "openai"]
+
+# 프로파일별 import 시간 예산 (ms)
+DEFAULT_PROFILES = {
+    "planner,overlay,evals": 2500,
+    "readability_eval,iou_eval": 2500,
+    "listener": 2500,
+}
+
+_PROBE = (
+    "import sys, time, json\n"
+    "t = time.perf_counter()\n"
+    "import main\n"
+    "elapsed_ms = (time.perf_counter() - t) * 1000\n"
+    "print('__RESULT__' + json.dumps({'elapsed_ms': elapsed_ms, "
+    "'heavy': [m for m in %r if m in sys.modules], "
+    "'routers': main.ACTIVE_ROUTERS}))\n"
+) % (HEAVY_MODULES,)
+
+
+def measure_import(roles: str, top: int = 10) -> dict:
+    """
+    새 프로세스에서 APP_ROLES=roles로 main을 import하고 결과 반환
+
+    Returns:
+        {"elapsed_ms": float, "heavy": list, "routers": list, "slowest": [(module, cumulative_us)]}
+    """
+    env = dict(os.environ)
+    env["APP_ROLES"] = roles
+    env["ENABLE_JOB_STATE_LISTENER"] = "false"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=str(project_root),
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+    result_line = next((l for l in proc.stdout.splitlines() if l.startswith("__RESULT__")), None)
+    if proc.returncode != 0 or result_line is None:
+        raise RuntimeError(f"import main 실패 (APP_ROLES={roles}):\n{proc.stderr[-2000:]}")
+    result = json.loads(result_line[len("__RESULT__"):])
+
+    # -X importtime 출력: "import time: self [us] | cumulative | imported package"
+    timings = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) == 3:
+            timings.append((parts[2].strip(), int(parts[1].strip())))
+    timings.sort(key=lambda x: x[1], reverse=True)
+    result["slowest"] = timings[:top]
+    return result
+
+
+def test_import_time(profiles: dict = None, top: int = 10) -> bool:
+    """프로파일별 import 시간 및 무거운 모듈 로드 여부 검증"""
+    profiles = profiles or DEFAULT_PROFILES
+    all_passed = True
+
+    print("=" * 60)
+    print("앱 import 시간 벤치마크")
+    print("=" * 60)
+
+    for roles, budget_ms in profiles.items():
+        result = measure_import(roles, top=top)
+        passed = not result["heavy"] and result["elapsed_ms"] <= budget_ms
+        all_passed = all_passed and passed
+
+        print(f"\n[APP_ROLES={roles}] {'✓ 통과' if passed else '✗ 실패'}")
+        print(f"  - import 시간: {result['elapsed_ms']:.0f}ms (예산: {budget_ms}ms)")
+        print(f"  - 마운트 라우터: {', '.join(result['routers']) or '(health만)'}")
+        print(f"  - 무거운 모듈 로드: {', '.join(result['heavy']) or '없음'}")
+        print(f"  - 느린 모듈 상위 {top}개 (누적):")
+        for module, cumulative_us in result["slowest"]:
+            print(f"      {cumulative_us / 1000:8.1f}ms  {module}")
+
+    print("\n" + "=" * 60)
+    print("✓ 모든 프로파일 통과" if all_passed else "✗ 일부 프로파일 실패")
+    print("=" * 60)
+    return all_passed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="APP_ROLES별 import 시간 벤치마크")
+    parser.add_argument("--roles", type=str, default=None, help="측정할 APP_ROLES (기본값: 기본 프로파일 전체)")
+    parser.add_argument("--budget-ms", type=int, default=2500, help="import 시간 예산 ms (--roles 지정 시, 기본값: 2500)")
+    parser.add_argument("--top", type=int, default=10, help="출력할 느린 모듈 개수 (기본값: 10)")
+
+    args = parser.parse_args()
+
+    profiles = {args.roles: args.budget_ms} if args.roles else None
+    sys.exit(0 if test_import_time(profiles, top=args.top) else 1)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""LLaVa CPU 추론 프로파일 벤치마크 스크립트
+
+LLAVA_CPU_PROFILE(fp32 / bf16 / int8)별로 새 프로세스에서 LLaVa 모델을 CPU로 로드하고
+로드 시간, 최대 RSS, 생성 지연 시간을 측정하여 기존 경로(fp32)와 비교합니다.
+프로파일마다 프로세스를 분리하므로 이전 프로파일의 메모리가 측정에 섞이지 않습니다.
+
+사용 방법:
+    python3 test/test_llava_cpu_profile.py --image /path/to/image.png
+    python3 test/test_llava_cpu_profile.py --image /path/to/image.png --profiles fp32,int8 --runs 3
+    python3 test/test_llava_cpu_profile.py --image /path/to/image.png --threads 16 --compile
+"""
+########################################################
+# created_at: 2026-10-19
+# author: LEEYH205
+# description: LLAVA_CPU_PROFILE별 로드 시간 / 메모리 / 생성 지연 시간 벤치마크
+# version: 1.0.0
+########################################################
+
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+
+DEFAULT_PROMPT = "Describe this image in one sentence."
+
+_PROBE = """
+import sys, time, json, resource
+from PIL import Image
+from services import llava_service
+
+image = Image.open(sys.argv[1]).convert("RGB")
+prompt, runs, max_new_tokens = sys.argv[2], int(sys.argv[3]), int(sys.argv[4])
+
+t = time.perf_counter()
+processor, model = llava_service.get_llava_model()
+load_seconds = time.perf_counter() - t
+
+latencies, response = [], ""
+for _ in range(runs):
+    t = time.perf_counter()
+    response = llava_service.process_image_with_llava(image, prompt, max_new_tokens=max_new_tokens)
+    latencies.append(time.perf_counter() - t)
+
+print("__RESULT__" + json.dumps({
+    "load_seconds": load_seconds,
+    "latencies": latencies,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "dtype": str(model.dtype),
+    "response": response
+}))
+"""
+
+
+def run_profile(profile: str, image_path: str, prompt: str, runs: int, max_new_tokens: int,
+                threads: int = 0, compile_model: bool = False) -> dict:
+    """
+    새 프로세스에서 LLAVA_CPU_PROFILE=profile로 모델을 로드하고 생성 지연 시간 측정
+
+    Returns:
+        {"load_seconds", "latencies", "peak_rss_mb", "dtype", "response"}
+    """
+    env = dict(os.environ)
+    env["DEVICE_TYPE"] = "cpu"
+    env["LLAVA_CPU_PROFILE"] = profile
+    env["LLAVA_CPU_THREADS"] = str(threads)
+    env["LLAVA_CPU_COMPILE"] = "true" if compile_model else "false"
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE, image_path, prompt, str(runs), str(max_new_tokens)],
+        cwd=str(project_root),
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    result_line = next((l for l in proc.stdout.splitlines() if l.startswith("__RESULT__")), None)
+    if proc.returncode != 0 or result_line is None:
+        raise RuntimeError(f"프로파일 실행 실패 (LLAVA_CPU_PROFILE={profile}):\n{proc.stderr[-2000:]}")
+    return json.loads(result_line[len("__RESULT__"):])
+
+
+def test_llava_cpu_profile(image_path: str, profiles: list, prompt: str = DEFAULT_PROMPT, runs: int = 2,
+                           max_new_tokens: int = 64, threads: int = 0, compile_model: bool = False) -> bool:
+    """프로파일별 벤치마크 실행 및 fp32 대비 비교 출력"""
+    print("=" * 60)
+    print("LLaVa CPU 추론 프로파일 벤치마크")
+    print("=" * 60)
+    print(f"이미지: {image_path}")
+    print(f"프로파일: {', '.join(profiles)} (runs={runs}, max_new_tokens={max_new_tokens}, "
+          f"threads={threads or 'auto'}, compile={compile_model})")
+
+    results = {}
+    for profile in profiles:
+        print(f"\n[{profile}] 모델 로드 및 생성 중... (시간이 걸릴 수 있습니다)")
+        try:
+            results[profile] = run_profile(profile, image_path, prompt, runs, max_new_tokens, threads, compile_model)
+        except Exception as e:
+            print(f"✗ {e}")
+            continue
+        r = results[profile]
+        # 첫 실행은 워밍업(컴파일, 캐시) 포함이므로 이후 실행 평균을 대표값으로 사용
+        steady = r["latencies"][1:] or r["latencies"]
+        r["steady_seconds"] = sum(steady) / len(steady)
+        print(f"  - dtype: {r['dtype']}")
+        print(f"  - 로드 시간: {r['load_seconds']:.1f}s")
+        print(f"  - 최대 RSS: {r['peak_rss_mb']:.0f}MB")
+        print(f"  - 생성 시간: 첫 실행 {r['latencies'][0]:.1f}s, 이후 평균 {r['steady_seconds']:.1f}s")
+        print(f"  - 응답: {r['response'][:120]}")
+
+    baseline = results.get("fp32")
+    if baseline:
+        print("\n" + "-" * 60)
+        print("fp32 대비")
+        print("-" * 60)
+        for profile, r in results.items():
+            print(f"  {profile:5s}: 생성 x{baseline['steady_seconds'] / r['steady_seconds']:.2f} 빠름, "
+                  f"메모리 {r['peak_rss_mb'] / baseline['peak_rss_mb'] * 100:.0f}%")
+
+    print("\n" + "=" * 60)
+    passed = len(results) == len(profiles)
+    print("✓ 모든 프로파일 실행 완료" if passed else "✗ 일부 프로파일 실패")
+    print("=" * 60)
+    return passed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="LLaVa CPU 추론 프로파일 벤치마크")
+    parser.add_argument("--image", type=str, required=True, help="테스트 이미지 경로")
+    parser.add_argument("--profiles", type=str, default="fp32,bf16,int8", help="측정할 프로파일 (기본값: fp32,bf16,int8)")
+    parser.add_argument("--prompt", type=str, default=DEFAULT_PROMPT, help="생성 프롬프트")
+    parser.add_argument("--runs", type=int, default=2, help="프로파일별 생성 횟수 (기본값: 2)")
+    parser.add_argument("--max-new-tokens", type=int, default=64, help="최대 생성 토큰 수 (기본값: 64)")
+    parser.add_argument("--threads", type=int, default=0, help="LLAVA_CPU_THREADS (기본값: 0=자동)")
+    parser.add_argument("--compile", action="store_true", help="torch.compile 사용 (LLAVA_CPU_COMPILE)")
+
+    args = parser.parse_args()
+
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    passed = test_llava_cpu_profile(args.image, profiles, args.prompt, args.runs, args.max_new_tokens,
+                                    args.threads, args.compile)
+    sys.exit(0 if passed else 1)